@@ -0,0 +1,4 @@
+"""
+效能基準測試
+於 alumni_platform_api 目錄下以 python -m benchmarks.<名稱> 執行
+"""
@@ -0,0 +1,113 @@
+"""
+應用程式啟動時間基準測試
+以 python -X importtime 在新的子行程中建立應用程式，量測 worker 啟動（匯入 + create_app）的耗時，
+並列出累計匯入時間最長的模組
+
+情境：
+    import      只匯入 src.app（工廠模組本身應該很輕）
+    create_app  create_app() 且不初始化資料庫（正式環境 worker / 測試）
+    dev         create_app() 並執行開發環境的資料庫初始化（create_all、示範資料檢查、索引同步）
+
+用法（於 alumni_platform_api 目錄）：
+    python -m benchmarks.import_time --top 15
+    python -m benchmarks.import_time --scenario create_app --max-seconds 5   # CI：超過上限時結束碼為 1
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import': 'import src.app',
+    'create_app': "from src.app import create_app; create_app({'AUTO_INIT_DATABASE': False})",
+    'dev': "from src.app import create_app; create_app({'AUTO_INIT_DATABASE': True})",
+}
+
+# -X importtime 輸出：import time:  self [us] | cumulative | imported package
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的輸出
+
+    Returns:
+        list[dict]: 每個模組的 self / cumulative 微秒與巢狀深度（0 為直接匯入）
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': (len(indent) - 1) // 2,
+            })
+    return modules
+
+
+def run(scenario, top=10, directory=None):
+    """
+    在子行程中執行一個情境
+
+    Returns:
+        dict: 總耗時（秒）、匯入耗時（秒）、匯入的模組數與累計時間最長的直接匯入
+    """
+    directory = directory or tempfile.mkdtemp(prefix='import-bench-')
+    env = dict(os.environ)
+    env.update({
+        'SCHEDULER_ENABLED': 'false',
+        'DATABASE_URL': f"sqlite:///{os.path.join(directory, f'{scenario}.db')}",
+        'PYTHONDONTWRITEBYTECODE': '1',
+    })
+    env.pop('FLASK_ENV', None)
+    env.pop('PRODUCTION', None)
+    code = (
+        'import sys, time; sys.path.insert(0, {!r}); started = time.perf_counter(); {}; '
+        'print(time.perf_counter() - started)'
+    ).format(PROJECT_DIR, SCENARIOS[scenario])
+
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_DIR, env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{scenario} failed:\n{completed.stderr[-4000:]}')
+
+    modules = parse_importtime(completed.stderr)
+    roots = sorted((m for m in modules if m['depth'] == 0), key=lambda m: m['cumulative_us'], reverse=True)
+    return {
+        'scenario': scenario,
+        'total_seconds': round(float(completed.stdout.strip().splitlines()[-1]), 3),
+        'import_seconds': round(sum(m['cumulative_us'] for m in roots) / 1e6, 3),
+        'modules': len(modules),
+        'top': [{'module': m['module'], 'cumulative_ms': round(m['cumulative_us'] / 1000, 1)} for m in roots[:top]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='應用程式啟動時間基準測試')
+    parser.add_argument('--scenario', choices=[*SCENARIOS, 'all'], default='all')
+    parser.add_argument('--top', type=int, default=10, help='列出累計匯入時間最長的前幾個模組')
+    parser.add_argument('--max-seconds', type=float, help='任一情境的總耗時超過此值時結束碼為 1')
+    args = parser.parse_args(argv)
+
+    scenarios = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+    results = [run(scenario, args.top) for scenario in scenarios]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.max_seconds is not None:
+        slow = [r['scenario'] for r in results if r['total_seconds'] > args.max_seconds]
+        if slow:
+            print(f"Startup budget exceeded ({args.max_seconds}s): {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
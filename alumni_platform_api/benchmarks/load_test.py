@@ -0,0 +1,506 @@
+"""
+HTTP 負載測試
+以腳本化的使用者旅程（登入、輪詢未讀數、瀏覽職缺 / 活動 / 公告、搜尋、HTTP 與 Socket.IO 訊息、活動報名）
+對執行中的伺服器施壓，記錄各端點的吞吐量與延遲百分位數，輸出可跨 commit 比較的 JSON 報告
+
+只使用標準函式庫（http.client + threading）；Socket.IO 以 Engine.IO v4 long-polling 協定連線，
+量測從 HTTP 送出訊息到對話房間收到 new_message 事件的時間
+
+準備（於 alumni_platform_api 目錄）：
+    python -m benchmarks.dataset --users 10000 --database-url sqlite:////tmp/load.db --reset
+    DATABASE_URL=sqlite:////tmp/load.db RATELIMIT_ENABLED=false SCHEDULER_ENABLED=false python src/main_v2.py
+
+執行：
+    python -m benchmarks.load_test --dataset-users 10000 --vusers 20 --duration 60 --output report.json
+    python -m benchmarks.load_test --dataset-users 10000 --compare baseline.json   # p95 退步超過門檻時結束碼為 1
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.dataset import COMPANIES, DEFAULT_PASSWORD, POSITIONS, DatasetGenerator  # noqa: E402
+
+SEARCH_TYPES = ('jobs', 'users', 'bulletins')
+
+
+def percentile(values, percent):
+    """最近序位百分位數（values 需已排序）"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+# ========================================
+# 統計
+# ========================================
+class Stats:
+    """各端點的延遲、狀態碼與錯誤數（執行緒安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, name, seconds, ok, status=None):
+        with self._lock:
+            entry = self._endpoints.setdefault(name, {'latencies': [], 'errors': 0, 'statuses': Counter()})
+            entry['latencies'].append(seconds)
+            entry['statuses'][str(status)] += 1
+            if not ok:
+                entry['errors'] += 1
+
+    def report(self, elapsed):
+        """
+        Returns:
+            dict: {'totals': {...}, 'endpoints': {名稱: {...}}}，時間單位為毫秒
+        """
+        def summarize(latencies, errors):
+            latencies = sorted(latencies)
+            count = len(latencies)
+            return {
+                'requests': count,
+                'errors': errors,
+                'rps': round(count / elapsed, 2) if elapsed else 0.0,
+                'mean_ms': round(sum(latencies) / count * 1000, 2) if count else 0.0,
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2) if count else 0.0,
+            }
+
+        with self._lock:
+            endpoints = {}
+            for name in sorted(self._endpoints):
+                entry = self._endpoints[name]
+                endpoints[name] = {**summarize(entry['latencies'], entry['errors']),
+                                   'statuses': dict(sorted(entry['statuses'].items()))}
+            everything = [value for entry in self._endpoints.values() for value in entry['latencies']]
+            errors = sum(entry['errors'] for entry in self._endpoints.values())
+        return {'totals': summarize(everything, errors), 'endpoints': endpoints}
+
+
+# ========================================
+# HTTP / Socket.IO 用戶端
+# ========================================
+class HttpSession:
+    """單一虛擬使用者的 keep-alive HTTP 連線"""
+
+    def __init__(self, base_url, stats, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def request(self, method, path, name=None, body=None, expect=(200,), raw=None, headers=None):
+        """
+        送出請求並記錄延遲
+
+        Args:
+            name: 統計用的端點名稱（預設為 "METHOD path"；含 id 的路徑請傳入樣板，例如 GET /api/v2/jobs/:id）
+            expect: 視為成功的狀態碼
+            raw: 直接送出的字串內容（Socket.IO），未提供時以 JSON 編碼 body
+
+        Returns:
+            tuple: (狀態碼, 解析後的 JSON 或文字)；連線錯誤時狀態碼為 None
+        """
+        name = name or f'{method} {path.split("?")[0]}'
+        request_headers = dict(headers or {})
+        if self.token:
+            request_headers['Authorization'] = f'Bearer {self.token}'
+        payload = raw
+        if body is not None:
+            payload = json.dumps(body)
+            request_headers['Content-Type'] = 'application/json'
+
+        started = time.perf_counter()
+        try:
+            connection = self._connect()
+            connection.request(method, path, body=payload.encode() if payload is not None else None,
+                               headers=request_headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.stats.record(name, time.perf_counter() - started, False, 'connection_error')
+            self.close()
+            return None, None
+        self.stats.record(name, time.perf_counter() - started, response.status in expect, response.status)
+
+        text = content.decode('utf-8', errors='replace')
+        if response.getheader('Content-Type', '').startswith('application/json'):
+            try:
+                return response.status, json.loads(text)
+            except ValueError:
+                pass
+        return response.status, text
+
+
+class SocketIOClient:
+    """
+    最小的 Socket.IO 用戶端（Engine.IO v4 long-polling）
+
+    背景執行緒持續 long-poll 接收封包：回應 ping，並把事件放入 events 佇列
+    """
+
+    PATH = '/socket.io/'
+
+    def __init__(self, base_url, stats):
+        self.http = HttpSession(base_url, stats, timeout=60)
+        self.receiver = HttpSession(base_url, Stats(), timeout=60)
+        self.stats = stats
+        self.sid = None
+        self.events = queue.Queue()
+        self.connected = threading.Event()
+        self._closed = threading.Event()
+        # 接收執行緒回應 ping 與虛擬使用者送出事件共用同一條連線
+        self._send_lock = threading.Lock()
+
+    def _url(self):
+        params = {'EIO': 4, 'transport': 'polling', 't': uuid.uuid4().hex[:8]}
+        if self.sid:
+            params['sid'] = self.sid
+        return f'{self.PATH}?{urlencode(params)}'
+
+    def _post(self, packet, name):
+        with self._send_lock:
+            status, _ = self.http.request('POST', self._url(), name=name, raw=packet,
+                                          headers={'Content-Type': 'text/plain;charset=UTF-8'})
+        return status == 200
+
+    def connect(self, token, timeout=10):
+        """握手並以 token 連線預設 namespace；成功時回傳 True"""
+        started = time.perf_counter()
+        status, body = self.http.request('GET', self._url(), name='SIO handshake')
+        if status != 200 or not isinstance(body, str) or not body.startswith('0'):
+            return False
+        self.sid = json.loads(body[1:])['sid']
+        if not self._post('40' + json.dumps({'token': token}), 'SIO connect'):
+            return False
+        threading.Thread(target=self._receive_loop, daemon=True).start()
+        ok = self.connected.wait(timeout)
+        self.stats.record('SIO connected', time.perf_counter() - started, ok, 'ok' if ok else 'timeout')
+        return ok
+
+    def emit(self, event, *args):
+        return self._post('42' + json.dumps([event, *args]), f'SIO emit {event}')
+
+    def wait_for(self, event, predicate=lambda data: True, timeout=10):
+        """等待特定事件（其他事件丟棄）；逾時回傳 None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                name, data = self.events.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if name == event and predicate(data):
+                return data
+
+    def close(self):
+        if self.sid and not self._closed.is_set():
+            self._closed.set()
+            self._post('1', 'SIO close')
+        self.http.close()
+        self.receiver.close()
+
+    def _receive_loop(self):
+        while not self._closed.is_set():
+            status, body = self.receiver.request('GET', self._url(), name='SIO poll')
+            if status != 200 or not isinstance(body, str):
+                self._closed.set()
+                return
+            for packet in body.split('\x1e'):
+                if packet == '2':
+                    self._post('3', 'SIO pong')
+                elif packet == '1':
+                    self._closed.set()
+                elif packet.startswith('40'):
+                    self.connected.set()
+                elif packet.startswith('42'):
+                    name, *args = json.loads(packet[2:])
+                    self.events.put((name, args[0] if args else None))
+
+
+# ========================================
+# 使用者旅程
+# ========================================
+class Journey:
+    """
+    單一虛擬使用者：登入後依權重隨機執行任務，任務之間隨機停頓（think time）
+
+    TASKS 的權重大致對應前端的實際流量：未讀數輪詢最頻繁，寫入（傳訊、報名）最少
+    """
+
+    TASKS = (
+        ('poll_unread', 10),
+        ('browse_jobs', 5),
+        ('browse_events', 4),
+        ('read_messages', 3),
+        ('browse_bulletins', 2),
+        ('search', 2),
+        ('send_message', 2),
+        ('register_event', 1),
+    )
+
+    def __init__(self, base_url, stats, dataset_users, rng, think_time=1.0, socketio=True):
+        self.base_url = base_url
+        self.http = HttpSession(base_url, stats)
+        self.stats = stats
+        self.rng = rng
+        self.dataset_users = max(2, dataset_users)
+        self.user_id = rng.randint(2, self.dataset_users)
+        self.think_time = think_time
+        self.use_socketio = socketio
+        self.socket = None
+        self.conversations = []
+        self.events = []
+
+    def run(self, deadline):
+        try:
+            if not self.login():
+                return
+            names, weights = zip(*self.TASKS)
+            while time.monotonic() < deadline:
+                getattr(self, self.rng.choices(names, weights)[0])()
+                if self.think_time:
+                    time.sleep(min(self.rng.expovariate(1 / self.think_time), max(0.0, deadline - time.monotonic())))
+        finally:
+            if self.socket is not None:
+                self.socket.close()
+            self.http.close()
+
+    def login(self, attempts=3):
+        """登入；資料集中約 3% 的帳號待審核無法登入，此時改用其他帳號"""
+        for _ in range(attempts):
+            status, data = self.http.request('POST', '/api/v2/auth/login', body={
+                'email': DatasetGenerator.email(self.user_id), 'password': DEFAULT_PASSWORD,
+            }, expect=(200, 401, 403))
+            if status == 200:
+                break
+            self.user_id = self.rng.randint(2, self.dataset_users)
+        else:
+            return False
+        self.http.token = data['access_token']
+        if self.use_socketio:
+            self.socket = SocketIOClient(self.base_url, self.stats)
+            if not self.socket.connect(self.http.token):
+                self.socket.close()
+                self.socket = None
+        return True
+
+    # ----------------------------------------
+    # 任務
+    # ----------------------------------------
+    def poll_unread(self):
+        self.http.request('GET', '/api/notifications/unread-count')
+        self.http.request('GET', '/api/v2/messages/unread-count')
+
+    def browse_jobs(self):
+        status, data = self.http.request('GET', f'/api/v2/jobs?page={self.rng.randint(1, 3)}',
+                                         name='GET /api/v2/jobs')
+        jobs = data.get('jobs', []) if status == 200 else []
+        if jobs:
+            self.http.request('GET', f"/api/v2/jobs/{self.rng.choice(jobs)['id']}", name='GET /api/v2/jobs/:id')
+
+    def browse_events(self):
+        status, data = self.http.request('GET', '/api/v2/events')
+        self.events = data.get('events', []) if status == 200 else []
+        if self.events:
+            self.http.request('GET', f"/api/v2/events/{self.rng.choice(self.events)['id']}",
+                              name='GET /api/v2/events/:id')
+
+    def browse_bulletins(self):
+        self.http.request('GET', '/api/v2/bulletins')
+
+    def search(self):
+        term = self.rng.choice((*(company for company, _, _ in COMPANIES), *POSITIONS))
+        self.http.request('GET', '/api/v2/search?' + urlencode({'q': term, 'type': self.rng.choice(SEARCH_TYPES)}),
+                          name='GET /api/v2/search')
+
+    def _load_conversations(self):
+        status, data = self.http.request('GET', '/api/v2/conversations')
+        self.conversations = data.get('conversations', []) if status == 200 else []
+
+    def read_messages(self):
+        self._load_conversations()
+        if self.conversations:
+            conversation_id = self.rng.choice(self.conversations)['id']
+            self.http.request('GET', f'/api/v2/conversations/{conversation_id}/messages',
+                              name='GET /api/v2/conversations/:id/messages')
+            self.http.request('POST', f'/api/v2/conversations/{conversation_id}/mark-read',
+                              name='POST /api/v2/conversations/:id/mark-read')
+
+    def send_message(self):
+        if not self.conversations:
+            self._load_conversations()
+        if not self.conversations:
+            return
+        conversation_id = self.rng.choice(self.conversations)['id']
+        content = f'負載測試訊息 {uuid.uuid4().hex[:12]}'
+        if self.socket is not None:
+            self.socket.emit('subscribe_messages', {'token': self.http.token}, {'conversation_id': conversation_id})
+
+        started = time.perf_counter()
+        status, _ = self.http.request('POST', f'/api/v2/conversations/{conversation_id}/messages',
+                                      name='POST /api/v2/conversations/:id/messages', body={'content': content},
+                                      expect=(201,))
+        if status == 201 and self.socket is not None:
+            delivered = self.socket.wait_for('new_message', lambda data: data.get('content') == content)
+            self.stats.record('SIO new_message delivery', time.perf_counter() - started, delivered is not None,
+                              'ok' if delivered is not None else 'timeout')
+
+    def register_event(self):
+        if not self.events:
+            self.browse_events()
+        if self.events:
+            # 已報名或額滿回應 400，屬於正常情況
+            self.http.request('POST', f"/api/v2/events/{self.rng.choice(self.events)['id']}/register",
+                              name='POST /api/v2/events/:id/register', body={}, expect=(200, 201, 400))
+
+
+# ========================================
+# 執行與比較
+# ========================================
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(base_url='http://localhost:5001', dataset_users=10000, vusers=10, duration=30.0, spawn_rate=5.0,
+        think_time=1.0, seed=42, socketio=True):
+    """
+    執行負載測試
+
+    Args:
+        dataset_users: 資料集的系友人數（虛擬使用者從 2..dataset_users 中挑選帳號登入）
+        spawn_rate: 每秒啟動的虛擬使用者數
+
+    Returns:
+        dict: JSON 報告
+    """
+    stats = Stats()
+    started_at = datetime.utcnow()
+    started = time.monotonic()
+    deadline = started + duration
+
+    threads = []
+    for index in range(vusers):
+        journey = Journey(base_url, stats, dataset_users, random.Random(f'{seed}:{index}'), think_time, socketio)
+        thread = threading.Thread(target=journey.run, args=(deadline,), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if spawn_rate:
+            time.sleep(1 / spawn_rate)
+    for thread in threads:
+        thread.join(timeout=max(0.0, deadline - time.monotonic()) + 60)
+    elapsed = time.monotonic() - started
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'started_at': started_at.isoformat(),
+            'base_url': base_url,
+            'dataset_users': dataset_users,
+            'vusers': vusers,
+            'duration_seconds': round(elapsed, 2),
+            'think_time': think_time,
+            'seed': seed,
+            'socketio': socketio,
+        },
+        **stats.report(elapsed),
+    }
+
+
+def compare(baseline, current, max_regression=0.2, min_delta_ms=5.0):
+    """
+    比較兩份報告的各端點 p95 與錯誤率
+
+    p95 增加超過 max_regression 比例且至少 min_delta_ms 毫秒，或錯誤率上升超過 1 個百分點時列為退步
+
+    Returns:
+        list[dict]: 退步的端點
+    """
+    regressions = []
+    for name, now in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None or not before['requests'] or not now['requests']:
+            continue
+        delta = now['p95_ms'] - before['p95_ms']
+        error_rate = now['errors'] / now['requests'] - before['errors'] / before['requests']
+        slower = before['p95_ms'] and delta > min_delta_ms and delta / before['p95_ms'] > max_regression
+        if slower or error_rate > 0.01:
+            regressions.append({
+                'endpoint': name,
+                'baseline_p95_ms': before['p95_ms'],
+                'p95_ms': now['p95_ms'],
+                'change': round(delta / before['p95_ms'], 3) if before['p95_ms'] else None,
+                'error_rate_change': round(error_rate, 4),
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HTTP 負載測試')
+    parser.add_argument('--host', default='http://localhost:5001')
+    parser.add_argument('--dataset-users', type=int, default=10000, help='benchmarks.dataset 產生時的 --users')
+    parser.add_argument('--vusers', type=int, default=10, help='同時執行的虛擬使用者數')
+    parser.add_argument('--duration', type=float, default=30, help='秒')
+    parser.add_argument('--spawn-rate', type=float, default=5, help='每秒啟動的虛擬使用者數')
+    parser.add_argument('--think-time', type=float, default=1.0, help='任務之間的平均停頓秒數（0 表示不停頓）')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-socketio', action='store_true', help='不建立 Socket.IO 連線')
+    parser.add_argument('--output', help='報告寫入的 JSON 檔案')
+    parser.add_argument('--compare', help='基準報告；有端點退步時結束碼為 1')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='p95 允許的退步比例')
+    args = parser.parse_args(argv)
+
+    report = run(args.host, args.dataset_users, args.vusers, args.duration, args.spawn_rate, args.think_time,
+                 args.seed, not args.no_socketio)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.max_regression)
+        for item in regressions:
+            print(f"Regression: {item['endpoint']} p95 {item['baseline_p95_ms']}ms -> {item['p95_ms']}ms "
+                  f"(errors {item['error_rate_change']:+.2%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+SQLite 並行寫入基準測試
+比較預設 engine（rollback journal、無 PRAGMA）與 src.config.database 的 SQLite 設定，
+在多個寫入執行緒 + 讀取執行緒同時存取時的吞吐量、延遲與 "database is locked" 錯誤數
+
+用法（於 alumni_platform_api 目錄）：
+    python -m benchmarks.sqlite_concurrency --writers 8 --readers 4 --operations 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.database import configure_sqlite_engine, sqlite_engine_options  # noqa: E402
+
+SCHEMA = [
+    'CREATE TABLE messages (id INTEGER PRIMARY KEY, conversation_id INTEGER NOT NULL, '
+    'sender_id INTEGER NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL)',
+    'CREATE INDEX idx_messages_conversation ON messages (conversation_id, created_at)',
+]
+
+
+def make_engine(path, profile):
+    """profile：bare = SQLAlchemy 預設值；tuned = 專案的 SQLite 設定"""
+    url = f'sqlite:///{path}'
+    if profile == 'bare':
+        # 與舊設定相同：只有 URI，沒有任何 engine 參數（pysqlite 預設等待鎖 5 秒）
+        return create_engine(url, connect_args={'check_same_thread': False})
+    engine = create_engine(url, **sqlite_engine_options())
+    configure_sqlite_engine(engine)
+    return engine
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def run(profile, writers=8, readers=4, operations=200, directory=None):
+    """
+    執行一輪基準測試
+
+    每個寫入執行緒執行 operations 次「插入一筆訊息並更新對話摘要」交易，
+    讀取執行緒在寫入期間持續查詢最新訊息。
+
+    Returns:
+        dict: 吞吐量、寫入延遲百分位數（毫秒）、錯誤數
+    """
+    directory = directory or tempfile.mkdtemp(prefix='sqlite-bench-')
+    path = os.path.join(directory, f'{profile}.db')
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    engine = make_engine(path, profile)
+    with engine.begin() as connection:
+        for statement in SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql('CREATE TABLE conversations (id INTEGER PRIMARY KEY, last_message_at REAL)')
+        connection.exec_driver_sql('INSERT INTO conversations (id) VALUES ' +
+                                   ', '.join(f'({i})' for i in range(1, 51)))
+
+    latencies, errors, reads = [], [], [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer(worker_id):
+        local = []
+        for i in range(operations):
+            conversation_id = (worker_id * operations + i) % 50 + 1
+            started = time.perf_counter()
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        'INSERT INTO messages (conversation_id, sender_id, content, created_at) '
+                        'VALUES (:c, :s, :content, :t)'
+                    ), {'c': conversation_id, 's': worker_id, 'content': '訊息內容' * 10, 't': time.time()})
+                    connection.execute(text('UPDATE conversations SET last_message_at = :t WHERE id = :c'),
+                                       {'c': conversation_id, 't': time.time()})
+                local.append(time.perf_counter() - started)
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+        with lock:
+            latencies.extend(local)
+
+    def reader():
+        count = 0
+        while not done.is_set():
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text(
+                        'SELECT * FROM messages WHERE conversation_id = :c ORDER BY created_at DESC LIMIT 20'
+                    ), {'c': count % 50 + 1}).all()
+                count += 1
+            except OperationalError as e:
+                with lock:
+                    errors.append(str(e.orig))
+        with lock:
+            reads[0] += count
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        'profile': profile,
+        'writers': writers,
+        'readers': readers,
+        'writes': len(latencies),
+        'reads': reads[0],
+        'errors': len(errors),
+        'locked_errors': sum('locked' in error for error in errors),
+        'elapsed_seconds': round(elapsed, 3),
+        'writes_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'reads_per_second': round(reads[0] / elapsed, 1) if elapsed else 0.0,
+        'write_p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'write_p95_ms': round(_percentile(latencies, 95) * 1000, 3),
+        'write_p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'write_mean_ms': round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite 並行寫入基準測試')
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--operations', type=int, default=200, help='每個寫入執行緒的交易數')
+    parser.add_argument('--profile', choices=['bare', 'tuned', 'both'], default='both')
+    args = parser.parse_args(argv)
+
+    profiles = ['bare', 'tuned'] if args.profile == 'both' else [args.profile]
+    results = [run(profile, args.writers, args.readers, args.operations) for profile in profiles]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
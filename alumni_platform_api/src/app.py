@@ -0,0 +1,318 @@
+"""
+Flask 應用程式工廠
+create_app(config) 依設定建立應用程式；模組本身只匯入 Flask，模型、藍圖與各項工具在建立時才載入
+
+- 藍圖依 BLUEPRINTS 清單（'模組:屬性'）匯入並註冊，可用設定 BLUEPRINTS 只載入部分藍圖
+- 開發環境（非 production、非 TESTING）啟動時建立資料表並填入示範資料；
+  其他環境改由部署流程執行 `flask --app src.main_v2 init-db` 或 Alembic migration
+- Flask-Migrate（連帶 Alembic）只在 flask CLI 中載入，一般 worker 啟動不需要
+"""
+import importlib
+import logging
+import os
+
+from flask import Flask, jsonify, send_from_directory
+
+# 藍圖清單：(匯入路徑, 說明)
+BLUEPRINTS = (
+    ('src.routes.auth_v2:auth_v2_bp', '/api/v2/auth/*'),
+    ('src.routes.jobs_v2:jobs_v2_bp', '/api/v2/jobs/*'),
+    ('src.routes.events_v2:events_v2_bp', '/api/v2/events/*'),
+    ('src.routes.bulletins_v2:bulletins_v2_bp', '/api/v2/bulletins/*'),
+    ('src.routes.messages_v2:messages_v2_bp', '/api/v2/messages/*'),
+    ('src.routes.career:career_bp', '/api/career/*'),
+    ('src.routes.notifications:notifications_bp', '/api/notifications/*, /api/system/*, /api/activities/*, /api/files/*'),
+    ('src.routes.csv_import_export:csv_bp', '/api/csv/*'),
+    ('src.routes.admin_v2:admin_v2_bp', '/api/v2/admin/*'),
+    ('src.routes.cms_v2:cms_v2_bp', '/api/v2/cms/*'),
+    ('src.routes.search_v2:search_bp', '/api/v2/search/*'),
+    ('src.routes.contact_requests_v2:contact_requests_v2_bp', '/api/v2/contact-requests/*, /api/v2/contacts/*'),
+    ('src.routes.recommendations_v2:recommendations_v2_bp', '/api/v2/recommendations/*'),
+    ('src.routes.metrics:metrics_bp', '/metrics'),
+)
+
+
+def _load(path):
+    module_name, _, attribute = path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _is_production():
+    return os.environ.get('FLASK_ENV') == 'production' or os.environ.get('PRODUCTION') == 'true'
+
+
+# ========================================
+# 設定
+# ========================================
+def default_config():
+    """由環境變數組成的預設設定"""
+    from src.config.database import get_database_config
+
+    production = _is_production()
+    config = {
+        'PRODUCTION': production,
+        # 開發環境允許使用預設金鑰，生產環境必須設定環境變數
+        'SECRET_KEY': os.environ.get('SECRET_KEY') or (None if production else 'dev-secret-key-for-development-only'),
+        'JWT_SECRET_KEY': os.environ.get('JWT_SECRET_KEY') or (
+            None if production else 'dev-jwt-secret-key-for-development-only'),
+        'ALLOWED_ORIGINS': os.environ.get('ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(','),
+        'MAX_CONTENT_LENGTH': 10 * 1024 * 1024,  # 10MB
+        # 檔案上傳：單次上傳上限、分段上傳的檔案上限與建議分段大小（每段仍受 MAX_CONTENT_LENGTH 限制）
+        'UPLOAD_FOLDER': os.environ.get('UPLOAD_FOLDER'),
+        'UPLOAD_MAX_BYTES': int(os.environ.get('UPLOAD_MAX_BYTES', 5 * 1024 * 1024)),
+        'UPLOAD_CHUNKED_MAX_BYTES': int(os.environ.get('UPLOAD_CHUNKED_MAX_BYTES', 100 * 1024 * 1024)),
+        'UPLOAD_CHUNK_SIZE': 1024 * 1024,
+        'UPLOAD_SESSION_TTL': int(os.environ.get('UPLOAD_SESSION_TTL', 24 * 3600)),
+        'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+        # 負載測試時可關閉（所有請求來自同一個 IP）
+        'RATELIMIT_ENABLED': os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true',
+        'BLUEPRINTS': [path for path, _ in BLUEPRINTS],
+    }
+    config.update(get_database_config())
+    return config
+
+
+# ========================================
+# 工廠
+# ========================================
+def create_app(config=None):
+    """
+    建立 Flask 應用程式
+
+    Args:
+        config: 覆寫預設設定的 dict（例如測試用的 TESTING、SQLALCHEMY_DATABASE_URI）
+
+    Returns:
+        Flask
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.update(default_config())
+    app.config.update(config or {})
+    app.config.setdefault('AUTO_INIT_DATABASE', not app.config['PRODUCTION'] and not app.config.get('TESTING'))
+
+    if app.config['PRODUCTION'] and not (app.config['SECRET_KEY'] and app.config['JWT_SECRET_KEY']):
+        raise ValueError('生產環境必須設定 SECRET_KEY 和 JWT_SECRET_KEY 環境變數')
+
+    _init_extensions(app)
+    for path in app.config['BLUEPRINTS']:
+        app.register_blueprint(_load(path))
+    _register_core_routes(app)
+    _register_background_jobs(app)
+
+    from src.commands import register_commands
+    register_commands(app)
+
+    if app.config['AUTO_INIT_DATABASE']:
+        from src.seed import init_database
+        init_database(app)
+
+    return app
+
+
+def _init_extensions(app):
+    """資料庫、快取、監控與 WebSocket 等擴充套件"""
+    import click
+    from flask_cors import CORS
+    from src.config.database import configure_sqlite_engine
+    from src.extensions import limiter
+    from src.models_v2 import db
+    from src.routes.websocket import socketio
+    from src.utils.cache import response_cache
+    from src.utils.conditional import init_conditional_requests
+    from src.utils.contact_graph import contact_graph
+    from src.utils.db_routing import replica_router
+    from src.utils.directory import init_directory
+    from src.utils.job_matching import init_job_matching
+    from src.utils.performance import init_request_metrics, metrics_pipeline
+    from src.utils.pool_monitor import pool_monitor
+    from src.utils.sql_monitor import sql_monitor
+
+    # CORS 設定 - 限制允許的來源
+    CORS(app, origins=app.config['ALLOWED_ORIGINS'], supports_credentials=True)
+
+    # 初始化 Rate Limiter（測試環境停用）
+    limiter.init_app(app)
+    if app.config.get('TESTING'):
+        limiter.enabled = False
+
+    # Database configuration - 支援 SQLite (開發) 和 PostgreSQL (生產)
+    db.init_app(app)
+
+    # SQLite：每條連線套用 WAL / busy_timeout / foreign_keys 等 PRAGMA（見 src.config.database）
+    with app.app_context():
+        configure_sqlite_engine(db.engine)
+        # 連線池等待時間 / 逾時 / 使用中連線數（/metrics 與管理後台效能 API）
+        pool_monitor.register('primary', db.engine)
+    pool_monitor.init_app(app)
+
+    # 讀取副本：GET 與標記為唯讀的路徑讀副本，寫入與讀自己的寫入走主庫（見 src.utils.db_routing）
+    replica_router.read_your_writes_seconds = float(os.environ.get('DATABASE_READ_YOUR_WRITES_SECONDS', 5))
+    replica_router.max_lag_seconds = float(os.environ.get('DATABASE_REPLICA_MAX_LAG_SECONDS', 30))
+    replica_router.init_app(app)
+
+    # 初始化公開列表回應快取（設定 CACHE_REDIS_URL 時多個 worker 共用）
+    response_cache.init_app(app)
+
+    # 列表端點的 ETag / If-None-Match 支援
+    init_conditional_requests(app)
+
+    # 系友通訊錄讀取模型：使用者 / 個人檔案寫入時同步
+    init_directory(app)
+
+    # 聯絡人關係圖快取：聯絡申請寫入 commit 後更新
+    contact_graph.init_app(app)
+
+    # 職缺媒合：職缺與職涯資料異動後排入增量重算
+    init_job_matching(app)
+
+    # 請求耗時記入行程內直方圖（/metrics），並放入佇列由背景 flusher 批次寫入 performance_metrics_v2
+    metrics_pipeline.max_queue = int(os.environ.get('METRICS_MAX_QUEUE', 10000))
+    metrics_pipeline.flush_interval = float(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+    init_request_metrics(app)
+
+    # SQL 語句監控：每請求查詢數 / 耗時（Server-Timing 標頭）與慢查詢指紋
+    sql_monitor.slow_threshold = float(os.environ.get('SLOW_QUERY_SECONDS', 0.1))
+    sql_monitor.server_timing = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    # 參數樣本會出現在管理端點，記錄實際值需明確開啟（僅限除錯時）
+    sql_monitor.raw_parameters = os.environ.get('SQL_SAMPLE_RAW_PARAMETERS', 'false').lower() == 'true'
+    sql_monitor.init_app(app)
+
+    # Flask-Migrate (Alembic)：只有 flask CLI（flask db ...、index-migration）需要
+    # compare_type=True: 偵測欄位類型變更
+    if app.config.get('MIGRATE_ENABLED', click.get_current_context(silent=True) is not None):
+        from flask_migrate import Migrate
+        Migrate(app, db, compare_type=True)
+
+    # 初始化 WebSocket
+    socketio.init_app(app, cors_allowed_origins=app.config['ALLOWED_ORIGINS'])
+
+
+def _register_core_routes(app):
+    """首頁、健康檢查、靜態檔案與錯誤處理"""
+    from datetime import datetime
+    from src.models_v2 import db
+
+    @app.errorhandler(413)
+    def request_entity_too_large(error):
+        return jsonify({'error': '檔案大小超過限制', 'message': '上傳檔案不得超過 10MB'}), 413
+
+    @app.route('/')
+    def index():
+        return jsonify({
+            'message': 'Alumni Platform API v2',
+            'version': '2.0.0',
+            'database': 'models_v2',
+            'endpoints': {
+                'auth': '/api/auth/v2',
+                'career': '/api/career',
+                'notifications': '/api/notifications',
+                'csv': '/api/csv'
+            }
+        })
+
+    @app.route('/api/health')
+    def health_check():
+        """健康檢查端點 - 驗證應用程式和資料庫狀態"""
+        try:
+            # 驗證資料庫連線
+            db.session.execute(db.text('SELECT 1'))
+            db_status = 'connected'
+            db_code = 200
+        except Exception as e:
+            db_status = 'disconnected'
+            db_code = 503
+            return jsonify({
+                'status': 'unhealthy',
+                'database': db_status,
+                'version': '2.0.0',
+                'error': str(e)
+            }), db_code
+
+        return jsonify({
+            'status': 'healthy',
+            'database': db_status,
+            'version': '2.0.0',
+            'timestamp': datetime.utcnow().isoformat()
+        }), 200
+
+    @app.route('/static/<path:path>')
+    def serve_static(path):
+        return send_from_directory(app.static_folder, path)
+
+
+def _register_background_jobs(app):
+    """
+    註冊排程工作（由 main_v2 在 SCHEDULER_ENABLED 時啟動）
+
+    所有排程工作皆為冪等，多個 worker 同時執行也安全
+    """
+    from functools import partial
+    from src.config.database import optimize_sqlite
+    from src.models_v2 import db
+    from src.utils.db_routing import replica_router
+    from src.utils.event_reminders import dispatch_event_reminders
+    from src.utils.job_expiry import sweep_expired_jobs
+    from src.utils.job_matching import process_match_refresh_queue, refresh_all_job_matches
+    from src.utils.pool_monitor import pool_controller
+    from src.utils.recommendations import refresh_people_recommendations
+    from src.utils.scheduler import scheduler
+    from src.utils.statistics import refresh_daily_stats
+    from src.utils.uploads import purge_expired_uploads
+
+    scheduler.register('event_reminders', dispatch_event_reminders,
+                       interval_seconds=int(os.environ.get('EVENT_REMINDER_INTERVAL', 60)))
+    scheduler.register('job_expiry', sweep_expired_jobs,
+                       interval_seconds=int(os.environ.get('JOB_EXPIRY_INTERVAL', 300)))
+    scheduler.register('upload_cleanup', purge_expired_uploads,
+                       interval_seconds=int(os.environ.get('UPLOAD_CLEANUP_INTERVAL', 3600)))
+
+    # 推薦結果每日重算：全量計分是長時間的 CPU 工作，在 web worker（eventlet 單一 worker）內執行會卡住所有請求，
+    # 預設改由 cron 以獨立行程執行 `flask --app src.main_v2 compute-recommendations`；
+    # BATCH_JOBS_IN_PROCESS=true 時才在排程器內執行（各 worker 每小時檢查一次，結果未過期時略過）
+    batch_jobs_in_process = os.environ.get('BATCH_JOBS_IN_PROCESS', 'false').lower() == 'true'
+    recommendation_max_age = int(os.environ.get('RECOMMENDATION_MAX_AGE', 24 * 3600))
+    if batch_jobs_in_process:
+        scheduler.register('people_recommendations',
+                           partial(refresh_people_recommendations, max_age_seconds=recommendation_max_age),
+                           interval_seconds=int(os.environ.get('RECOMMENDATION_CHECK_INTERVAL', 3600)))
+
+    # 職缺媒合：異動的職缺 / 系友每分鐘增量重算（只載入共有詞的候選）；
+    # 每日全量重算與推薦相同，預設由 cron 執行 `flask --app src.main_v2 compute-job-matches`
+    scheduler.register('job_match_refresh', process_match_refresh_queue,
+                       interval_seconds=int(os.environ.get('JOB_MATCH_REFRESH_INTERVAL', 60)))
+    if batch_jobs_in_process:
+        scheduler.register('job_match_rebuild',
+                           partial(refresh_all_job_matches, max_age_seconds=recommendation_max_age),
+                           interval_seconds=int(os.environ.get('RECOMMENDATION_CHECK_INTERVAL', 3600)))
+
+    # 管理後台統計每日彙總；今天的彙總未過期時略過
+    stats_rollup_interval = int(os.environ.get('STATS_ROLLUP_INTERVAL', 300))
+    scheduler.register('daily_stats_rollup',
+                       partial(refresh_daily_stats, max_age_seconds=stats_rollup_interval // 2),
+                       interval_seconds=stats_rollup_interval)
+
+    # SQLite 定期 PRAGMA optimize（其他資料庫時不註冊）
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        scheduler.register('sqlite_optimize', lambda: optimize_sqlite(db.engine),
+                           interval_seconds=int(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', 3600)))
+
+    # 連線池上限自動調整（POOL_ADAPTIVE=true 時啟用）：等待過長或逾時時提高，持續閒置時降回
+    if os.environ.get('POOL_ADAPTIVE', 'false').lower() == 'true':
+        pool_controller.min_capacity = int(os.environ['POOL_MIN_CAPACITY']) if os.environ.get('POOL_MIN_CAPACITY') else None
+        pool_controller.max_capacity = int(os.environ['POOL_MAX_CAPACITY']) if os.environ.get('POOL_MAX_CAPACITY') else None
+        # 每個 worker 的執行緒 / greenlet 數；未設定時以觀察到的同時處理中請求數為準
+        pool_controller.worker_concurrency = (int(os.environ['POOL_WORKER_CONCURRENCY'])
+                                              if os.environ.get('POOL_WORKER_CONCURRENCY') else None)
+        scheduler.register('pool_autotune', pool_controller.adjust,
+                           interval_seconds=int(os.environ.get('POOL_ADAPTIVE_INTERVAL', 10)))
+
+    # 讀取副本健康檢查（未設定副本時不註冊）
+    if replica_router.replicas:
+        scheduler.register('replica_health_check', replica_router.check_health,
+                           interval_seconds=int(os.environ.get('REPLICA_HEALTH_CHECK_INTERVAL', 15)))
@@ -0,0 +1,106 @@
+"""
+CLI 指令（flask --app src.main_v2 <指令>）
+排程工作的手動執行、資料庫初始化與索引 / 副本檢查
+
+各指令在執行時才匯入所需模組，一般 worker 啟動不需載入這些工具（例如 Alembic）。
+"""
+import click
+
+
+def register_commands(app):
+    """註冊所有 CLI 指令"""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """建立資料表、空資料庫時填入示範資料、補齊讀取模型與 SQLite 索引（部署時執行一次）"""
+        from src.seed import init_database
+        init_database(app)
+        print("✅ Database initialized")
+
+    @app.cli.command('dispatch-event-reminders')
+    def dispatch_event_reminders_command():
+        """手動執行一次活動提醒派送（可搭配 cron）"""
+        from src.utils.event_reminders import dispatch_event_reminders
+        result = dispatch_event_reminders()
+        print(f"✅ Event reminders: {result}")
+
+    @app.cli.command('sweep-expired-jobs')
+    def sweep_expired_jobs_command():
+        """手動執行一次職缺過期處理"""
+        from src.utils.job_expiry import sweep_expired_jobs
+        expired = sweep_expired_jobs()
+        print(f"✅ Expired jobs: {expired}")
+
+    @app.cli.command('rebuild-directory')
+    def rebuild_directory_command():
+        """全量重建系友通訊錄讀取模型"""
+        from src.utils.directory import rebuild_directory
+        count = rebuild_directory()
+        print(f"✅ Directory entries: {count}")
+
+    @app.cli.command('compute-recommendations')
+    def compute_recommendations_command():
+        """立即重算「你可能認識的系友」推薦"""
+        from src.utils.recommendations import compute_people_recommendations
+        result = compute_people_recommendations()
+        print(f"✅ People recommendations: {result}")
+
+    @app.cli.command('compute-job-matches')
+    def compute_job_matches_command():
+        """立即全量重算職缺與系友媒合"""
+        from src.utils.job_matching import compute_job_matches
+        result = compute_job_matches()
+        print(f"✅ Job matches: {result}")
+
+    @app.cli.command('rollup-stats')
+    def rollup_stats_command():
+        """立即彙總每日統計（首次執行會回補所有歷史日期）"""
+        from src.utils.statistics import rollup_daily_stats
+        result = rollup_daily_stats()
+        print(f"✅ Daily stats: {result}")
+
+    @app.cli.command('check-indexes')
+    def check_indexes_command():
+        """比對模型宣告的索引與實際資料庫（PostgreSQL 另列出未使用的索引）"""
+        from src.utils.index_manager import check_indexes, unused_indexes
+        report = check_indexes()
+        for key in ('missing_tables', 'missing', 'mismatched', 'invalid', 'undeclared'):
+            items = report[key]
+            print(f"{'✅' if not items else '⚠️ '} {key}: {len(items)}")
+            for item in items:
+                print(f"    {item if isinstance(item, str) else item['table'] + '.' + item['name'] + ' ' + str(item['columns'])}")
+        unused = unused_indexes()
+        if unused is not None:
+            print(f"ℹ️  unused indexes: {len(unused)}")
+            for item in unused:
+                print(f"    {item['table_name']}.{item['index_name']} ({item['size_bytes']} bytes)")
+
+    @app.cli.command('sync-indexes')
+    @click.option('--drop-undeclared', is_flag=True, help='一併刪除模型未宣告的索引')
+    def sync_indexes_command(drop_undeclared):
+        """直接建立缺少的索引（開發環境 / SQLite；正式環境請用 index-migration）"""
+        from src.utils.index_manager import sync_indexes
+        result = sync_indexes(drop_undeclared=drop_undeclared)
+        print(f"✅ Index sync: {result}")
+
+    @app.cli.command('index-migration')
+    @click.option('-m', '--message', default='sync declared indexes', help='Revision 訊息')
+    @click.option('--drop-undeclared', is_flag=True, help='一併刪除模型未宣告的索引')
+    def index_migration_command(message, drop_undeclared):
+        """以目前資料庫與模型宣告的差異產生 Alembic revision"""
+        from src.utils.index_manager import check_indexes, write_index_migration
+        config = app.extensions['migrate'].migrate.get_config()
+        path = write_index_migration(config, check_indexes(), message=message, drop_undeclared=drop_undeclared)
+        print(f"✅ Index migration: {path}" if path else "✅ Indexes already match the models")
+
+    @app.cli.command('check-replicas')
+    def check_replicas_command():
+        """檢查讀取副本的連線與複寫延遲"""
+        from src.utils.db_routing import replica_router
+        if not replica_router.replicas:
+            print("ℹ️  No read replicas configured (DATABASE_REPLICA_URLS)")
+            return
+        replica_router.check_health()
+        for replica in replica_router.stats()['replicas']:
+            print(f"{'✅' if replica['healthy'] else '❌'} {replica['name']}: "
+                  f"lag={replica['lag_seconds']} error={replica['last_error']}")
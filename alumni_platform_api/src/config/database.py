@@ -5,6 +5,8 @@ PostgreSQL 資料庫配置
 import os
 from urllib.parse import urlparse
 
+from src.utils.pool_monitor import InstrumentedQueuePool
+
 def get_database_url():
     """
     獲取資料庫連接 URL
@@ -31,6 +33,14 @@ def get_database_url():
         return f'sqlite:///{db_path}'
 
 
+def get_replica_urls():
+    """
+    讀取副本連線 URL 清單
+    DATABASE_REPLICA_URLS 以逗號分隔；未設定時為空清單（所有讀寫走主庫）
+    """
+    return [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+
 def get_database_config():
     """
     獲取資料庫配置
@@ -43,17 +53,97 @@ def get_database_config():
         return {
             'SQLALCHEMY_DATABASE_URI': database_url,
             'SQLALCHEMY_ENGINE_OPTIONS': {
+                # 記錄取得連線的等待時間與逾時，並可由 AdaptivePoolController 調整上限（見 src.utils.pool_monitor）
+                'poolclass': InstrumentedQueuePool,
                 'pool_size': 10,
                 'max_overflow': 20,
                 'pool_pre_ping': True,
                 'pool_recycle': 3600,
             },
             'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'DATABASE_REPLICA_URLS': get_replica_urls(),
         }
     else:
-        # SQLite 配置
-        return {
+        # SQLite 配置：檔案資料庫使用 QueuePool，連線可跨執行緒（request / Socket.IO / 背景排程）共用
+        config = {
             'SQLALCHEMY_DATABASE_URI': database_url,
             'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'DATABASE_REPLICA_URLS': get_replica_urls(),
         }
+        if ':memory:' not in database_url:
+            config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options()
+        return config
+
+
+# ========================================
+# SQLite 連線設定
+# ========================================
+def sqlite_engine_options():
+    """SQLite 檔案資料庫的 engine 參數（連線池與連線參數）"""
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('SQLITE_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('SQLITE_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+        'connect_args': {
+            'check_same_thread': False,
+            # 秒；與 PRAGMA busy_timeout 相同，等待其他寫入者釋放鎖而非立即失敗
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000,
+        },
+    }
+
+
+def sqlite_pragmas():
+    """
+    每條 SQLite 連線建立時套用的 PRAGMA
 
+    - journal_mode=WAL：讀取不會被寫入擋住，寫入者之間仍互斥
+    - synchronous=NORMAL：WAL 模式下仍保證資料庫一致，只有斷電時可能遺失最後幾筆交易
+    - busy_timeout：遇到鎖時等待而非立即回傳 "database is locked"
+    - foreign_keys=ON：SQLite 預設不檢查外鍵，開啟後 ondelete='CASCADE' 才會生效
+    - cache_size（負值為 KiB）、mmap_size、temp_store：減少讀取時的系統呼叫與暫存檔
+    - journal_size_limit：checkpoint 後把 WAL 檔截斷到此大小
+    """
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'foreign_keys': 'ON',
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', 64000)),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'temp_store': 'MEMORY',
+        'journal_size_limit': 64 * 1024 * 1024,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """engine 'connect' 事件：對新建立的 DBAPI 連線套用 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def configure_sqlite_engine(engine):
+    """SQLite engine 註冊 PRAGMA 設定（其他資料庫不做任何事）"""
+    from sqlalchemy import event
+
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', apply_sqlite_pragmas):
+        event.listen(engine, 'connect', apply_sqlite_pragmas)
+
+
+def optimize_sqlite(engine):
+    """
+    定期執行 PRAGMA optimize（SQLite 依查詢紀錄決定要 ANALYZE 哪些資料表），並做一次被動 checkpoint
+
+    Returns:
+        dict | None: 非 SQLite 時為 None
+    """
+    if engine.dialect.name != 'sqlite':
+        return None
+    with engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA optimize')
+        busy, wal_pages, checkpointed = connection.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)').one()
+    return {'wal_pages': wal_pages, 'checkpointed': checkpointed}
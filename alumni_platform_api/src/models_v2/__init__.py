@@ -8,11 +8,15 @@ from .user_auth import User, UserProfile, UserSession
 from .career import WorkExperience, Education, Skill, UserSkill
 from .jobs import Job, JobCategory, JobRequest
 from .messages import Conversation, Message
-from .events import Event, EventCategory, EventRegistration
+from .events import Event, EventCategory, EventRegistration, EventReminderDispatch
 from .content import Bulletin, BulletinCategory, BulletinComment, Article, ArticleCategory
 from .article_comment import ArticleComment, CommentStatus
-from .system import Notification, SystemLog, SystemSetting, UserActivity, FileUpload, NotificationType, NotificationStatus
+from .system import Notification, SystemLog, SystemSetting, UserActivity, FileUpload, UploadSession, NotificationType, NotificationStatus
 from .contact_request import ContactRequest
+from .directory import DirectoryEntry
+from .recommendations import PeopleRecommendation, JobMatch
+from .statistics import DailyStat
+from .metrics import PerformanceMetric
 
 __all__ = [
     'db',
@@ -25,11 +29,19 @@ __all__ = [
     # Messages
     'Conversation', 'Message',
     # Events
-    'Event', 'EventCategory', 'EventRegistration',
+    'Event', 'EventCategory', 'EventRegistration', 'EventReminderDispatch',
     # Content
     'Bulletin', 'BulletinCategory', 'BulletinComment', 'Article', 'ArticleCategory',
     # System
-    'Notification', 'NotificationType', 'NotificationStatus', 'SystemLog', 'SystemSetting', 'UserActivity', 'FileUpload',
+    'Notification', 'NotificationType', 'NotificationStatus', 'SystemLog', 'SystemSetting', 'UserActivity', 'FileUpload', 'UploadSession',
     # Contact Requests
     'ContactRequest',
+    # Directory
+    'DirectoryEntry',
+    # Recommendations
+    'PeopleRecommendation', 'JobMatch',
+    # Statistics
+    'DailyStat',
+    # Metrics
+    'PerformanceMetric',
 ]
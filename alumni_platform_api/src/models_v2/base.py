@@ -5,8 +5,10 @@ Base Models and Mixins
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from sqlalchemy import Column, Integer, DateTime, Enum as SQLEnum
+from src.utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# 設定讀取副本時由 RoutingSession 決定讀寫分別走哪個 engine（見 src.utils.db_routing）
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class TimestampMixin:
@@ -32,6 +34,15 @@ class GoogleSheetsMixin:
         return elapsed > threshold_minutes
 
 
+class ViewCountMixin:
+    """瀏覽次數混入類 - 模型需有 views_count 欄位"""
+
+    def increment_views(self):
+        """增加瀏覽次數（以 SQL 運算式在資料庫端遞增，並行瀏覽或讀取來自副本時不會以舊值覆寫）"""
+        self.views_count = type(self).views_count + 1
+        db.session.commit()
+
+
 class BaseModel(db.Model, TimestampMixin, GoogleSheetsMixin):
     """抽象基礎模型 - 所有模型的父類"""
     __abstract__ = True
@@ -4,10 +4,10 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel, db, enum_type
+from .base import BaseModel, ViewCountMixin, db, enum_type
 
 
 # ========================================
@@ -118,9 +118,15 @@ class BulletinCategory(BaseModel):
 # ========================================
 # 公告/公佈欄
 # ========================================
-class Bulletin(BaseModel):
+class Bulletin(BaseModel, ViewCountMixin):
     """公告/公佈欄"""
     __tablename__ = 'bulletins_v2'
+    __table_args__ = (
+        Index('idx_bulletin_created_at', 'created_at'),
+        Index('idx_bulletin_status', 'status'),
+        Index('idx_bulletin_author_id', 'author_id'),
+        Index('idx_bulletin_category_id', 'category_id'),
+    )
 
     # 基本資訊
     author_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'),
@@ -199,11 +205,6 @@ class Bulletin(BaseModel):
         self.is_pinned = False
         db.session.commit()
 
-    def increment_views(self):
-        """增加瀏覽次數"""
-        self.views_count += 1
-        db.session.commit()
-
     def increment_likes(self):
         """增加按讚數"""
         self.likes_count += 1
@@ -477,7 +478,7 @@ class ArticleCategory(BaseModel):
 # ========================================
 # 文章/部落格 (可選功能)
 # ========================================
-class Article(BaseModel):
+class Article(BaseModel, ViewCountMixin):
     """文章/部落格"""
     __tablename__ = 'articles_v2'
 
@@ -522,11 +523,6 @@ class Article(BaseModel):
             self.published_at = datetime.utcnow()
         db.session.commit()
 
-    def increment_views(self):
-        """增加瀏覽次數"""
-        self.views_count += 1
-        db.session.commit()
-
     def to_dict(self, include_private=False):
         """轉換為字典"""
         data = {
@@ -0,0 +1,140 @@
+"""
+系友通訊錄讀取模型
+將 users_v2 與 user_profiles_v2 的公開欄位攤平成一張表，
+通訊錄列表只需單一有索引的查詢，不必 JOIN 也不必逐筆載入 profile
+
+資料由 src.utils.directory 的 session hook 在使用者或個人檔案寫入時同步，
+不應直接修改。
+
+search_text 的全文索引依資料庫建立（隨資料表建立 / 刪除）：
+- SQLite：FTS5 external content 虛擬表 alumni_directory_fts，以觸發器隨寫入同步
+- PostgreSQL：to_tsvector('simple', search_text) 的 GIN 運算式索引
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, DDL, event
+from .base import db
+
+
+class DirectoryEntry(db.Model):
+    """系友通訊錄項目（每位使用者一筆）"""
+    __tablename__ = 'alumni_directory_v2'
+    __table_args__ = (
+        Index('idx_directory_status_last_login', 'status', 'last_login_at'),
+        Index('idx_directory_status_graduation_year', 'status', 'graduation_year'),
+        Index('idx_directory_status_class_year', 'status', 'class_year'),
+        Index('idx_directory_status_company', 'status', 'current_company'),
+    )
+
+    # 主鍵即使用者 ID
+    id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'), primary_key=True,
+                autoincrement=False, comment='使用者ID')
+
+    # 帳號資訊
+    email = Column(String(255), nullable=False, comment='電子郵件')
+    role = Column(String(50), nullable=False, comment='角色')
+    status = Column(String(50), nullable=False, comment='帳號狀態')
+    joined_at = Column(DateTime, comment='註冊時間')
+    last_login_at = Column(DateTime, comment='最後登入時間')
+
+    # 公開個人資料
+    has_profile = Column(Boolean, default=False, nullable=False, comment='是否有個人檔案')
+    full_name = Column(String(100), comment='姓名')
+    display_name = Column(String(100), comment='顯示名稱')
+    avatar_url = Column(String(500), comment='頭像 URL')
+    graduation_year = Column(Integer, comment='畢業年份')
+    class_year = Column(Integer, comment='屆數')
+    major = Column(String(100), comment='主修')
+    degree = Column(String(50), comment='學位')
+    current_company = Column(String(200), comment='目前公司')
+    current_position = Column(String(200), comment='目前職位')
+    current_location = Column(String(200), comment='所在地')
+    bio = Column(Text, comment='個人簡介')
+    linkedin_url = Column(String(500), comment='LinkedIn')
+    github_url = Column(String(500), comment='GitHub')
+    personal_website = Column(String(500), comment='個人網站')
+    show_email = Column(Boolean, default=True, nullable=False, comment='是否公開 email')
+    show_phone = Column(Boolean, default=False, nullable=False, comment='是否公開電話')
+    phone = Column(String(20), comment='電話（僅在公開時保存）')
+
+    # 搜尋用：姓名、顯示名稱、公司、職位分詞後以空白串接（見 src.utils.directory.search_tokens）
+    search_text = Column(Text, default='', nullable=False, comment='搜尋文字')
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment='同步時間')
+
+    def __repr__(self):
+        return f'<DirectoryEntry {self.id}>'
+
+    def to_dict(self, include_private=False):
+        """轉換為字典（與原本通訊錄回應格式相同）"""
+        data = {
+            'id': self.id,
+            'email': self.email,
+            'role': self.role,
+            'status': self.status,
+            'created_at': self.joined_at.isoformat() if self.joined_at else None,
+            'last_login_at': self.last_login_at.isoformat() if self.last_login_at else None,
+        }
+
+        if self.has_profile:
+            data['profile'] = {
+                'full_name': self.full_name,
+                'display_name': self.display_name,
+                'avatar_url': self.avatar_url,
+                'graduation_year': self.graduation_year,
+                'major': self.major,
+                'degree': self.degree,
+                'current_company': self.current_company,
+                'current_position': self.current_position,
+                'location': self.current_location,
+                'bio': self.bio,
+                'linkedin_url': self.linkedin_url,
+                'github_url': self.github_url,
+                'personal_website': self.personal_website,
+                'show_email': self.show_email,
+                'show_phone': self.show_phone,
+            }
+
+            # 只在用戶允許的情況下顯示聯絡方式
+            if self.show_email:
+                data['profile']['email'] = self.email
+            if self.show_phone:
+                data['profile']['phone'] = self.phone
+
+        return data
+
+
+# ========================================
+# 全文搜尋索引
+# ========================================
+SEARCH_FTS_TABLE = 'alumni_directory_fts'
+SEARCH_GIN_INDEX = 'idx_directory_search_text_fts'
+
+SEARCH_INDEX_DDL = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5("
+        f"search_text, content='alumni_directory_v2', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_ai AFTER INSERT ON alumni_directory_v2 BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_ad AFTER DELETE ON alumni_directory_v2 BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, search_text) "
+        f"VALUES ('delete', old.id, old.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_au AFTER UPDATE OF search_text ON alumni_directory_v2 BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, search_text) "
+        f"VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        # 既有資料表補建索引時先依現有內容建好，否則刪除觸發器找不到對應詞條會損毀索引
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}) VALUES ('rebuild')",
+    ],
+    'postgresql': [
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_GIN_INDEX} ON alumni_directory_v2 "
+        f"USING gin (to_tsvector('simple', search_text))",
+    ],
+}
+
+for _dialect, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(DirectoryEntry.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+# 觸發器與 GIN 索引隨資料表刪除；FTS 虛擬表需另外刪除，否則重建資料表後會留下舊的索引內容
+event.listen(DirectoryEntry.__table__, 'after_drop',
+             DDL(f'DROP TABLE IF EXISTS {SEARCH_FTS_TABLE}').execute_if(dialect='sqlite'))
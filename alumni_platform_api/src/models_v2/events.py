@@ -4,10 +4,10 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel, db, enum_type
+from .base import BaseModel, ViewCountMixin, db, enum_type
 
 
 # ========================================
@@ -119,12 +119,15 @@ class EventCategory(BaseModel):
 # ========================================
 # 活動資訊
 # ========================================
-class Event(BaseModel):
+class Event(BaseModel, ViewCountMixin):
     """活動資訊"""
     __tablename__ = 'events_v2'
     __table_args__ = (
         Index('idx_event_status', 'status'),
         Index('idx_event_organizer_id', 'organizer_id'),
+        Index('idx_event_status_start_time', 'status', 'start_time'),
+        Index('idx_event_created_at', 'created_at'),
+        Index('idx_event_category_id', 'category_id'),
     )
 
     # 基本資訊
@@ -217,11 +220,6 @@ class Event(BaseModel):
             return 0
         return round((self.current_participants / self.max_participants) * 100, 1)
 
-    def increment_views(self):
-        """增加瀏覽次數"""
-        self.views_count += 1
-        db.session.commit()
-
     def increment_participants(self):
         """增加報名人數"""
         self.current_participants += 1
@@ -357,6 +355,11 @@ class Event(BaseModel):
 class EventRegistration(BaseModel):
     """活動報名"""
     __tablename__ = 'event_registrations_v2'
+    __table_args__ = (
+        Index('idx_event_registration_event_status', 'event_id', 'status'),
+        Index('idx_event_registration_created_at', 'created_at'),
+        Index('idx_event_registration_user_id', 'user_id'),
+    )
 
     event_id = Column(Integer, ForeignKey('events_v2.id', ondelete='CASCADE'),
                      nullable=False, comment='活動ID')
@@ -480,3 +483,55 @@ class EventRegistration(BaseModel):
             '取消時間': self.cancelled_at.strftime('%Y-%m-%d %H:%M') if self.cancelled_at else '',
             '取消原因': self.cancellation_reason or ''
         }
+
+
+# ========================================
+# 活動提醒派送紀錄
+# ========================================
+class EventReminderDispatch(BaseModel):
+    """
+    活動提醒派送紀錄（claimed-work 表）
+
+    每位報名者在每個提醒時段只會有一筆紀錄，由唯一索引保證；
+    排程器以 INSERT ... ON CONFLICT DO NOTHING 認領工作，
+    因此重啟或多個 worker 同時執行都不會重複發送提醒。
+    """
+    __tablename__ = 'event_reminder_dispatches_v2'
+    __table_args__ = (
+        UniqueConstraint('event_id', 'user_id', 'reminder_window',
+                         name='uq_event_reminder_dispatch'),
+        Index('idx_event_reminder_dispatch_claim', 'status', 'claim_token'),
+    )
+
+    STATUS_CLAIMED = 'claimed'   # 已認領，尚未發送
+    STATUS_SENT = 'sent'         # 已發送
+    STATUS_SKIPPED = 'skipped'   # 使用者關閉活動提醒，略過
+
+    event_id = Column(Integer, ForeignKey('events_v2.id', ondelete='CASCADE'),
+                     nullable=False, comment='活動ID')
+    user_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'),
+                    nullable=False, comment='報名者ID')
+    reminder_window = Column(String(20), nullable=False, comment='提醒時段(如 24h, 1h)')
+
+    status = Column(String(20), default=STATUS_CLAIMED, nullable=False, comment='派送狀態')
+    claim_token = Column(String(64), nullable=False, comment='認領批次代碼')
+    claimed_at = Column(DateTime, nullable=False, comment='認領時間')
+    dispatched_at = Column(DateTime, comment='發送時間')
+    notification_id = Column(Integer, comment='對應通知ID')
+
+    def __repr__(self):
+        return f'<EventReminderDispatch Event {self.event_id} User {self.user_id} ({self.reminder_window})>'
+
+    def to_dict(self, include_private=False):
+        """轉換為字典"""
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'user_id': self.user_id,
+            'reminder_window': self.reminder_window,
+            'status': self.status,
+            'claimed_at': self.claimed_at.isoformat() if self.claimed_at else None,
+            'dispatched_at': self.dispatched_at.isoformat() if self.dispatched_at else None,
+            'notification_id': self.notification_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -4,10 +4,10 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, or_
 from sqlalchemy.orm import relationship
 import enum
-from .base import BaseModel, db, enum_type
+from .base import BaseModel, ViewCountMixin, db, enum_type
 
 
 # ========================================
@@ -117,12 +117,15 @@ class JobCategory(BaseModel):
 # ========================================
 # 職缺資訊
 # ========================================
-class Job(BaseModel):
+class Job(BaseModel, ViewCountMixin):
     """職缺資訊"""
     __tablename__ = 'jobs_v2'
     __table_args__ = (
         Index('idx_job_status', 'status'),
         Index('idx_job_user_id', 'user_id'),
+        Index('idx_job_status_expires_at', 'status', 'expires_at'),
+        Index('idx_job_created_at', 'created_at'),
+        Index('idx_job_category_id', 'category_id'),
     )
 
     # 基本資訊
@@ -184,6 +187,12 @@ class Job(BaseModel):
             return False
         return datetime.utcnow() > self.expires_at
 
+    @classmethod
+    def not_expired_filter(cls, now=None):
+        """未過期條件（查詢用，可走 idx_job_status_expires_at）"""
+        now = now or datetime.utcnow()
+        return or_(cls.expires_at.is_(None), cls.expires_at > now)
+
     @property
     def salary_range(self):
         """薪資範圍字串"""
@@ -197,11 +206,6 @@ class Job(BaseModel):
         else:
             return '未提供'
 
-    def increment_views(self):
-        """增加瀏覽次數"""
-        self.views_count += 1
-        db.session.commit()
-
     def increment_requests(self):
         """增加交流請求數"""
         self.requests_count += 1
@@ -298,6 +302,10 @@ class Job(BaseModel):
 class JobRequest(BaseModel):
     """職缺交流請求"""
     __tablename__ = 'job_requests_v2'
+    __table_args__ = (
+        Index('idx_job_request_job_status', 'job_id', 'status'),
+        Index('idx_job_request_requester_id', 'requester_id'),
+    )
 
     job_id = Column(Integer, ForeignKey('jobs_v2.id', ondelete='CASCADE'),
                     nullable=False, comment='職缺ID')
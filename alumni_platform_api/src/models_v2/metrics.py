@@ -0,0 +1,45 @@
+"""
+效能指標模型
+請求耗時依「時間窗 × 端點 × 方法 × 狀態碼」彙總後批次寫入，與使用者活動記錄分開
+
+資料由 src.utils.performance 的背景 flusher 寫入，不應直接修改。
+多個 worker 會各自寫入同一時間窗的列，讀取時需再加總。
+"""
+
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
+from .base import db
+
+
+class PerformanceMetric(db.Model):
+    """每個時間窗的請求耗時彙總"""
+    __tablename__ = 'performance_metrics_v2'
+    __table_args__ = (
+        Index('idx_performance_metric_window', 'window_start'),
+        Index('idx_performance_metric_endpoint_window', 'endpoint', 'window_start'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    window_start = Column(DateTime, nullable=False, comment='時間窗起點（UTC）')
+    endpoint = Column(String(200), nullable=False, comment='路由規則（如 /api/v2/jobs/<int:job_id>）')
+    method = Column(String(10), nullable=False, comment='HTTP 方法')
+    status_code = Column(Integer, nullable=False, comment='HTTP 狀態碼')
+    count = Column(Integer, nullable=False, default=0, comment='請求數')
+    error_count = Column(Integer, nullable=False, default=0, comment='錯誤數（5xx 或例外）')
+    total_ms = Column(Float, nullable=False, default=0.0, comment='總耗時（毫秒）')
+    max_ms = Column(Float, nullable=False, default=0.0, comment='最大耗時（毫秒）')
+
+    def __repr__(self):
+        return f'<PerformanceMetric {self.window_start} {self.method} {self.endpoint}>'
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'window_start': self.window_start.isoformat(),
+            'endpoint': self.endpoint,
+            'method': self.method,
+            'status_code': self.status_code,
+            'count': self.count,
+            'error_count': self.error_count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+        }
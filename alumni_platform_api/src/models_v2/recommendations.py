@@ -0,0 +1,74 @@
+"""
+推薦結果模型
+離線批次計算的結果表，線上端點只做索引範圍查詢
+
+資料由 src.utils.recommendations / src.utils.job_matching 的批次工作維護，不應直接修改。
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index
+from .base import db
+
+
+class PeopleRecommendation(db.Model):
+    """「你可能認識的系友」推薦（每位使用者保留分數最高的前 K 位）"""
+    __tablename__ = 'people_recommendations_v2'
+    __table_args__ = (
+        Index('idx_people_recommendation_user_score', 'user_id', 'score'),
+    )
+
+    user_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'), primary_key=True,
+                     autoincrement=False, comment='使用者ID')
+    candidate_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'), primary_key=True,
+                          autoincrement=False, comment='被推薦的使用者ID')
+    score = Column(Float, nullable=False, comment='推薦分數')
+    reasons = Column(String(200), nullable=False, default='', comment='推薦原因（以逗號分隔）')
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment='計算時間')
+
+    def __repr__(self):
+        return f'<PeopleRecommendation {self.user_id} -> {self.candidate_id}>'
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'user_id': self.user_id,
+            'candidate_id': self.candidate_id,
+            'score': round(self.score, 4),
+            'reasons': self.reasons.split(',') if self.reasons else [],
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None,
+        }
+
+
+class JobMatch(db.Model):
+    """
+    職缺與系友媒合結果
+
+    保存每個職缺分數最高的前 K 位系友，以及每位系友分數最高的前 K 個職缺（兩者聯集），
+    兩個方向都以 (id, score) 索引直接取前幾名。
+    """
+    __tablename__ = 'job_matches_v2'
+    __table_args__ = (
+        Index('idx_job_match_job_score', 'job_id', 'score'),
+        Index('idx_job_match_user_score', 'user_id', 'score'),
+    )
+
+    job_id = Column(Integer, ForeignKey('jobs_v2.id', ondelete='CASCADE'), primary_key=True,
+                    autoincrement=False, comment='職缺ID')
+    user_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'), primary_key=True,
+                     autoincrement=False, comment='系友ID')
+    score = Column(Float, nullable=False, comment='媒合分數 (0~1)')
+    matched_terms = Column(String(500), nullable=False, default='', comment='相符的技能 / 技術（以逗號分隔）')
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment='計算時間')
+
+    def __repr__(self):
+        return f'<JobMatch job {self.job_id} -> user {self.user_id}>'
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'job_id': self.job_id,
+            'user_id': self.user_id,
+            'score': round(self.score, 4),
+            'matched_terms': self.matched_terms.split(',') if self.matched_terms else [],
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None,
+        }
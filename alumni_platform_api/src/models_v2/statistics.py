@@ -0,0 +1,43 @@
+"""
+統計彙總模型
+每日一列、每個指標一列的時間序列表，管理後台儀表板與趨勢圖只讀取此表
+
+資料由 src.utils.statistics 的排程彙總工作維護，不應直接修改。
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Index
+from .base import db
+
+
+class DailyStat(db.Model):
+    """
+    每日統計
+
+    - 流量指標（如 signups）：當日新增筆數
+    - 存量指標（如 users_total）：彙總當下的快照，已結算的日期保留當日最後一次快照
+    今日的列隨排程持續更新（is_final=False），日期過去後結算一次即不再重算。
+    """
+    __tablename__ = 'daily_stats_v2'
+    __table_args__ = (
+        Index('idx_daily_stat_metric_day', 'metric', 'day'),
+    )
+
+    day = Column(Date, primary_key=True, comment='日期（UTC）')
+    metric = Column(String(50), primary_key=True, comment='指標名稱')
+    value = Column(Integer, nullable=False, default=0, comment='數值')
+    is_final = Column(Boolean, nullable=False, default=False, comment='是否已結算')
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment='計算時間')
+
+    def __repr__(self):
+        return f'<DailyStat {self.day} {self.metric}={self.value}>'
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'day': self.day.isoformat(),
+            'metric': self.metric,
+            'value': self.value,
+            'is_final': self.is_final,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None,
+        }
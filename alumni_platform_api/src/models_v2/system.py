@@ -526,3 +526,49 @@ class FileUpload(BaseModel):
             '已刪除': '是' if self.is_deleted else '否',
             '上傳時間': self.created_at.strftime('%Y-%m-%d %H:%M') if self.created_at else ''
         }
+
+
+# ========================================
+# 分段上傳
+# ========================================
+class UploadSession(BaseModel):
+    """
+    分段上傳（可續傳）工作階段
+
+    已接收的位元組存放在上傳目錄的 .partial/<upload_id>.part，檔案大小即為目前的 offset，
+    因此 worker 重啟後仍可從中斷處繼續；收齊後改名為最終檔名並建立 FileUpload。
+    """
+    __tablename__ = 'upload_sessions_v2'
+    __table_args__ = (
+        Index('idx_upload_session_expires_at', 'expires_at'),
+    )
+
+    upload_id = Column(String(64), unique=True, nullable=False, comment='上傳代碼')
+    user_id = Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'),
+                    nullable=False, comment='上傳者ID')
+
+    file_name = Column(String(200), nullable=False, comment='檔案名稱')
+    file_type = Column(String(100), comment='檔案類型(MIME)')
+    total_size = Column(Integer, nullable=False, comment='檔案大小(bytes)')
+    checksum = Column(String(64), comment='用戶端提供的 SHA-256(完成時比對)')
+
+    related_type = Column(String(50), comment='關聯資源類型')
+    related_id = Column(Integer, comment='關聯資源ID')
+
+    expires_at = Column(DateTime, nullable=False, comment='過期時間')
+
+    def __repr__(self):
+        return f'<UploadSession {self.upload_id} {self.file_name}>'
+
+    def to_dict(self, include_private=False):
+        """轉換為字典"""
+        return {
+            'upload_id': self.upload_id,
+            'file_name': self.file_name,
+            'file_type': self.file_type,
+            'size': self.total_size,
+            'related_type': self.related_type,
+            'related_id': self.related_id,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -3,6 +3,7 @@
 User & Authentication Models
 """
 from .base import db, BaseModel, String, Integer, Boolean, Text, DateTime, ForeignKey, relationship
+from sqlalchemy import Index
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import secrets
@@ -11,6 +12,9 @@ import secrets
 class User(BaseModel):
     """使用者基本資料表"""
     __tablename__ = 'users_v2'
+    __table_args__ = (
+        Index('idx_user_created_at', 'created_at'),
+    )
     
     id = db.Column(Integer, primary_key=True)
     
@@ -45,7 +49,13 @@ class User(BaseModel):
     def set_password(self, password):
         """設定密碼(加密)"""
         self.password_hash = generate_password_hash(password, method='pbkdf2:sha256')
-    
+
+    @staticmethod
+    def unusable_password_hash():
+        """無法登入的密碼雜湊（匯入的帳號，需透過重設密碼流程設定）"""
+        # 不含 '$' 的值不是有效雜湊，check_password_hash 一律回傳 False；也省去 pbkdf2 的計算
+        return '!' + secrets.token_urlsafe(16)
+
     def check_password(self, password):
         """驗證密碼"""
         return check_password_hash(self.password_hash, password)
@@ -229,6 +239,9 @@ class UserProfile(BaseModel):
 class UserSession(BaseModel):
     """使用者登入會話表"""
     __tablename__ = 'user_sessions_v2'
+    __table_args__ = (
+        Index('idx_user_session_created_at', 'created_at'),
+    )
     
     id = db.Column(Integer, primary_key=True)
     user_id = db.Column(Integer, ForeignKey('users_v2.id', ondelete='CASCADE'), nullable=False)
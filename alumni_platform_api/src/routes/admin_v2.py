@@ -8,8 +8,16 @@ from src.models_v2 import db, User, UserProfile, Job, Event, Bulletin, Notificat
 from src.models_v2.jobs import JobStatus
 from src.models_v2.content import ContentStatus
 from src.routes.auth_v2 import token_required, admin_required
-from sqlalchemy import func, case
-from datetime import datetime, timedelta
+from src.utils.conditional import check_not_modified, table_fingerprint
+from src.utils.performance import metrics_pipeline, performance_monitor
+from src.utils.db_routing import replica_router
+from src.utils.pool_monitor import pool_controller, pool_monitor
+from src.utils.sql_monitor import sql_monitor
+from src.utils.index_manager import check_indexes, suggest_indexes, unused_indexes
+from src.utils.statistics import (
+    FLOW_METRICS, GAUGE_METRICS, MAX_TREND_DAYS, TREND_INTERVALS, dashboard_statistics, metric_series
+)
+from datetime import date, datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,81 +32,147 @@ admin_v2_bp = Blueprint('admin_v2', __name__)
 @token_required
 @admin_required
 def get_statistics(current_user):
-    """取得系統統計數據"""
+    """取得系統統計數據（讀取每日彙總表，見 src.utils.statistics）"""
     try:
-        now = datetime.utcnow()
-        thirty_days_ago = now - timedelta(days=30)
-        this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        week_start = (now - timedelta(days=now.weekday())).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-
-        # 用戶統計 — 單一查詢取得所有計數
-        user_stats = db.session.query(
-            func.count().label('total'),
-            func.count(case((User.status == 'active', 1))).label('active'),
-            func.count(case((User.status == 'pending', 1))).label('pending'),
-            func.count(case((User.last_login_at >= thirty_days_ago, 1))).label('active_30d'),
-            func.count(case((User.created_at >= this_month_start, 1))).label('new_this_month'),
-        ).select_from(User).first()
-
-        # 職缺統計 — 單一查詢
-        job_stats = db.session.query(
-            func.count().label('total'),
-            func.count(case((Job.status == JobStatus.ACTIVE, 1))).label('active'),
-            func.count(case((Job.status == JobStatus.DRAFT, 1))).label('draft'),
-            func.count(case((Job.created_at >= this_month_start, 1))).label('new_this_month'),
-        ).select_from(Job).first()
-
-        # 活動統計 — 單一查詢
-        event_stats = db.session.query(
-            func.count().label('total'),
-            func.count(case((Event.start_time > now, 1))).label('upcoming'),
-            func.count(case((Event.created_at >= this_month_start, 1))).label('new_this_month'),
-        ).select_from(Event).first()
-
-        # 公告統計 — 單一查詢
-        bulletin_stats = db.session.query(
-            func.count().label('total'),
-            func.count(case((Bulletin.status == ContentStatus.PUBLISHED, 1))).label('published'),
-            func.count(case((Bulletin.created_at >= this_month_start, 1))).label('new_this_month'),
-            func.count(case((Bulletin.created_at >= week_start, 1))).label('new_this_week'),
-        ).select_from(Bulletin).first()
+        statistics = dashboard_statistics()
+        as_of = statistics.pop('as_of')
+        return jsonify({'statistics': statistics, 'as_of': as_of}), 200
 
-        return jsonify({
-            'statistics': {
-                'users': {
-                    'total': user_stats.total,
-                    'active': user_stats.active,
-                    'pending': user_stats.pending,
-                    'active_30d': user_stats.active_30d,
-                    'new_this_month': user_stats.new_this_month,
-                },
-                'jobs': {
-                    'total': job_stats.total,
-                    'active': job_stats.active,
-                    'draft': job_stats.draft,
-                    'new_this_month': job_stats.new_this_month,
-                },
-                'events': {
-                    'total': event_stats.total,
-                    'upcoming': event_stats.upcoming,
-                    'new_this_month': event_stats.new_this_month,
-                },
-                'bulletins': {
-                    'total': bulletin_stats.total,
-                    'published': bulletin_stats.published,
-                    'new_this_month': bulletin_stats.new_this_month,
-                    'new_this_week': bulletin_stats.new_this_week,
-                },
-            }
-        }), 200
-        
     except Exception as e:
         current_app.logger.error(f'Get statistics failed: {str(e)}')
         return jsonify({'message': f'Failed to get statistics: {str(e)}'}), 500
 
 
+@admin_v2_bp.route('/api/v2/admin/statistics/trends', methods=['GET'])
+@token_required
+@admin_required
+def get_statistics_trends(current_user):
+    """
+    取得統計指標的時間序列
+
+    Query 參數：
+        metrics: 以逗號分隔的指標名稱，預設為所有流量指標
+        start / end: YYYY-MM-DD，預設為最近 30 天
+        interval: day / week / month，預設 day（active_users 在週 / 月區間為單日最大值，其餘流量指標為加總）
+    """
+    try:
+        metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()]
+        metrics = metrics or list(FLOW_METRICS)
+        unknown = [m for m in metrics if m not in FLOW_METRICS and m not in GAUGE_METRICS]
+        if unknown:
+            return jsonify({'message': f"Unknown metrics: {', '.join(unknown)}"}), 400
+
+        interval = request.args.get('interval', 'day')
+        if interval not in TREND_INTERVALS:
+            return jsonify({'message': f"interval must be one of: {', '.join(TREND_INTERVALS)}"}), 400
+
+        try:
+            end = date.fromisoformat(request.args['end']) if request.args.get('end') \
+                else datetime.utcnow().date()
+            start = date.fromisoformat(request.args['start']) if request.args.get('start') \
+                else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'message': 'start / end must be YYYY-MM-DD'}), 400
+        if start > end:
+            return jsonify({'message': 'start must not be after end'}), 400
+        if (end - start).days >= MAX_TREND_DAYS:
+            return jsonify({'message': f'Range must not exceed {MAX_TREND_DAYS} days'}), 400
+
+        return jsonify({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'interval': interval,
+            'series': metric_series(metrics, start, end, interval),
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Get statistics trends failed: {str(e)}')
+        return jsonify({'message': f'Failed to get statistics trends: {str(e)}'}), 500
+
+
+# ========================================
+# 效能監控 API
+# ========================================
+@admin_v2_bp.route('/api/v2/admin/performance', methods=['GET'])
+@token_required
+@admin_required
+def get_performance(current_user):
+    """取得本 worker 的請求延遲統計（各端點百分位數、最近的慢請求與錯誤、寫入佇列狀態、連線池）"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        return jsonify({
+            'summary': performance_monitor.get_stats(),
+            'endpoints': performance_monitor.endpoint_stats()[:limit],
+            'recent_slow_requests': list(performance_monitor.recent_slow_requests),
+            'recent_errors': list(performance_monitor.recent_errors),
+            'pipeline': metrics_pipeline.stats(),
+            'connection_pools': pool_monitor.stats(limit),
+            'pool_adjustments': pool_controller.stats()['history'],
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Get performance failed: {str(e)}')
+        return jsonify({'message': f'Failed to get performance: {str(e)}'}), 500
+
+
+@admin_v2_bp.route('/api/v2/admin/performance/sql', methods=['GET'])
+@token_required
+@admin_required
+def get_sql_performance(current_user):
+    """取得本 worker 的 SQL 統計（慢語句、總耗時最高的語句、各端點每請求語句數）"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        return jsonify({
+            'slow_threshold_ms': sql_monitor.slow_threshold * 1000,
+            'slow_statements': sql_monitor.slow_statements(limit),
+            'top_statements': sql_monitor.top_statements(limit),
+            'endpoints': sql_monitor.endpoint_stats(limit),
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Get SQL performance failed: {str(e)}')
+        return jsonify({'message': f'Failed to get SQL performance: {str(e)}'}), 500
+
+
+@admin_v2_bp.route('/api/v2/admin/performance/sql', methods=['DELETE'])
+@token_required
+@admin_required
+def reset_sql_performance(current_user):
+    """清除本 worker 的 SQL 統計（例如部署新索引後重新觀察）"""
+    sql_monitor.reset()
+    return jsonify({'message': 'SQL statistics reset'}), 200
+
+
+@admin_v2_bp.route('/api/v2/admin/performance/indexes', methods=['GET'])
+@token_required
+@admin_required
+def get_index_report(current_user):
+    """
+    索引檢查：模型宣告與實際 schema 的差異、未使用的索引（PostgreSQL），
+    以及依本 worker 擷取的慢語句推測缺少的索引
+    """
+    try:
+        connection = db.session.connection()
+        statements = sql_monitor.slow_statements(100) + sql_monitor.top_statements(100)
+        return jsonify({
+            'schema': check_indexes(connection),
+            'unused': unused_indexes(connection),
+            'suggestions': suggest_indexes(statements, connection),
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f'Get index report failed: {str(e)}')
+        return jsonify({'message': f'Failed to get index report: {str(e)}'}), 500
+
+
+@admin_v2_bp.route('/api/v2/admin/performance/replicas', methods=['GET'])
+@token_required
+@admin_required
+def get_replica_status(current_user):
+    """取得本 worker 的讀取副本狀態（健康、複寫延遲、分配的交易數、退回主庫次數）"""
+    return jsonify(replica_router.stats()), 200
+
+
 # ========================================
 # 用戶管理 API
 # ========================================
@@ -139,6 +213,10 @@ def get_users_admin(current_user):
         # 排序
         query = query.order_by(User.created_at.desc())
         
+        not_modified = check_not_modified(query, *table_fingerprint(UserProfile))
+        if not_modified is not None:
+            return not_modified
+
         # 分頁
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
@@ -334,6 +412,10 @@ def get_pending_users(current_user):
         query = User.query.filter_by(status='pending')
         query = query.order_by(User.created_at.desc())
         
+        not_modified = check_not_modified(query, *table_fingerprint(UserProfile))
+        if not_modified is not None:
+            return not_modified
+
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
         users = []
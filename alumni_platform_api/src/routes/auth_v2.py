@@ -4,8 +4,13 @@
 """
 
 from flask import Blueprint, request, jsonify, current_app
-from src.models_v2 import db, User, UserProfile, UserSession
+from src.models_v2 import db, User, UserProfile, UserSession, DirectoryEntry
 from src.extensions import limiter
+from src.utils.cache import get_version
+from src.utils.conditional import check_not_modified
+from src.utils.counting import CACHED, ESTIMATED, EXACT, count_total, paginate
+from src.utils.directory import directory_facets, directory_query
+from src.utils.pagination import InvalidCursor, keyset_paginate, wants_keyset, wants_total
 import jwt
 import logging
 from datetime import datetime, timedelta
@@ -609,104 +614,77 @@ def linkedin_callback():
 # ========================================
 # 系友通訊錄 API
 # ========================================
+# 通訊錄總數可接受估計值（大表上 COUNT 最貴），其次為快取的精確值
+USER_COUNT_STRATEGIES = (ESTIMATED, CACHED, EXACT)
+
+
 @auth_v2_bp.route('/api/v2/users', methods=['GET'])
 def get_users():
     """
     獲取系友列表（支援搜尋和篩選）
+
+    查詢攤平後的通訊錄讀取模型（alumni_directory_v2），不需 JOIN 個人檔案。
     
     Query Parameters:
-    - search: 搜尋關鍵字（姓名、公司、職位）
+    - search: 搜尋關鍵字（姓名、公司、職位），多個關鍵字以空白分隔需全部符合
     - graduation_year: 畢業年份
-    - industry: 產業別
+    - class_year: 屆數
+    - company: 目前公司（精確比對，對應 facets.company 的值）
     - page: 頁碼（默認 1）
     - per_page: 每頁數量（默認 20）
+    - cursor / pagination=cursor: 改用 keyset 分頁（回傳 next_cursor）
+    - include_total: keyset 模式下是否計算總數
+    - count: 總數計算方式 estimated（預設）/ cached / exact
     """
     try:
         # 獲取查詢參數
-        search = request.args.get('search', '').strip()
-        graduation_year = request.args.get('graduation_year', type=int)
-        industry = request.args.get('industry', '').strip()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         per_page = min(max(per_page, 1), 100)
 
         # 基本查詢：只返回活躍用戶
-        query = User.query.filter_by(status='active')
-        
-        # 搜尋功能（姓名、公司、職位）
-        if search:
-            query = query.join(UserProfile, User.id == UserProfile.user_id, isouter=True)
-            query = query.filter(
-                db.or_(
-                    UserProfile.full_name.ilike(f'%{search}%'),
-                    UserProfile.display_name.ilike(f'%{search}%'),
-                    UserProfile.current_company.ilike(f'%{search}%'),
-                    UserProfile.current_position.ilike(f'%{search}%')
-                )
-            )
-        else:
-            # 如果沒有搜尋，也需要 join 來使用篩選
-            if graduation_year or industry:
-                query = query.join(UserProfile, User.id == UserProfile.user_id, isouter=True)
-        
-        # 畢業年份篩選
-        if graduation_year:
-            query = query.filter(UserProfile.graduation_year == graduation_year)
-        
-        # 產業別篩選 (暫時不支援,因為 UserProfile 沒有 industry 欄位)
-        # if industry:
-        #     query = query.filter(UserProfile.industry == industry)
+        query = directory_query(
+            search=request.args.get('search', '').strip(),
+            graduation_year=request.args.get('graduation_year', type=int),
+            class_year=request.args.get('class_year', type=int),
+            company=request.args.get('company', '').strip(),
+        )
         
         # 排序：最近登入的在前
-        query = query.order_by(User.last_login_at.desc().nullslast())
+        query = query.order_by(DirectoryEntry.last_login_at.desc().nullslast(), DirectoryEntry.id.desc())
         
+        # facets 為全體統計，篩選範圍外的異動也會改變回應，ETag 一併納入 users 版本號
+        not_modified = check_not_modified(query, get_version('users'))
+        if not_modified is not None:
+            return not_modified
+
         # 分頁
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        keyset = None
+        if wants_keyset():
+            try:
+                keyset = keyset_paginate(query, [(DirectoryEntry.last_login_at, True)], per_page,
+                                         request.args.get('cursor'))
+            except InvalidCursor as e:
+                return jsonify({'message': str(e)}), 400
+            items = keyset.items
+        else:
+            pagination = paginate(query, page, per_page, accept=USER_COUNT_STRATEGIES, resources=('users',))
+            items = pagination.items
         
-        # 組裝用戶列表
-        users = []
-        for user in pagination.items:
-            user_data = {
-                'id': user.id,
-                'email': user.email,
-                'role': user.role,
-                'status': user.status,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'last_login_at': user.last_login_at.isoformat() if user.last_login_at else None,
-            }
-            
-            # 加入個人資料（如果有）
-            if user.profile:
-                profile = user.profile
-                user_data['profile'] = {
-                    'full_name': profile.full_name,
-                    'display_name': profile.display_name,
-                    'avatar_url': profile.avatar_url,
-                    'graduation_year': profile.graduation_year,
-                    'major': profile.major,
-                    'degree': profile.degree,
-                    'current_company': profile.current_company,
-                    'current_position': profile.current_position,
-                    'location': profile.current_location,
-                    'bio': profile.bio,
-                    'linkedin_url': profile.linkedin_url,
-                    'github_url': profile.github_url,
-                    'personal_website': profile.personal_website,
-                    'show_email': profile.show_email,
-                    'show_phone': profile.show_phone,
-                }
-                
-                # 只在用戶允許的情況下顯示聯絡方式
-                if profile.show_email:
-                    user_data['profile']['email'] = user.email
-                if profile.show_phone:
-                    user_data['profile']['phone'] = profile.phone
-            
-            users.append(user_data)
+        users = [entry.to_dict() for entry in items]
+        facets = directory_facets()
         
+        if keyset is not None:
+            result = {'users': users, 'facets': facets, **keyset.to_dict()}
+            if wants_total():
+                result['total'], result['total_exact'] = count_total(query, USER_COUNT_STRATEGIES, ('users',))
+            return jsonify(result), 200
+
         return jsonify({
             'users': users,
+            'facets': facets,
             'total': pagination.total,
+            'total_exact': pagination.total_exact,
             'page': page,
             'per_page': per_page,
             'pages': pagination.pages
@@ -7,6 +7,10 @@ from flask import Blueprint, request, jsonify
 from src.models_v2 import db, Bulletin, BulletinCategory, BulletinComment, User
 from src.models_v2.content import ContentStatus, BulletinType
 from src.routes.auth_v2 import token_required, admin_required
+from src.utils.cache import response_cache
+from src.utils.conditional import check_not_modified
+from src.utils.loader_plans import apply_loader_plan
+from src.utils.serializers import bulletin_serializer, json_response
 from datetime import datetime
 from sqlalchemy import or_
 
@@ -17,6 +21,7 @@ bulletins_v2_bp = Blueprint('bulletins_v2', __name__)
 # 公告分類管理
 # ========================================
 @bulletins_v2_bp.route('/api/v2/bulletin-categories', methods=['GET'])
+@response_cache.cached('bulletin_categories', 'bulletins')
 def get_bulletin_categories():
     """取得所有公告分類"""
     categories = BulletinCategory.query.filter_by(is_active=True).all()
@@ -48,6 +53,7 @@ def create_bulletin_category(current_user):
 # 公告管理
 # ========================================
 @bulletins_v2_bp.route('/api/v2/bulletins', methods=['GET'])
+@response_cache.cached('bulletins', 'bulletin_categories', 'users')
 def get_bulletins():
     """取得公告列表"""
     category_id = request.args.get('category_id', type=int)
@@ -58,6 +64,11 @@ def get_bulletins():
     per_page = request.args.get('per_page', 20, type=int)
     per_page = min(max(per_page, 1), 100)
 
+    try:
+        fields = bulletin_serializer.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     query = Bulletin.query
 
     if category_id:
@@ -72,18 +83,18 @@ def get_bulletins():
             Bulletin.content.like(f'%{search}%')
         ))
 
-    pagination = query.order_by(
+    pagination = apply_loader_plan(query, fields).order_by(
         Bulletin.is_pinned.desc(),
         Bulletin.published_at.desc()
     ).paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'bulletins': [b.to_dict() for b in pagination.items],
+    return json_response({
+        'bulletins': bulletin_serializer.dump_many(pagination.items, fields),
         'total': pagination.total,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
-    }), 200
+    })
 
 
 @bulletins_v2_bp.route('/api/v2/bulletins/<int:bulletin_id>', methods=['GET'])
@@ -242,7 +253,11 @@ def get_my_bulletins(current_user):
         except KeyError:
             pass
 
-    pagination = query.order_by(Bulletin.created_at.desc())\
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    pagination = apply_loader_plan(query).order_by(Bulletin.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
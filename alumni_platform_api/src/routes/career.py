@@ -6,6 +6,9 @@
 from flask import Blueprint, request, jsonify
 from src.models_v2 import db, WorkExperience, Education, Skill, UserSkill
 from src.routes.auth_v2 import token_required
+from src.utils.cache import response_cache
+from src.utils.conditional import check_not_modified
+from src.utils.loader_plans import apply_loader_plan
 from datetime import datetime
 
 career_bp = Blueprint('career', __name__)
@@ -22,9 +25,14 @@ def get_work_experiences(current_user):
     is_own_data = (user_id == current_user.id)
     is_admin = (current_user.role == 'admin')
 
-    experiences = WorkExperience.query.filter_by(user_id=user_id)\
-        .order_by(WorkExperience.is_current.desc(), WorkExperience.start_date.desc())\
-        .all()
+    query = WorkExperience.query.filter_by(user_id=user_id)
+
+    # 是否顯示薪資會影響回應內容，一併納入 ETag
+    not_modified = check_not_modified(query, is_own_data or is_admin)
+    if not_modified is not None:
+        return not_modified
+
+    experiences = query.order_by(WorkExperience.is_current.desc(), WorkExperience.start_date.desc()).all()
 
     # 隱私控制：非本人且非管理員，隱藏薪資欄位
     result = []
@@ -165,9 +173,14 @@ def get_user_work_experiences(current_user, user_id):
     is_own_data = (user_id == current_user.id)
     is_admin = (current_user.role == 'admin')
     
-    experiences = WorkExperience.query.filter_by(user_id=user_id)\
-        .order_by(WorkExperience.is_current.desc(), WorkExperience.start_date.desc())\
-        .all()
+    query = WorkExperience.query.filter_by(user_id=user_id)
+
+    # 是否顯示薪資會影響回應內容，一併納入 ETag
+    not_modified = check_not_modified(query, is_own_data or is_admin)
+    if not_modified is not None:
+        return not_modified
+
+    experiences = query.order_by(WorkExperience.is_current.desc(), WorkExperience.start_date.desc()).all()
 
     # 隱私控制：非本人且非管理員，隱藏薪資欄位
     result = []
@@ -188,9 +201,13 @@ def get_user_work_experiences(current_user, user_id):
 @token_required
 def get_user_educations(current_user, user_id):
     """獲取特定用戶的教育背景（公開資料）"""
-    educations = Education.query.filter_by(user_id=user_id)\
-        .order_by(Education.start_year.desc())\
-        .all()
+    query = Education.query.filter_by(user_id=user_id)
+
+    not_modified = check_not_modified(query)
+    if not_modified is not None:
+        return not_modified
+
+    educations = query.order_by(Education.start_year.desc()).all()
 
     return jsonify({
         'educations': [edu.to_dict() for edu in educations]
@@ -206,9 +223,13 @@ def get_educations(current_user):
     """取得使用者的教育背景列表"""
     user_id = request.args.get('user_id', current_user.id, type=int)
 
-    educations = Education.query.filter_by(user_id=user_id)\
-        .order_by(Education.start_year.desc())\
-        .all()
+    query = Education.query.filter_by(user_id=user_id)
+
+    not_modified = check_not_modified(query)
+    if not_modified is not None:
+        return not_modified
+
+    educations = query.order_by(Education.start_year.desc()).all()
 
     return jsonify({
         'educations': [edu.to_dict() for edu in educations]
@@ -345,6 +366,7 @@ def delete_education(current_user, edu_id):
 # 技能管理
 # ========================================
 @career_bp.route('/api/career/skills', methods=['GET'])
+@response_cache.cached('skills')
 def get_all_skills():
     """取得所有技能項目(公開)"""
     category = request.args.get('category')
@@ -366,9 +388,13 @@ def get_user_skills(current_user):
     """取得使用者的技能列表"""
     user_id = request.args.get('user_id', current_user.id, type=int)
 
-    user_skills = UserSkill.query.filter_by(user_id=user_id)\
-        .order_by(UserSkill.proficiency_level.desc())\
-        .all()
+    query = UserSkill.query.filter_by(user_id=user_id)
+
+    not_modified = check_not_modified(query)
+    if not_modified is not None:
+        return not_modified
+
+    user_skills = apply_loader_plan(query).order_by(UserSkill.proficiency_level.desc()).all()
 
     return jsonify({
         'skills': [us.to_dict() for us in user_skills]  # 前端期望 'skills' 而不是 'user_skills'
@@ -480,9 +506,13 @@ def get_my_skills(current_user):
     """取得我的技能列表 (別名路由)"""
     user_id = request.args.get('user_id', current_user.id, type=int)
 
-    user_skills = UserSkill.query.filter_by(user_id=user_id)\
-        .order_by(UserSkill.proficiency_level.desc())\
-        .all()
+    query = UserSkill.query.filter_by(user_id=user_id)
+
+    not_modified = check_not_modified(query)
+    if not_modified is not None:
+        return not_modified
+
+    user_skills = apply_loader_plan(query).order_by(UserSkill.proficiency_level.desc()).all()
 
     return jsonify({
         'skills': [us.to_dict() for us in user_skills]  # 前端期望 'skills' 而不是 'user_skills'
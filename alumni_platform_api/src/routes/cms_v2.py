@@ -8,6 +8,8 @@ from src.models_v2 import db, Article, User
 from src.models_v2.content import ContentStatus, ArticleCategory
 from src.models_v2.article_comment import ArticleComment, CommentStatus
 from src.routes.auth_v2 import token_required, admin_required
+from src.utils.conditional import check_not_modified
+from src.utils.loader_plans import apply_loader_plan
 from datetime import datetime
 from sqlalchemy import or_
 import logging
@@ -69,8 +71,12 @@ def get_articles(current_user):
                 )
             )
         
+        not_modified = check_not_modified(query, current_user.id, current_user.role)
+        if not_modified is not None:
+            return not_modified
+
         # 排序和分頁
-        pagination = query.order_by(Article.created_at.desc())\
+        pagination = apply_loader_plan(query).order_by(Article.created_at.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
@@ -331,9 +337,13 @@ def like_article(current_user, article_id):
 def get_article_categories(current_user):
     """取得所有文章分類"""
     try:
-        categories = ArticleCategory.query.filter_by(is_active=True)\
-            .order_by(ArticleCategory.sort_order, ArticleCategory.name)\
-            .all()
+        query = ArticleCategory.query.filter_by(is_active=True)
+
+        not_modified = check_not_modified(query)
+        if not_modified is not None:
+            return not_modified
+
+        categories = query.order_by(ArticleCategory.sort_order, ArticleCategory.name).all()
         return jsonify({
             'categories': [cat.to_dict() for cat in categories]
         }), 200
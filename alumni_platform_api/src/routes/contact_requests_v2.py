@@ -5,10 +5,16 @@ P2P 聯絡申請系統：系友可向其他系友發送聯絡申請，
 """
 
 from flask import Blueprint, request, jsonify
-from src.models_v2 import db, User, ContactRequest, NotificationType
+from src.models_v2 import db, User, UserProfile, ContactRequest, NotificationType
 from src.routes.auth_v2 import token_required
 from src.routes.notification_helper import create_notification
+from src.utils.conditional import (
+    check_not_modified, conditional_response, make_etag, normalize_query_string, table_fingerprint
+)
+from src.utils.cache import response_cache
+from src.utils.contact_graph import contact_graph, load_users, user_summary
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 import logging
 
 logger = logging.getLogger(__name__)
@@ -135,6 +141,10 @@ def get_sent_requests(current_user):
 
         query = query.order_by(ContactRequest.created_at.desc())
 
+        not_modified = check_not_modified(query, current_user.id, *table_fingerprint(UserProfile))
+        if not_modified is not None:
+            return not_modified
+
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
         return jsonify({
@@ -179,6 +189,10 @@ def get_received_requests(current_user):
 
         query = query.order_by(ContactRequest.created_at.desc())
 
+        not_modified = check_not_modified(query, current_user.id, *table_fingerprint(UserProfile))
+        if not_modified is not None:
+            return not_modified
+
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
         return jsonify({
@@ -303,7 +317,10 @@ def reject_contact_request(current_user, request_id):
 @token_required
 def get_contacts(current_user):
     """
-    取得已建立聯絡的系友清單（雙向查詢 accepted 的申請）
+    取得已建立聯絡的系友清單（由聯絡人關係圖快取排序分頁，只載入該頁的個人檔案）
+
+    列出所有已接受的聯絡人（含已停用的帳號），total 與各頁筆數一致。
+    ETag 含聯絡申請與使用者的共用版本號，其他 worker 的接受 / 拒絕或停用帳號後不會回應過期的 304。
 
     Query Parameters:
     - page: 頁碼（默認 1）
@@ -313,45 +330,33 @@ def get_contacts(current_user):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         per_page = min(max(per_page, 1), 100)
+        page = max(page, 1)
 
-        # 雙向查詢：我是 requester 或 target，且狀態為 accepted
-        query = ContactRequest.query.filter(
-            ContactRequest.status == 'accepted',
-            or_(
-                ContactRequest.requester_id == current_user.id,
-                ContactRequest.target_id == current_user.id
-            )
-        ).order_by(ContactRequest.responded_at.desc())
+        connected = contact_graph.contacts(current_user.id)
 
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        etag = make_etag(request.path, normalize_query_string(), current_user.id,
+                         *response_cache.get_versions(('contact_requests', 'users')),
+                         *[edge.request_id for _, edge in connected], *table_fingerprint(UserProfile))
+        not_modified = conditional_response(etag)
+        if not_modified is not None:
+            return not_modified
 
-        contacts = []
-        for req in pagination.items:
-            # 找出對方是誰
-            if req.requester_id == current_user.id:
-                contact_user = req.target
-            else:
-                contact_user = req.requester
+        total = len(connected)
+        page_items = connected[(page - 1) * per_page:page * per_page]
+        users = load_users([user_id for user_id, _ in page_items], active_only=False)
 
+        contacts = []
+        for user_id, edge in page_items:
+            contact_user = users.get(user_id)
             if not contact_user:
                 continue
 
-            profile = contact_user.profile
-            contact_data = {
-                'id': contact_user.id,
-                'email': contact_user.email,
-                'full_name': profile.full_name if profile else None,
-                'display_name': profile.display_name if profile else None,
-                'avatar_url': profile.avatar_url if profile else None,
-                'current_company': profile.current_company if profile else None,
-                'current_position': profile.current_position if profile else None,
-                'graduation_year': profile.graduation_year if profile else None,
-                'bio': profile.bio if profile else None,
-                'connected_at': req.responded_at.isoformat() if req.responded_at else None,
-                'contact_request_id': req.id,
-            }
+            contact_data = user_summary(contact_user)
+            contact_data['connected_at'] = edge.responded_at.isoformat() if edge.responded_at else None
+            contact_data['contact_request_id'] = edge.request_id
 
             # 已接受的聯絡人可以看到聯絡資訊
+            profile = contact_user.profile
             if profile:
                 contact_data['phone'] = profile.phone
                 contact_data['linkedin_url'] = profile.linkedin_url
@@ -365,8 +370,8 @@ def get_contacts(current_user):
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
+                'total': total,
+                'pages': (total + per_page - 1) // per_page
             }
         }), 200
 
@@ -398,39 +403,96 @@ def get_contact_status(current_user, user_id):
                 'message': '無法查詢自己的聯絡狀態'
             }), 200
 
-        # 查詢雙向的申請記錄（取最近一筆）
-        contact_request = ContactRequest.query.filter(
-            or_(
-                db.and_(
-                    ContactRequest.requester_id == current_user.id,
-                    ContactRequest.target_id == user_id
-                ),
-                db.and_(
-                    ContactRequest.requester_id == user_id,
-                    ContactRequest.target_id == current_user.id
-                )
-            )
-        ).order_by(ContactRequest.created_at.desc()).first()
+        # 雙向的最新一筆申請（由關係圖快取查詢，共用版本號變動時快取已先丟棄）
+        edge = contact_graph.edge(current_user.id, user_id)
 
-        if not contact_request:
+        if not edge:
             return jsonify({
                 'status': 'none',
                 'contact_request': None
             }), 200
 
         # 細分 pending 狀態方向
-        status = contact_request.status
+        status = edge.status
         if status == 'pending':
-            if contact_request.requester_id == current_user.id:
+            if edge.requester_id == current_user.id:
                 status = 'pending_sent'
             else:
                 status = 'pending_received'
 
+        contact_request = ContactRequest.query.options(
+            joinedload(ContactRequest.requester).joinedload(User.profile),
+            joinedload(ContactRequest.target).joinedload(User.profile),
+        ).filter_by(id=edge.request_id).first()
+
         return jsonify({
             'status': status,
-            'contact_request': contact_request.to_dict()
+            'contact_request': contact_request.to_dict() if contact_request else None
         }), 200
 
     except Exception as e:
         logger.error(f"查詢聯絡狀態失敗: {str(e)}")
         return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+
+# ========================================
+# 共同聯絡人
+# ========================================
+@contact_requests_v2_bp.route('/api/v2/contacts/mutual/<int:user_id>', methods=['GET'])
+@token_required
+def get_mutual_contacts(current_user, user_id):
+    """
+    查詢與特定使用者的共同聯絡人
+
+    Query Parameters:
+    - limit: 回傳筆數上限（默認 20，最多 100）
+    """
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+        if user_id == current_user.id:
+            return jsonify({'message': '無法查詢與自己的共同聯絡人'}), 400
+
+        mutual_ids = contact_graph.mutual_contacts(current_user.id, user_id)
+        users = load_users(mutual_ids[:limit])
+
+        return jsonify({
+            'data': [user_summary(users[uid]) for uid in mutual_ids[:limit] if uid in users],
+            'total': len(mutual_ids)
+        }), 200
+
+    except Exception as e:
+        logger.error(f"查詢共同聯絡人失敗: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+
+# ========================================
+# 二度人脈
+# ========================================
+@contact_requests_v2_bp.route('/api/v2/contacts/second-degree', methods=['GET'])
+@token_required
+def get_second_degree_contacts(current_user):
+    """
+    取得二度人脈（聯絡人的聯絡人），依共同聯絡人數排序
+
+    只展開最近建立聯絡的前 MAX_FANOUT 位聯絡人。
+
+    Query Parameters:
+    - limit: 回傳筆數上限（默認 20，最多 100）
+    """
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+        ranked = contact_graph.second_degree(current_user.id, limit=limit)
+        users = load_users([user_id for user_id, _ in ranked])
+
+        data = []
+        for user_id, mutual_count in ranked:
+            if user_id in users:
+                data.append({**user_summary(users[user_id]), 'mutual_count': mutual_count})
+
+        return jsonify({'data': data}), 200
+
+    except Exception as e:
+        logger.error(f"取得二度人脈失敗: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
@@ -6,17 +6,23 @@ CSV 匯入/匯出功能
 from flask import Blueprint, request, send_file, jsonify
 import csv
 import io
-import secrets
 from datetime import datetime
 from src.models_v2 import db, User, UserProfile, Job, Event, Bulletin, EventRegistration, JobRequest
 from src.routes.auth_v2 import token_required, admin_required  # 使用統一的認證裝飾器
 from src.extensions import limiter
+from src.utils.directory import refresh_directory_entries
+from src.utils.job_matching import match_refresh_queue
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload
 import logging
 
 logger = logging.getLogger(__name__)
 
 csv_bp = Blueprint('csv', __name__)
 
+# 匯入系友時每批處理的資料列數
+IMPORT_BATCH_SIZE = 500
+
 
 def _truncate(value, max_len=500):
     """Truncate string to max length for safety."""
@@ -25,6 +31,126 @@ def _truncate(value, max_len=500):
     return value
 
 
+# 整數欄位上限（PostgreSQL INTEGER）；超出時該列視為格式錯誤，而非讓整批寫入失敗
+MAX_INT_VALUE = 2 ** 31 - 1
+
+
+def _int_value(value, field):
+    """CSV 整數欄位（空白或 0 為 None）"""
+    number = int(value or 0)
+    if not 0 <= number <= MAX_INT_VALUE:
+        raise ValueError(f'{field} out of range: {number}')
+    return number or None
+
+
+def _profile_values(row):
+    """
+    CSV 資料列 → UserProfile 欄位
+
+    Raises:
+        ValueError: 畢業年份或屆數不是數字或超出範圍
+    """
+    return {
+        'full_name': _truncate(row.get('姓名'), 100),
+        'display_name': _truncate(row.get('顯示名稱') or row.get('姓名'), 100),
+        'graduation_year': _int_value(row.get('畢業年份'), 'graduation_year'),
+        'class_year': _int_value(row.get('屆數'), 'class_year'),
+        'current_company': _truncate(row.get('目前公司'), 200),
+        'current_position': _truncate(row.get('職位'), 200),
+        'personal_website': _truncate(row.get('個人網站'), 500),
+        'linkedin_url': _truncate(row.get('LinkedIn'), 500),
+    }
+
+
+def _insert_users(profiles):
+    """
+    批次建立新帳號與 profile（不 commit）
+
+    新帳號不設定可用的密碼，需透過「忘記密碼」流程設定。批次 INSERT 不經過 flush，
+    通訊錄讀取模型在此直接更新，職缺媒合由呼叫端在 commit 後排入重算。
+
+    Args:
+        profiles: {電子郵件: UserProfile 欄位}
+
+    Returns:
+        list[int]: 新帳號 id
+    """
+    if not profiles:
+        return []
+    created = db.session.execute(
+        insert(User).returning(User.id, User.email),
+        [{'email': email, 'role': 'user', 'password_hash': User.unusable_password_hash()} for email in profiles]
+    ).all()
+    db.session.execute(insert(UserProfile), [{'user_id': user_id, **profiles[email]} for user_id, email in created])
+    user_ids = [user_id for user_id, _ in created]
+    refresh_directory_entries(db.session.connection(), user_ids)
+    return user_ids
+
+
+def _import_user_rows(rows):
+    """
+    匯入一批資料列並 commit
+
+    Args:
+        rows: [(行號, CSV 資料列), ...]
+
+    Returns:
+        tuple: (新增數, 更新數, 該批的資料列錯誤訊息)
+
+    Raises:
+        Exception: 寫入失敗（呼叫端 rollback）
+    """
+    emails = {row.get('電子郵件', '').strip() for _, row in rows} - {''}
+    users = {
+        user.email: user
+        for user in User.query.options(joinedload(User.profile)).filter(User.email.in_(emails))
+    }
+    new_profiles = {}
+    imported = updated = 0
+    errors = []
+
+    for row_num, row in rows:
+        email = row.get('電子郵件', '').strip()
+        if not email:
+            errors.append(f"第 {row_num} 行: 缺少電子郵件")
+            continue
+
+        try:
+            values = _profile_values(row)
+        except ValueError as e:
+            logger.error(f"匯入使用者第 {row_num} 行失敗: {str(e)}")
+            errors.append(f"第 {row_num} 行: 資料處理失敗")
+            continue
+
+        user = users.get(email)
+        if user:
+            # 更新現有使用者的 Profile (User 模型不含 name 等欄位)；顯示名稱留白時不以姓名取代
+            values['display_name'] = _truncate(row.get('顯示名稱'), 100)
+            if user.profile:
+                for field, value in values.items():
+                    if value:
+                        setattr(user.profile, field, value)
+            else:
+                # 建立 Profile
+                user.profile = UserProfile(**values)
+            updated += 1
+
+        elif email in new_profiles:
+            # 同一批中重複的電子郵件視為更新
+            previous = new_profiles[email]
+            new_profiles[email] = {field: value or previous[field] for field, value in values.items()}
+            updated += 1
+
+        else:
+            new_profiles[email] = values
+            imported += 1
+
+    new_user_ids = _insert_users(new_profiles)
+    db.session.commit()
+    match_refresh_queue.add(user_ids=new_user_ids)
+    return imported, updated, errors
+
+
 # ========================================
 # 匯出功能
 # ========================================
@@ -55,35 +181,8 @@ def export_users(current_user):
 def export_jobs(current_user):
     """匯出職缺發布清單為 CSV"""
     try:
-        jobs = Job.query.all()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow([
-            'ID', '發布者', '職缺標題', '公司名稱', '地點',
-            '薪資範圍', '職缺描述', '交流請求數', '發布日期'
-        ])
-
-        for job in jobs:
-            poster = User.query.get(job.user_id)
-            request_count = JobRequest.query.filter_by(job_id=job.id).count()
-
-            writer.writerow([
-                job.id,
-                poster.name if poster else '未知',
-                job.title,
-                job.company,
-                job.location,
-                job.salary_range or '',
-                (job.description or '')[:200],  # 限制長度
-                request_count,
-                job.created_at.strftime('%Y-%m-%d') if job.created_at else ''
-            ])
-
-        output.seek(0)
         return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8-sig')),
+            io.BytesIO(export_jobs_csv()),
             mimetype='text/csv',
             as_attachment=True,
             download_name=f'職缺發布清單_{datetime.now().strftime("%Y%m%d")}.csv'
@@ -100,41 +199,8 @@ def export_jobs(current_user):
 def export_events(current_user):
     """匯出活動清單為 CSV"""
     try:
-        events = Event.query.all()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow([
-            'ID', '活動名稱', '開始時間', '結束時間', '地點',
-            '名額', '已報名', '報名率', '報名截止日', '建立者',
-            '活動描述', '建立日期'
-        ])
-
-        for event in events:
-            creator = User.query.get(event.created_by)
-            registered_count = EventRegistration.query.filter_by(event_id=event.id).count()
-            capacity = event.capacity or 0
-            rate = f"{(registered_count/capacity*100):.1f}%" if capacity > 0 else "0%"
-
-            writer.writerow([
-                event.id,
-                event.title,
-                event.start_time.strftime('%Y-%m-%d %H:%M') if event.start_time else '',
-                event.end_time.strftime('%Y-%m-%d %H:%M') if event.end_time else '',
-                event.location,
-                capacity,
-                registered_count,
-                rate,
-                event.registration_deadline.strftime('%Y-%m-%d') if event.registration_deadline else '',
-                creator.name if creator else '',
-                (event.description or '')[:200],
-                event.created_at.strftime('%Y-%m-%d') if event.created_at else ''
-            ])
-
-        output.seek(0)
         return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8-sig')),
+            io.BytesIO(export_events_csv()),
             mimetype='text/csv',
             as_attachment=True,
             download_name=f'活動清單_{datetime.now().strftime("%Y%m%d")}.csv'
@@ -151,32 +217,8 @@ def export_events(current_user):
 def export_bulletins(current_user):
     """匯出公告發布清單為 CSV"""
     try:
-        bulletins = Bulletin.query.order_by(Bulletin.is_pinned.desc(), Bulletin.created_at.desc()).all()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        writer.writerow([
-            'ID', '公告標題', '分類', '內容摘要', '是否置頂',
-            '發布者', '發布日期'
-        ])
-
-        for bulletin in bulletins:
-            author = User.query.get(bulletin.author_id)
-
-            writer.writerow([
-                bulletin.id,
-                bulletin.title,
-                bulletin.category,
-                (bulletin.content or '')[:300],
-                '是' if bulletin.is_pinned else '否',
-                author.name if author else '系統',
-                bulletin.created_at.strftime('%Y-%m-%d') if bulletin.created_at else ''
-            ])
-
-        output.seek(0)
         return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8-sig')),
+            io.BytesIO(export_bulletins_csv()),
             mimetype='text/csv',
             as_attachment=True,
             download_name=f'公告發布清單_{datetime.now().strftime("%Y%m%d")}.csv'
@@ -211,84 +253,38 @@ def import_users(current_user):
 
         # 讀取 CSV
         stream = io.StringIO(file.stream.read().decode('utf-8-sig'))
-        reader = csv.DictReader(stream)
+        rows = list(enumerate(csv.DictReader(stream), start=2))  # 從第 2 行開始(第 1 行是標題)
 
         imported_count = 0
         updated_count = 0
         errors = []
 
-        for row_num, row in enumerate(reader, start=2):  # 從第 2 行開始(第 1 行是標題)
+        # 分批處理：每批一次查出已存在的使用者，新帳號與 profile 各以一個批次 INSERT 寫入後 commit；
+        # 整批寫入失敗時改為逐列重試，只有出錯的那一列記為錯誤
+        for batch_start in range(0, len(rows), IMPORT_BATCH_SIZE):
+            batch = rows[batch_start:batch_start + IMPORT_BATCH_SIZE]
             try:
-                email = row.get('電子郵件', '').strip()
-                if not email:
-                    errors.append(f"第 {row_num} 行: 缺少電子郵件")
-                    continue
-
-                # 檢查使用者是否存在
-                user = User.query.filter_by(email=email).first()
-
-                if user:
-                    # 更新現有使用者的 Profile (User 模型不含 name 等欄位)
-                    if user.profile:
-                        user.profile.full_name = _truncate(row.get('姓名'), 100) or user.profile.full_name
-                        user.profile.display_name = _truncate(row.get('顯示名稱'), 100) or user.profile.display_name
-                        user.profile.graduation_year = int(row.get('畢業年份', 0)) or user.profile.graduation_year
-                        user.profile.class_year = int(row.get('屆數', 0)) or user.profile.class_year
-                        user.profile.current_company = _truncate(row.get('目前公司'), 200) or user.profile.current_company
-                        user.profile.current_position = _truncate(row.get('職位'), 200) or user.profile.current_position
-                        user.profile.personal_website = _truncate(row.get('個人網站'), 500) or user.profile.personal_website
-                        user.profile.linkedin_url = _truncate(row.get('LinkedIn'), 500) or user.profile.linkedin_url
-                    else:
-                        # 建立 Profile
-                        profile = UserProfile(
-                            user_id=user.id,
-                            full_name=_truncate(row.get('姓名'), 100),
-                            display_name=_truncate(row.get('顯示名稱'), 100),
-                            graduation_year=int(row.get('畢業年份', 0)) or None,
-                            class_year=int(row.get('屆數', 0)) or None,
-                            current_company=_truncate(row.get('目前公司'), 200),
-                            current_position=_truncate(row.get('職位'), 200),
-                            personal_website=_truncate(row.get('個人網站'), 500),
-                            linkedin_url=_truncate(row.get('LinkedIn'), 500)
-                        )
-                        db.session.add(profile)
-
-                    updated_count += 1
-
-                else:
-                    # 建立新使用者 (使用隨機密碼，而非預設密碼)
-                    temp_password = secrets.token_urlsafe(12)  # 生成隨機密碼
-                    user = User(
-                        email=email,
-                        role='user'
-                    )
-                    user.set_password(temp_password)
-                    db.session.add(user)
-                    db.session.flush()  # 取得 user.id
-
-                    # 建立 Profile (使用正確的欄位名稱)
-                    profile = UserProfile(
-                        user_id=user.id,
-                        full_name=_truncate(row.get('姓名'), 100),
-                        display_name=_truncate(row.get('顯示名稱') or row.get('姓名'), 100),
-                        graduation_year=int(row.get('畢業年份', 0)) or None,
-                        class_year=int(row.get('屆數', 0)) or None,
-                        current_company=_truncate(row.get('目前公司'), 200),
-                        current_position=_truncate(row.get('職位'), 200),
-                        personal_website=_truncate(row.get('個人網站'), 500),
-                        linkedin_url=_truncate(row.get('LinkedIn'), 500)
-                    )
-                    db.session.add(profile)
-
-                    imported_count += 1
-                    # 注意：新帳號需要透過「忘記密碼」流程重設密碼
-
-                db.session.commit()
-
+                batch_imported, batch_updated, batch_errors = _import_user_rows(batch)
             except Exception as e:
                 db.session.rollback()
-                logger.error(f"匯入使用者第 {row_num} 行失敗: {str(e)}")
-                errors.append(f"第 {row_num} 行: 資料處理失敗")
+                logger.warning(f"匯入使用者第 {batch[0][0]}-{batch[-1][0]} 行整批寫入失敗，改為逐列處理: {str(e)}")
+                batch_imported = batch_updated = 0
+                batch_errors = []
+                for row_num, row in batch:
+                    try:
+                        row_imported, row_updated, row_errors = _import_user_rows([(row_num, row)])
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"匯入使用者第 {row_num} 行失敗: {str(e)}")
+                        batch_errors.append(f"第 {row_num} 行: 資料處理失敗")
+                        continue
+                    batch_imported += row_imported
+                    batch_updated += row_updated
+                    batch_errors.extend(row_errors)
+
+            imported_count += batch_imported
+            updated_count += batch_updated
+            errors.extend(batch_errors)
 
         return {
             'success': True,
@@ -493,9 +489,15 @@ def export_all(current_user):
 
 
 # Helper 函數 (生成 CSV 內容字串)
+# 發布者 / profile 以 JOIN 一併載入、請求數與報名數以 GROUP BY 一次取得，查詢數不隨筆數成長
+def _count_by(column):
+    """以 GROUP BY 取得 {外鍵: 筆數}"""
+    return dict(db.session.query(column, func.count()).group_by(column).all())
+
+
 def export_users_csv():
     """生成系友帳號 CSV 內容"""
-    users = User.query.all()
+    users = User.query.options(joinedload(User.profile)).order_by(User.id).all()
     output = io.StringIO()
     writer = csv.writer(output)
 
@@ -527,18 +529,17 @@ def export_users_csv():
 
 def export_jobs_csv():
     """生成職缺 CSV 內容"""
-    jobs = Job.query.all()
+    jobs = Job.query.options(joinedload(Job.user).joinedload(User.profile)).order_by(Job.id).all()
+    request_counts = _count_by(JobRequest.job_id)
     output = io.StringIO()
     writer = csv.writer(output)
 
     writer.writerow(['ID', '發布者', '職缺標題', '公司名稱', '地點', '薪資範圍', '職缺描述', '交流請求數', '發布日期'])
 
     for job in jobs:
-        poster = User.query.get(job.user_id)
-        request_count = JobRequest.query.filter_by(job_id=job.id).count()
         writer.writerow([
-            job.id, poster.name if poster else '未知', job.title, job.company, job.location,
-            job.salary_range or '', (job.description or '')[:200], request_count,
+            job.id, job.user.name if job.user else '未知', job.title, job.company, job.location,
+            job.salary_range or '', (job.description or '')[:200], request_counts.get(job.id, 0),
             job.created_at.strftime('%Y-%m-%d') if job.created_at else ''
         ])
 
@@ -547,16 +548,16 @@ def export_jobs_csv():
 
 def export_events_csv():
     """生成活動 CSV 內容"""
-    events = Event.query.all()
+    events = Event.query.options(joinedload(Event.organizer).joinedload(User.profile)).order_by(Event.id).all()
+    registration_counts = _count_by(EventRegistration.event_id)
     output = io.StringIO()
     writer = csv.writer(output)
 
     writer.writerow(['ID', '活動名稱', '開始時間', '結束時間', '地點', '名額', '已報名', '報名率', '報名截止日', '建立者', '活動描述', '建立日期'])
 
     for event in events:
-        creator = User.query.get(event.created_by)
-        registered_count = EventRegistration.query.filter_by(event_id=event.id).count()
-        capacity = event.capacity or 0
+        registered_count = registration_counts.get(event.id, 0)
+        capacity = event.max_participants or 0
         rate = f"{(registered_count/capacity*100):.1f}%" if capacity > 0 else "0%"
 
         writer.writerow([
@@ -564,8 +565,8 @@ def export_events_csv():
             event.start_time.strftime('%Y-%m-%d %H:%M') if event.start_time else '',
             event.end_time.strftime('%Y-%m-%d %H:%M') if event.end_time else '',
             event.location, capacity, registered_count, rate,
-            event.registration_deadline.strftime('%Y-%m-%d') if event.registration_deadline else '',
-            creator.name if creator else '', (event.description or '')[:200],
+            event.registration_end.strftime('%Y-%m-%d') if event.registration_end else '',
+            event.organizer.name if event.organizer else '', (event.description or '')[:200],
             event.created_at.strftime('%Y-%m-%d') if event.created_at else ''
         ])
 
@@ -574,17 +575,19 @@ def export_events_csv():
 
 def export_bulletins_csv():
     """生成公告 CSV 內容"""
-    bulletins = Bulletin.query.order_by(Bulletin.is_pinned.desc(), Bulletin.created_at.desc()).all()
+    bulletins = Bulletin.query.options(
+        joinedload(Bulletin.author).joinedload(User.profile), joinedload(Bulletin.category)
+    ).order_by(Bulletin.is_pinned.desc(), Bulletin.created_at.desc()).all()
     output = io.StringIO()
     writer = csv.writer(output)
 
     writer.writerow(['ID', '公告標題', '分類', '內容摘要', '是否置頂', '發布者', '發布日期'])
 
     for bulletin in bulletins:
-        author = User.query.get(bulletin.author_id)
         writer.writerow([
-            bulletin.id, bulletin.title, bulletin.category, (bulletin.content or '')[:300],
-            '是' if bulletin.is_pinned else '否', author.name if author else '系統',
+            bulletin.id, bulletin.title, bulletin.category.name if bulletin.category else '',
+            (bulletin.content or '')[:300],
+            '是' if bulletin.is_pinned else '否', bulletin.author.name if bulletin.author else '系統',
             bulletin.created_at.strftime('%Y-%m-%d') if bulletin.created_at else ''
         ])
 
@@ -7,6 +7,10 @@ from flask import Blueprint, request, jsonify
 from src.models_v2 import db, Event, EventCategory, EventRegistration, User, UserProfile
 from src.models_v2.events import EventStatus, EventType, RegistrationStatus
 from src.routes.auth_v2 import token_required, admin_required
+from src.utils.cache import response_cache
+from src.utils.conditional import check_not_modified
+from src.utils.loader_plans import apply_loader_plan
+from src.utils.serializers import event_serializer, json_response
 from src.routes.notification_helper import (
     create_event_registration_notification,
     create_event_cancelled_notification,
@@ -26,6 +30,7 @@ events_v2_bp = Blueprint('events_v2', __name__)
 # 活動分類管理
 # ========================================
 @events_v2_bp.route('/api/v2/event-categories', methods=['GET'])
+@response_cache.cached('event_categories', 'events')
 def get_event_categories():
     """取得所有活動分類"""
     categories = EventCategory.query.filter_by(is_active=True).all()
@@ -71,6 +76,7 @@ def create_event_category(current_user):
 # 活動管理
 # ========================================
 @events_v2_bp.route('/api/v2/events', methods=['GET'])
+@response_cache.cached('events', 'event_categories', 'users')
 def get_events():
     """取得活動列表"""
     category_id = request.args.get('category_id', type=int)
@@ -81,6 +87,11 @@ def get_events():
     per_page = request.args.get('per_page', 20, type=int)
     per_page = min(max(per_page, 1), 100)
 
+    try:
+        fields = event_serializer.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     query = Event.query
 
     # 篩選條件
@@ -115,16 +126,17 @@ def get_events():
         query = query.filter(Event.end_time < now)
 
     # 分頁
-    pagination = query.order_by(Event.start_time.asc())\
+    pagination = apply_loader_plan(query, fields)\
+        .order_by(Event.start_time.asc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'events': [event.to_dict() for event in pagination.items],
+    return json_response({
+        'events': event_serializer.dump_many(pagination.items, fields),
         'total': pagination.total,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
-    }), 200
+    })
 
 
 @events_v2_bp.route('/api/v2/events/<int:event_id>', methods=['GET'])
@@ -344,7 +356,11 @@ def get_my_events(current_user):
     if status:
         query = query.filter_by(status=status)
 
-    pagination = query.order_by(Event.start_time.desc())\
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    pagination = apply_loader_plan(query).order_by(Event.start_time.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
@@ -477,11 +493,15 @@ def get_my_registrations(current_user):
     if status:
         query = query.filter_by(status=status)
 
-    pagination = query.order_by(EventRegistration.created_at.desc())\
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    pagination = apply_loader_plan(query).order_by(EventRegistration.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
-        'registrations': [reg.to_dict(include_event=True) for reg in pagination.items],
+        'registrations': [reg.to_dict() for reg in pagination.items],
         'total': pagination.total,
         'page': page,
         'per_page': per_page,
@@ -512,6 +532,10 @@ def get_event_registrations(current_user, event_id):
     if status:
         query = query.filter_by(status=status)
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(EventRegistration.created_at.asc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
@@ -7,6 +7,12 @@ from flask import Blueprint, request, jsonify
 from src.models_v2 import db, Job, JobCategory, JobRequest, User, UserProfile, Conversation
 from src.models_v2.jobs import JobType, JobStatus, RequestStatus
 from src.routes.auth_v2 import token_required, admin_required
+from src.utils.cache import response_cache
+from src.utils.conditional import check_not_modified
+from src.utils.counting import CACHED, EXACT, count_total, paginate
+from src.utils.loader_plans import apply_loader_plan
+from src.utils.pagination import InvalidCursor, keyset_paginate, wants_keyset, wants_total
+from src.utils.serializers import job_serializer, json_response
 from src.routes.notification_helper import (
     create_job_request_notification,
     create_job_request_approved_notification,
@@ -26,6 +32,7 @@ jobs_v2_bp = Blueprint('jobs_v2', __name__)
 # 職缺分類管理
 # ========================================
 @jobs_v2_bp.route('/api/v2/job-categories', methods=['GET'])
+@response_cache.cached('job_categories', 'jobs')
 def get_job_categories():
     """取得所有職缺分類"""
     categories = JobCategory.query.filter_by(is_active=True).all()
@@ -71,6 +78,7 @@ def create_job_category(current_user):
 # 職缺管理
 # ========================================
 @jobs_v2_bp.route('/api/v2/jobs', methods=['GET'])
+@response_cache.cached('jobs', 'job_categories', 'users')
 def get_jobs():
     """取得職缺列表"""
     category_id = request.args.get('category_id', type=int)
@@ -82,6 +90,11 @@ def get_jobs():
     per_page = request.args.get('per_page', 20, type=int)
     per_page = min(max(per_page, 1), 100)
 
+    try:
+        fields = job_serializer.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     query = Job.query
 
     # 篩選條件
@@ -101,6 +114,9 @@ def get_jobs():
         try:
             status_enum = JobStatus[status.upper()]
             query = query.filter_by(status=status_enum)
+            # 過期排程尚未處理的職缺也不應出現在開放中列表
+            if status_enum == JobStatus.ACTIVE:
+                query = query.filter(Job.not_expired_filter())
         except (KeyError, ValueError):
             pass
     if search:
@@ -112,17 +128,36 @@ def get_jobs():
             )
         )
 
-    # 分頁
-    pagination = query.order_by(Job.published_at.desc(), Job.created_at.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
-
-    return jsonify({
-        'jobs': [job.to_dict() for job in pagination.items],
+    # keyset 分頁（帶 cursor 或 pagination=cursor 時）
+    if wants_keyset():
+        try:
+            keyset = keyset_paginate(
+                apply_loader_plan(query, fields),
+                [(Job.published_at, True), (Job.created_at, True)],
+                per_page, request.args.get('cursor')
+            )
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+
+        result = {'jobs': job_serializer.dump_many(keyset.items, fields), **keyset.to_dict()}
+        if wants_total():
+            result['total'], result['total_exact'] = count_total(query, (CACHED, EXACT), ('jobs',))
+        return json_response(result)
+
+    # 分頁（總數依篩選條件快取，職缺異動後失效）
+    pagination = paginate(
+        apply_loader_plan(query, fields).order_by(Job.published_at.desc(), Job.created_at.desc()),
+        page, per_page, accept=(CACHED, EXACT), resources=('jobs',), count_query=query
+    )
+
+    return json_response({
+        'jobs': job_serializer.dump_many(pagination.items, fields),
         'total': pagination.total,
+        'total_exact': pagination.total_exact,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
-    }), 200
+    })
 
 
 @jobs_v2_bp.route('/api/v2/jobs/<int:job_id>', methods=['GET'])
@@ -350,7 +385,11 @@ def get_my_jobs(current_user):
         except (KeyError, ValueError):
             pass
 
-    pagination = query.order_by(Job.created_at.desc())\
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    pagination = apply_loader_plan(query).order_by(Job.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
@@ -441,6 +480,10 @@ def get_received_requests(current_user):
         except (KeyError, ValueError):
             pass
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(JobRequest.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
@@ -467,6 +510,10 @@ def get_sent_requests(current_user):
     if status:
         query = query.filter_by(status=status)
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(JobRequest.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
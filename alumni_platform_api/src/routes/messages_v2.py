@@ -8,6 +8,9 @@ from src.models_v2 import db, Conversation, Message, User, UserProfile
 from src.routes.auth_v2 import token_required
 from src.routes.notification_helper import create_new_message_notification
 from src.routes.websocket import emit_message, emit_conversation_update
+from src.utils.conditional import check_not_modified, table_fingerprint
+from src.utils.loader_plans import apply_loader_plan
+from src.utils.serializers import conversation_serializer, json_response
 from datetime import datetime
 from sqlalchemy import or_, and_
 from sqlalchemy.orm import joinedload
@@ -29,27 +32,36 @@ def get_conversations(current_user):
     per_page = request.args.get('per_page', 20, type=int)
     per_page = min(max(per_page, 1), 100)
 
-    query = Conversation.query.options(
-        joinedload(Conversation.user1).joinedload(User.profile),
-        joinedload(Conversation.user2).joinedload(User.profile),
-        joinedload(Conversation.job),
-    ).filter(
+    try:
+        fields = conversation_serializer.parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    query = Conversation.query.filter(
         or_(
             Conversation.user1_id == current_user.id,
             Conversation.user2_id == current_user.id
         )
     )
 
-    pagination = query.order_by(Conversation.last_message_at.desc())\
+    # 回應內含對方的個人檔案（姓名、頭像），個人檔案異動也要讓 ETag 改變
+    not_modified = check_not_modified(query, current_user.id, *table_fingerprint(UserProfile))
+    if not_modified is not None:
+        return not_modified
+
+    pagination = apply_loader_plan(query, fields)\
+        .order_by(Conversation.last_message_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'conversations': [conv.to_dict(current_user_id=current_user.id) for conv in pagination.items],
+    return json_response({
+        'conversations': conversation_serializer.dump_many(
+            pagination.items, fields, current_user_id=current_user.id
+        ),
         'total': pagination.total,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
-    }), 200
+    })
 
 
 @messages_v2_bp.route('/api/v2/conversations/<int:conversation_id>', methods=['GET'])
@@ -144,6 +156,10 @@ def get_messages(current_user, conversation_id):
 
     query = Message.query.filter_by(conversation_id=conversation_id)
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(Message.created_at.asc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
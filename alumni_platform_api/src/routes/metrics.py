@@ -0,0 +1,33 @@
+"""
+監控指標路由
+提供 Prometheus 抓取的 /metrics 端點
+"""
+
+import hmac
+import os
+
+from flask import Blueprint, Response, current_app, request, jsonify
+from src.utils.performance import render_prometheus
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus 文字格式的效能指標
+
+    設定 METRICS_TOKEN 時需帶 Authorization: Bearer <METRICS_TOKEN>（Prometheus 的 bearer_token 設定）。
+    生產環境必須設定 METRICS_TOKEN，未設定時拒絕提供（指標含所有路由、延遲與連線池狀態）。
+    """
+    token = os.environ.get('METRICS_TOKEN')
+    if not token and current_app.config.get('PRODUCTION'):
+        return jsonify({'message': 'METRICS_TOKEN is not configured'}), 403
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided, token):
+            return jsonify({'message': 'Unauthorized'}), 401
+
+    return Response(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
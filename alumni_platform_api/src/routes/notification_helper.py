@@ -5,6 +5,7 @@
 from src.models_v2 import db, Notification, NotificationType, NotificationStatus
 from src.models_v2.events import RegistrationStatus
 from src.routes.websocket import emit_notification
+from sqlalchemy import func, insert
 from datetime import datetime
 import logging
 
@@ -66,6 +67,66 @@ def create_notification(
         return None
 
 
+def bulk_insert_notifications(rows):
+    """
+    批次寫入通知（單一 INSERT，不 commit）
+
+    Args:
+        rows: 通知欄位字典列表，欄位同 create_notification 的參數
+
+    Returns:
+        list[tuple[int, int]]: (notification_id, user_id)，順序與 rows 相同
+    """
+    if not rows:
+        return []
+
+    result = db.session.execute(
+        insert(Notification).returning(
+            Notification.id, Notification.user_id, sort_by_parameter_order=True
+        ),
+        [{'status': NotificationStatus.UNREAD, **row} for row in rows]
+    )
+    return [(row.id, row.user_id) for row in result]
+
+
+def emit_bulk_notifications(notification_ids):
+    """
+    批次推播已寫入的通知（須在 commit 之後呼叫）
+
+    以一次查詢載入通知、一次 GROUP BY 計算各使用者未讀數，
+    避免每位使用者各自查詢。
+
+    Returns:
+        list[Notification]: 已推播的通知
+    """
+    if not notification_ids:
+        return []
+
+    notifications = Notification.query.filter(Notification.id.in_(notification_ids)).all()
+    user_ids = {notification.user_id for notification in notifications}
+
+    unread_counts = dict(
+        db.session.query(Notification.user_id, func.count(Notification.id))
+        .filter(
+            Notification.user_id.in_(user_ids),
+            Notification.status == NotificationStatus.UNREAD
+        )
+        .group_by(Notification.user_id)
+        .all()
+    )
+
+    for notification in notifications:
+        try:
+            emit_notification(notification.user_id, {
+                **notification.to_dict(),
+                'unread_count': unread_counts.get(notification.user_id, 0)
+            })
+        except Exception as e:
+            logger.error(f"Failed to emit notification {notification.id}: {str(e)}")
+
+    return notifications
+
+
 def create_job_request_notification(job_owner_id: int, requester_name: str, job_title: str, job_id: int, request_id: int):
     """建立職缺交流請求通知給職缺發布者"""
     return create_notification(
@@ -131,16 +192,23 @@ def create_event_cancelled_notification(participant_id: int, event_title: str, e
     )
 
 
+def build_event_reminder_content(event_title: str, event_id: int, start_time: datetime):
+    """組出活動提醒通知內容（單筆與批次派送共用）"""
+    return {
+        'notification_type': NotificationType.EVENT_REMINDER,
+        'title': "活動提醒",
+        'message': f"活動「{event_title}」將於 {start_time.strftime('%Y-%m-%d %H:%M')} 開始",
+        'related_type': "event",
+        'related_id': event_id,
+        'action_url': f"/events/{event_id}"
+    }
+
+
 def create_event_reminder_notification(participant_id: int, event_title: str, event_id: int, start_time: datetime):
     """建立活動提醒通知給報名者"""
     return create_notification(
         user_id=participant_id,
-        notification_type=NotificationType.EVENT_REMINDER,
-        title="活動提醒",
-        message=f"活動「{event_title}」將於 {start_time.strftime('%Y-%m-%d %H:%M')} 開始",
-        related_type="event",
-        related_id=event_id,
-        action_url=f"/events/{event_id}"
+        **build_event_reminder_content(event_title, event_id, start_time)
     )
 
 
@@ -174,27 +242,36 @@ def create_conversation_notification(user_id: int, job_title: str, job_id: int,
 def notify_all_event_participants(event_id: int, notification_type: NotificationType, title: str, message: str):
     """通知所有活動報名者"""
     from src.models_v2 import EventRegistration
-    
-    registrations = EventRegistration.query.filter_by(
-        event_id=event_id,
-        status=RegistrationStatus.REGISTERED
-    ).all()
-    
-    notifications = []
-    for registration in registrations:
-        notification = create_notification(
-            user_id=registration.user_id,
-            notification_type=notification_type,
-            title=title,
-            message=message,
-            related_type="event",
-            related_id=event_id,
-            action_url=f"/events/{event_id}"
+
+    user_ids = [
+        user_id for (user_id,) in db.session.query(EventRegistration.user_id).filter_by(
+            event_id=event_id,
+            status=RegistrationStatus.REGISTERED
         )
-        if notification:
-            notifications.append(notification)
-    
-    return notifications
+    ]
+    if not user_ids:
+        return []
+
+    try:
+        rows = bulk_insert_notifications([
+            {
+                'user_id': user_id,
+                'notification_type': notification_type,
+                'title': title,
+                'message': message,
+                'related_type': "event",
+                'related_id': event_id,
+                'action_url': f"/events/{event_id}"
+            }
+            for user_id in user_ids
+        ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to notify event participants: {str(e)}")
+        return []
+
+    return emit_bulk_notifications([notification_id for notification_id, _ in rows])
 
 
 def create_user_registration_notification_to_admins(applicant_name: str, applicant_email: str, user_id: int):
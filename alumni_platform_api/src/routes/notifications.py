@@ -3,11 +3,20 @@
 包含通知管理、系統設定、活動記錄
 """
 
-from flask import Blueprint, request, jsonify
-from src.models_v2 import db, Notification, SystemSetting, UserActivity, FileUpload, UserProfile
+from flask import Blueprint, current_app, request, jsonify
+from src.models_v2 import db, Notification, SystemSetting, UserActivity, FileUpload, UploadSession, UserProfile
 from src.routes.auth_v2 import token_required, admin_required
+from src.utils.conditional import check_not_modified
+from src.utils.counting import CACHED, EXACT, count_total, paginate
+from src.utils.pagination import InvalidCursor, keyset_paginate, wants_keyset, wants_total
+from src.utils.uploads import (
+    ALLOWED_EXTENSIONS, ChecksumMismatch, OffsetMismatch, UploadBusy, UploadTooLarge,
+    abort_upload_session, append_chunk, create_upload_session, discard_uploads,
+    file_extension, parse_multipart_upload, partial_offset, save_upload
+)
 from datetime import datetime
 from sqlalchemy import or_
+from werkzeug.exceptions import RequestEntityTooLarge
 import json
 import logging
 
@@ -37,12 +46,36 @@ def get_notifications(current_user):
         query = query.filter_by(notification_type=notification_type)
 
     # 分頁
-    pagination = query.order_by(Notification.created_at.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
+    # keyset 分頁（帶 cursor 或 pagination=cursor 時）
+    if wants_keyset():
+        try:
+            keyset = keyset_paginate(query, [(Notification.created_at, True)], per_page,
+                                     request.args.get('cursor'))
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+
+        result = {
+            'notifications': [notif.to_dict() for notif in keyset.items],
+            **keyset.to_dict()
+        }
+        if wants_total():
+            result['total'], result['total_exact'] = count_total(query, (CACHED, EXACT), ('notifications',))
+        return jsonify(result), 200
+
+    # id 作為次要排序，與 keyset 模式順序一致，同時間的通知不會跨頁重複
+    pagination = paginate(
+        query.order_by(Notification.created_at.desc(), Notification.id.desc()),
+        page, per_page, accept=(CACHED, EXACT), resources=('notifications',), count_query=query
+    )
 
     return jsonify({
         'notifications': [notif.to_dict() for notif in pagination.items],
         'total': pagination.total,
+        'total_exact': pagination.total_exact,
         'page': page,
         'per_page': per_page,
         'pages': pagination.pages
@@ -304,6 +337,10 @@ def get_user_activities(current_user):
     if activity_type:
         query = query.filter_by(activity_type=activity_type)
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(UserActivity.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
@@ -372,6 +409,10 @@ def get_file_uploads(current_user):
     if related_type:
         query = query.filter_by(related_type=related_type)
 
+    not_modified = check_not_modified(query, current_user.id)
+    if not_modified is not None:
+        return not_modified
+
     pagination = query.order_by(FileUpload.created_at.desc())\
         .paginate(page=page, per_page=per_page, error_out=False)
 
@@ -501,82 +542,171 @@ def update_notification_preferences(current_user):
 @notifications_bp.route('/api/files/upload', methods=['POST'])
 @token_required
 def upload_file(current_user):
-    """上傳檔案"""
+    """
+    上傳檔案
+
+    內容邊讀邊寫入暫存檔並計算 SHA-256，超過 UPLOAD_MAX_BYTES 時立即回應 413；
+    較大的附件請改用 /api/files/uploads 分段上傳
+    """
+    max_bytes = current_app.config['UPLOAD_MAX_BYTES']
+    writers = []
     try:
-        if 'file' not in request.files:
+        try:
+            form, files, writers = parse_multipart_upload(request, max_bytes)
+        except (UploadTooLarge, RequestEntityTooLarge):
+            return jsonify({'message': f'File size exceeds {max_bytes // (1024 * 1024)}MB limit'}), 413
+
+        if 'file' not in files:
             return jsonify({'message': 'No file provided'}), 400
-        
-        file = request.files['file']
+
+        file = files['file']
         if file.filename == '':
             return jsonify({'message': 'No file selected'}), 400
-        
+
         # 檢查檔案類型
-        allowed_extensions = {'jpg', 'jpeg', 'png', 'gif', 'pdf', 'doc', 'docx'}
-        file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-        
-        if file_ext not in allowed_extensions:
-            return jsonify({'message': f'File type not allowed. Allowed: {", ".join(allowed_extensions)}'}), 400
-        
-        # 檢查檔案大小 (5MB)
-        file.seek(0, 2)  # 移動到檔案結尾
-        file_size = file.tell()
-        file.seek(0)  # 重置位置
-        
-        if file_size > 5 * 1024 * 1024:  # 5MB
-            return jsonify({'message': 'File size exceeds 5MB limit'}), 400
-        
-        # 生成唯一檔名
-        import os
-        import uuid
-        from werkzeug.utils import secure_filename
-        
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        
-        # 建立上傳目錄 - 使用與 Flask app 相同的 static 目錄
-        # 計算 static 目錄路徑：從 src/routes/notifications.py 向上三層到 alumni_platform_api，然後進入 src/static
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        static_dir = os.path.join(base_dir, 'src', 'static')
-        upload_dir = os.path.join(static_dir, 'uploads')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # 保存檔案
-        file_path = os.path.join(upload_dir, unique_filename)
-        file.save(file_path)
-        
-        # 記錄到資料庫
-        file_type_category = 'image' if file_ext in {'jpg', 'jpeg', 'png', 'gif'} else 'document'
-        related_type = request.form.get('related_type')
-        related_id = request.form.get('related_id', type=int)
-        
-        file_upload = FileUpload(
-            user_id=current_user.id,
-            file_name=filename,
-            file_path=f'/static/uploads/{unique_filename}',
-            file_type=file.content_type or f'application/{file_ext}',  # 使用 MIME type
-            file_size=file_size,
-            related_type=related_type,
-            related_id=related_id
-        )
-        
-        db.session.add(file_upload)
+        if file_extension(file.filename) not in ALLOWED_EXTENSIONS:
+            return jsonify({'message': f'File type not allowed. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'}), 400
+
+        file_upload, sha256 = save_upload(current_user.id, file, form.get('related_type'),
+                                          form.get('related_id', type=int))
         db.session.commit()
-        
-        # 構建完整的 URL
-        from flask import request as flask_request
-        base_url = flask_request.host_url.rstrip('/')
-        file_url = f'{base_url}/static/uploads/{unique_filename}'
-        
+
         return jsonify({
             'message': 'File uploaded successfully',
             'file': file_upload.to_dict(),
-            'url': file_url
+            'sha256': sha256,
+            'url': f"{request.host_url.rstrip('/')}{file_upload.file_path}"
         }), 201
-        
+
     except Exception as e:
         db.session.rollback()
         logger.error(f"Failed to upload file: {str(e)}")
         return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+    finally:
+        discard_uploads(writers)
+
+
+def _get_upload_session(current_user, upload_id):
+    session = UploadSession.query.filter_by(upload_id=upload_id, user_id=current_user.id).first()
+    if session is None or session.expires_at <= datetime.utcnow():
+        return None
+    return session
+
+
+@notifications_bp.route('/api/files/uploads', methods=['POST'])
+@token_required
+def create_upload(current_user):
+    """
+    建立分段上傳（可續傳）
+
+    Body: {"filename", "size", "content_type"?, "sha256"?, "related_type"?, "related_id"?}
+    之後以 PUT /api/files/uploads/<upload_id> 依序送出各段（Upload-Offset 標頭為該段的起始位置）
+    """
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename') or ''
+    size = data.get('size')
+    max_bytes = current_app.config['UPLOAD_CHUNKED_MAX_BYTES']
+
+    if file_extension(filename) not in ALLOWED_EXTENSIONS:
+        return jsonify({'message': f'File type not allowed. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'}), 400
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        return jsonify({'message': 'size must be a positive integer'}), 400
+    if size > max_bytes:
+        return jsonify({'message': f'File size exceeds {max_bytes // (1024 * 1024)}MB limit'}), 413
+
+    try:
+        session = create_upload_session(current_user.id, filename, size, data.get('content_type'),
+                                        data.get('sha256'), data.get('related_type'), data.get('related_id'))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to create upload session: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+    return jsonify({
+        **session.to_dict(),
+        'offset': 0,
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE']
+    }), 201
+
+
+@notifications_bp.route('/api/files/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_upload(current_user, upload_id):
+    """查詢分段上傳已接收的位元組數（斷線後由此 offset 繼續）"""
+    session = _get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found'}), 404
+    return jsonify({**session.to_dict(), 'offset': partial_offset(session)}), 200
+
+
+@notifications_bp.route('/api/files/uploads/<upload_id>', methods=['PUT'])
+@token_required
+def upload_chunk(current_user, upload_id):
+    """
+    送出一段內容（請求本文為原始位元組）
+
+    Upload-Offset 與已接收的位元組數不符、或同一上傳正有另一個請求在寫入時回應 409 與目前的 offset；
+    單段超過 MAX_CONTENT_LENGTH 時回應 413；收齊後回應 201 與建立的檔案
+    """
+    session = _get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found'}), 404
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'message': 'Upload-Offset header is required'}), 400
+
+    try:
+        offset, completed = append_chunk(session, request.stream, offset, request.content_length)
+        if completed is None:
+            return jsonify({'upload_id': upload_id, 'offset': offset}), 200
+        file_upload, sha256 = completed
+    except FileNotFoundError:
+        return jsonify({'message': 'Upload not found'}), 404
+    except UploadBusy:
+        return jsonify({'message': 'Another request is writing this upload',
+                        'offset': partial_offset(session)}), 409
+    except OffsetMismatch as e:
+        return jsonify({'message': 'Upload-Offset mismatch', 'offset': e.offset}), 409
+    except UploadTooLarge:
+        return jsonify({'message': 'Chunk exceeds declared file size', 'offset': partial_offset(session)}), 413
+    except RequestEntityTooLarge:
+        # 單一段超過 MAX_CONTENT_LENGTH
+        max_chunk = current_app.config['MAX_CONTENT_LENGTH']
+        return jsonify({'message': f'Chunk exceeds {max_chunk // (1024 * 1024)}MB limit',
+                        'offset': partial_offset(session)}), 413
+    except ChecksumMismatch:
+        return jsonify({'message': 'Checksum mismatch, upload discarded'}), 422
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to upload chunk: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+    return jsonify({
+        'message': 'File uploaded successfully',
+        'file': file_upload.to_dict(),
+        'sha256': sha256,
+        'url': f"{request.host_url.rstrip('/')}{file_upload.file_path}"
+    }), 201
+
+
+@notifications_bp.route('/api/files/uploads/<upload_id>', methods=['DELETE'])
+@token_required
+def cancel_upload(current_user, upload_id):
+    """取消分段上傳並刪除已接收的內容"""
+    session = _get_upload_session(current_user, upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found'}), 404
+    try:
+        abort_upload_session(session)
+    except UploadBusy:
+        return jsonify({'message': 'Another request is writing this upload',
+                        'offset': partial_offset(session)}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to cancel upload: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+    return jsonify({'message': 'Upload cancelled'}), 200
 
 
 # ========================================
@@ -0,0 +1,160 @@
+"""
+推薦路由 v2
+讀取離線批次計算的推薦結果（見 src.utils.recommendations、src.utils.job_matching），
+請求時不做任何計分
+"""
+
+from flask import Blueprint, request, jsonify
+from src.models_v2 import DirectoryEntry, Job, JobMatch, PeopleRecommendation
+from src.models_v2.jobs import JobStatus
+from src.routes.auth_v2 import token_required
+from src.utils.contact_graph import contact_graph, load_users, user_summary
+from src.utils.loader_plans import apply_loader_plan
+from src.utils.serializers import job_serializer, json_response
+import logging
+
+logger = logging.getLogger(__name__)
+
+recommendations_v2_bp = Blueprint('recommendations_v2', __name__)
+
+
+# ========================================
+# 你可能認識的系友
+# ========================================
+@recommendations_v2_bp.route('/api/v2/recommendations/people', methods=['GET'])
+@token_required
+def get_people_recommendations(current_user):
+    """
+    取得「你可能認識的系友」推薦
+
+    批次計算後才發出聯絡申請的對象、或已停用的帳號，會在回應時過濾掉。
+
+    Query Parameters:
+    - limit: 回傳筆數上限（默認 10，最多 20）
+    """
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 20)
+
+        recommendations = PeopleRecommendation.query\
+            .filter_by(user_id=current_user.id)\
+            .order_by(PeopleRecommendation.score.desc(), PeopleRecommendation.candidate_id)\
+            .all()
+
+        connected = contact_graph.adjacency(current_user.id)
+        recommendations = [r for r in recommendations if r.candidate_id not in connected]
+        users = load_users([r.candidate_id for r in recommendations])
+
+        data = []
+        for recommendation in recommendations:
+            user = users.get(recommendation.candidate_id)
+            if not user:
+                continue
+            item = recommendation.to_dict()
+            data.append({
+                **user_summary(user),
+                'score': item['score'],
+                'reasons': item['reasons'],
+            })
+            if len(data) >= limit:
+                break
+
+        return jsonify({
+            'data': data,
+            'computed_at': recommendations[0].computed_at.isoformat() if recommendations else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"取得推薦系友失敗: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+
+# ========================================
+# 適合我的職缺
+# ========================================
+@recommendations_v2_bp.route('/api/v2/recommendations/jobs', methods=['GET'])
+@token_required
+def get_job_recommendations(current_user):
+    """
+    取得與我的技能、年資、學歷最相符的職缺
+
+    Query Parameters:
+    - limit: 回傳筆數上限（默認 10，最多 20）
+    - fields: 職缺欄位（同職缺列表）
+    """
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 20)
+        try:
+            fields = job_serializer.parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        matches = JobMatch.query.filter_by(user_id=current_user.id)\
+            .order_by(JobMatch.score.desc(), JobMatch.job_id)\
+            .limit(limit * 2).all()
+
+        # 計算後才下架或過期的職缺在回應時過濾
+        jobs = apply_loader_plan(
+            Job.query.filter(Job.id.in_([m.job_id for m in matches]),
+                             Job.status == JobStatus.ACTIVE, Job.not_expired_filter()),
+            fields
+        ).all()
+        jobs_by_id = {job.id: job for job in jobs}
+        matches = [m for m in matches if m.job_id in jobs_by_id][:limit]
+        dumped = job_serializer.dump_many([jobs_by_id[m.job_id] for m in matches], fields)
+
+        return json_response({
+            'data': [
+                {'job': job, 'score': round(m.score, 4),
+                 'matched_terms': m.to_dict()['matched_terms']}
+                for m, job in zip(matches, dumped)
+            ]
+        })
+
+    except Exception as e:
+        logger.error(f"取得推薦職缺失敗: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
+
+
+# ========================================
+# 職缺的推薦系友（發布者 / 管理員）
+# ========================================
+@recommendations_v2_bp.route('/api/v2/recommendations/jobs/<int:job_id>/candidates', methods=['GET'])
+@token_required
+def get_job_candidates(current_user, job_id):
+    """
+    取得與職缺最相符的系友（只有職缺發布者與管理員可查看）
+
+    系友資料取自通訊錄讀取模型，聯絡方式依本人隱私設定顯示。
+
+    Query Parameters:
+    - limit: 回傳筆數上限（默認 20，最多 50）
+    """
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+
+        job = Job.query.get(job_id)
+        if not job:
+            return jsonify({'message': 'Job not found'}), 404
+        if job.user_id != current_user.id and current_user.role != 'admin':
+            return jsonify({'message': 'Permission denied'}), 403
+
+        matches = JobMatch.query.filter(JobMatch.job_id == job_id, JobMatch.user_id != job.user_id)\
+            .order_by(JobMatch.score.desc(), JobMatch.user_id)\
+            .limit(limit).all()
+        entries = DirectoryEntry.query.filter(
+            DirectoryEntry.id.in_([m.user_id for m in matches]),
+            DirectoryEntry.status == 'active'
+        ).all()
+        entries_by_id = {entry.id: entry for entry in entries}
+
+        return jsonify({
+            'data': [
+                {'user': entries_by_id[m.user_id].to_dict(), 'score': round(m.score, 4),
+                 'matched_terms': m.to_dict()['matched_terms']}
+                for m in matches if m.user_id in entries_by_id
+            ]
+        }), 200
+
+    except Exception as e:
+        logger.error(f"取得職缺推薦系友失敗: {str(e)}")
+        return jsonify({'message': '伺服器內部錯誤，請稍後再試'}), 500
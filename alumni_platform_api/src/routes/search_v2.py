@@ -8,6 +8,8 @@ from src.extensions import limiter
 from src.models_v2 import (
     db, Job, Event, Bulletin, Article, UserProfile, Message, Conversation, User
 )
+from src.models_v2.events import EventStatus
+from src.utils.serializers import build_loader, job_serializer, event_serializer, bulletin_serializer
 from sqlalchemy import or_, and_, func
 from datetime import datetime
 
@@ -54,7 +56,8 @@ def global_search(current_user):
                     Job.description.ilike(f'%{query}%'),
                     Job.location.ilike(f'%{query}%')
                 )
-            ).filter_by(status='active')
+            ).filter_by(status='active').filter(Job.not_expired_filter())\
+                .options(*job_serializer.loader_options())
             
             jobs_pagination = jobs_query.paginate(
                 page=page if search_type == 'jobs' else 1,
@@ -83,7 +86,9 @@ def global_search(current_user):
                     Event.description.ilike(f'%{query}%'),
                     Event.location.ilike(f'%{query}%')
                 )
-            ).filter_by(status='published')
+            ).filter(
+                Event.status != EventStatus.DRAFT, Event.status != EventStatus.CANCELLED
+            ).options(*event_serializer.loader_options())
             
             events_pagination = events_query.paginate(
                 page=page if search_type == 'events' else 1,
@@ -111,7 +116,7 @@ def global_search(current_user):
                     Bulletin.title.ilike(f'%{query}%'),
                     Bulletin.content.ilike(f'%{query}%')
                 )
-            ).filter_by(status='published')
+            ).filter_by(status='published').options(*bulletin_serializer.loader_options())
             
             bulletins_pagination = bulletins_query.paginate(
                 page=page if search_type == 'bulletins' else 1,
@@ -141,7 +146,9 @@ def global_search(current_user):
                     Article.content.ilike(f'%{query}%'),
                     Article.summary.ilike(f'%{query}%')
                 )
-            ).filter_by(status='published')
+            ).filter_by(status='published').options(
+                build_loader(Article, 'author.profile'), build_loader(Article, 'category')
+            )
             
             articles_pagination = articles_query.paginate(
                 page=page if search_type == 'articles' else 1,
@@ -242,7 +249,7 @@ def get_search_suggestions(current_user):
         # 職缺標題建議
         jobs = Job.query.filter(
             Job.title.ilike(f'%{query}%')
-        ).filter_by(status='active').limit(5).all()
+        ).filter_by(status='active').filter(Job.not_expired_filter()).limit(5).all()
         
         for job in jobs:
             suggestions.append({
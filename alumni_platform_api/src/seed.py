@@ -0,0 +1,301 @@
+"""
+資料庫初始化與測試資料
+建立資料表、空資料庫時填入示範資料、補齊讀取模型與索引
+
+開發環境由 create_app 在啟動時執行；正式環境以 `flask --app src.main_v2 init-db`（或 Alembic migration）
+在部署時執行一次，不在每個 worker 啟動時重複。
+"""
+import logging
+from datetime import datetime, timedelta
+
+from src.models_v2 import db, User, UserProfile, Skill
+from src.models_v2 import Job, JobCategory
+from src.models_v2 import Event, EventCategory
+from src.models_v2 import Bulletin, BulletinCategory
+from src.models_v2 import SystemSetting
+
+
+def init_database(app):
+    """初始化資料庫並填入測試資料（開發環境由 create_app 呼叫；其他環境以 flask init-db 執行）"""
+    from src.utils.directory import ensure_directory
+    from src.utils.index_manager import sync_indexes
+
+    with app.app_context():
+        # 建立所有資料表（如果不存在）
+        db.create_all()
+        logging.info("✅ Database tables ensured")
+
+        # 檢查是否需要填入測試資料
+        try:
+            user_count = User.query.count()
+            if user_count == 0:
+                logging.info("📊 Database is empty, seeding initial data...")
+                seed_data()
+                logging.info("✅ Initial data seeded successfully")
+            else:
+                logging.info(f"ℹ️  Database contains {user_count} users, skipping seed")
+
+            # 既有資料庫第一次部署讀取模型時補齊
+            ensure_directory()
+
+            # db.create_all 不會替既有資料表補上新宣告的索引；SQLite 開發環境直接補，
+            # PostgreSQL 走 index-migration 產生的 Alembic revision
+            if db.engine.dialect.name == 'sqlite':
+                sync_indexes()
+        except Exception as e:
+            logging.error(f"Database init error: {e}")
+
+
+def seed_data():
+    """填入測試資料"""
+    try:
+        # ========================================
+        # 建立測試使用者
+        # ========================================
+        users_data = [
+            {
+                'email': 'admin@example.com',
+                'password': 'admin123',
+                'name': '系統管理員',
+                'role': 'admin',
+                'profile': {
+                    'graduation_year': 2015,
+                    'class_year': 100,
+                    'current_company': '系友會',
+                    'current_position': '平台管理員',
+                    'bio': '負責系友會平台的維護與管理'
+                }
+            },
+            {
+                'email': 'wang@example.com',
+                'password': 'password123',
+                'name': '王小明',
+                'role': 'user',
+                'profile': {
+                    'graduation_year': 2020,
+                    'class_year': 108,
+                    'current_company': 'ASUS',
+                    'current_position': '光學工程師',
+                    'industry': '電子製造',
+                    'bio': '專注於筆電螢幕光學設計與優化'
+                }
+            },
+            {
+                'email': 'lee@example.com',
+                'password': 'password123',
+                'name': '李美華',
+                'role': 'user',
+                'profile': {
+                    'graduation_year': 2019,
+                    'class_year': 107,
+                    'current_company': 'MediaTek',
+                    'current_position': '色彩科學研究員',
+                    'industry': '半導體',
+                    'bio': '專注於顯示器色彩管理技術研發'
+                }
+            }
+        ]
+
+        created_users = []
+        for user_data in users_data:
+            user = User(
+                email=user_data['email'],
+                role=user_data['role']
+            )
+            user.set_password(user_data['password'])
+            db.session.add(user)
+            db.session.flush()
+
+            # 建立使用者檔案
+            profile_data = user_data['profile']
+            profile = UserProfile(
+                user_id=user.id,
+                full_name=user_data['name'],  # name 從 user_data 移到 profile
+                display_name=user_data['name'].split()[0] if user_data['name'] else None,
+                graduation_year=profile_data.get('graduation_year'),
+                class_year=profile_data.get('class_year') or profile_data.get('class_name'),
+                current_company=profile_data.get('current_company'),
+                current_position=profile_data.get('current_position'),
+                bio=profile_data.get('bio')
+            )
+            db.session.add(profile)
+
+            created_users.append(user)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(created_users)} users")
+
+        # ========================================
+        # 建立技能項目
+        # ========================================
+        skills_data = [
+            {'name': 'Python', 'category': '程式語言'},
+            {'name': 'JavaScript', 'category': '程式語言'},
+            {'name': 'Zemax', 'category': '光學軟體'},
+            {'name': 'LightTools', 'category': '光學軟體'},
+            {'name': '色彩管理', 'category': '專業技能'},
+            {'name': '光學設計', 'category': '專業技能'},
+        ]
+
+        created_skills = []
+        for skill_data in skills_data:
+            skill = Skill(
+                name=skill_data['name'],
+                category=skill_data['category']
+            )
+            db.session.add(skill)
+            created_skills.append(skill)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(created_skills)} skills")
+
+        # ========================================
+        # 建立職缺分類
+        # ========================================
+        job_categories = [
+            {'name': '光學工程', 'icon': '🔬', 'color': '#3b82f6'},
+            {'name': '色彩科學', 'icon': '🎨', 'color': '#8b5cf6'},
+            {'name': '軟體開發', 'icon': '💻', 'color': '#10b981'},
+        ]
+
+        created_job_cats = []
+        for cat_data in job_categories:
+            category = JobCategory(
+                name=cat_data['name'],
+                icon=cat_data['icon'],
+                color=cat_data['color']
+            )
+            db.session.add(category)
+            created_job_cats.append(category)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(created_job_cats)} job categories")
+
+        # ========================================
+        # 建立測試職缺
+        # ========================================
+        if created_users and created_job_cats:
+            job = Job(
+                user_id=created_users[1].id,
+                category_id=created_job_cats[0].id,
+                title='光學工程師',
+                company='台積電',
+                description='負責先進製程光學系統設計與優化',
+                location='新竹',
+                job_type='full_time',
+                status='active',
+                salary_min=80000,
+                salary_max=120000,
+                published_at=datetime.utcnow()
+            )
+            db.session.add(job)
+            db.session.commit()
+            print("  ✓ Created 1 sample job")
+
+        # ========================================
+        # 建立活動分類
+        # ========================================
+        event_categories = [
+            {'name': '系友聚會', 'icon': '👥', 'color': '#f59e0b'},
+            {'name': '學術講座', 'icon': '📚', 'color': '#06b6d4'},
+        ]
+
+        created_event_cats = []
+        for cat_data in event_categories:
+            category = EventCategory(
+                name=cat_data['name'],
+                icon=cat_data['icon'],
+                color=cat_data['color']
+            )
+            db.session.add(category)
+            created_event_cats.append(category)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(created_event_cats)} event categories")
+
+        # ========================================
+        # 建立測試活動
+        # ========================================
+        if created_users and created_event_cats:
+            event = Event(
+                organizer_id=created_users[0].id,
+                category_id=created_event_cats[0].id,
+                title='2025年度系友大會',
+                description='年度系友聚會,歡迎所有系友參加',
+                start_time=datetime.utcnow() + timedelta(days=30),
+                end_time=datetime.utcnow() + timedelta(days=30, hours=4),
+                location='國立清華大學',
+                max_participants=100,
+                is_free=True,
+                published_at=datetime.utcnow()
+            )
+            db.session.add(event)
+            db.session.commit()
+            print("  ✓ Created 1 sample event")
+
+        # ========================================
+        # 建立公告分類
+        # ========================================
+        bulletin_categories = [
+            {'name': '系友會公告', 'icon': '📢', 'color': '#ef4444'},
+            {'name': '系友動態', 'icon': '🌟', 'color': '#06b6d4'},
+        ]
+
+        created_bulletin_cats = []
+        for cat_data in bulletin_categories:
+            category = BulletinCategory(
+                name=cat_data['name'],
+                icon=cat_data['icon'],
+                color=cat_data['color']
+            )
+            db.session.add(category)
+            created_bulletin_cats.append(category)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(created_bulletin_cats)} bulletin categories")
+
+        # ========================================
+        # 建立測試公告
+        # ========================================
+        if created_users and created_bulletin_cats:
+            bulletin = Bulletin(
+                author_id=created_users[0].id,
+                category_id=created_bulletin_cats[0].id,
+                title='歡迎使用系友會平台',
+                content='感謝各位系友使用本平台,期待大家多多交流!',
+                bulletin_type='announcement',
+                status='published',
+                is_pinned=True,
+                published_at=datetime.utcnow()
+            )
+            db.session.add(bulletin)
+            db.session.commit()
+            print("  ✓ Created 1 sample bulletin")
+
+        # ========================================
+        # 建立系統設定
+        # ========================================
+        settings_data = [
+            {'key': 'site_name', 'value': '色彩與照明科技研究所系友會', 'type': 'string', 'public': True, 'category': '基本設定'},
+            {'key': 'site_description', 'value': '系友會社群平台', 'type': 'string', 'public': True, 'category': '基本設定'},
+            {'key': 'enable_registration', 'value': 'true', 'type': 'bool', 'public': True, 'category': '功能設定'},
+            {'key': 'max_file_size', 'value': '5242880', 'type': 'int', 'public': False, 'category': '系統設定'},
+        ]
+
+        for setting_data in settings_data:
+            setting = SystemSetting(
+                setting_key=setting_data['key'],
+                setting_type=setting_data['type'],
+                category=setting_data['category'],
+                is_public=setting_data['public']
+            )
+            setting.set_value(setting_data['value'])
+            db.session.add(setting)
+
+        db.session.commit()
+        print(f"  ✓ Created {len(settings_data)} system settings")
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error seeding data: {str(e)}")
+        raise
@@ -0,0 +1,343 @@
+"""
+回應快取模組
+公開列表端點（職缺、活動、公告、分類、技能）的版本化回應快取
+
+- 快取鍵 = 端點 + 相依資源版本號 + 正規化後的查詢字串
+- 每個資源（jobs、events...）維護一個版本號，資料異動 commit 後由 session hook 遞增，
+  版本一變舊快取自然失效，不需逐一刪除
+- 預設使用行程內 LRU（限制筆數與總位元組），設定 CACHE_REDIS_URL 時改用 Redis，
+  讓多個 worker 共用快取與版本號
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src.utils.conditional import conditional_response, make_etag, normalize_query_string
+
+logger = logging.getLogger(__name__)
+
+# 資料表 → 快取資源標籤
+TABLE_RESOURCES = {
+    'jobs_v2': 'jobs',
+    'job_categories_v2': 'job_categories',
+    'events_v2': 'events',
+    'event_categories_v2': 'event_categories',
+    'bulletins_v2': 'bulletins',
+    'bulletin_categories_v2': 'bulletin_categories',
+    'skills_v2': 'skills',
+    'users_v2': 'users',
+    'user_profiles_v2': 'users',
+    'notifications_v2': 'notifications',
+    'contact_requests': 'contact_requests',
+}
+
+# 只有這些欄位變動時不使快取失效（計數器與登入紀錄更新頻繁，列表可容忍 TTL 內的延遲）
+IGNORED_FIELDS = {'views_count', 'last_login_at', 'login_count', 'updated_at'}
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+# ========================================
+# 快取後端
+# ========================================
+class LocalCacheBackend:
+    """行程內 LRU 快取與版本號"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        status, mimetype, body = value
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._size += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, (_, _, body) = self._entries.pop(key)
+        self._size -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_versions(self, resources):
+        with self._lock:
+            return [self._versions.get(resource, 0) for resource in resources]
+
+    def bump_versions(self, resources):
+        with self._lock:
+            for resource in resources:
+                self._versions[resource] = self._versions.get(resource, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'local', 'entries': len(self._entries), 'bytes': self._size}
+
+
+class RedisCacheBackend:
+    """Redis 共用快取（多 worker 共用快取內容與版本號）"""
+
+    def __init__(self, url, prefix='alumni:cache:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        header, body = raw.split(b'\n', 1)
+        status, mimetype = header.decode().split(' ', 1)
+        return int(status), mimetype, body
+
+    def set(self, key, value, ttl):
+        status, mimetype, body = value
+        self._client.set(self._prefix + key, f'{status} {mimetype}'.encode() + b'\n' + body, ex=ttl)
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._prefix + 'r:*'):
+            self._client.delete(key)
+
+    def get_versions(self, resources):
+        values = self._client.mget([self._prefix + 'v:' + resource for resource in resources])
+        return [int(value) if value else 0 for value in values]
+
+    def bump_versions(self, resources):
+        pipeline = self._client.pipeline()
+        for resource in resources:
+            pipeline.incr(self._prefix + 'v:' + resource)
+        pipeline.execute()
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+# ========================================
+# 回應快取
+# ========================================
+class ResponseCache:
+    """版本化回應快取"""
+
+    def __init__(self):
+        self.backend = LocalCacheBackend()
+        self.enabled = True
+        self.default_ttl = DEFAULT_TTL
+        self.hits = 0
+        self.misses = 0
+        # 後端各自序列化存取，命中計數另以此鎖保護（多執行緒同時 += 會遺失更新）
+        self._stats_lock = threading.Lock()
+        self._hooks_installed = False
+
+    def init_app(self, app):
+        """依設定建立後端並註冊 session hook"""
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', DEFAULT_TTL)
+
+        redis_url = app.config.get('CACHE_REDIS_URL')
+        if redis_url:
+            try:
+                self.backend = RedisCacheBackend(redis_url)
+            except ImportError:
+                logger.warning("CACHE_REDIS_URL is set but redis is not installed, using local cache")
+        if isinstance(self.backend, LocalCacheBackend):
+            self.backend = LocalCacheBackend(
+                max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+                max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES),
+            )
+
+        if not self._hooks_installed:
+            event.listen(Session, 'after_flush', _collect_flushed_resources)
+            event.listen(Session, 'do_orm_execute', _collect_bulk_resources)
+            event.listen(Session, 'after_commit', _bump_committed_resources)
+            event.listen(Session, 'after_soft_rollback', _discard_pending_resources)
+            self._hooks_installed = True
+
+        app.extensions['response_cache'] = self
+
+    def get_versions(self, resources):
+        return self.backend.get_versions(resources)
+
+    def bump(self, *resources):
+        if resources:
+            self.backend.bump_versions(resources)
+
+    def clear(self):
+        self.backend.clear()
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._stats_lock:
+            counts = {'hits': self.hits, 'misses': self.misses}
+        return {**self.backend.stats(), **counts}
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def cached(self, *resources, ttl=None):
+        """
+        快取端點回應的裝飾器
+
+        僅用於回應與使用者身分無關的公開 GET 端點；只快取 200 回應。
+        ETag 直接由快取鍵（含版本號）算出，If-None-Match 相符時連快取都不用讀。
+
+        Args:
+            resources: 回應內容相依的資源標籤，任一版本變動即失效
+            ttl: 存活秒數（預設 RESPONSE_CACHE_TTL），處理時間相關欄位（如 is_expired）
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return func(*args, **kwargs)
+
+                key = self._make_key(resources)
+                not_modified = conditional_response(make_etag(key))
+                if not_modified is not None:
+                    return not_modified
+
+                try:
+                    cached = self.backend.get(key)
+                except Exception as e:
+                    logger.warning(f"Response cache read failed: {str(e)}")
+                    cached = None
+
+                if cached is not None:
+                    self._count(hit=True)
+                    status, mimetype, body = cached
+                    response = current_app.response_class(body, status=status, mimetype=mimetype)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._count(hit=False)
+                response = make_response(func(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    try:
+                        self.backend.set(
+                            key,
+                            (response.status_code, response.mimetype, response.get_data()),
+                            ttl or self.default_ttl
+                        )
+                    except Exception as e:
+                        logger.warning(f"Response cache write failed: {str(e)}")
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def _make_key(self, resources):
+        versions = self.get_versions(resources)
+        version_tag = ','.join(f'{resource}:{version}' for resource, version in zip(resources, versions))
+        return f'r:{request.endpoint}|{version_tag}|{normalize_query_string()}'
+
+
+# ========================================
+# Session hooks：commit 後遞增資源版本號
+# ========================================
+def _pending_resources(session):
+    return session.info.setdefault('cache_pending_resources', set())
+
+
+def _resource_for(obj):
+    return TABLE_RESOURCES.get(getattr(obj, '__tablename__', None))
+
+
+def _has_relevant_changes(obj):
+    state = inspect(obj)
+    for attr in state.attrs:
+        if attr.key in IGNORED_FIELDS:
+            continue
+        if attr.history.has_changes():
+            return True
+    return False
+
+
+def _collect_flushed_resources(session, flush_context):
+    pending = _pending_resources(session)
+    for obj in list(session.new) + list(session.deleted):
+        resource = _resource_for(obj)
+        if resource:
+            pending.add(resource)
+    for obj in session.dirty:
+        resource = _resource_for(obj)
+        if resource and resource not in pending and _has_relevant_changes(obj):
+            pending.add(resource)
+
+
+def _collect_bulk_resources(orm_execute_state):
+    """
+    ORM 批次 INSERT / UPDATE / DELETE（例如 Query.update）不經過 flush，另外記錄
+
+    UPDATE / DELETE 未影響任何資料列時不使快取失效（例如排程沒有找到過期職缺）。
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    resource = TABLE_RESOURCES.get(mapper.local_table.name) if mapper is not None else None
+    if not resource:
+        return None
+
+    result = orm_execute_state.invoke_statement()
+    if orm_execute_state.is_insert or result.rowcount != 0:
+        _pending_resources(orm_execute_state.session).add(resource)
+    return result
+
+
+def _bump_committed_resources(session):
+    pending = session.info.pop('cache_pending_resources', None)
+    if pending:
+        response_cache.bump(*pending)
+
+
+def _discard_pending_resources(session, previous_transaction):
+    session.info.pop('cache_pending_resources', None)
+
+
+response_cache = ResponseCache()
+
+
+def get_version(resource):
+    """取得資源目前的版本號"""
+    return response_cache.get_versions([resource])[0]
+
+
+def bump_version(*resources):
+    """遞增資源版本號，使相關快取失效"""
+    response_cache.bump(*resources)
@@ -0,0 +1,94 @@
+"""
+條件式請求模組 (ETag / If-None-Match)
+在序列化回應之前就算出 ETag，資料未變動時直接回傳 304
+
+兩種 ETag 來源：
+- 資料列指紋：對列表查詢做一次彙總 (筆數, 最大 updated_at, id 總和)，
+  任何新增、刪除或更新都會改變指紋
+- 資源版本號：回應快取的快取鍵本身即包含版本號，直接雜湊即可
+"""
+import hashlib
+
+from flask import current_app, g, request
+from sqlalchemy import func
+
+
+def normalize_query_string():
+    """正規化查詢字串：參數依名稱與值排序，順序不同的相同查詢視為相同"""
+    return '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+
+
+def make_etag(*parts):
+    """由任意部分組成強 ETag（不含引號）"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def query_fingerprint(query):
+    """
+    計算列表查詢的資料列指紋
+
+    需在套用 eager loading 選項之前呼叫（with_entities 會改寫查詢欄位）。
+    """
+    entity = query.column_descriptions[0]['entity']
+    row = query.with_entities(
+        func.count(entity.id),
+        func.max(entity.updated_at),
+        func.sum(entity.id)
+    ).order_by(None).one()
+    return tuple(row)
+
+
+def table_fingerprint(model):
+    """
+    整張資料表的指紋 (筆數, 最大 updated_at)
+
+    用於列表內容還取決於關聯表的情況，例如系友列表顯示的個人資料。
+    """
+    return tuple(
+        model.query.with_entities(func.count(model.id), func.max(model.updated_at)).one()
+    )
+
+
+def conditional_response(etag):
+    """
+    登記本次回應的 ETag；若 If-None-Match 相符則回傳 304 回應，否則回傳 None
+    """
+    g.response_etag = etag
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def check_not_modified(query, *scope):
+    """
+    列表端點用：以資料列指紋判斷是否可回 304
+
+    Args:
+        query: 已套用篩選條件、尚未分頁的查詢
+        scope: 其他影響回應內容的值（例如目前使用者 ID）
+
+    Returns:
+        304 回應或 None
+    """
+    etag = make_etag(request.path, normalize_query_string(), *scope, *query_fingerprint(query))
+    return conditional_response(etag)
+
+
+def init_conditional_requests(app):
+    """註冊 after_request hook，為登記過 ETag 的回應加上標頭"""
+
+    @app.after_request
+    def attach_etag(response):
+        etag = g.pop('response_etag', None)
+        if etag is None or response.status_code != 200:
+            return response
+
+        if 'ETag' not in response.headers:
+            response.set_etag(etag)
+        if 'Cache-Control' not in response.headers:
+            # 允許瀏覽器保存，但每次都要帶 If-None-Match 回來驗證
+            response.headers['Cache-Control'] = 'private, no-cache' if request.headers.get('Authorization') else 'no-cache'
+        response.vary.add('Authorization')
+        return response
@@ -0,0 +1,303 @@
+"""
+聯絡人關係圖快取
+以使用者為單位，在記憶體中保存其所有聯絡申請的鄰接表（每對使用者只保留最新一筆申請）：
+
+- 聯絡狀態查詢：鄰接表載入後為 O(1) 字典查詢
+- 聯絡人清單：由鄰接表排序分頁，只針對該頁的使用者一次載入個人檔案
+- 共同聯絡人：兩個聯絡人集合取交集
+- 二度人脈：最多展開 MAX_FANOUT 位聯絡人（一次查詢載入），依共同聯絡人數排序
+
+更新方式：ContactRequest 新增 / 接受 / 拒絕 commit 後，session hook 直接更新兩端已載入的鄰接表；
+刪除時則丟棄兩端的鄰接表下次重新載入。多個 worker 各自保有快取，
+每次查詢先比對回應快取的 contact_requests 版本號（設定 CACHE_REDIS_URL 時為各 worker 共用），
+版本變動即丟棄整個快取，其他 worker 的寫入下次查詢就生效；CONTACT_GRAPH_TTL 只作為版本號讀取失敗時的上限。
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session, joinedload
+
+from src.models_v2 import db, ContactRequest, User
+from src.utils.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_USERS = 10000
+
+# 二度人脈最多展開的聯絡人數（依最近建立聯絡排序）
+MAX_FANOUT = 200
+
+# 每次查詢鄰接表的使用者數上限（避免 IN 清單過長）
+LOAD_CHUNK_SIZE = 500
+
+# 鄰接表相依的回應快取資源
+GRAPH_RESOURCES = ('contact_requests',)
+
+# 一對使用者間最新一筆申請
+Edge = namedtuple('Edge', 'request_id requester_id status created_at responded_at')
+
+_EDGE_COLUMNS = (
+    ContactRequest.id, ContactRequest.requester_id, ContactRequest.target_id,
+    ContactRequest.status, ContactRequest.created_at, ContactRequest.responded_at,
+)
+
+
+def _is_newer(edge, current):
+    if current is None or edge.request_id == current.request_id:
+        return True
+    return (edge.created_at or datetime.min, edge.request_id) > \
+        (current.created_at or datetime.min, current.request_id)
+
+
+def _connected_sort_key(item):
+    _, edge = item
+    return (edge.responded_at or datetime.min, edge.request_id)
+
+
+class ContactGraph:
+    """行程內聯絡人鄰接表快取（LRU + TTL）"""
+
+    def __init__(self, ttl=DEFAULT_TTL, max_users=DEFAULT_MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._nodes = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._hooks_installed = False
+
+    def init_app(self, app):
+        """讀取設定並註冊 session hook"""
+        self.ttl = app.config.get('CONTACT_GRAPH_TTL', DEFAULT_TTL)
+        self.max_users = app.config.get('CONTACT_GRAPH_MAX_USERS', DEFAULT_MAX_USERS)
+
+        if not self._hooks_installed:
+            event.listen(Session, 'after_flush', _collect_flushed_requests)
+            event.listen(Session, 'after_commit', _apply_committed_requests)
+            event.listen(Session, 'after_soft_rollback', _discard_pending_requests)
+            self._hooks_installed = True
+
+        app.extensions['contact_graph'] = self
+
+    # ----------------------------------------
+    # 鄰接表載入
+    # ----------------------------------------
+    def _get_cached(self, user_id):
+        node = self._nodes.get(user_id)
+        if node is None:
+            return None
+        loaded_at, edges = node
+        if loaded_at + self.ttl < time.monotonic():
+            del self._nodes[user_id]
+            return None
+        self._nodes.move_to_end(user_id)
+        return edges
+
+    def _store(self, user_id, edges):
+        self._nodes[user_id] = (time.monotonic(), edges)
+        self._nodes.move_to_end(user_id)
+        while len(self._nodes) > self.max_users:
+            self._nodes.popitem(last=False)
+
+    def _sync_version(self):
+        """聯絡申請的版本號與上次不同時（任一 worker commit 過聯絡申請）丟棄整個快取"""
+        try:
+            version = tuple(response_cache.get_versions(GRAPH_RESOURCES))
+        except Exception as e:
+            logger.warning(f"Contact graph version check failed: {str(e)}")
+            return
+        with self._lock:
+            if version != self._version:
+                self._nodes.clear()
+                self._version = version
+
+    def adjacency_many(self, user_ids):
+        """
+        取得多位使用者的鄰接表，未快取的一次查詢載入
+
+        Returns:
+            dict: user_id -> {對方 ID: Edge}
+        """
+        self._sync_version()
+        result, missing = {}, []
+        with self._lock:
+            for user_id in set(user_ids):
+                edges = self._get_cached(user_id)
+                if edges is None:
+                    missing.append(user_id)
+                else:
+                    result[user_id] = edges
+
+        missing.sort()
+        for start in range(0, len(missing), LOAD_CHUNK_SIZE):
+            chunk = missing[start:start + LOAD_CHUNK_SIZE]
+            loaded = {user_id: {} for user_id in chunk}
+            rows = db.session.query(*_EDGE_COLUMNS).filter(
+                or_(ContactRequest.requester_id.in_(chunk), ContactRequest.target_id.in_(chunk))
+            ).all()
+            for request_id, requester_id, target_id, status, created_at, responded_at in rows:
+                edge = Edge(request_id, requester_id, status, created_at, responded_at)
+                for user_id, other_id in ((requester_id, target_id), (target_id, requester_id)):
+                    edges = loaded.get(user_id)
+                    if edges is not None and _is_newer(edge, edges.get(other_id)):
+                        edges[other_id] = edge
+            with self._lock:
+                for user_id, edges in loaded.items():
+                    self._store(user_id, edges)
+            result.update(loaded)
+
+        return result
+
+    def adjacency(self, user_id):
+        """取得單一使用者的鄰接表"""
+        return self.adjacency_many([user_id])[user_id]
+
+    # ----------------------------------------
+    # 查詢
+    # ----------------------------------------
+    def edge(self, user_id, other_id):
+        """兩位使用者間最新一筆申請，沒有則回傳 None"""
+        return self.adjacency(user_id).get(other_id)
+
+    def contacts(self, user_id):
+        """
+        已建立聯絡的使用者，依建立聯絡時間新到舊排序
+
+        Returns:
+            list: [(對方 ID, Edge), ...]
+        """
+        accepted = [(other_id, edge) for other_id, edge in self.adjacency(user_id).items()
+                    if edge.status == 'accepted']
+        accepted.sort(key=_connected_sort_key, reverse=True)
+        return accepted
+
+    def contact_ids(self, user_id):
+        return {other_id for other_id, edge in self.adjacency(user_id).items() if edge.status == 'accepted'}
+
+    def mutual_contacts(self, user_id, other_id):
+        """共同聯絡人 ID（排序後）"""
+        adjacency = self.adjacency_many([user_id, other_id])
+        mine = {uid for uid, edge in adjacency[user_id].items() if edge.status == 'accepted'}
+        theirs = {uid for uid, edge in adjacency[other_id].items() if edge.status == 'accepted'}
+        return sorted(mine & theirs)
+
+    def second_degree(self, user_id, limit=20, max_fanout=MAX_FANOUT):
+        """
+        二度人脈：聯絡人的聯絡人（排除自己與已是聯絡人者）
+
+        Args:
+            limit: 回傳筆數上限
+            max_fanout: 最多展開的聯絡人數
+
+        Returns:
+            list: [(使用者 ID, 共同聯絡人數), ...]，依共同聯絡人數多到少排序
+        """
+        direct = [other_id for other_id, _ in self.contacts(user_id)][:max_fanout]
+        excluded = set(self.adjacency(user_id)) | {user_id}
+
+        counts = {}
+        for edges in self.adjacency_many(direct).values():
+            for candidate, edge in edges.items():
+                if edge.status == 'accepted' and candidate not in excluded:
+                    counts[candidate] = counts.get(candidate, 0) + 1
+
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    # ----------------------------------------
+    # 更新
+    # ----------------------------------------
+    def apply(self, edge, requester_id, target_id):
+        """寫入一筆申請到兩端已載入的鄰接表"""
+        with self._lock:
+            for user_id, other_id in ((requester_id, target_id), (target_id, requester_id)):
+                edges = self._get_cached(user_id)
+                if edges is not None and _is_newer(edge, edges.get(other_id)):
+                    edges[other_id] = edge
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._nodes.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._nodes.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {'users': len(self._nodes), 'max_users': self.max_users, 'ttl': self.ttl}
+
+
+contact_graph = ContactGraph()
+
+
+def load_users(user_ids, active_only=True):
+    """
+    一次載入多位使用者與個人檔案
+
+    Args:
+        active_only: 只載入 active 使用者（聯絡人清單沿用原本的行為，列出所有已接受的聯絡人）
+
+    Returns:
+        dict: user_id -> User
+    """
+    if not user_ids:
+        return {}
+    query = User.query.options(joinedload(User.profile)).filter(User.id.in_(list(user_ids)))
+    if active_only:
+        query = query.filter(User.status == 'active')
+    return {user.id: user for user in query.all()}
+
+
+def user_summary(user):
+    """系友基本資料（聯絡人清單、共同聯絡人、二度人脈、推薦共用）"""
+    profile = user.profile
+    return {
+        'id': user.id,
+        'email': user.email,
+        'full_name': profile.full_name if profile else None,
+        'display_name': profile.display_name if profile else None,
+        'avatar_url': profile.avatar_url if profile else None,
+        'current_company': profile.current_company if profile else None,
+        'current_position': profile.current_position if profile else None,
+        'graduation_year': profile.graduation_year if profile else None,
+        'bio': profile.bio if profile else None,
+    }
+
+
+# ========================================
+# Session hooks：commit 後更新鄰接表
+# ========================================
+def _pending_requests(session):
+    return session.info.setdefault('contact_graph_pending', [])
+
+
+def _collect_flushed_requests(session, flush_context):
+    pending = _pending_requests(session)
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ContactRequest):
+            pending.append(('apply', obj.requester_id, obj.target_id, Edge(
+                obj.id, obj.requester_id, obj.status, obj.created_at, obj.responded_at
+            )))
+    for obj in session.deleted:
+        if isinstance(obj, ContactRequest):
+            pending.append(('invalidate', obj.requester_id, obj.target_id, None))
+
+
+def _apply_committed_requests(session):
+    pending = session.info.pop('contact_graph_pending', None)
+    for action, requester_id, target_id, edge in pending or ():
+        if action == 'apply':
+            contact_graph.apply(edge, requester_id, target_id)
+        else:
+            contact_graph.invalidate(requester_id, target_id)
+
+
+def _discard_pending_requests(session, previous_transaction):
+    session.info.pop('contact_graph_pending', None)
@@ -0,0 +1,200 @@
+"""
+總筆數計算策略模組
+分頁列表的 COUNT 常是整個請求中最貴的查詢，端點可宣告接受的計算方式：
+
+- exact：每次執行 COUNT
+- cached：依正規化後的查詢（SQL + 參數）快取，相依資源版本變動即失效
+- estimated：PostgreSQL 以 pg_class.reltuples / EXPLAIN 估計列數，
+  SQLite 以 sqlite_stat1（需先 ANALYZE）估計未篩選資料表的筆數；
+  無法估計或估計值很小時退回 cached / exact
+
+用戶端可用 ?count= 在端點接受的方式中選擇，預設為端點宣告的第一種。
+回應以 total_exact 標示總數是否為精確值。
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import has_request_context, request
+from sqlalchemy import text
+
+from src.models_v2 import db
+from src.utils.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+EXACT = 'exact'
+CACHED = 'cached'
+ESTIMATED = 'estimated'
+COUNT_STRATEGIES = (EXACT, CACHED, ESTIMATED)
+
+DEFAULT_COUNT_CACHE_TTL = 300
+DEFAULT_COUNT_CACHE_ENTRIES = 4096
+
+# 估計值低於此數時直接精確計算（小結果集 COUNT 很便宜，估計誤差比例卻很大）
+ESTIMATE_EXACT_THRESHOLD = 1000
+
+
+# ========================================
+# 計數快取
+# ========================================
+class CountCache:
+    """行程內計數快取（鍵已包含資源版本號，版本一變自然失效）"""
+
+    def __init__(self, ttl=DEFAULT_COUNT_CACHE_TTL, max_entries=DEFAULT_COUNT_CACHE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+# ========================================
+# 計算方式
+# ========================================
+def _count_query(query):
+    """去掉排序與 eager loading 的計數用查詢"""
+    return query.enable_eagerloads(False).order_by(None)
+
+
+def exact_count(query):
+    """精確 COUNT"""
+    return _count_query(query).count()
+
+
+def query_cache_key(query, resources=()):
+    """由編譯後的 SQL、參數與資源版本號組成快取鍵"""
+    compiled = _count_query(query).statement.compile(dialect=db.engine.dialect)
+    params = json.dumps(sorted(compiled.params.items()), default=str, ensure_ascii=False)
+    versions = response_cache.get_versions(list(resources)) if resources else []
+    raw = f'{compiled}|{params}|{",".join(map(str, versions))}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def cached_count(query, resources):
+    """快取的 COUNT，資源版本變動後重新計算"""
+    key = query_cache_key(query, resources)
+    total = count_cache.get(key)
+    if total is None:
+        total = exact_count(query)
+        count_cache.set(key, total)
+    return total
+
+
+def estimate_count(query):
+    """
+    估計筆數，無法估計時回傳 None
+
+    PostgreSQL：未篩選時讀 pg_class.reltuples，有篩選時讀 EXPLAIN 的 Plan Rows。
+    SQLite：只支援未篩選的查詢，讀 sqlite_stat1。
+    """
+    statement = _count_query(query).statement
+    dialect = db.engine.dialect.name
+    table = query.column_descriptions[0]['entity'].__tablename__
+    unfiltered = statement.whereclause is None and len(statement.get_final_froms()) == 1
+
+    try:
+        if dialect == 'postgresql':
+            if unfiltered:
+                rows = db.session.execute(
+                    text('SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)'),
+                    {'table': table}
+                ).scalar()
+            else:
+                compiled = statement.compile(dialect=db.engine.dialect)
+                plan = db.session.connection().exec_driver_sql(
+                    f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+                ).scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                rows = plan[0]['Plan']['Plan Rows']
+            # reltuples 為 -1 表示從未 ANALYZE
+            return int(rows) if rows is not None and rows >= 0 else None
+
+        if dialect == 'sqlite' and unfiltered:
+            stat = db.session.execute(
+                text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1'),
+                {'table': table}
+            ).scalar()
+            return int(stat.split()[0]) if stat else None
+    except Exception as e:
+        # sqlite_stat1 不存在（尚未 ANALYZE）等情況
+        logger.debug(f"Count estimate unavailable for {table}: {str(e)}")
+    return None
+
+
+def count_total(query, accept=(EXACT,), resources=()):
+    """
+    依端點接受的方式計算總數
+
+    Args:
+        query: 已套用篩選條件的查詢
+        accept: 端點接受的計算方式，第一個為預設
+        resources: cached 模式使用的快取資源標籤
+
+    Returns:
+        (total, exact): 總數與是否為精確值
+    """
+    strategy = request.args.get('count') if has_request_context() else None
+    if strategy not in accept:
+        strategy = accept[0]
+
+    if strategy == ESTIMATED:
+        estimate = estimate_count(query)
+        if estimate is not None and estimate >= ESTIMATE_EXACT_THRESHOLD:
+            return estimate, False
+        strategy = CACHED if resources else EXACT
+
+    if strategy == CACHED and resources:
+        return cached_count(query, resources), True
+    return exact_count(query), True
+
+
+def paginate(query, page, per_page, accept=(EXACT,), resources=(), count_query=None):
+    """
+    page / per_page 分頁，總數依計算策略取得
+
+    最後一頁（筆數不足一頁）可直接推得精確總數，不需另外 COUNT。
+
+    Args:
+        query: 已排序、已套用 eager loading 的查詢
+        count_query: 計數用查詢（預設為 query）
+
+    Returns:
+        Flask-SQLAlchemy Pagination，另加上 total_exact 屬性
+    """
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    if pagination.items and len(pagination.items) < pagination.per_page:
+        total, exact = (pagination.page - 1) * pagination.per_page + len(pagination.items), True
+    else:
+        total, exact = count_total(count_query if count_query is not None else query, accept, resources)
+    pagination.total = total
+    pagination.total_exact = exact
+    return pagination
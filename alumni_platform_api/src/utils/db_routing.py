@@ -0,0 +1,343 @@
+"""
+讀取副本路由
+設定 DATABASE_REPLICA_URLS 時，db.session 依請求性質在主庫與讀取副本之間選擇 engine：
+
+- 寫入（flush、INSERT / UPDATE / DELETE、SELECT ... FOR UPDATE）一律走主庫，同一交易寫入後的讀取也留在主庫
+- GET / HEAD 請求與以 read_only() 標記的路徑讀取副本；同一交易固定使用同一個副本，讀到一致的快照
+- 讀自己的寫入：commit 過寫入的請求剩餘部分走主庫；同一個用戶端（Authorization 標頭或
+  db_primary_until cookie）在 read_your_writes_seconds 內的讀取也走主庫，不會讀到副本尚未同步的舊資料
+- 背景排程、CLI、Socket.IO 事件與直接取用 db.session.connection() 的程式預設走主庫，需要時以 read_only() 標記
+- 健康檢查：排程定期對每個副本 SELECT 1（PostgreSQL 另檢查複寫延遲），執行中發生連線錯誤也立即標記為
+  不健康；沒有健康的副本時退回主庫
+
+未設定副本時所有讀寫照舊走主庫，行為與單一 engine 相同。
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+PRIMARY_COOKIE = 'db_primary_until'
+
+_READ_SQL = re.compile(r'\s*(?:SELECT|EXPLAIN)\b', re.IGNORECASE)
+_forced_route = ContextVar('db_forced_route', default=None)
+
+# 副本上已套用主庫所有交易時延遲為 0；否則為最後一筆重播交易至今的秒數
+_REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+# ========================================
+# 路由標記
+# ========================================
+@contextmanager
+def read_only():
+    """
+    標記區塊只讀取，可走副本（也可作為 view 裝飾器：@read_only()）
+
+    用於以 POST 傳遞條件的查詢，或背景工作中只讀取的部分；讀自己的寫入規則仍然適用。
+    """
+    token = _forced_route.set('replica')
+    try:
+        yield
+    finally:
+        _forced_route.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """區塊內的讀取一律走主庫（例如讀取後據以寫入，或 GET 請求中需要最新資料的檢查）"""
+    token = _forced_route.set('primary')
+    try:
+        yield
+    finally:
+        _forced_route.reset(token)
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    if getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None:
+        return True
+    if isinstance(clause, TextClause):
+        return not _READ_SQL.match(clause.text)
+    return False
+
+
+def _client_key():
+    authorization = request.headers.get('Authorization')
+    return hashlib.sha1(authorization.encode()).hexdigest() if authorization else None
+
+
+# ========================================
+# 副本與路由器
+# ========================================
+class Replica:
+    """單一讀取副本的 engine 與健康狀態"""
+
+    __slots__ = ('name', 'engine', 'healthy', 'lag_seconds', 'last_error', 'checked_at', 'transactions')
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds = None
+        self.last_error = None
+        self.checked_at = None
+        self.transactions = 0
+
+    def update(self, healthy, lag_seconds=None, error=None):
+        """記錄健康檢查結果（狀態改變時寫入 log）"""
+        if healthy != self.healthy:
+            if healthy:
+                logger.info(f"Read replica {self.name} is healthy again")
+            else:
+                logger.warning(f"Read replica {self.name} marked unhealthy: {error}")
+        self.healthy = healthy
+        self.lag_seconds = lag_seconds
+        self.last_error = error
+        self.checked_at = datetime.utcnow()
+
+    def on_error(self, context):
+        """engine 'handle_error' 事件：連線錯誤時立即停用，等下一次健康檢查恢復"""
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.update(False, self.lag_seconds, str(context.original_exception))
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'name': self.name,
+            'healthy': self.healthy,
+            'lag_seconds': self.lag_seconds,
+            'last_error': self.last_error,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None,
+            'transactions': self.transactions,
+        }
+
+
+class ReplicaRouter:
+    """讀取副本的選擇、讀自己的寫入記錄與健康檢查"""
+
+    def __init__(self, read_your_writes_seconds=5.0, max_lag_seconds=30.0, max_tracked_clients=10000):
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.max_tracked_clients = max_tracked_clients
+        self.replicas = []
+        self.fallbacks = 0
+        self._next = 0
+        self._recent_writers = {}
+        self._lock = threading.Lock()
+
+    # ----------------------------------------
+    # 安裝
+    # ----------------------------------------
+    def init_app(self, app):
+        """依 DATABASE_REPLICA_URLS 建立副本 engine，並註冊讀自己的寫入用的 request hook"""
+        self.configure(app.config.get('DATABASE_REPLICA_URLS') or [],
+                       app.config.get('SQLALCHEMY_ENGINE_OPTIONS'))
+
+        @app.before_request
+        def reset_primary_window():
+            g.pop('db_primary_until', None)
+
+        @app.after_request
+        def set_primary_cookie(response):
+            until = g.get('db_primary_until')
+            if until is not None and self.replicas:
+                response.set_cookie(PRIMARY_COOKIE, f'{until:.3f}', max_age=int(self.read_your_writes_seconds) + 1,
+                                    httponly=True, samesite='Lax', secure=request.is_secure)
+            return response
+
+    def configure(self, urls, engine_options=None):
+        """
+        重新建立副本 engine（舊的 engine 會被釋放）
+
+        Args:
+            urls: 副本連線字串清單；空清單表示停用副本
+            engine_options: PostgreSQL 等副本沿用主庫的 engine 參數；SQLite 使用 sqlite_engine_options()
+        """
+        from src.config.database import configure_sqlite_engine, sqlite_engine_options
+        from src.utils.pool_monitor import pool_monitor
+
+        replicas = []
+        for url in urls:
+            url = make_url(url)
+            if url.get_backend_name() == 'sqlite':
+                options = sqlite_engine_options() if ':memory:' not in str(url) else {}
+            else:
+                options = dict(engine_options or {})
+            engine = create_engine(url, **options)
+            configure_sqlite_engine(engine)
+            replica = Replica(url.render_as_string(hide_password=True), engine)
+            event.listen(engine, 'handle_error', replica.on_error)
+            replicas.append(replica)
+
+        with self._lock:
+            previous, self.replicas = self.replicas, replicas
+            self._next = 0
+            self.fallbacks = 0
+            self._recent_writers.clear()
+        for replica in previous:
+            pool_monitor.unregister(f'replica:{replica.name}')
+            replica.engine.dispose()
+        for replica in replicas:
+            pool_monitor.register(f'replica:{replica.name}', replica.engine)
+
+    # ----------------------------------------
+    # 路由
+    # ----------------------------------------
+    def wants_replica(self):
+        """目前的讀取是否可以走副本"""
+        forced = _forced_route.get()
+        if forced == 'primary':
+            return False
+        if not has_request_context():
+            return forced == 'replica'
+        if 'db_primary_until' in g or self.in_write_window():
+            return False
+        if forced == 'replica':
+            return True
+        # Socket.IO 事件共用連線握手時的 GET 請求，需另外排除
+        return request.method in READ_METHODS and getattr(request, 'sid', None) is None
+
+    def choose(self):
+        """輪流選擇健康的副本；沒有健康的副本時回傳 None（由主庫處理）"""
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                self.fallbacks += 1
+                return None
+            replica = healthy[self._next % len(healthy)]
+            self._next += 1
+            replica.transactions += 1
+            return replica
+
+    # ----------------------------------------
+    # 讀自己的寫入
+    # ----------------------------------------
+    def record_write(self):
+        """請求中 commit 了寫入：本請求剩餘部分與此用戶端接下來一段時間的讀取走主庫"""
+        if not self.replicas or not has_request_context():
+            return
+        until = time.time() + self.read_your_writes_seconds
+        g.db_primary_until = until
+        key = _client_key()
+        if key is None:
+            return
+        with self._lock:
+            self._recent_writers.pop(key, None)
+            self._recent_writers[key] = until
+            if len(self._recent_writers) > self.max_tracked_clients:
+                now = time.time()
+                for stale in [k for k, v in self._recent_writers.items() if v <= now]:
+                    del self._recent_writers[stale]
+                while len(self._recent_writers) > self.max_tracked_clients:
+                    del self._recent_writers[next(iter(self._recent_writers))]
+
+    def in_write_window(self):
+        """此用戶端最近是否寫入過（cookie 跨 worker 有效，Authorization 標頭只在本 worker 內記錄）"""
+        now = time.time()
+        try:
+            if float(request.cookies.get(PRIMARY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        key = _client_key()
+        return key is not None and self._recent_writers.get(key, 0) > now
+
+    # ----------------------------------------
+    # 健康檢查
+    # ----------------------------------------
+    def check_health(self):
+        """
+        對每個副本執行健康檢查（排程工作），複寫延遲超過 max_lag_seconds 視為不健康
+
+        Returns:
+            dict: {'healthy': 數量, 'unhealthy': 數量}
+        """
+        for replica in list(self.replicas):
+            try:
+                with replica.engine.connect() as connection:
+                    if connection.dialect.name == 'postgresql':
+                        lag = float(connection.execute(_REPLICATION_LAG_SQL).scalar() or 0)
+                    else:
+                        connection.execute(text('SELECT 1'))
+                        lag = 0.0
+                error = f'replication lag {lag:.1f}s' if lag > self.max_lag_seconds else None
+            except Exception as e:
+                lag, error = None, str(e)
+            replica.update(error is None, lag, error)
+
+        healthy = sum(1 for replica in self.replicas if replica.healthy)
+        return {'healthy': healthy, 'unhealthy': len(self.replicas) - healthy}
+
+    def stats(self):
+        """副本狀態與路由統計"""
+        with self._lock:
+            return {
+                'replicas': [replica.to_dict() for replica in self.replicas],
+                'read_your_writes_seconds': self.read_your_writes_seconds,
+                'max_lag_seconds': self.max_lag_seconds,
+                'fallbacks': self.fallbacks,
+                'tracked_clients': len(self._recent_writers),
+            }
+
+
+replica_router = ReplicaRouter()
+
+
+# ========================================
+# Session
+# ========================================
+class RoutingSession(Session):
+    """依 replica_router 在主庫與讀取副本之間選擇 engine 的 Session"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not replica_router.replicas or primary is not self._db.engine:
+            return primary
+        if self._flushing or _is_write(clause):
+            self.info['db_wrote'] = True
+            return primary
+        if self.info.get('db_wrote') or (mapper is None and clause is None):
+            return primary
+
+        replica = self.info.get('db_replica')
+        if replica is None or _forced_route.get() == 'primary':
+            if not replica_router.wants_replica():
+                return primary
+            replica = replica_router.choose()
+            if replica is None:
+                return primary
+            self.info['db_replica'] = replica
+        return replica.engine
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_committed_write(session):
+    if session.info.get('db_wrote'):
+        replica_router.record_write()
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_transaction_route(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('db_wrote', None)
+        session.info.pop('db_replica', None)
@@ -0,0 +1,284 @@
+"""
+系友通訊錄讀取模型維護與查詢
+- 寫入同步：User / UserProfile flush 後，在同一個交易內重建受影響使用者的通訊錄項目
+- 查詢：單一資料表、有索引的篩選；關鍵字走 search_text 的全文索引
+  （SQLite FTS5 / PostgreSQL tsvector GIN），多個關鍵字須全部出現（不同欄位亦可）
+- 分詞：英數字連續為一個詞（前綴比對），中文等其他文字每個字一個詞，
+  多字的中文關鍵字以相鄰字的片語比對，等同子字串搜尋且可由索引處理
+- Facet：依畢業年份、屆數、公司統計人數，依 users 資源版本快取，資料異動後重算
+"""
+import logging
+import re
+import threading
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import DateTime, and_, delete, event, false, func, insert, literal, literal_column, select, text, true
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import column as sql_column, table as sql_table
+
+from src.models_v2 import db, DirectoryEntry, User, UserProfile
+from src.models_v2.directory import SEARCH_FTS_TABLE, SEARCH_GIN_INDEX, SEARCH_INDEX_DDL
+from src.utils.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# 每次重建的使用者數上限（避免 IN 清單過長）
+REFRESH_CHUNK_SIZE = 500
+
+# 每個 facet 最多回傳的值數
+FACET_LIMIT = 20
+
+FACET_COLUMNS = {
+    'graduation_year': DirectoryEntry.graduation_year,
+    'class_year': DirectoryEntry.class_year,
+    'company': DirectoryEntry.current_company,
+}
+
+SEARCH_FIELDS = ('full_name', 'display_name', 'current_company', 'current_position')
+
+_search_fts = sql_table(SEARCH_FTS_TABLE, sql_column('rowid'), sql_column('search_text'))
+_ts_config = literal_column("'simple'")
+_token = re.compile(r'[a-z0-9]+|[^\x00-\x7f]')
+
+_hooks_installed = False
+_facet_lock = threading.Lock()
+_facet_cache = {}
+
+
+# ========================================
+# 分詞
+# ========================================
+def search_tokens(value):
+    """英數字連續為一個詞，其他文字每個字一個詞，標點與空白略過（文件與關鍵字使用同一分詞）"""
+    if not value:
+        return []
+    return [token for token in _token.findall(value.lower()) if token.isalnum()]
+
+
+def search_document(values):
+    """通訊錄項目的 search_text"""
+    return ' '.join(token for field in SEARCH_FIELDS for token in search_tokens(values[field]))
+
+
+# ========================================
+# 同步
+# ========================================
+def _directory_select(now):
+    """由 users_v2 LEFT JOIN user_profiles_v2 產生通訊錄項目欄位（search_text 另以 search_document 產生）"""
+    has_profile = UserProfile.id.isnot(None)
+    columns = {
+        'id': User.id,
+        'email': User.email,
+        'role': User.role,
+        'status': User.status,
+        'joined_at': User.created_at,
+        'last_login_at': User.last_login_at,
+        'has_profile': has_profile,
+        'full_name': UserProfile.full_name,
+        'display_name': UserProfile.display_name,
+        'avatar_url': UserProfile.avatar_url,
+        'graduation_year': UserProfile.graduation_year,
+        'class_year': UserProfile.class_year,
+        'major': UserProfile.major,
+        'degree': UserProfile.degree,
+        'current_company': UserProfile.current_company,
+        'current_position': UserProfile.current_position,
+        'current_location': UserProfile.current_location,
+        'bio': UserProfile.bio,
+        'linkedin_url': UserProfile.linkedin_url,
+        'github_url': UserProfile.github_url,
+        'personal_website': UserProfile.personal_website,
+        'show_email': func.coalesce(UserProfile.show_email, true()),
+        'show_phone': func.coalesce(UserProfile.show_phone, False),
+        # 電話只在使用者公開時寫入讀取模型
+        'phone': db.case((UserProfile.show_phone == true(), UserProfile.phone), else_=None),
+        'updated_at': literal(now, DateTime),
+    }
+    return select(*[column.label(name) for name, column in columns.items()])\
+        .select_from(User).outerjoin(UserProfile, UserProfile.user_id == User.id)
+
+
+def _directory_rows(connection, statement):
+    rows = [dict(row) for row in connection.execute(statement).mappings()]
+    for row in rows:
+        row['search_text'] = search_document(row)
+    return rows
+
+
+def refresh_directory_entries(connection, user_ids):
+    """重建指定使用者的通訊錄項目（不 commit，跟隨呼叫端交易；全文索引由資料庫隨寫入同步）"""
+    user_ids = sorted(user_ids)
+    table = DirectoryEntry.__table__
+    statement = _directory_select(datetime.utcnow())
+
+    for start in range(0, len(user_ids), REFRESH_CHUNK_SIZE):
+        chunk = user_ids[start:start + REFRESH_CHUNK_SIZE]
+        rows = _directory_rows(connection, statement.where(User.id.in_(chunk)))
+        connection.execute(delete(table).where(table.c.id.in_(chunk)))
+        if rows:
+            connection.execute(insert(table), rows)
+
+
+def rebuild_directory():
+    """
+    全量重建通訊錄讀取模型
+
+    Returns:
+        int: 項目數
+    """
+    table = DirectoryEntry.__table__
+    try:
+        connection = db.session.connection()
+        rows = _directory_rows(connection, _directory_select(datetime.utcnow()))
+        connection.execute(delete(table))
+        for start in range(0, len(rows), REFRESH_CHUNK_SIZE):
+            connection.execute(insert(table), rows[start:start + REFRESH_CHUNK_SIZE])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows)
+
+
+def ensure_search_index():
+    """
+    建立 search_text 的全文索引（db.create_all 不會替既有資料表補上）
+
+    Returns:
+        bool: 是否新建立（既有項目的 search_text 需全量重建成分詞格式）
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        exists = db.session.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                                    {'name': SEARCH_FTS_TABLE}).first() is not None
+    elif dialect == 'postgresql':
+        exists = db.session.execute(text("SELECT to_regclass(:name)"), {'name': SEARCH_GIN_INDEX}).scalar() is not None
+    else:
+        return False
+    if exists:
+        return False
+
+    for statement in SEARCH_INDEX_DDL[dialect]:
+        db.session.execute(text(statement))
+    db.session.commit()
+    logger.info(f"Created directory search index on {dialect}")
+    return True
+
+
+def ensure_directory():
+    """讀取模型與使用者數不一致、或全文索引剛建立時（例如新部署）全量重建"""
+    if ensure_search_index() or DirectoryEntry.query.count() != User.query.count():
+        count = rebuild_directory()
+        logger.info(f"Rebuilt alumni directory with {count} entries")
+
+
+def _changed_user_ids(session):
+    user_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, User):
+            user_id = obj.id
+        elif isinstance(obj, UserProfile):
+            user_id = obj.user_id
+        else:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if user_id is not None:
+            user_ids.add(user_id)
+    return user_ids
+
+
+def _sync_directory(session, flush_context):
+    user_ids = _changed_user_ids(session)
+    if user_ids:
+        refresh_directory_entries(session.connection(), user_ids)
+
+
+def init_directory(app):
+    """註冊同步用 session hook"""
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Session, 'after_flush', _sync_directory)
+        _hooks_installed = True
+
+
+# ========================================
+# 查詢
+# ========================================
+def directory_query(search=None, graduation_year=None, class_year=None, company=None):
+    """
+    通訊錄查詢（僅 active 使用者）
+
+    Args:
+        search: 關鍵字，以空白分隔，須全部命中（姓名、顯示名稱、公司、職位）；
+                英文與數字為詞首比對，中文為子字串比對
+        graduation_year / class_year / company: 精確篩選（對應 facet 值）
+    """
+    query = DirectoryEntry.query.filter(DirectoryEntry.status == 'active')
+
+    if search and search.split():
+        query = query.filter(_search_filter(search))
+    if graduation_year:
+        query = query.filter(DirectoryEntry.graduation_year == graduation_year)
+    if class_year:
+        query = query.filter(DirectoryEntry.class_year == class_year)
+    if company:
+        query = query.filter(DirectoryEntry.current_company == company)
+
+    return query
+
+
+def _search_filter(search):
+    """關鍵字條件：SQLite 走 FTS5、PostgreSQL 走 tsvector GIN 索引，其他資料庫以分詞文字 LIKE 比對"""
+    terms = [search_tokens(term) for term in search.split()]
+    if not all(terms):
+        # 只有標點等無法分詞的關鍵字不會命中任何人
+        return false()
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        # 每個關鍵字一個片語，最後一個英數詞為前綴："台 積 電" "eng"*
+        match = ' '.join(f'"{" ".join(tokens)}"' + ('*' if tokens[-1].isascii() else '') for tokens in terms)
+        return DirectoryEntry.id.in_(select(_search_fts.c.rowid).where(_search_fts.c.search_text.op('MATCH')(match)))
+    if dialect == 'postgresql':
+        # 與索引相同的運算式才會走 GIN：台 <-> 積 <-> 電 & eng:*
+        query = ' & '.join(' <-> '.join(tokens) + (':*' if tokens[-1].isascii() else '') for tokens in terms)
+        return func.to_tsvector(_ts_config, DirectoryEntry.search_text).op('@@')(func.to_tsquery(_ts_config, query))
+    return and_(*[DirectoryEntry.search_text.like(f'%{" ".join(tokens)}%') for tokens in terms])
+
+
+def _compute_facets():
+    facets = {}
+    for name, column in FACET_COLUMNS.items():
+        rows = db.session.query(column, func.count(DirectoryEntry.id))\
+            .filter(DirectoryEntry.status == 'active', column.isnot(None))\
+            .group_by(column)\
+            .order_by(func.count(DirectoryEntry.id).desc(), column)\
+            .limit(FACET_LIMIT).all()
+        facets[name] = [{'value': value, 'count': count} for value, count in rows]
+    return facets
+
+
+def directory_facets():
+    """
+    通訊錄 facet 統計（畢業年份、屆數、公司）
+
+    依 users 資源版本快取，使用者或個人檔案異動後重新統計。
+    """
+    version = response_cache.get_versions(['users'])[0]
+    with _facet_lock:
+        cached = _facet_cache.get('facets')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+    facets = _compute_facets()
+    with _facet_lock:
+        _facet_cache['facets'] = (version, facets)
+    return facets
+
+
+def clear_facet_cache():
+    """清除 facet 快取"""
+    with _facet_lock:
+        _facet_cache.clear()
@@ -0,0 +1,251 @@
+"""
+活動提醒派送模組
+掃描即將開始的活動，批次發送提醒通知給報名者
+
+流程：
+1. 認領 (claim)：以 INSERT ... SELECT ... ON CONFLICT DO NOTHING 將到期的
+   (活動, 報名者, 提醒時段) 寫入 event_reminder_dispatches_v2，
+   唯一索引保證同一筆提醒只會被一個 worker 認領。
+2. 派送 (dispatch)：分批讀取本次認領的工作，一次寫入整批通知並標記已發送，
+   commit 後再推播 WebSocket。
+3. 認領後若程序中斷，超過租約時間仍未發送的工作會在下次執行時被重新認領。
+"""
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import DateTime, String, literal, select, update
+
+from src.models_v2 import db, Event, EventRegistration, EventReminderDispatch, UserProfile
+from src.models_v2.events import EventStatus, RegistrationStatus
+from src.routes.notification_helper import (
+    build_event_reminder_content,
+    bulk_insert_notifications,
+    emit_bulk_notifications,
+)
+
+logger = logging.getLogger(__name__)
+
+# 提醒時段：(名稱, 活動開始前多久)
+DEFAULT_REMINDER_WINDOWS = (
+    ('24h', timedelta(hours=24)),
+    ('1h', timedelta(hours=1)),
+)
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CLAIM_LEASE = timedelta(minutes=10)
+
+
+def _reminder_bands(windows):
+    """
+    將提醒時段轉為互不重疊的區間 (名稱, 下限, 上限]
+
+    例如 24h / 1h 會得到 ('24h', 1h, 24h] 與 ('1h', 0, 1h]，
+    活動若在開始前 30 分鐘才建立，只會收到 1h 提醒，不會同時補發 24h 提醒。
+    """
+    ordered = sorted(windows, key=lambda item: item[1])
+    bands = []
+    lower = timedelta(0)
+    for name, lead in ordered:
+        bands.append((name, lower, lead))
+        lower = lead
+    return bands
+
+
+def _insert_ignoring_conflicts(table):
+    """依資料庫方言建立 INSERT ... ON CONFLICT DO NOTHING"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f'Unsupported database dialect for reminder claims: {dialect}')
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+def reclaim_stale_reminders(claim_token, now, lease=DEFAULT_CLAIM_LEASE):
+    """重新認領租約已過期但尚未發送的工作（前一次執行中斷時）"""
+    result = db.session.execute(
+        update(EventReminderDispatch)
+        .where(
+            EventReminderDispatch.status == EventReminderDispatch.STATUS_CLAIMED,
+            EventReminderDispatch.claimed_at < now - lease
+        )
+        .values(claim_token=claim_token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def claim_due_reminders(claim_token, now, windows=DEFAULT_REMINDER_WINDOWS):
+    """
+    認領所有到期的提醒
+
+    每個提醒時段一條 INSERT ... SELECT，
+    活動篩選走 idx_event_status_start_time，報名篩選走 idx_event_registration_event_status。
+
+    Returns:
+        int: 新認領的筆數
+    """
+    table = EventReminderDispatch.__table__
+    columns = ['event_id', 'user_id', 'reminder_window', 'status', 'claim_token',
+               'claimed_at', 'created_at', 'updated_at']
+    claimed = 0
+
+    for name, lower, upper in _reminder_bands(windows):
+        due_registrations = (
+            select(
+                EventRegistration.event_id,
+                EventRegistration.user_id,
+                literal(name, String),
+                literal(EventReminderDispatch.STATUS_CLAIMED, String),
+                literal(claim_token, String),
+                literal(now, DateTime),
+                literal(now, DateTime),
+                literal(now, DateTime),
+            )
+            .join(Event, Event.id == EventRegistration.event_id)
+            .where(
+                Event.status == EventStatus.UPCOMING,
+                Event.start_time > now + lower,
+                Event.start_time <= now + upper,
+                EventRegistration.status == RegistrationStatus.REGISTERED
+            )
+            .distinct()
+        )
+        result = db.session.execute(
+            _insert_ignoring_conflicts(table).from_select(columns, due_registrations)
+        )
+        claimed += result.rowcount or 0
+
+    return claimed
+
+
+def _users_without_event_reminders(user_ids):
+    """找出關閉活動提醒的使用者（一次查詢）"""
+    rows = db.session.query(UserProfile.user_id, UserProfile.notification_preferences).filter(
+        UserProfile.user_id.in_(user_ids),
+        UserProfile.notification_preferences.isnot(None)
+    ).all()
+
+    opted_out = set()
+    for user_id, preferences in rows:
+        try:
+            if json.loads(preferences).get('eventReminders', True) is False:
+                opted_out.add(user_id)
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return opted_out
+
+
+def dispatch_claimed_reminders(claim_token, now, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    分批發送本次認領的提醒
+
+    每批：一次查詢工作與活動資料、一次查詢通知偏好、一次 INSERT 通知、
+    一次依主鍵批次 UPDATE 派送紀錄，然後 commit 並推播。
+
+    Returns:
+        tuple[int, int]: (已發送, 已略過)
+    """
+    sent = 0
+    skipped = 0
+    last_id = 0
+
+    while True:
+        rows = (
+            db.session.query(
+                EventReminderDispatch.id,
+                EventReminderDispatch.user_id,
+                EventReminderDispatch.event_id,
+                Event.title,
+                Event.start_time
+            )
+            .join(Event, Event.id == EventReminderDispatch.event_id)
+            .filter(
+                EventReminderDispatch.status == EventReminderDispatch.STATUS_CLAIMED,
+                EventReminderDispatch.claim_token == claim_token,
+                EventReminderDispatch.id > last_id
+            )
+            .order_by(EventReminderDispatch.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        opted_out = _users_without_event_reminders({row.user_id for row in rows})
+        to_send = [row for row in rows if row.user_id not in opted_out]
+        to_skip = [row for row in rows if row.user_id in opted_out]
+
+        try:
+            inserted = bulk_insert_notifications([
+                {'user_id': row.user_id, **build_event_reminder_content(row.title, row.event_id, row.start_time)}
+                for row in to_send
+            ])
+            updates = [
+                {
+                    'id': row.id,
+                    'status': EventReminderDispatch.STATUS_SENT,
+                    'dispatched_at': now,
+                    'notification_id': notification_id
+                }
+                for row, (notification_id, _) in zip(to_send, inserted)
+            ]
+            updates.extend(
+                {'id': row.id, 'status': EventReminderDispatch.STATUS_SKIPPED, 'dispatched_at': now}
+                for row in to_skip
+            )
+            db.session.execute(update(EventReminderDispatch), updates)
+            db.session.commit()
+        except Exception:
+            # 本批維持 claimed 狀態，租約過期後會被重新認領
+            db.session.rollback()
+            raise
+
+        emit_bulk_notifications([notification_id for notification_id, _ in inserted])
+        sent += len(to_send)
+        skipped += len(to_skip)
+
+    return sent, skipped
+
+
+def dispatch_event_reminders(now=None, batch_size=None, windows=None):
+    """
+    排程進入點：認領並發送所有到期的活動提醒
+
+    可安全地重複執行或由多個 worker 同時執行。
+
+    Returns:
+        dict: 本次執行的統計
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config.get('EVENT_REMINDER_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    windows = windows or current_app.config.get('EVENT_REMINDER_WINDOWS', DEFAULT_REMINDER_WINDOWS)
+    claim_token = uuid.uuid4().hex
+
+    try:
+        reclaimed = reclaim_stale_reminders(claim_token, now)
+        claimed = claim_due_reminders(claim_token, now, windows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    sent, skipped = dispatch_claimed_reminders(claim_token, now, batch_size)
+
+    if claimed or reclaimed:
+        logger.info(
+            f"Event reminders dispatched: claimed={claimed}, reclaimed={reclaimed}, "
+            f"sent={sent}, skipped={skipped}"
+        )
+
+    return {
+        'claimed': claimed,
+        'reclaimed': reclaimed,
+        'sent': sent,
+        'skipped': skipped
+    }
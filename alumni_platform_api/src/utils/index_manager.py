@@ -0,0 +1,278 @@
+"""
+資料庫索引管理
+索引一律宣告在模型的 __table_args__（或欄位 index=True），模型本身就是索引清單；
+本模組負責比對宣告與實際 schema，並產生對 SQLite / PostgreSQL 都正確的變更。
+
+- check_indexes：宣告但不存在（missing）、同名但欄位不同（mismatched）、
+  宣告的欄位在實際資料表中不存在（invalid）、存在但未宣告（undeclared，例如舊的手動索引）
+- sync_indexes：直接建立缺少的索引（db.create_all 不會替既有資料表補索引）
+- write_index_migration：把差異寫成 Alembic revision，正式環境照一般 migration 流程部署
+- unused_indexes：PostgreSQL 依 pg_stat_user_indexes 列出從未被使用的索引
+- suggest_indexes：從 SQL 監控擷取的慢語句指紋找出沒有索引可用的 WHERE / ORDER BY 欄位
+"""
+import logging
+import os
+import re
+
+from sqlalchemy import UniqueConstraint, inspect, text
+
+from src.models_v2 import db
+from src.models_v2.directory import SEARCH_GIN_INDEX
+
+logger = logging.getLogger(__name__)
+
+# 以 DDL 事件建立、無法用 Index 宣告的索引（例如運算式 GIN 索引），不列為 undeclared
+EXTERNAL_INDEXES = {SEARCH_GIN_INDEX}
+
+
+# ========================================
+# 宣告與實際 schema
+# ========================================
+def declared_indexes(metadata=None):
+    """
+    模型宣告的索引
+
+    Returns:
+        dict: (table, index_name) -> {'columns': [...], 'unique': bool, 'index': Index}
+    """
+    metadata = metadata or db.metadata
+    declared = {}
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            columns = [column.name for column in index.columns]
+            if not columns or index.name is None:
+                continue
+            declared[(table.name, index.name)] = {'columns': columns, 'unique': bool(index.unique), 'index': index}
+    return declared
+
+
+def live_schema(connection):
+    """
+    實際資料庫中的資料表欄位與索引（不含主鍵與唯一約束自動建立的索引）
+
+    Returns:
+        (dict: table -> set(columns), dict: (table, index_name) -> {'columns', 'unique'})
+    """
+    inspector = inspect(connection)
+    columns, indexes = {}, {}
+    for table in inspector.get_table_names():
+        columns[table] = {column['name'] for column in inspector.get_columns(table)}
+        for index in inspector.get_indexes(table):
+            if index.get('duplicates_constraint') or not index.get('name'):
+                continue
+            indexes[(table, index['name'])] = {
+                'columns': [name for name in index['column_names'] if name is not None],
+                'unique': bool(index.get('unique')),
+            }
+    return columns, indexes
+
+
+def check_indexes(connection=None, metadata=None):
+    """
+    比對模型宣告與實際索引
+
+    只比對模型有宣告的資料表；資料表尚未建立時整張表列入 missing_tables。
+    """
+    connection = connection or db.session.connection()
+    declared = declared_indexes(metadata)
+    columns, live = live_schema(connection)
+    declared_tables = {table for table, _ in declared} | {table.name for table in (metadata or db.metadata).sorted_tables}
+
+    report = {
+        'dialect': connection.dialect.name,
+        'missing_tables': sorted(table for table in declared_tables if table not in columns),
+        'missing': [],
+        'mismatched': [],
+        'invalid': [],
+        'undeclared': [],
+    }
+    for (table, name), spec in declared.items():
+        if table not in columns:
+            continue
+        item = {'table': table, 'name': name, 'columns': spec['columns'], 'unique': spec['unique']}
+        absent = [column for column in spec['columns'] if column not in columns[table]]
+        if absent:
+            report['invalid'].append(dict(item, absent_columns=absent))
+        elif (table, name) not in live:
+            report['missing'].append(item)
+        elif live[(table, name)]['columns'] != spec['columns'] or live[(table, name)]['unique'] != spec['unique']:
+            report['mismatched'].append(dict(item, live_columns=live[(table, name)]['columns']))
+
+    for (table, name), spec in live.items():
+        if table in declared_tables and (table, name) not in declared and name not in EXTERNAL_INDEXES:
+            report['undeclared'].append({'table': table, 'name': name, 'columns': spec['columns'],
+                                         'unique': spec['unique']})
+    return report
+
+
+def sync_indexes(connection=None, drop_undeclared=False, metadata=None):
+    """
+    建立缺少的索引、重建欄位不同的索引，可選擇刪除未宣告的索引
+
+    欄位不存在的宣告（invalid）需先跑 schema migration，這裡只略過並回報。
+
+    Returns:
+        dict: {'created': [...], 'recreated': [...], 'dropped': [...], 'skipped': [...]}
+    """
+    owns_transaction = connection is None
+    connection = connection or db.session.connection()
+    declared = declared_indexes(metadata)
+    report = check_indexes(connection, metadata)
+
+    for item in report['mismatched']:
+        connection.execute(text(f'DROP INDEX {connection.dialect.identifier_preparer.quote(item["name"])}'))
+    for item in report['missing'] + report['mismatched']:
+        declared[(item['table'], item['name'])]['index'].create(connection)
+    dropped = []
+    if drop_undeclared:
+        for item in report['undeclared']:
+            connection.execute(text(f'DROP INDEX {connection.dialect.identifier_preparer.quote(item["name"])}'))
+            dropped.append(item['name'])
+    if owns_transaction:
+        db.session.commit()
+
+    result = {
+        'created': [item['name'] for item in report['missing']],
+        'recreated': [item['name'] for item in report['mismatched']],
+        'dropped': dropped,
+        'skipped': [item['name'] for item in report['invalid']],
+    }
+    if result['created'] or result['recreated'] or dropped:
+        logger.info(f"Index sync: {result}")
+    return result
+
+
+# ========================================
+# Alembic migration
+# ========================================
+def index_migration_ops(report, drop_undeclared=False):
+    """由 check_indexes 的結果產生 Alembic upgrade / downgrade 操作"""
+    from alembic.operations import ops
+
+    upgrade, downgrade = [], []
+    for item in report['mismatched']:
+        upgrade.append(ops.DropIndexOp(item['name'], table_name=item['table']))
+        downgrade.insert(0, ops.CreateIndexOp(item['name'], item['table'], item['live_columns'],
+                                              unique=item['unique']))
+    for item in report['missing'] + report['mismatched']:
+        upgrade.append(ops.CreateIndexOp(item['name'], item['table'], item['columns'],
+                                         unique=item['unique'], if_not_exists=True))
+        downgrade.insert(0, ops.DropIndexOp(item['name'], table_name=item['table'], if_exists=True))
+    if drop_undeclared:
+        for item in report['undeclared']:
+            upgrade.append(ops.DropIndexOp(item['name'], table_name=item['table'], if_exists=True))
+            downgrade.insert(0, ops.CreateIndexOp(item['name'], item['table'], item['columns'],
+                                                  unique=item['unique'], if_not_exists=True))
+    return ops.UpgradeOps(ops=upgrade), ops.DowngradeOps(ops=downgrade)
+
+
+def write_index_migration(config, report, message='sync declared indexes', drop_undeclared=False):
+    """
+    把索引差異寫成 Alembic revision（接在目前的 head 之後）
+
+    Args:
+        config: Alembic Config（Flask-Migrate 的 migrate.get_config()）
+
+    Returns:
+        str | None: 產生的檔案路徑；沒有差異時為 None
+    """
+    from alembic import command
+
+    upgrade, downgrade = index_migration_ops(report, drop_undeclared)
+    if upgrade.is_empty():
+        return None
+
+    script_location = config.get_main_option('script_location')
+    os.makedirs(os.path.join(script_location, 'versions'), exist_ok=True)
+    script = command.revision(config, message=message)
+
+    with open(script.path, encoding='utf-8') as f:
+        content = f.read()
+    content = content.replace('def upgrade():\n    pass', 'def upgrade():\n' + _render(upgrade), 1)
+    content = content.replace('def downgrade():\n    pass', 'def downgrade():\n' + _render(downgrade), 1)
+    with open(script.path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return script.path
+
+
+def _render(operations):
+    from alembic.autogenerate import render_python_code
+
+    code = render_python_code(operations, render_as_batch=False)
+    return '\n'.join(f'    {line.strip()}' for line in code.splitlines() if line.strip() and not line.strip().startswith('#'))
+
+
+# ========================================
+# 使用情形
+# ========================================
+_UNUSED_INDEXES_SQL = text("""
+    SELECT s.relname AS table_name, s.indexrelname AS index_name, s.idx_scan,
+           pg_relation_size(s.indexrelid) AS size_bytes
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+""")
+
+
+def unused_indexes(connection=None):
+    """
+    從統計資料重置以來從未被掃描的索引（僅 PostgreSQL）
+
+    Returns:
+        list | None: 非 PostgreSQL 時為 None
+    """
+    connection = connection or db.session.connection()
+    if connection.dialect.name != 'postgresql':
+        return None
+    return [dict(row._mapping) for row in connection.execute(_UNUSED_INDEXES_SQL)]
+
+
+# 語句指紋中的「資料表.欄位 比較運算子」與 ORDER BY 欄位
+_PREDICATE = re.compile(r'\b(\w+)\.(\w+)\s*(?:=|!=|<>|<=|>=|<|>|\bIN\b|\bLIKE\b|\bIS\b|\bBETWEEN\b)', re.IGNORECASE)
+_ORDER_BY = re.compile(r'\bORDER BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|$)', re.IGNORECASE)
+_QUALIFIED = re.compile(r'\b(\w+)\.(\w+)\b')
+_ALIAS_SUFFIX = re.compile(r'_\d+$')
+
+
+def suggest_indexes(statements, connection=None, metadata=None):
+    """
+    從慢語句指紋推測缺少的索引
+
+    語句中出現在 WHERE 比較或 ORDER BY 的欄位，若沒有任何索引（宣告或實際）以它為第一欄，
+    即列為建議，依相關語句的總耗時排序。只是啟發式提示，加入前請先以 EXPLAIN 確認。
+
+    Args:
+        statements: sql_monitor.slow_statements() / top_statements() 的結果
+    """
+    metadata = metadata or db.metadata
+    tables = metadata.tables
+    leading = {(table, spec['columns'][0]) for (table, _), spec in declared_indexes(metadata).items()}
+    if connection is not None:
+        _, live = live_schema(connection)
+        leading |= {(table, spec['columns'][0]) for (table, _), spec in live.items() if spec['columns']}
+    for table in tables.values():
+        leading |= {(table.name, column.name) for column in table.primary_key.columns}
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and len(constraint.columns):
+                leading.add((table.name, list(constraint.columns)[0].name))
+        leading |= {(table.name, column.name) for column in table.columns if column.unique}
+
+    suggestions = {}
+    for statement in statements:
+        sql = statement['fingerprint']
+        candidates = set(_PREDICATE.findall(sql))
+        for order_by in _ORDER_BY.findall(sql):
+            candidates |= set(_QUALIFIED.findall(order_by))
+        for table, column in candidates:
+            if table not in tables:
+                table = _ALIAS_SUFFIX.sub('', table)
+            if table not in tables or column not in tables[table].columns or (table, column) in leading:
+                continue
+            item = suggestions.setdefault((table, column), {
+                'table': table, 'column': column, 'total_ms': 0.0, 'statements': 0, 'example': sql,
+            })
+            item['total_ms'] += statement['total_ms']
+            item['statements'] += 1
+
+    return sorted(suggestions.values(), key=lambda item: -item['total_ms'])
@@ -0,0 +1,47 @@
+"""
+職缺過期處理模組
+定期將已過期但仍為 ACTIVE 的職缺批次轉為 EXPIRED
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import update
+
+from src.models_v2 import db, Job
+from src.models_v2.jobs import JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_expired_jobs(now=None):
+    """
+    將過期職缺轉為 EXPIRED（單一 UPDATE，走 idx_job_status_expires_at）
+
+    commit 後由回應快取的 session hook 遞增 jobs 版本號，列表快取隨之失效。
+
+    Returns:
+        int: 轉換的職缺數量
+    """
+    now = now or datetime.utcnow()
+
+    try:
+        result = db.session.execute(
+            update(Job)
+            .where(
+                Job.status == JobStatus.ACTIVE,
+                Job.expires_at.isnot(None),
+                Job.expires_at <= now
+            )
+            .values(status=JobStatus.EXPIRED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    expired = result.rowcount or 0
+    if expired:
+        logger.info(f"Expired {expired} jobs")
+
+    return expired
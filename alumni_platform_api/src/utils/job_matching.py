@@ -0,0 +1,592 @@
+"""
+職缺與系友媒合引擎
+把職缺與系友的職涯資料轉成稀疏特徵向量，離線計算兩個方向的前 K 名並寫入 job_matches_v2。
+
+特徵：
+- 技能詞：詞彙表為技能庫名稱（中英文）與工作經歷中出現過的技術；
+  職缺向量取自標題與職位要求中出現的詞，系友向量取自 UserSkill（依熟練度加權）與工作經歷技術
+- 年資：工作經歷月數加總，對照職缺的 experience_years_min / max
+- 學歷：最高學位等級，對照職缺的 education_level
+
+分數 = 0.7 × 技能向量 cosine + 0.2 × 年資符合度 + 0.1 × 學歷符合度，只計算至少共有一個詞的組合。
+稀疏矩陣乘積以倒排索引（詞 -> 系友權重）累加，計算量只與實際共有詞的組合數有關。
+
+更新方式：
+- compute_job_matches：全量重算並整批替換（排程每日一次）
+- refresh_job_matches：職缺或系友職涯資料異動後，只重算受影響的職缺 / 系友（排程每分鐘處理）；
+  另一方只載入與異動對象共有詞的候選（SQL 預篩），詞彙表在技能庫與工作經歷未變動時沿用快取
+- 兩者都先算完再以一個短交易刪除並寫入，計分期間不持有寫入鎖
+"""
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, event, func, inspect, insert, or_
+from sqlalchemy.orm import Session
+
+from src.models_v2 import (
+    db, Education, Job, JobMatch, Skill, User, UserProfile, UserSkill, WorkExperience
+)
+from src.models_v2.jobs import JobStatus
+
+logger = logging.getLogger(__name__)
+
+# 每個職缺保留的系友數、每位系友保留的職缺數
+TOP_K_USERS_PER_JOB = 50
+TOP_K_JOBS_PER_USER = 20
+
+SKILL_WEIGHT = 0.7
+EXPERIENCE_WEIGHT = 0.2
+EDUCATION_WEIGHT = 0.1
+
+INSERT_CHUNK_SIZE = 1000
+
+# 增量重算的候選數超過此值時直接載入全部（IN 清單過長時整表讀取反而較快，也避免超過參數上限）
+CANDIDATE_LOAD_LIMIT = 10000
+
+# 熟練度 -> 技能詞權重（工作經歷中的技術視為 intermediate）
+PROFICIENCY_WEIGHTS = {
+    'beginner': 0.5,
+    'intermediate': 1.0,
+    'advanced': 1.5,
+    'expert': 2.0,
+}
+TECHNOLOGY_WEIGHT = 1.0
+
+# 學位等級，比對時由高到低找第一個出現的關鍵字
+DEGREE_LEVELS = (
+    (3, ('phd', 'doctor', '博士')),
+    (2, ('master', '碩士', '研究所')),
+    (1, ('bachelor', '學士', '大學')),
+    (0, ('diploma', 'associate', '專科', '高中')),
+)
+
+_ascii_term = re.compile(r'^[a-z0-9.+#\- ]+$')
+
+
+def _normalize(value):
+    return ' '.join(str(value).split()).lower() if value else None
+
+
+def degree_level(value):
+    """學位字串轉等級（無法判斷或「不拘」時回傳 None）"""
+    value = _normalize(value)
+    if not value:
+        return None
+    for level, keywords in DEGREE_LEVELS:
+        if any(keyword in value for keyword in keywords):
+            return level
+    return None
+
+
+def _l2_normalize(vector):
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+# ========================================
+# 詞彙表與向量
+# ========================================
+class Vocabulary:
+    """技能詞彙表：在職缺文字中找出出現的詞"""
+
+    def __init__(self, terms):
+        self.terms = sorted({term for term in terms if term})
+        # 英數詞需整詞比對（避免 "c" 命中所有英文字），中文詞直接子字串比對
+        self._patterns = {
+            term: re.compile(r'(?<![a-z0-9])' + re.escape(term) + r'(?![a-z0-9+#])')
+            for term in self.terms if _ascii_term.match(term)
+        }
+
+    def extract(self, text):
+        text = _normalize(text) or ''
+        found = set()
+        for term in self.terms:
+            if term in text:
+                pattern = self._patterns.get(term)
+                if pattern is None or pattern.search(text):
+                    found.add(term)
+        return found
+
+
+def _parse_technologies(raw):
+    if not raw:
+        return []
+    try:
+        values = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    return [_normalize(value) for value in values if isinstance(value, str) and value.strip()]
+
+
+def load_vocabulary():
+    """技能庫名稱與所有工作經歷技術"""
+    terms = set()
+    for name, name_en in db.session.query(Skill.name, Skill.name_en):
+        terms.add(_normalize(name))
+        terms.add(_normalize(name_en))
+    for technologies, in db.session.query(WorkExperience.technologies).filter(WorkExperience.technologies.isnot(None)):
+        terms.update(_parse_technologies(technologies))
+    return Vocabulary(terms)
+
+
+_vocabulary_cache = {'key': None, 'vocabulary': None}
+_vocabulary_lock = threading.Lock()
+
+
+def _vocabulary_key():
+    """技能庫與工作經歷技術的版本（筆數 + 最後更新時間），兩個彙總查詢"""
+    skills = db.session.query(func.count(Skill.id), func.max(Skill.updated_at)).one()
+    experiences = db.session.query(func.count(WorkExperience.id), func.max(WorkExperience.updated_at))\
+        .filter(WorkExperience.technologies.isnot(None)).one()
+    return tuple(skills) + tuple(experiences)
+
+
+def cached_vocabulary():
+    """詞彙表（技能庫與工作經歷未變動時沿用上次載入的結果）"""
+    key = _vocabulary_key()
+    with _vocabulary_lock:
+        if _vocabulary_cache['key'] == key:
+            return _vocabulary_cache['vocabulary']
+    vocabulary = load_vocabulary()
+    with _vocabulary_lock:
+        _vocabulary_cache.update(key=key, vocabulary=vocabulary)
+    return vocabulary
+
+
+def clear_vocabulary_cache():
+    with _vocabulary_lock:
+        _vocabulary_cache.update(key=None, vocabulary=None)
+
+
+def _like_pattern(term):
+    """詞的 LIKE 預篩條件：多個字之間允許任意空白或換行（實際比對由 Vocabulary / _normalize 處理）"""
+    escaped = [word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') for word in term.split()]
+    return '%' + '%'.join(escaped) + '%'
+
+
+def candidate_users(terms):
+    """
+    可能含有這些詞的系友 ID（技能名稱完全相符，或工作經歷技術含有該詞）
+
+    只做預篩，實際向量由 load_user_features 計算；候選過多時回傳 None（載入全部）
+    """
+    terms = sorted(terms)
+    if not terms:
+        return set()
+    user_ids = set()
+    skills = db.session.query(UserSkill.user_id).join(Skill, Skill.id == UserSkill.skill_id)\
+        .filter(or_(func.lower(Skill.name).in_(terms), func.lower(Skill.name_en).in_(terms)))
+    user_ids.update(user_id for user_id, in skills.distinct())
+    experiences = db.session.query(WorkExperience.user_id).filter(
+        or_(*[WorkExperience.technologies.ilike(_like_pattern(term), escape='\\') for term in terms]))
+    user_ids.update(user_id for user_id, in experiences.distinct())
+    return user_ids if len(user_ids) <= CANDIDATE_LOAD_LIMIT else None
+
+
+def candidate_jobs(terms):
+    """
+    標題、職位要求或描述中可能出現這些詞的上架職缺 ID
+
+    只做預篩，實際詞彙由 load_job_features 擷取；候選過多時回傳 None（載入全部）
+    """
+    terms = sorted(terms)
+    if not terms:
+        return set()
+    conditions = [column.ilike(_like_pattern(term), escape='\\')
+                  for term in terms for column in (Job.title, Job.requirements, Job.description)]
+    query = db.session.query(Job.id).filter(Job.status == JobStatus.ACTIVE, Job.not_expired_filter(), or_(*conditions))
+    job_ids = {job_id for job_id, in query}
+    return job_ids if len(job_ids) <= CANDIDATE_LOAD_LIMIT else None
+
+
+def load_user_features(user_ids=None):
+    """
+    系友特徵
+
+    Args:
+        user_ids: 只載入這些使用者（None 為所有 active 使用者）
+
+    Returns:
+        dict: user_id -> (技能向量, 年資, 學歷等級)
+    """
+    query = db.session.query(User.id).filter(User.status == 'active')
+    if user_ids is not None:
+        query = query.filter(User.id.in_(list(user_ids)))
+    active = {user_id for user_id, in query}
+
+    vectors = defaultdict(dict)
+    months = defaultdict(int)
+    levels = {}
+
+    def scoped(q, column):
+        return q.filter(column.in_(list(user_ids))) if user_ids is not None else q
+
+    skills = scoped(db.session.query(UserSkill.user_id, Skill.name, Skill.name_en, UserSkill.proficiency_level)
+                    .join(Skill, Skill.id == UserSkill.skill_id), UserSkill.user_id)
+    for user_id, name, name_en, proficiency in skills:
+        weight = PROFICIENCY_WEIGHTS.get(_normalize(proficiency), 1.0)
+        for term in (_normalize(name), _normalize(name_en)):
+            if term:
+                vectors[user_id][term] = max(vectors[user_id].get(term, 0), weight)
+
+    today = date.today()
+    experiences = scoped(db.session.query(WorkExperience.user_id, WorkExperience.start_date,
+                                          WorkExperience.end_date, WorkExperience.technologies),
+                         WorkExperience.user_id)
+    for user_id, start_date, end_date, technologies in experiences:
+        end = end_date or today
+        if start_date:
+            months[user_id] += max(0, (end.year - start_date.year) * 12 + (end.month - start_date.month))
+        for term in _parse_technologies(technologies):
+            vectors[user_id].setdefault(term, TECHNOLOGY_WEIGHT)
+
+    for user_id, degree in scoped(db.session.query(Education.user_id, Education.degree), Education.user_id):
+        level = degree_level(degree)
+        if level is not None:
+            levels[user_id] = max(levels.get(user_id, level), level)
+    for user_id, degree in scoped(db.session.query(UserProfile.user_id, UserProfile.degree), UserProfile.user_id):
+        level = degree_level(degree)
+        if level is not None:
+            levels[user_id] = max(levels.get(user_id, level), level)
+
+    return {
+        user_id: (_l2_normalize(vectors[user_id]), months[user_id] / 12, levels.get(user_id))
+        for user_id in active if vectors.get(user_id)
+    }
+
+
+def _active_jobs_query(job_ids=None):
+    query = db.session.query(
+        Job.id, Job.title, Job.requirements, Job.description,
+        Job.experience_years_min, Job.experience_years_max, Job.education_level
+    ).filter(Job.status == JobStatus.ACTIVE, Job.not_expired_filter())
+    if job_ids is not None:
+        query = query.filter(Job.id.in_(list(job_ids)))
+    return query
+
+
+def load_job_features(vocabulary, job_ids=None):
+    """
+    職缺特徵（只含上架中且未過期的職缺）
+
+    Returns:
+        dict: job_id -> (技能向量, 最低年資, 最高年資, 學歷等級)
+    """
+    jobs = {}
+    for job_id, title, requirements, description, years_min, years_max, education in _active_jobs_query(job_ids):
+        # 沒有填寫職位要求時才退回職缺描述
+        terms = vocabulary.extract(f'{title} {requirements or description or ""}')
+        if terms:
+            jobs[job_id] = (_l2_normalize({term: 1.0 for term in terms}), years_min, years_max,
+                            degree_level(education))
+    return jobs
+
+
+# ========================================
+# 計分
+# ========================================
+def experience_fit(years, years_min, years_max):
+    """年資符合度 (0~1)：不足時依比例，超過上限過多時略降"""
+    if not years_min:
+        fit = 1.0
+    else:
+        fit = min(years / years_min, 1.0)
+    if years_max and years > years_max + 5:
+        fit *= 0.5
+    return fit
+
+
+def education_fit(level, required):
+    if required is None:
+        return 1.0
+    if level is None:
+        return 0.5
+    return 1.0 if level >= required else 0.0
+
+
+def _invert(vectors):
+    index = defaultdict(list)
+    for key, features in vectors.items():
+        for term, weight in features[0].items():
+            index[term].append((key, weight))
+    return index
+
+
+def score_pairs(job_features, user_features):
+    """
+    計算所有至少共有一個詞的 (職缺, 系友) 分數
+
+    以系友倒排索引做稀疏矩陣乘積：每個職缺只走訪自己詞彙對應的系友清單。
+
+    Yields:
+        (job_id, user_id, score, 相符的詞)
+    """
+    user_index = _invert(user_features)
+    for job_id, (job_vector, years_min, years_max, required) in job_features.items():
+        dots = defaultdict(float)
+        matched = defaultdict(list)
+        for term, job_weight in job_vector.items():
+            for user_id, user_weight in user_index.get(term, ()):
+                dots[user_id] += job_weight * user_weight
+                matched[user_id].append(term)
+
+        for user_id, similarity in dots.items():
+            _, years, level = user_features[user_id]
+            score = (SKILL_WEIGHT * similarity
+                     + EXPERIENCE_WEIGHT * experience_fit(years, years_min, years_max)
+                     + EDUCATION_WEIGHT * education_fit(level, required))
+            yield job_id, user_id, score, sorted(matched[user_id])
+
+
+def _top_k(scored, k):
+    return heapq.nlargest(k, scored, key=lambda item: (item[2], -item[0], -item[1]))
+
+
+def _rows(pairs, now):
+    return [{
+        'job_id': job_id,
+        'user_id': user_id,
+        'score': score,
+        'matched_terms': ','.join(terms)[:500],
+        'computed_at': now,
+    } for job_id, user_id, score, terms in pairs]
+
+
+def _insert(rows):
+    table = JobMatch.__table__
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(table), rows[start:start + INSERT_CHUNK_SIZE])
+
+
+# ========================================
+# 全量計算
+# ========================================
+def compute_job_matches(now=None):
+    """
+    全量重算並整批替換媒合結果
+
+    先算完所有組合，再以一個短交易刪除舊結果並寫入
+
+    Returns:
+        dict: {'jobs': 職缺數, 'users': 系友數, 'matches': 寫入筆數}
+    """
+    now = now or datetime.utcnow()
+    vocabulary = cached_vocabulary()
+    job_features = load_job_features(vocabulary)
+    user_features = load_user_features()
+
+    by_job = defaultdict(list)
+    by_user = defaultdict(list)
+    for pair in score_pairs(job_features, user_features):
+        by_job[pair[0]].append(pair)
+        by_user[pair[1]].append(pair)
+
+    kept = {}
+    for pairs in by_job.values():
+        for pair in _top_k(pairs, TOP_K_USERS_PER_JOB):
+            kept[pair[:2]] = pair
+    for pairs in by_user.values():
+        for pair in _top_k(pairs, TOP_K_JOBS_PER_USER):
+            kept[pair[:2]] = pair
+
+    try:
+        db.session.execute(delete(JobMatch.__table__))
+        _insert(_rows(kept.values(), now))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Computed {len(kept)} job matches for {len(job_features)} jobs")
+    return {'jobs': len(job_features), 'users': len(by_user), 'matches': len(kept)}
+
+
+# ========================================
+# 增量更新
+# ========================================
+def _replaced(job_ids, user_ids):
+    """本次增量重算要替換的媒合列"""
+    return or_(JobMatch.job_id.in_(list(job_ids)), JobMatch.user_id.in_(list(user_ids)))
+
+
+def _current_scores(column, ids, replaced):
+    """各 id 目前保留的筆數與最低分（不含即將替換的列，判斷新分數能否擠進對方的前 K 名）"""
+    if not ids:
+        return {}
+    rows = db.session.query(column, func.count(), func.min(JobMatch.score))\
+        .filter(column.in_(list(ids)), ~replaced).group_by(column).all()
+    return {key: (count, lowest) for key, count, lowest in rows}
+
+
+def _keep_for_other_side(pairs, other_index, column, k, replaced):
+    """對方（職缺或系友）清單未滿 K 筆、或分數高於其目前最低分者也要保留"""
+    stats = _current_scores(column, {pair[other_index] for pair in pairs}, replaced)
+    kept = []
+    for pair in pairs:
+        count, lowest = stats.get(pair[other_index], (0, None))
+        if count < k or pair[2] > lowest:
+            kept.append(pair)
+    return kept
+
+
+def _top_k_by(pairs, index, k):
+    groups = defaultdict(list)
+    for pair in pairs:
+        groups[pair[index]].append(pair)
+    return [pair for group in groups.values() for pair in _top_k(group, k)]
+
+
+def refresh_job_matches(job_ids=(), user_ids=(), now=None):
+    """
+    只重算受影響的職缺與系友
+
+    - 職缺：只載入與這些職缺共有詞的候選系友，保留該職缺前 K 名，以及能擠進系友前 K 名的組合
+    - 系友：只載入可能出現其技能詞的上架職缺，反向同理
+    先算完再以一個短交易刪除這些職缺 / 系友的舊結果並寫入。
+    增量更新不會回補因刪除而少於 K 筆的另一方清單，由每日全量重算修正。
+
+    Returns:
+        dict: {'jobs': 重算的職缺數, 'users': 重算的系友數}
+    """
+    job_ids, user_ids = set(job_ids), set(user_ids)
+    if not job_ids and not user_ids:
+        return {'jobs': 0, 'users': 0}
+
+    now = now or datetime.utcnow()
+    vocabulary = cached_vocabulary()
+    replaced = _replaced(job_ids, user_ids)
+    kept = {}
+
+    if job_ids:
+        job_features = load_job_features(vocabulary, job_ids)
+        terms = {term for features in job_features.values() for term in features[0]}
+        pairs = list(score_pairs(job_features, load_user_features(candidate_users(terms))))
+        for pair in _top_k_by(pairs, 0, TOP_K_USERS_PER_JOB):
+            kept[pair[:2]] = pair
+        for pair in _keep_for_other_side(pairs, 1, JobMatch.user_id, TOP_K_JOBS_PER_USER, replaced):
+            kept[pair[:2]] = pair
+
+    if user_ids:
+        user_features = load_user_features(user_ids)
+        terms = {term for features in user_features.values() for term in features[0]}
+        pairs = list(score_pairs(load_job_features(vocabulary, candidate_jobs(terms)), user_features))
+        for pair in _top_k_by(pairs, 1, TOP_K_JOBS_PER_USER):
+            kept[pair[:2]] = pair
+        for pair in _keep_for_other_side(pairs, 0, JobMatch.job_id, TOP_K_USERS_PER_JOB, replaced):
+            kept[pair[:2]] = pair
+
+    try:
+        db.session.execute(delete(JobMatch.__table__).where(replaced))
+        _insert(_rows(kept.values(), now))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {'jobs': len(job_ids), 'users': len(user_ids)}
+
+
+# ========================================
+# 待重算佇列（session hook 收集，排程處理）
+# ========================================
+_USER_CAREER_MODELS = (UserSkill, WorkExperience, Education, UserProfile)
+
+# 影響媒合結果的職缺欄位（瀏覽數等計數器變動不需重算）
+_JOB_MATCH_FIELDS = ('title', 'requirements', 'description', 'status', 'expires_at',
+                     'experience_years_min', 'experience_years_max', 'education_level')
+# 個人檔案中只有學位影響媒合（其他欄位如頭像、簡介的修改不需重算）
+_PROFILE_MATCH_FIELDS = ('degree',)
+
+
+class MatchRefreshQueue:
+    """行程內待重算的職缺與系友 ID"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.job_ids = set()
+        self.user_ids = set()
+
+    def add(self, job_ids=(), user_ids=()):
+        with self._lock:
+            self.job_ids.update(job_ids)
+            self.user_ids.update(user_ids)
+
+    def drain(self):
+        with self._lock:
+            job_ids, user_ids = self.job_ids, self.user_ids
+            self.job_ids, self.user_ids = set(), set()
+        return job_ids, user_ids
+
+    def clear(self):
+        self.drain()
+
+
+match_refresh_queue = MatchRefreshQueue()
+_hooks_installed = False
+
+
+def _changed(obj, fields):
+    attrs = inspect(obj).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+def _collect_flushed_changes(session, flush_context):
+    pending = session.info.setdefault('job_match_pending', (set(), set()))
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Job):
+            if obj in session.dirty and not _changed(obj, _JOB_MATCH_FIELDS):
+                continue
+            pending[0].add(obj.id)
+        elif isinstance(obj, _USER_CAREER_MODELS) and obj.user_id is not None:
+            if isinstance(obj, UserProfile):
+                if obj in session.dirty and not _changed(obj, _PROFILE_MATCH_FIELDS):
+                    continue
+                if obj in session.new and obj.degree is None:
+                    continue
+            pending[1].add(obj.user_id)
+
+
+def _queue_committed_changes(session):
+    pending = session.info.pop('job_match_pending', None)
+    if pending:
+        match_refresh_queue.add(*pending)
+
+
+def _discard_pending_changes(session, previous_transaction):
+    session.info.pop('job_match_pending', None)
+
+
+def init_job_matching(app):
+    """註冊收集異動用的 session hook"""
+    global _hooks_installed
+    if not _hooks_installed:
+        event.listen(Session, 'after_flush', _collect_flushed_changes)
+        event.listen(Session, 'after_commit', _queue_committed_changes)
+        event.listen(Session, 'after_soft_rollback', _discard_pending_changes)
+        _hooks_installed = True
+
+
+def process_match_refresh_queue():
+    """排程用：處理佇列中的增量重算"""
+    job_ids, user_ids = match_refresh_queue.drain()
+    try:
+        return refresh_job_matches(job_ids, user_ids)
+    except Exception:
+        # 失敗時放回佇列，下次再試
+        match_refresh_queue.add(job_ids, user_ids)
+        raise
+
+
+def refresh_all_job_matches(max_age_seconds=None):
+    """排程用：結果比 max_age_seconds 新時略過全量重算"""
+    if max_age_seconds:
+        latest = db.session.query(func.max(JobMatch.computed_at)).scalar()
+        if latest and latest > datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            return {'skipped': True}
+    return compute_job_matches()
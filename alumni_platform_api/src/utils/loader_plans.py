@@ -0,0 +1,56 @@
+"""
+載入計畫模組
+各列表端點的 eager loading 計畫登記表，消除序列化時的 N+1 lazy load
+
+to_dict / 序列化器讀到的關聯（發布者 → profile、分類、活動）都要列在計畫中：
+- 以序列化器輸出的端點直接使用序列化器宣告的關聯（會隨 ?fields= 縮減）
+- 仍以 to_dict 輸出的端點在此列出關聯路徑
+
+新增列表端點時請一併登記，並在 tests/test_query_budget.py 加上查詢數上限測試。
+"""
+from flask import request
+
+from src.models_v2 import Article, EventRegistration, UserSkill
+from src.utils.serializers import (
+    ModelSerializer, build_loader,
+    job_serializer, event_serializer, bulletin_serializer, conversation_serializer
+)
+
+# 端點名稱 → 序列化器，或 (模型, 關聯路徑)
+LOADER_PLANS = {
+    'jobs_v2.get_jobs': job_serializer,
+    'jobs_v2.get_my_jobs': job_serializer,
+    'events_v2.get_events': event_serializer,
+    'events_v2.get_my_events': event_serializer,
+    'events_v2.get_my_registrations': (EventRegistration, ('event', 'user.profile')),
+    'bulletins_v2.get_bulletins': bulletin_serializer,
+    'bulletins_v2.get_my_bulletins': bulletin_serializer,
+    'messages_v2.get_conversations': conversation_serializer,
+    'cms_v2.get_articles': (Article, ('author.profile', 'category')),
+    'career.get_user_skills': (UserSkill, ('skill',)),
+    'career.get_my_skills': (UserSkill, ('skill',)),
+    'recommendations_v2.get_job_recommendations': job_serializer,
+}
+
+
+def loader_options(fields=None, endpoint=None):
+    """
+    取得端點的 eager loading 選項
+
+    Args:
+        fields: ?fields= 解析結果（僅序列化器端點使用）
+        endpoint: 端點名稱（預設為目前請求的端點）
+
+    Raises:
+        KeyError: 端點未登記載入計畫
+    """
+    plan = LOADER_PLANS[endpoint or request.endpoint]
+    if isinstance(plan, ModelSerializer):
+        return plan.loader_options(fields)
+    model, paths = plan
+    return [build_loader(model, path) for path in paths]
+
+
+def apply_loader_plan(query, fields=None, endpoint=None):
+    """對查詢套用端點的載入計畫（需在 check_not_modified 之後呼叫）"""
+    return query.options(*loader_options(fields, endpoint))
@@ -0,0 +1,168 @@
+"""
+Keyset 分頁模組
+以「上一頁最後一筆的排序鍵 + id」作為游標，取代 OFFSET/LIMIT，
+第 N 頁與第一頁成本相同，且不需要每頁執行 COUNT(*)
+
+- 游標為 itsdangerous 簽章的不透明字串，內容包含端點排序鍵名稱，
+  竄改或拿到其他端點使用都會被拒絕
+- 端點自行選擇是否支援：請求帶 cursor（或 pagination=cursor 取第一頁）時改用 keyset，
+  原本的 page / per_page 模式不變
+- 總筆數為選用：帶 include_total=true 才計算
+"""
+from datetime import datetime
+
+from flask import current_app, request
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, or_
+
+CURSOR_SALT = 'keyset-cursor'
+
+
+class InvalidCursor(ValueError):
+    """游標無法解析、簽章錯誤或不屬於此端點"""
+
+
+class KeysetPage:
+    """keyset 分頁結果"""
+
+    def __init__(self, items, next_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def to_dict(self):
+        """回應中的分頁資訊"""
+        return {
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'per_page': self.per_page
+        }
+
+
+def wants_keyset():
+    """請求是否使用 keyset 分頁"""
+    return 'cursor' in request.args or request.args.get('pagination') == 'cursor'
+
+
+def wants_total():
+    """keyset 模式下是否需要總筆數"""
+    return request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+
+
+# ========================================
+# 游標編碼
+# ========================================
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(signature, values):
+    """將排序鍵值編碼為簽章游標"""
+    return _serializer().dumps({'k': signature, 'v': [_encode_value(value) for value in values]})
+
+
+def decode_cursor(token, signature):
+    """
+    解碼游標
+
+    Raises:
+        InvalidCursor: 簽章錯誤、格式錯誤或排序鍵不符
+    """
+    try:
+        data = _serializer().loads(token)
+        values = [_decode_value(value) for value in data['v']]
+    except (BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidCursor('Invalid cursor')
+    if data.get('k') != signature or len(values) != len(signature):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+# ========================================
+# 分頁查詢
+# ========================================
+def _sort_keys(model, keys):
+    """補上 id 作為最後的排序鍵，確保排序唯一"""
+    keys = [(column, descending) for column, descending in keys]
+    if not any(column is model.id for column, _ in keys):
+        keys.append((model.id, True))
+    return keys
+
+
+def _nullable(column):
+    return any(col.nullable for col in column.property.columns)
+
+
+def _after(keys, values):
+    """
+    「排在游標之後」的條件（NULL 一律排在最後）
+
+    逐欄展開為 (a 在 va 之後) OR (a = va AND 下一欄在之後) ...
+    """
+    condition = None
+    for (column, descending), value in reversed(list(zip(keys, values))):
+        if value is None:
+            # 游標值為 NULL：之後只剩同為 NULL 的資料列
+            beyond = column.is_(None)
+            condition = beyond if condition is None else and_(beyond, condition)
+            continue
+
+        beyond = column < value if descending else column > value
+        parts = [beyond]
+        if _nullable(column):
+            parts.append(column.is_(None))
+        if condition is not None:
+            parts.append(and_(column == value, condition))
+        condition = or_(*parts)
+    return condition
+
+
+def keyset_paginate(query, keys, per_page, cursor=None):
+    """
+    以 keyset 方式取得一頁資料
+
+    Args:
+        query: 已套用篩選條件的查詢（原有排序會被取代）
+        keys: 排序鍵 [(欄位, 是否遞減), ...]，未包含 id 時自動補上
+        per_page: 每頁筆數
+        cursor: 上一頁回傳的 next_cursor
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        InvalidCursor: 游標無效
+    """
+    model = query.column_descriptions[0]['entity']
+    keys = _sort_keys(model, keys)
+    signature = [column.key for column, _ in keys]
+
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, signature)))
+
+    order = [(column.desc() if descending else column.asc()).nullslast() for column, descending in keys]
+    rows = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(signature, [getattr(last, column.key) for column, _ in keys])
+
+    return KeysetPage(rows, next_cursor, per_page)
@@ -1,133 +1,562 @@
 """
 效能監控模組
 用於追蹤應用程式效能指標
+
+請求耗時的記錄流程：
+- 請求結束時只把一筆 tuple 放進行程內佇列（deque.append 本身是執行緒安全的，不需加鎖），
+  請求端只付出微秒等級的成本，不開交易也不寫資料庫
+- 背景 flusher 每隔 flush_interval 秒（或佇列超過 flush_threshold 時提早）取出佇列內容，
+  依「時間窗 × 端點 × 方法 × 狀態碼」彙總後一次批次寫入 performance_metrics_v2
+- 佇列達到 max_queue 時直接丟棄新紀錄並計數（back-pressure），資料庫變慢或無法連線時
+  監控不會拖垮應用程式，也不會無限制佔用記憶體
 """
+import logging
+import threading
 import time
-from functools import wraps
-from flask import request, g
-from src.models_v2 import db, UserActivity
+from collections import deque
 from datetime import datetime
+from functools import wraps
+
+from flask import g, got_request_exception, request
+from sqlalchemy import insert
+
+from src.models_v2 import db, PerformanceMetric
+from src.utils.pool_monitor import pool_monitor
+
+logger = logging.getLogger(__name__)
+
+
+def _request_endpoint():
+    """以路由規則作為端點名稱（路徑參數不同的請求歸為同一端點，避免基數爆炸）"""
+    return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
 
 def track_performance(func):
-    """效能追蹤裝飾器"""
+    """
+    效能追蹤裝飾器
+
+    init_request_metrics 已為所有請求記錄耗時，此裝飾器僅供未安裝 hook 的 app 使用。
+    """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+
         try:
             result = func(*args, **kwargs)
-            execution_time = time.time() - start_time
-            
-            # 記錄效能指標
             log_performance_metric(
-                endpoint=request.path,
+                endpoint=_request_endpoint(),
                 method=request.method,
-                execution_time=execution_time,
+                execution_time=time.perf_counter() - start_time,
                 status_code=200
             )
-            
             return result
         except Exception as e:
-            execution_time = time.time() - start_time
-            
-            # 記錄錯誤
             log_performance_metric(
-                endpoint=request.path,
+                endpoint=_request_endpoint(),
                 method=request.method,
-                execution_time=execution_time,
+                execution_time=time.perf_counter() - start_time,
                 status_code=500,
                 error=str(e)
             )
-            
             raise
-    
+
     return wrapper
 
 
 def log_performance_metric(endpoint, method, execution_time, status_code, error=None):
-    """記錄效能指標"""
-    try:
-        with db.session.begin():
-            # 記錄到 UserActivity（如果有的話）
-            # 或者可以創建專門的 PerformanceMetric 模型
-            if hasattr(g, 'user_id') and g.user_id:
-                activity = UserActivity(
-                    user_id=g.user_id,
-                    activity_type='api_request',
-                    activity_data={
-                        'endpoint': endpoint,
-                        'method': method,
-                        'execution_time': execution_time,
-                        'status_code': status_code,
-                        'error': error
-                    }
-                )
-                db.session.add(activity)
-    except Exception as e:
-        print(f"Failed to log performance metric: {e}")
+    """記錄效能指標（行程內直方圖 + 放入佇列，由背景 flusher 寫入）"""
+    performance_monitor.record_request(endpoint, method, execution_time, status_code)
+    if error is not None:
+        performance_monitor.record_error(endpoint, method, error)
+    metrics_pipeline.record(endpoint, method, status_code, execution_time, error=error is not None)
 
 
-class PerformanceMonitor:
-    """效能監控類"""
-    
+# ========================================
+# 非同步批次寫入
+# ========================================
+class MetricsPipeline:
+    """行程內效能指標佇列與背景 flusher"""
+
+    def __init__(self, max_queue=10000, flush_interval=10.0, flush_threshold=2000, window_seconds=60):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.window_seconds = window_seconds
+
+        self._queue = deque()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._app = None
+
+        # 計數器只供觀察用，多執行緒同時累加時允許少量誤差
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.rows_written = 0
+        self.flush_failures = 0
+
+    # ----------------------------------------
+    # 記錄端（請求執行緒）
+    # ----------------------------------------
+    def record(self, endpoint, method, status_code, execution_time, error=False):
+        """
+        放入一筆請求紀錄；佇列已滿時丟棄
+
+        Returns:
+            bool: 是否成功放入
+        """
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._queue.append((time.time(), endpoint, method, status_code, execution_time, error))
+        self.recorded += 1
+        if len(self._queue) >= self.flush_threshold:
+            self._wake_event.set()
+        return True
+
+    def init_app(self, app):
+        """記住 app，背景 flusher 在其 app context 內寫入"""
+        self._app = app
+
+    # ----------------------------------------
+    # 寫入端（背景執行緒）
+    # ----------------------------------------
+    def drain(self):
+        """取出佇列內目前所有紀錄"""
+        records = []
+        try:
+            for _ in range(len(self._queue)):
+                records.append(self._queue.popleft())
+        except IndexError:
+            pass
+        return records
+
+    def aggregate(self, records):
+        """依時間窗、端點、方法、狀態碼彙總成要寫入的列"""
+        groups = {}
+        for timestamp, endpoint, method, status_code, execution_time, error in records:
+            window = int(timestamp // self.window_seconds) * self.window_seconds
+            key = (window, endpoint[:200], method, status_code)
+            elapsed_ms = execution_time * 1000.0
+            row = groups.get(key)
+            if row is None:
+                groups[key] = row = {
+                    'window_start': datetime.utcfromtimestamp(window),
+                    'endpoint': key[1],
+                    'method': method,
+                    'status_code': status_code,
+                    'count': 0,
+                    'error_count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                }
+            row['count'] += 1
+            row['error_count'] += 1 if error else 0
+            row['total_ms'] += elapsed_ms
+            row['max_ms'] = max(row['max_ms'], elapsed_ms)
+        return list(groups.values())
+
+    def flush(self):
+        """
+        把佇列內容彙總後批次寫入（需在 app context 內呼叫）
+
+        直接使用 engine 連線寫入，不經過 db.session，不會觸發其他模組的 session hook。
+        寫入失敗時該批紀錄計入 dropped，不放回佇列。
+
+        Returns:
+            int: 寫入的列數
+        """
+        with self._flush_lock:
+            records = self.drain()
+            if not records:
+                return 0
+            rows = self.aggregate(records)
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(PerformanceMetric.__table__), rows)
+            except Exception as e:
+                self.flush_failures += 1
+                self.dropped += len(records)
+                logger.error(f"Failed to flush {len(records)} performance metrics: {str(e)}")
+                return 0
+            self.flushed += len(records)
+            self.rows_written += len(rows)
+            return len(rows)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app=None):
+        """啟動背景 flusher（重複呼叫不會啟動第二個）"""
+        if self.running:
+            return
+        self._app = app or self._app
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='metrics-flusher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止背景 flusher，並寫入剩餘紀錄"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        if self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(self.flush_interval)
+            self._wake_event.clear()
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception as e:
+                logger.error(f"Metrics flusher error: {str(e)}")
+
+    def clear(self):
+        """清空佇列與計數器（測試用）"""
+        self._queue.clear()
+        self.recorded = self.dropped = self.flushed = self.rows_written = self.flush_failures = 0
+
+    def stats(self):
+        """佇列與寫入計數"""
+        return {
+            'queued': len(self._queue),
+            'max_queue': self.max_queue,
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'flushed': self.flushed,
+            'rows_written': self.rows_written,
+            'flush_failures': self.flush_failures,
+            'running': self.running,
+        }
+
+
+metrics_pipeline = MetricsPipeline()
+
+
+# ========================================
+# 行程內延遲直方圖
+# ========================================
+class LatencyHistogram:
+    """
+    固定大小的對數分桶直方圖（HDR 風格），以微秒為單位
+
+    每個 2 的次方區間再等分為 2^SUB_BUCKET_BITS 個子桶，任何數值的相對誤差不超過 1/16；
+    1µs ~ 約 134 秒共 384 個桶，記錄為 O(1)，百分位數只需走訪固定數量的桶。
+    """
+    SUB_BUCKET_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    MAX_VALUE = (1 << 27) - 1
+    BUCKET_COUNT = (27 - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
     def __init__(self):
-        self.metrics = {
-            'requests': [],
-            'errors': [],
-            'slow_queries': []
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def bucket_index(cls, value):
+        if value < cls.SUB_BUCKETS:
+            return value
+        exponent = value.bit_length() - 1
+        shift = exponent - cls.SUB_BUCKET_BITS
+        return (shift + 1) * cls.SUB_BUCKETS + (value >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def bucket_upper_bound(cls, index):
+        """桶內可能的最大值"""
+        if index < cls.SUB_BUCKETS:
+            return index
+        shift = index // cls.SUB_BUCKETS - 1
+        lower = (index % cls.SUB_BUCKETS + cls.SUB_BUCKETS) << shift
+        return lower + (1 << shift) - 1
+
+    def record(self, microseconds):
+        value = min(max(int(microseconds), 0), self.MAX_VALUE)
+        self.counts[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative_counts(self, bounds):
+        """
+        不超過各上界的累計筆數（Prometheus histogram 的 le 桶）
+
+        以桶上界判斷，跨越邊界的桶計入較大的 le（誤差同樣在 1/16 以內）。
+
+        Args:
+            bounds: 由小到大的上界（微秒）
+        """
+        result, seen, index = [], 0, 0
+        for bound in bounds:
+            while index < self.BUCKET_COUNT and self.bucket_upper_bound(index) <= bound:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def percentile(self, percent):
+        """第 percent 百分位數（微秒，取桶上界，不超過實際最大值）"""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bucket_upper_bound(index), self.max)
+        return self.max
+
+
+class RateCounter:
+    """最近 window 秒的每秒請求數（環狀計數器，固定記憶體）"""
+
+    __slots__ = ('window', 'counts', 'seconds')
+
+    def __init__(self, window=60):
+        self.window = window
+        self.counts = [0] * window
+        self.seconds = [0] * window
+
+    def record(self, now):
+        second = int(now)
+        slot = second % self.window
+        if self.seconds[slot] != second:
+            self.seconds[slot] = second
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+
+    def rate(self, now):
+        oldest = int(now) - self.window
+        return sum(count for count, second in zip(self.counts, self.seconds) if second > oldest) / self.window
+
+
+class EndpointStats:
+    """單一端點（方法 + 路由規則）的統計"""
+
+    __slots__ = ('histogram', 'errors', 'rate')
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.rate = RateCounter()
+
+    def to_dict(self, now):
+        histogram = self.histogram
+        return {
+            'count': histogram.count,
+            'errors': self.errors,
+            'avg_ms': round(histogram.total / histogram.count / 1000, 3) if histogram.count else 0.0,
+            'p50_ms': histogram.percentile(50) / 1000,
+            'p95_ms': histogram.percentile(95) / 1000,
+            'p99_ms': histogram.percentile(99) / 1000,
+            'max_ms': histogram.max / 1000,
+            'rps_1m': round(self.rate.rate(now), 3),
         }
-    
+
+
+class PerformanceMonitor:
+    """
+    效能監控類
+
+    每個端點一個固定大小的直方圖，最近的慢請求與錯誤只保留在固定長度的環狀緩衝區；
+    端點數量受路由規則限制，記憶體用量與請求數無關。
+    """
+
+    def __init__(self, slow_threshold=1.0, recent_size=100):
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._total = EndpointStats()
+        self.recent_slow_requests = deque(maxlen=recent_size)
+        self.recent_errors = deque(maxlen=recent_size)
+        self.started_at = time.time()
+
     def record_request(self, endpoint, method, execution_time, status_code):
         """記錄請求"""
-        self.metrics['requests'].append({
-            'endpoint': endpoint,
-            'method': method,
-            'execution_time': execution_time,
-            'status_code': status_code,
-            'timestamp': datetime.utcnow()
-        })
-        
-        # 記錄慢查詢（超過 1 秒）
-        if execution_time > 1.0:
-            self.metrics['slow_queries'].append({
+        now = time.time()
+        microseconds = execution_time * 1_000_000
+        is_error = status_code >= 500
+        with self._lock:
+            stats = self._endpoints.get((method, endpoint))
+            if stats is None:
+                stats = self._endpoints[(method, endpoint)] = EndpointStats()
+            for target in (stats, self._total):
+                target.histogram.record(microseconds)
+                target.rate.record(now)
+                if is_error:
+                    target.errors += 1
+
+        # 慢請求（超過 slow_threshold 秒）
+        if execution_time > self.slow_threshold:
+            self.recent_slow_requests.append({
                 'endpoint': endpoint,
                 'method': method,
                 'execution_time': execution_time,
-                'timestamp': datetime.utcnow()
+                'status_code': status_code,
+                'timestamp': datetime.utcnow().isoformat()
             })
-    
+
     def record_error(self, endpoint, method, error):
-        """記錄錯誤"""
-        self.metrics['errors'].append({
+        """記錄錯誤（錯誤數由 record_request 依狀態碼累計，此處只保留最近的錯誤訊息）"""
+        self.recent_errors.append({
             'endpoint': endpoint,
             'method': method,
-            'error': str(error),
-            'timestamp': datetime.utcnow()
+            'error': str(error)[:500],
+            'timestamp': datetime.utcnow().isoformat()
         })
-    
+
+    def endpoint_stats(self):
+        """各端點統計，依請求數由多到少排列"""
+        now = time.time()
+        with self._lock:
+            items = [(method, endpoint, stats.to_dict(now)) for (method, endpoint), stats in self._endpoints.items()]
+        items.sort(key=lambda item: -item[2]['count'])
+        return [dict(method=method, endpoint=endpoint, **stats) for method, endpoint, stats in items]
+
+    def endpoint_histograms(self, bounds):
+        """
+        各端點的累計直方圖
+
+        Args:
+            bounds: 由小到大的上界（秒）
+
+        Returns:
+            list: [(method, endpoint, [各上界的累計筆數], count, total_seconds), ...]
+        """
+        bounds_us = [bound * 1_000_000 for bound in bounds]
+        with self._lock:
+            return [
+                (method, endpoint, stats.histogram.cumulative_counts(bounds_us),
+                 stats.histogram.count, stats.histogram.total / 1_000_000)
+                for (method, endpoint), stats in self._endpoints.items()
+            ]
+
     def get_stats(self):
         """獲取統計資訊"""
-        if not self.metrics['requests']:
-            return {
-                'total_requests': 0,
-                'avg_execution_time': 0,
-                'error_rate': 0,
-                'slow_queries_count': 0
-            }
-        
-        total_requests = len(self.metrics['requests'])
-        total_time = sum(r['execution_time'] for r in self.metrics['requests'])
-        avg_time = total_time / total_requests
-        error_rate = len(self.metrics['errors']) / total_requests if total_requests > 0 else 0
-        
+        now = time.time()
+        with self._lock:
+            total = self._total.to_dict(now)
+        uptime = now - self.started_at
         return {
-            'total_requests': total_requests,
-            'avg_execution_time': avg_time,
-            'error_rate': error_rate,
-            'slow_queries_count': len(self.metrics['slow_queries'])
+            'total_requests': total['count'],
+            'avg_execution_time': total['avg_ms'] / 1000,
+            'error_rate': total['errors'] / total['count'] if total['count'] else 0,
+            'slow_requests_count': len(self.recent_slow_requests),
+            'p50_ms': total['p50_ms'],
+            'p95_ms': total['p95_ms'],
+            'p99_ms': total['p99_ms'],
+            'max_ms': total['max_ms'],
+            'rps_1m': total['rps_1m'],
+            'rps_avg': round(total['count'] / uptime, 3) if uptime > 0 else 0.0,
+            'uptime_seconds': round(uptime, 1),
         }
 
+    def reset(self):
+        """清除所有統計（測試用）"""
+        with self._lock:
+            self._endpoints.clear()
+            self._total = EndpointStats()
+        self.recent_slow_requests.clear()
+        self.recent_errors.clear()
+        self.started_at = time.time()
+
 
 # 全局效能監控實例
 performance_monitor = PerformanceMonitor()
 
+
+# ========================================
+# Request hook
+# ========================================
+def init_request_metrics(app):
+    """註冊 request hook：每個請求記入行程內直方圖並放入寫入佇列"""
+    metrics_pipeline.init_app(app)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def record_request_metric(response):
+        started_at = g.pop('request_started_at', None)
+        if started_at is not None:
+            endpoint, elapsed = _request_endpoint(), time.perf_counter() - started_at
+            performance_monitor.record_request(endpoint, request.method, elapsed, response.status_code)
+            metrics_pipeline.record(endpoint, request.method, response.status_code, elapsed,
+                                    error=response.status_code >= 500)
+        return response
+
+    def record_exception(sender, exception, **extra):
+        performance_monitor.record_error(_request_endpoint(), request.method, exception)
+
+    got_request_exception.connect(record_exception, app, weak=False)
+
+
+# ========================================
+# Prometheus 文字格式
+# ========================================
+# Prometheus histogram 的 le 上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """
+    以 Prometheus text exposition format 輸出行程內統計（每個 worker 各自輸出）
+
+    延遲以 histogram 輸出：各 worker 的 _bucket 可在 Prometheus 端以 sum by (le) 加總後再用
+    histogram_quantile 計算百分位數（summary 的 quantile 無法跨 worker 加總或平均）。
+    """
+    lines = [
+        '# HELP http_request_duration_seconds Request latency by route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for method, endpoint, cumulative, count, total in performance_monitor.endpoint_histograms(LATENCY_BUCKETS):
+        labels = f'method="{_label(method)}",endpoint="{_label(endpoint)}"'
+        for bound, seen in zip(LATENCY_BUCKETS, cumulative):
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {seen}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+    endpoints = performance_monitor.endpoint_stats()
+
+    for name, kind, help_text, key, scale in (
+        ('http_request_duration_max_seconds', 'gauge', 'Maximum request latency by route.', 'max_ms', 1000),
+        ('http_request_errors_total', 'counter', 'Requests answered with a 5xx status.', 'errors', 1),
+        ('http_requests_per_second', 'gauge', 'Request rate over the last minute.', 'rps_1m', 1),
+    ):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for stats in endpoints:
+            labels = f'method="{_label(stats["method"])}",endpoint="{_label(stats["endpoint"])}"'
+            lines.append(f'{name}{{{labels}}} {stats[key] / scale}')
+
+    pipeline = metrics_pipeline.stats()
+    for name, kind, help_text, value in (
+        ('metrics_pipeline_queued', 'gauge', 'Request metrics waiting to be flushed.', pipeline['queued']),
+        ('metrics_pipeline_dropped_total', 'counter', 'Request metrics dropped by back-pressure or failed flushes.',
+         pipeline['dropped']),
+        ('metrics_pipeline_flushed_total', 'counter', 'Request metrics written to the database.', pipeline['flushed']),
+        ('process_uptime_seconds', 'gauge', 'Seconds since the monitor started.',
+         round(time.time() - performance_monitor.started_at, 1)),
+    ):
+        lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}'])
+
+    lines.extend(pool_monitor.prometheus_lines(_label))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,341 @@
+"""
+資料庫連線池監控與自動調整
+engine 使用 InstrumentedQueuePool（poolclass）時記錄每次取得連線的等待時間與逾時
+
+- 各連線池：累計取得次數、等待時間、逾時次數；即時的使用中 / 閒置 / overflow 連線數與目前上限
+- 各端點：在哪些路由上等待連線、發生逾時（找出連線池耗盡時受影響的請求）
+- 以 Prometheus 格式併入 /metrics，管理後台效能 API 另回傳 JSON
+- AdaptivePoolController（POOL_ADAPTIVE=true 時由排程定期執行）：等待時間過長或逾時時提高連線上限，
+  持續閒置時逐步降回；上限不超過同時處理中的請求數（執行緒或 greenlet）加上背景工作的保留量，
+  超過實際並行數的連線不會減少等待，只會佔用資料庫的連線數
+
+連線上限以 overflow 調整：pool_size（保留的閒置連線數）不變，max_overflow 隨負載增減，
+降低上限後多出的連線在歸還時關閉。
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from src.utils.sql_monitor import _current_endpoint
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """記錄取得連線等待時間與逾時、可在執行中調整連線上限的 QueuePool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_monitor.record_checkout(self, time.perf_counter() - started, timed_out=True)
+            raise
+        pool_monitor.record_checkout(self, time.perf_counter() - started)
+        return connection
+
+    @property
+    def capacity(self):
+        """可同時開啟的連線上限（max_overflow=-1 不限制時為 None）"""
+        return None if self._max_overflow < 0 else self.size() + self._max_overflow
+
+    def resize(self, capacity):
+        """調整連線上限（不低於 pool_size）"""
+        self._max_overflow = max(0, capacity - self.size())
+
+
+class PoolStats:
+    """單一連線池的取得連線統計；window_* 為控制器上次讀取之後的量"""
+
+    __slots__ = ('checkouts', 'wait_total', 'wait_max', 'timeouts',
+                 'window_checkouts', 'window_wait', 'window_timeouts', 'window_peak')
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.window_checkouts = 0
+        self.window_wait = 0.0
+        self.window_timeouts = 0
+        self.window_peak = 0
+
+
+class PoolMonitor:
+    """連線池統計與同時處理中的請求數"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self._pools = {}
+        self._endpoints = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    # ----------------------------------------
+    # 安裝
+    # ----------------------------------------
+    def register(self, name, engine):
+        """登記要監控的 engine（engine.dispose() 重建連線池後仍以同一名稱統計）"""
+        with self._lock:
+            self._engines[name] = engine
+
+    def unregister(self, name):
+        """取消登記（統計一併移除）"""
+        with self._lock:
+            self._engines.pop(name, None)
+            self._pools.pop(name, None)
+            for key in [key for key in self._endpoints if key[0] == name]:
+                del self._endpoints[key]
+
+    def init_app(self, app):
+        """以 request hook 計算同時處理中的請求數（自動調整的並行上限）"""
+
+        @app.before_request
+        def count_in_flight():
+            with self._lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        @app.teardown_request
+        def release_in_flight(exception=None):
+            with self._lock:
+                self.in_flight = max(0, self.in_flight - 1)
+
+    def pools(self):
+        """目前登記的 (名稱, 連線池)，只包含 InstrumentedQueuePool"""
+        with self._lock:
+            engines = list(self._engines.items())
+        return [(name, engine.pool) for name, engine in engines if isinstance(engine.pool, InstrumentedQueuePool)]
+
+    def _name_for(self, pool):
+        for name, engine in self._engines.items():
+            if engine.pool is pool:
+                return name
+        return None
+
+    # ----------------------------------------
+    # 記錄
+    # ----------------------------------------
+    def record_checkout(self, pool, elapsed, timed_out=False):
+        """記錄一次取得連線（由 InstrumentedQueuePool 呼叫）"""
+        endpoint = _current_endpoint()
+        checked_out = pool.checkedout()
+        with self._lock:
+            name = self._name_for(pool)
+            if name is None:
+                return
+            stats = self._pools.get(name)
+            if stats is None:
+                stats = self._pools[name] = PoolStats()
+            stats.wait_total += elapsed
+            stats.wait_max = max(stats.wait_max, elapsed)
+            stats.window_wait += elapsed
+            stats.window_peak = max(stats.window_peak, checked_out)
+            if timed_out:
+                stats.timeouts += 1
+                stats.window_timeouts += 1
+            else:
+                stats.checkouts += 1
+                stats.window_checkouts += 1
+
+            endpoint_stats = self._endpoints.get((name, endpoint))
+            if endpoint_stats is None:
+                endpoint_stats = self._endpoints[(name, endpoint)] = [0, 0.0, 0.0, 0]
+            endpoint_stats[0] += 1
+            endpoint_stats[1] += elapsed
+            endpoint_stats[2] = max(endpoint_stats[2], elapsed)
+            if timed_out:
+                endpoint_stats[3] += 1
+
+    def take_window(self, name):
+        """取出並歸零連線池自上次讀取以來的量（自動調整用）"""
+        with self._lock:
+            stats = self._pools.get(name) or PoolStats()
+            window = {
+                'checkouts': stats.window_checkouts,
+                'wait_total': stats.window_wait,
+                'timeouts': stats.window_timeouts,
+                'peak_checked_out': stats.window_peak,
+            }
+            stats.window_checkouts = stats.window_timeouts = stats.window_peak = 0
+            stats.window_wait = 0.0
+            return window
+
+    def take_peak_in_flight(self):
+        """取出並重設同時處理中請求數的峰值"""
+        with self._lock:
+            peak, self.peak_in_flight = self.peak_in_flight, self.in_flight
+            return peak
+
+    # ----------------------------------------
+    # 報表
+    # ----------------------------------------
+    @staticmethod
+    def gauges(pool):
+        """連線池的即時狀態"""
+        return {
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(0, pool.overflow()),
+            'capacity': pool.capacity,
+        }
+
+    def stats(self, limit=50):
+        """各連線池與各端點的取得連線統計"""
+        pools = []
+        for name, pool in self.pools():
+            with self._lock:
+                stats = self._pools.get(name) or PoolStats()
+                attempts = stats.checkouts + stats.timeouts
+                pools.append(dict(self.gauges(pool), name=name, checkouts=stats.checkouts, timeouts=stats.timeouts,
+                                  avg_wait_ms=round(stats.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                                  max_wait_ms=round(stats.wait_max * 1000, 3)))
+        with self._lock:
+            endpoints = [
+                {'pool': name, 'endpoint': endpoint, 'checkouts': values[0],
+                 'total_wait_ms': round(values[1] * 1000, 3), 'max_wait_ms': round(values[2] * 1000, 3),
+                 'timeouts': values[3]}
+                for (name, endpoint), values in self._endpoints.items()
+            ]
+            in_flight = self.in_flight
+        endpoints.sort(key=lambda item: (-item['timeouts'], -item['total_wait_ms']))
+        return {'pools': pools, 'endpoints': endpoints[:limit], 'in_flight': in_flight}
+
+    def prometheus_lines(self, label):
+        """Prometheus text format 的連線池指標（label 為標籤值跳脫函式）"""
+        pools = self.pools()
+        lines = []
+        for metric, help_text, key in (
+            ('db_pool_size', 'Connections kept open by the pool.', 'size'),
+            ('db_pool_checked_out', 'Connections currently in use.', 'checked_out'),
+            ('db_pool_idle', 'Idle connections in the pool.', 'idle'),
+            ('db_pool_overflow', 'Connections open beyond pool_size.', 'overflow'),
+            ('db_pool_capacity', 'Current connection limit (pool_size + max_overflow).', 'capacity'),
+        ):
+            lines.extend([f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge'])
+            for name, pool in pools:
+                value = self.gauges(pool)[key]
+                if value is not None:
+                    lines.append(f'{metric}{{pool="{label(name)}"}} {value}')
+
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        lines.extend(['# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection by route.',
+                      '# TYPE db_pool_checkout_wait_seconds summary'])
+        for (name, endpoint), values in endpoints:
+            labels = f'pool="{label(name)}",endpoint="{label(endpoint)}"'
+            lines.append(f'db_pool_checkout_wait_seconds_sum{{{labels}}} {values[1]}')
+            lines.append(f'db_pool_checkout_wait_seconds_count{{{labels}}} {values[0]}')
+        lines.extend(['# HELP db_pool_checkout_timeouts_total Checkouts that gave up after pool_timeout by route.',
+                      '# TYPE db_pool_checkout_timeouts_total counter'])
+        for (name, endpoint), values in endpoints:
+            lines.append(f'db_pool_checkout_timeouts_total{{pool="{label(name)}",endpoint="{label(endpoint)}"}} '
+                         f'{values[3]}')
+        return lines
+
+    def reset(self):
+        """清除所有統計（登記的 engine 保留）"""
+        with self._lock:
+            self._pools.clear()
+            self._endpoints.clear()
+            self.peak_in_flight = self.in_flight
+
+
+pool_monitor = PoolMonitor()
+
+
+# ========================================
+# 自動調整
+# ========================================
+class AdaptivePoolController:
+    """依等待時間與並行請求數調整連線上限"""
+
+    def __init__(self, monitor, min_capacity=None, max_capacity=None, worker_concurrency=None,
+                 grow_wait_seconds=0.01, shrink_after=3, reserve=2):
+        self.monitor = monitor
+        self.min_capacity = min_capacity
+        self.max_capacity = max_capacity
+        self.worker_concurrency = worker_concurrency
+        self.grow_wait_seconds = grow_wait_seconds
+        self.shrink_after = shrink_after
+        self.reserve = reserve
+        self.history = deque(maxlen=50)
+        self._initial = {}
+        self._idle_windows = {}
+
+    def bounds(self, name, pool):
+        """(下限, 上限)：未設定時下限為 pool_size，上限為設定值的兩倍"""
+        initial = self._initial.setdefault(name, pool.capacity)
+        return self.min_capacity or pool.size(), self.max_capacity or max(initial * 2, pool.size())
+
+    def adjust(self, names=None):
+        """
+        檢查每個連線池上一個時間窗的等待狀況並調整上限（排程工作）
+
+        - 有逾時或平均等待超過 grow_wait_seconds，且使用中的連線曾達上限：提高上限（每次 +25%，至少 1）
+        - 連續 shrink_after 個時間窗沒有等待、使用中的連線比上限少 2 以上：降低上限 1
+        - 上限不超過並行請求數（worker_concurrency，未設定時為觀察到的峰值）加上 reserve
+
+        Args:
+            names: 只調整指定名稱的連線池；None 為全部
+
+        Returns:
+            list: 本次的調整紀錄
+        """
+        concurrency = self.worker_concurrency or self.monitor.take_peak_in_flight()
+        changes = []
+        for name, pool in self.monitor.pools():
+            capacity = pool.capacity
+            if capacity is None or (names is not None and name not in names):
+                continue
+            window = self.monitor.take_window(name)
+            low, high = self.bounds(name, pool)
+            high = max(low, min(high, concurrency + self.reserve))
+            attempts = window['checkouts'] + window['timeouts']
+            avg_wait = window['wait_total'] / attempts if attempts else 0.0
+            saturated = window['timeouts'] > 0 or (
+                avg_wait > self.grow_wait_seconds and window['peak_checked_out'] >= capacity
+            )
+
+            target = capacity
+            if saturated:
+                self._idle_windows[name] = 0
+                target = min(high, capacity + max(1, capacity // 4))
+            elif avg_wait < self.grow_wait_seconds / 10 and window['peak_checked_out'] <= capacity - 2:
+                self._idle_windows[name] = self._idle_windows.get(name, 0) + 1
+                if self._idle_windows[name] >= self.shrink_after:
+                    self._idle_windows[name] = 0
+                    target = capacity - 1
+            else:
+                self._idle_windows[name] = 0
+            target = max(low, target)
+
+            if target != capacity:
+                pool.resize(target)
+                change = {
+                    'pool': name, 'at': datetime.utcnow().isoformat(), 'from': capacity, 'to': target,
+                    'avg_wait_ms': round(avg_wait * 1000, 3), 'timeouts': window['timeouts'],
+                    'peak_checked_out': window['peak_checked_out'], 'concurrency': concurrency,
+                }
+                self.history.append(change)
+                changes.append(change)
+                logger.info(f"Pool {name} capacity {capacity} -> {target} "
+                            f"(avg wait {change['avg_wait_ms']}ms, timeouts {window['timeouts']})")
+            elif saturated:
+                logger.warning(f"Pool {name} saturated at its upper bound {capacity}; "
+                               f"raise POOL_MAX_CAPACITY / worker concurrency or look for long-running transactions")
+        return changes
+
+    def stats(self):
+        """調整紀錄"""
+        return {'history': list(self.history)}
+
+
+pool_controller = AdaptivePoolController(pool_monitor)
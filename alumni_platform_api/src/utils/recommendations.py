@@ -0,0 +1,212 @@
+"""
+「你可能認識的系友」推薦引擎
+離線批次計算，結果寫入 people_recommendations_v2，線上端點只讀取結果表。
+
+作法（稀疏共現計分）：
+- 每位 active 使用者展開成一組特徵：指導教授、屆數（無屆數時用畢業年份）、
+  曾任 / 現任公司、技能、聯絡人（兩人有同一位聯絡人即為共同聯絡人）
+- 由特徵建立倒排索引（特徵 -> 使用者），每位使用者只走訪自己特徵的成員清單累加分數，
+  計算量為 Σ(特徵群組大小)，不需要 users × users 矩陣
+- 特徵權重依群組大小遞減（log 縮放），成員超過 MAX_GROUP_SIZE 的特徵太普遍，不參與計分
+- 排除自己與已有任何聯絡申請的對象，以 heapq 取前 TOP_K 位
+"""
+import heapq
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert
+
+from src.models_v2 import (
+    db, ContactRequest, Education, PeopleRecommendation, User, UserProfile, UserSkill, WorkExperience
+)
+
+logger = logging.getLogger(__name__)
+
+# 每位使用者保留的推薦數
+TOP_K = 20
+
+# 成員超過此數的特徵不參與計分（同時限制每位使用者的走訪成本）
+MAX_GROUP_SIZE = 500
+
+# 寫入結果表時每批筆數
+INSERT_CHUNK_SIZE = 1000
+
+# 特徵種類 -> (基礎權重, 推薦原因代碼)
+FEATURE_KINDS = {
+    'advisor': (3.0, 'shared_advisor'),
+    'cohort': (2.0, 'same_cohort'),
+    'company': (2.0, 'same_company'),
+    'contact': (1.5, 'mutual_contacts'),
+    'skill': (0.5, 'shared_skills'),
+}
+
+
+def _normalize(value):
+    return ' '.join(value.split()).lower() if value else None
+
+
+# ========================================
+# 特徵載入
+# ========================================
+def load_features():
+    """
+    載入所有 active 使用者的特徵
+
+    Returns:
+        dict: user_id -> set((種類, 值), ...)
+    """
+    active = {user_id for user_id, in db.session.query(User.id).filter(User.status == 'active')}
+    features = {user_id: set() for user_id in active}
+
+    def add(user_id, kind, value):
+        if user_id in features and value is not None:
+            features[user_id].add((kind, value))
+
+    profiles = db.session.query(
+        UserProfile.user_id, UserProfile.class_year, UserProfile.graduation_year,
+        UserProfile.advisor_1, UserProfile.advisor_2, UserProfile.current_company
+    )
+    for user_id, class_year, graduation_year, advisor_1, advisor_2, company in profiles:
+        if class_year:
+            add(user_id, 'cohort', f'class:{class_year}')
+        elif graduation_year:
+            add(user_id, 'cohort', f'grad:{graduation_year}')
+        add(user_id, 'advisor', _normalize(advisor_1))
+        add(user_id, 'advisor', _normalize(advisor_2))
+        add(user_id, 'company', _normalize(company))
+
+    for user_id, advisor_1, advisor_2 in db.session.query(
+            Education.user_id, Education.advisor_1, Education.advisor_2):
+        add(user_id, 'advisor', _normalize(advisor_1))
+        add(user_id, 'advisor', _normalize(advisor_2))
+
+    for user_id, company in db.session.query(WorkExperience.user_id, WorkExperience.company_name):
+        add(user_id, 'company', _normalize(company))
+
+    for user_id, skill_id in db.session.query(UserSkill.user_id, UserSkill.skill_id):
+        add(user_id, 'skill', skill_id)
+
+    accepted = db.session.query(ContactRequest.requester_id, ContactRequest.target_id)\
+        .filter(ContactRequest.status == 'accepted')
+    for requester_id, target_id in accepted:
+        add(requester_id, 'contact', target_id)
+        add(target_id, 'contact', requester_id)
+
+    return features
+
+
+def load_excluded_pairs():
+    """已有任何聯絡申請（含待處理、已拒絕）的使用者對，雙向"""
+    excluded = defaultdict(set)
+    for requester_id, target_id in db.session.query(ContactRequest.requester_id, ContactRequest.target_id):
+        excluded[requester_id].add(target_id)
+        excluded[target_id].add(requester_id)
+    return excluded
+
+
+# ========================================
+# 計分
+# ========================================
+def score_candidates(features, excluded=None, top_k=TOP_K, max_group_size=MAX_GROUP_SIZE):
+    """
+    逐位使用者計算推薦
+
+    Args:
+        features: user_id -> 特徵集合（見 load_features）
+        excluded: user_id -> 不推薦的使用者集合
+
+    Yields:
+        (user_id, [(candidate_id, score, reasons), ...])，依分數高到低
+    """
+    excluded = excluded or {}
+
+    groups = defaultdict(list)
+    for user_id, user_features in features.items():
+        for feature in user_features:
+            groups[feature].append(user_id)
+
+    weights = {}
+    for feature, members in groups.items():
+        if 2 <= len(members) <= max_group_size:
+            weights[feature] = FEATURE_KINDS[feature[0]][0] / math.log2(1 + len(members))
+
+    for user_id, user_features in features.items():
+        scores = defaultdict(float)
+        for feature in user_features:
+            weight = weights.get(feature)
+            if weight is None:
+                continue
+            for other_id in groups[feature]:
+                scores[other_id] += weight
+
+        skip = excluded.get(user_id, ())
+        top = heapq.nsmallest(
+            top_k,
+            ((-score, candidate_id) for candidate_id, score in scores.items()
+             if candidate_id != user_id and candidate_id not in skip)
+        )
+        if not top:
+            continue
+
+        results = []
+        for negative_score, candidate_id in top:
+            shared = user_features & features[candidate_id]
+            reasons = sorted({FEATURE_KINDS[feature[0]][1] for feature in shared if feature in weights})
+            results.append((candidate_id, -negative_score, reasons))
+        yield user_id, results
+
+
+# ========================================
+# 批次工作
+# ========================================
+def compute_people_recommendations(top_k=TOP_K, now=None):
+    """
+    重新計算並整批替換推薦結果
+
+    先在記憶體中算完所有推薦，再以一個短交易刪除舊結果並寫入；
+    計分期間不持有寫入鎖（SQLite 上其他寫入者不會因等待逾時而失敗）
+
+    Returns:
+        dict: {'users': 有推薦的使用者數, 'recommendations': 推薦筆數}
+    """
+    now = now or datetime.utcnow()
+    features = load_features()
+    excluded = load_excluded_pairs()
+
+    users, rows = 0, []
+    for user_id, results in score_candidates(features, excluded, top_k=top_k):
+        users += 1
+        rows.extend((user_id, candidate_id, score, ','.join(reasons)) for candidate_id, score, reasons in results)
+
+    table = PeopleRecommendation.__table__
+    try:
+        db.session.execute(delete(table))
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.session.execute(insert(table), [
+                {'user_id': user_id, 'candidate_id': candidate_id, 'score': score,
+                 'reasons': reasons, 'computed_at': now}
+                for user_id, candidate_id, score, reasons in rows[start:start + INSERT_CHUNK_SIZE]
+            ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    logger.info(f"Computed {len(rows)} people recommendations for {users} users")
+    return {'users': users, 'recommendations': len(rows)}
+
+
+def refresh_people_recommendations(max_age_seconds=None):
+    """
+    排程用：結果比 max_age_seconds 新時略過（多個 worker 各自排程時只有第一個會重算）
+
+    計分為純 Python 的 CPU 工作，預設不在 web worker 內排程，
+    以 cron 執行 `flask --app src.main_v2 compute-recommendations`（見 app._register_background_jobs）
+    """
+    if max_age_seconds:
+        latest = db.session.query(func.max(PeopleRecommendation.computed_at)).scalar()
+        if latest and latest > datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            return {'skipped': True}
+    return compute_people_recommendations()
@@ -0,0 +1,118 @@
+"""
+背景排程模組
+以單一背景執行緒定期執行註冊的工作（活動提醒、資料整理等）
+
+每個工作都必須是冪等的：多個 worker 各自啟動排程器時會重複執行，
+正確性由工作本身（例如 claimed-work 表）保證，排程器只負責「定期呼叫」。
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """排程工作定義"""
+
+    def __init__(self, name, func, interval_seconds):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.next_run_at = 0.0
+        self.last_run_at = None
+        self.last_result = None
+        self.last_error = None
+        self.run_count = 0
+
+    def to_dict(self):
+        """轉換為字典"""
+        return {
+            'name': self.name,
+            'interval_seconds': self.interval_seconds,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+            'run_count': self.run_count
+        }
+
+
+class Scheduler:
+    """簡易週期排程器"""
+
+    def __init__(self, tick_seconds=5):
+        self.tick_seconds = tick_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._app = None
+
+    def register(self, name, func, interval_seconds):
+        """註冊週期工作（func 會在 app context 內被呼叫）"""
+        with self._lock:
+            self._jobs[name] = ScheduledJob(name, func, interval_seconds)
+
+    @property
+    def jobs(self):
+        with self._lock:
+            return dict(self._jobs)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_job(self, name, app=None):
+        """立即執行指定工作並回傳結果"""
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(f'Unknown scheduled job: {name}')
+
+        app = app or self._app
+        job.last_run_at = datetime.utcnow()
+        job.run_count += 1
+        try:
+            with app.app_context():
+                job.last_result = job.func()
+            job.last_error = None
+            return job.last_result
+        except Exception as e:
+            job.last_error = str(e)
+            logger.error(f"Scheduled job '{name}' failed: {str(e)}")
+            raise
+        finally:
+            job.next_run_at = time.monotonic() + job.interval_seconds
+
+    def start(self, app):
+        """啟動背景執行緒（重複呼叫不會啟動第二個）"""
+        if self.running:
+            return
+        self._app = app
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name='scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Scheduler started with jobs: {', '.join(self.jobs) or '(none)'}")
+
+    def stop(self, timeout=None):
+        """停止背景執行緒"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run_loop(self):
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            for name, job in self.jobs.items():
+                if now < job.next_run_at:
+                    continue
+                try:
+                    self.run_job(name)
+                except Exception:
+                    # 錯誤已記錄，等下一個週期再試
+                    pass
+            self._stop_event.wait(self.tick_seconds)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,321 @@
+"""
+宣告式序列化模組
+列表端點用的快速序列化：欄位計畫預先編譯、支援 ?fields= 稀疏欄位、
+宣告所需關聯供查詢 eager load，並以 orjson（未安裝時退回標準 json）編碼
+
+輸出與各模型 to_dict() 相同（不含 include_private 欄位）：
+- 時間欄位轉 ISO 字串、Enum 轉 value
+- 關聯欄位（如 poster_name）只在關聯存在時輸出
+- 衍生欄位（is_expired、registration_open）整批共用同一個 now
+- 需要額外查詢的彙總欄位（如對話的 message_count）整頁一次 GROUP BY
+"""
+import json
+from datetime import datetime
+from operator import attrgetter
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.models_v2 import db, Job, Event, Bulletin, Conversation, Message
+from src.models_v2.content import ContentStatus
+from src.models_v2.events import EventStatus
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 為選用相依
+    orjson = None
+
+# 欄位值為 OMIT 時不輸出該鍵（對應 to_dict 中的條件式欄位）
+OMIT = object()
+
+# 快取的欄位計畫上限（?fields= 由使用者輸入，避免無上限成長）
+MAX_CACHED_PLANS = 64
+
+
+# ========================================
+# 欄位定義
+# ========================================
+class Field:
+    """
+    單一輸出欄位
+
+    Args:
+        name: 輸出鍵名（亦是 ?fields= 使用的名稱）
+        getter: getter(obj, ctx) -> 值或 OMIT
+        load: 需要 eager load 的關聯路徑（如 'user.profile'）
+        batch: batch(ids) -> {id: 值}，整頁只呼叫一次
+    """
+    __slots__ = ('name', 'getter', 'load', 'batch')
+
+    def __init__(self, name, getter, load=None, batch=None):
+        self.name = name
+        self.getter = getter
+        self.load = load
+        self.batch = batch
+
+
+def column(name):
+    """一般欄位，原值輸出"""
+    get = attrgetter(name)
+    return Field(name, lambda obj, ctx: get(obj))
+
+
+def datetime_field(name):
+    """時間欄位，輸出 ISO 字串"""
+    get = attrgetter(name)
+
+    def getter(obj, ctx):
+        value = get(obj)
+        return value.isoformat() if value else None
+    return Field(name, getter)
+
+
+def enum_field(name):
+    """Enum 欄位，輸出 value"""
+    get = attrgetter(name)
+
+    def getter(obj, ctx):
+        value = get(obj)
+        return value.value if value else None
+    return Field(name, getter)
+
+
+def computed(name, getter):
+    """衍生欄位，getter(obj, ctx) 可使用 ctx['now'] 等共用值"""
+    return Field(name, getter)
+
+
+def related(relationship, load=None, **outputs):
+    """
+    關聯欄位群組，關聯為 None 時整組不輸出
+
+    Args:
+        relationship: 關聯屬性名稱
+        load: eager load 路徑（預設為關聯本身）
+        outputs: 輸出鍵名 → 關聯物件上的屬性名稱
+    """
+    get_related = attrgetter(relationship)
+    fields = []
+    for name, attr in outputs.items():
+        get = attrgetter(attr)
+
+        def getter(obj, ctx, get=get):
+            target = get_related(obj)
+            return OMIT if target is None else get(target)
+        fields.append(Field(name, getter, load=load or relationship))
+    return fields
+
+
+def aggregate(name, batch, default=0):
+    """彙總欄位：整頁一次查詢，batch(ids) 回傳 {id: 值}"""
+    def getter(obj, ctx):
+        return ctx['batches'][name].get(obj.id, default)
+    return Field(name, getter, batch=batch)
+
+
+# ========================================
+# 序列化器
+# ========================================
+class ModelSerializer:
+    """
+    模型序列化器
+
+    欄位依宣告順序輸出；欄位計畫依 fields 組合編譯一次後快取。
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = []
+        for field in fields:
+            self.fields.extend(field if isinstance(field, list) else [field])
+        self.field_names = frozenset(field.name for field in self.fields)
+        self._plans = {}
+
+    def parse_fields(self, raw):
+        """
+        解析 ?fields= 參數
+
+        Returns:
+            frozenset 或 None（未指定時輸出全部欄位）
+
+        Raises:
+            ValueError: 含有未知欄位
+        """
+        if not raw:
+            return None
+        names = frozenset(name.strip() for name in raw.split(',') if name.strip())
+        unknown = names - self.field_names
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return names or None
+
+    def plan(self, fields=None):
+        """取得（必要時編譯）欄位計畫"""
+        plan = self._plans.get(fields)
+        if plan is None:
+            selected = [field for field in self.fields if fields is None or field.name in fields]
+            plan = (
+                tuple((field.name, field.getter) for field in selected),
+                tuple(dict.fromkeys(field.load for field in selected if field.load)),
+                tuple((field.name, field.batch) for field in selected if field.batch),
+            )
+            if len(self._plans) < MAX_CACHED_PLANS:
+                self._plans[fields] = plan
+        return plan
+
+    def load_paths(self, fields=None):
+        """選定欄位需要的關聯路徑"""
+        return self.plan(fields)[1]
+
+    def loader_options(self, fields=None):
+        """
+        依選定欄位產生 eager loading 選項
+
+        多對一關聯用 joinedload（不會使分頁筆數膨脹），集合關聯用 selectinload。
+        """
+        return [build_loader(self.model, path) for path in self.load_paths(fields)]
+
+    def dump_many(self, objs, fields=None, **context):
+        """序列化多筆資料"""
+        getters, _, batches = self.plan(fields)
+        ctx = {'now': datetime.utcnow(), 'batches': {}, **context}
+        if batches:
+            ids = [obj.id for obj in objs]
+            for name, batch in batches:
+                ctx['batches'][name] = batch(ids) if ids else {}
+
+        result = []
+        for obj in objs:
+            data = {}
+            for name, getter in getters:
+                value = getter(obj, ctx)
+                if value is not OMIT:
+                    data[name] = value
+            result.append(data)
+        return result
+
+    def dump(self, obj, fields=None, **context):
+        """序列化單筆資料"""
+        return self.dump_many([obj], fields, **context)[0]
+
+
+def build_loader(model, path):
+    """將 'user.profile' 這類路徑轉成串接的 joinedload / selectinload"""
+    option = None
+    current = model
+    for name in path.split('.'):
+        attr = getattr(current, name)
+        prop = attr.property
+        loader = selectinload if prop.uselist else joinedload
+        option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+        current = prop.mapper.class_
+    return option
+
+
+def json_response(payload, status=200):
+    """以 orjson 編碼回應（未安裝時退回標準 json）"""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+# ========================================
+# 各模型序列化器
+# ========================================
+def _message_counts(conversation_ids):
+    rows = db.session.query(Message.conversation_id, func.count(Message.id))\
+        .filter(Message.conversation_id.in_(conversation_ids))\
+        .group_by(Message.conversation_id).all()
+    return dict(rows)
+
+
+def _is_expired(job, ctx):
+    return bool(job.expires_at) and ctx['now'] > job.expires_at
+
+
+def _registration_open(event, ctx):
+    now = ctx['now']
+    if event.registration_start and now < event.registration_start:
+        return False
+    if event.registration_end and now > event.registration_end:
+        return False
+    return event.status in (EventStatus.UPCOMING, EventStatus.ONGOING)
+
+
+def _current_user_field(name, getter):
+    def wrapped(obj, ctx):
+        current_user_id = ctx.get('current_user_id')
+        return getter(obj, current_user_id) if current_user_id else OMIT
+    return computed(name, wrapped)
+
+
+job_serializer = ModelSerializer(Job, [
+    column('id'), column('user_id'), column('category_id'),
+    column('title'), column('company'), column('company_website'), column('company_logo_url'),
+    column('description'), column('requirements'), column('responsibilities'), column('benefits'),
+    enum_field('job_type'), enum_field('status'),
+    column('location'), column('is_remote'),
+    column('salary_range'), column('salary_min'), column('salary_max'),
+    column('salary_currency'), column('salary_negotiable'),
+    column('experience_years_min'), column('experience_years_max'), column('education_level'),
+    column('application_email'), column('application_url'),
+    column('views_count'), column('requests_count'),
+    computed('is_expired', _is_expired),
+    datetime_field('expires_at'), datetime_field('published_at'),
+    datetime_field('created_at'), datetime_field('updated_at'),
+    related('user', load='user.profile', poster_name='name', poster_email='email'),
+    related('category', category_name='name'),
+])
+
+event_serializer = ModelSerializer(Event, [
+    column('id'), column('organizer_id'), column('category_id'),
+    column('title'), column('subtitle'), column('description'),
+    enum_field('event_type'), enum_field('status'),
+    datetime_field('start_time'), datetime_field('end_time'),
+    column('location'), column('location_detail'), column('is_online'), column('online_url'),
+    column('max_participants'), column('current_participants'), column('available_seats'),
+    column('allow_waitlist'), column('waitlist_count'),
+    datetime_field('registration_start'), datetime_field('registration_end'),
+    column('require_approval'), column('cover_image_url'), column('tags'),
+    column('fee'), column('fee_currency'), column('is_free'),
+    column('contact_name'), column('contact_email'), column('contact_phone'),
+    column('views_count'), column('is_full'),
+    computed('registration_open', _registration_open),
+    column('occupancy_rate'),
+    datetime_field('published_at'), datetime_field('cancelled_at'), column('cancellation_reason'),
+    datetime_field('created_at'), datetime_field('updated_at'),
+    related('organizer', load='organizer.profile', organizer_name='name', organizer_email='email'),
+    related('category', category_name='name'),
+])
+
+bulletin_serializer = ModelSerializer(Bulletin, [
+    column('id'), column('author_id'), column('category_id'),
+    column('title'), column('subtitle'), column('content'), column('summary'),
+    enum_field('bulletin_type'), enum_field('status'),
+    column('cover_image_url'), column('attachment_url'), column('attachment_name'), column('tags'),
+    column('is_pinned'), column('is_featured'), column('allow_comments'),
+    column('views_count'), column('likes_count'), column('comments_count'),
+    computed('is_published', lambda bulletin, ctx: bulletin.status == ContentStatus.PUBLISHED),
+    datetime_field('published_at'), datetime_field('scheduled_at'), datetime_field('archived_at'),
+    datetime_field('created_at'), datetime_field('updated_at'),
+    related('author', load='author.profile', author_name='name', author_email='email'),
+    related('category', category_name='name'),
+])
+
+conversation_serializer = ModelSerializer(Conversation, [
+    column('id'), column('user1_id'), column('user2_id'),
+    enum_field('conversation_type'),
+    column('job_id'), column('job_request_id'), column('title'), column('is_active'),
+    datetime_field('last_message_at'), column('last_message_preview'),
+    aggregate('message_count', _message_counts),
+    datetime_field('created_at'), datetime_field('updated_at'),
+    _current_user_field('other_user_id', Conversation.get_other_user),
+    _current_user_field('unread_count', Conversation.get_unread_count),
+    _current_user_field('is_archived', Conversation.is_archived_for),
+    related('user1', load='user1.profile', user1_name='name', user1_email='email'),
+    related('user2', load='user2.profile', user2_name='name', user2_email='email'),
+    related('job', job_title='title', company='company'),
+])
@@ -0,0 +1,249 @@
+"""
+SQL 查詢監控
+以 SQLAlchemy engine 事件記錄每個 SQL 語句的耗時，用來從正式環境流量找出 N+1 與缺少的索引
+
+- 語句指紋：去掉常數、把 IN (...) 清單收斂成單一佔位符後的 SQL，參數不同的同一查詢歸為一類
+- 每個指紋累計執行次數、總耗時、最大耗時，並保留最慢那次的參數樣本與來源端點；
+  參數樣本預設只記錄型別（如 <str>），避免密碼雜湊、token、email 等值經由管理端點外流，
+  raw_parameters=True（SQL_SAMPLE_RAW_PARAMETERS=true）時才記錄截斷後的實際值
+- 每個請求累計語句數與資料庫耗時，寫入 Server-Timing 標頭（瀏覽器 DevTools 可直接看到）；
+  各端點彙總平均 / 最大語句數，以及單一請求內同一指紋的最大重複次數（N+1 的特徵）
+- 指紋數量上限為 max_fingerprints，滿了之後淘汰總耗時最少的指紋，記憶體用量固定
+"""
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_NAMED_PARAM = re.compile(r'%\(\w+\)s|:\w+\b|\$\d+')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*(?:\((?:[^()]*)\)\s*,?\s*)+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement):
+    """正規化 SQL：常數與參數一律換成 ?，IN / VALUES 清單收斂，空白壓縮"""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NAMED_PARAM.sub('?', normalized)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (?)', normalized)
+    normalized = _VALUES_LIST.sub('VALUES (...) ', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def _redacted(value):
+    return f'<{type(value).__name__}>'
+
+
+def _sample_parameters(parameters, raw=False, limit=10, width=100):
+    """參數樣本：只保留前 limit 個；預設只記錄型別，raw 時記錄截斷為 width 字元的實際值"""
+    if parameters is None:
+        return None
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        # executemany：只取第一組
+        return _sample_parameters(parameters[0], raw, limit, width)
+
+    def sample(value):
+        return repr(value)[:width] if raw else _redacted(value)
+
+    if isinstance(parameters, dict):
+        return {key: sample(value) for key, value in list(parameters.items())[:limit]}
+    if isinstance(parameters, (list, tuple)):
+        return [sample(value) for value in parameters[:limit]]
+    return sample(parameters)
+
+
+def _current_endpoint():
+    if not has_request_context():
+        return '<background>'
+    return f'{request.method} {request.url_rule.rule if request.url_rule is not None else "<unmatched>"}'
+
+
+class StatementStats:
+    """單一語句指紋的統計"""
+
+    __slots__ = ('count', 'total', 'max', 'sample_parameters', 'sample_endpoint')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sample_parameters = None
+        self.sample_endpoint = None
+
+
+class EndpointQueryStats:
+    """單一端點每個請求的語句數統計"""
+
+    __slots__ = ('requests', 'statements', 'max_statements', 'db_time', 'max_repeats', 'max_repeats_fingerprint')
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_time = 0.0
+        self.max_repeats = 0
+        self.max_repeats_fingerprint = None
+
+
+class SQLMonitor:
+    """SQL 語句與每請求查詢數監控"""
+
+    def __init__(self, slow_threshold=0.1, max_fingerprints=500, raw_parameters=False):
+        self.slow_threshold = slow_threshold
+        self.max_fingerprints = max_fingerprints
+        self.raw_parameters = raw_parameters
+        self.server_timing = True
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._endpoints = {}
+        self._listening = False
+
+    # ----------------------------------------
+    # 安裝
+    # ----------------------------------------
+    def init_app(self, app):
+        """註冊 engine 事件（所有 engine 共用）與 request hook"""
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+        @app.before_request
+        def start_sql_tracking():
+            g.sql_started_at = time.perf_counter()
+            g.sql_statements = 0
+            g.sql_time = 0.0
+            g.sql_fingerprints = Counter()
+
+        @app.after_request
+        def finish_sql_tracking(response):
+            started_at = g.pop('sql_started_at', None)
+            if started_at is None:
+                return response
+            statements, db_time = g.pop('sql_statements', 0), g.pop('sql_time', 0.0)
+            repeated = g.pop('sql_fingerprints', Counter()).most_common(1)
+            self.record_request(_current_endpoint(), statements, db_time, repeated[0] if repeated else None)
+
+            if self.server_timing:
+                total_ms = (time.perf_counter() - started_at) * 1000
+                response.headers.add(
+                    'Server-Timing', f'db;dur={db_time * 1000:.2f};desc="{statements} queries"'
+                )
+                response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+            return response
+
+    # ----------------------------------------
+    # engine 事件
+    # ----------------------------------------
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('sql_monitor_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('sql_monitor_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        key = fingerprint(statement)
+        if has_request_context() and 'sql_fingerprints' in g:
+            g.sql_statements += 1
+            g.sql_time += elapsed
+            g.sql_fingerprints[key] += 1
+        self.record_statement(key, elapsed, parameters)
+
+    # ----------------------------------------
+    # 記錄
+    # ----------------------------------------
+    def record_statement(self, key, elapsed, parameters=None):
+        """累計語句指紋的統計（key 為 fingerprint() 的結果）"""
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self.max_fingerprints:
+                    # 淘汰總耗時最少的指紋（只在新指紋出現且已滿時發生）
+                    del self._statements[min(self._statements, key=lambda k: self._statements[k].total)]
+                stats = self._statements[key] = StatementStats()
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed >= stats.max:
+                stats.max = elapsed
+                if elapsed >= self.slow_threshold or stats.sample_endpoint is None:
+                    stats.sample_parameters = _sample_parameters(parameters, self.raw_parameters)
+                    stats.sample_endpoint = _current_endpoint()
+
+    def record_request(self, endpoint, statements, db_time, most_repeated=None):
+        """累計端點的每請求語句數"""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointQueryStats()
+            stats.requests += 1
+            stats.statements += statements
+            stats.max_statements = max(stats.max_statements, statements)
+            stats.db_time += db_time
+            if most_repeated and most_repeated[1] > stats.max_repeats:
+                stats.max_repeats_fingerprint, stats.max_repeats = most_repeated
+
+    # ----------------------------------------
+    # 報表
+    # ----------------------------------------
+    def slow_statements(self, limit=20):
+        """最大耗時超過門檻的語句，依最大耗時排序"""
+        with self._lock:
+            items = [(key, stats) for key, stats in self._statements.items() if stats.max >= self.slow_threshold]
+            items.sort(key=lambda item: -item[1].max)
+            return [self._statement_dict(key, stats) for key, stats in items[:limit]]
+
+    def top_statements(self, limit=20):
+        """依總耗時排序的語句（找出最值得加索引或快取的查詢）"""
+        with self._lock:
+            items = sorted(self._statements.items(), key=lambda item: -item[1].total)
+            return [self._statement_dict(key, stats) for key, stats in items[:limit]]
+
+    def endpoint_stats(self, limit=50):
+        """各端點每請求平均語句數，由多到少排列"""
+        with self._lock:
+            items = [
+                {
+                    'endpoint': endpoint,
+                    'requests': stats.requests,
+                    'avg_statements': round(stats.statements / stats.requests, 2),
+                    'max_statements': stats.max_statements,
+                    'avg_db_ms': round(stats.db_time / stats.requests * 1000, 3),
+                    'max_repeats': stats.max_repeats,
+                    'max_repeats_fingerprint': stats.max_repeats_fingerprint,
+                }
+                for endpoint, stats in self._endpoints.items() if stats.requests
+            ]
+        items.sort(key=lambda item: -item['avg_statements'])
+        return items[:limit]
+
+    @staticmethod
+    def _statement_dict(key, stats):
+        return {
+            'fingerprint': key,
+            'count': stats.count,
+            'total_ms': round(stats.total * 1000, 3),
+            'avg_ms': round(stats.total / stats.count * 1000, 3),
+            'max_ms': round(stats.max * 1000, 3),
+            'sample_parameters': stats.sample_parameters,
+            'sample_endpoint': stats.sample_endpoint,
+        }
+
+    def reset(self):
+        """清除所有統計"""
+        with self._lock:
+            self._statements.clear()
+            self._endpoints.clear()
+
+
+sql_monitor = SQLMonitor()
@@ -0,0 +1,277 @@
+"""
+管理後台統計彙總
+排程工作把各資料表的計數彙總成 daily_stats_v2 的每日時間序列，
+儀表板與趨勢端點只讀取彙總表，不再每次掃描 users_v2 / jobs_v2 / events_v2 / bulletins_v2。
+
+- 流量指標（FLOW_METRICS）：以 created_at 分日計數，從最後一個已結算日期的隔天增量彙總到今天；
+  昨天以前的日期結算後不再重算，今天的列每次排程覆寫
+- 存量指標（GAUGE_METRICS）：總數、各狀態數量等只能取快照的數值，每次排程寫入今天的列
+- 儀表板：彙總表 + 「上次彙總之後」新建立的筆數（created_at 索引範圍查詢），
+  查詢量與資料表大小無關；存量指標最多落後一個排程週期
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, delete, func, insert, select, update
+
+from src.models_v2 import db, Bulletin, DailyStat, Event, EventRegistration, Job, User, UserSession
+from src.models_v2.content import ContentStatus
+from src.models_v2.jobs import JobStatus
+from src.utils.db_routing import use_primary
+
+logger = logging.getLogger(__name__)
+
+# 流量指標：名稱 -> (分日依據的時間欄位, 計數運算式)
+FLOW_METRICS = {
+    'signups': (User.created_at, func.count(User.id)),
+    'active_users': (UserSession.created_at, func.count(func.distinct(UserSession.user_id))),
+    'jobs_created': (Job.created_at, func.count(Job.id)),
+    'events_created': (Event.created_at, func.count(Event.id)),
+    'bulletins_created': (Bulletin.created_at, func.count(Bulletin.id)),
+    'registrations': (EventRegistration.created_at, func.count(EventRegistration.id)),
+}
+
+# 每日不重複人數：同一人在不同天各算一次，週 / 月區間不能加總，改取區間內單日最大值（尖峰日）
+DAILY_DISTINCT_METRICS = {'active_users'}
+
+# 存量指標（由 snapshot_gauges 計算）
+GAUGE_METRICS = (
+    'users_total', 'users_active', 'users_pending', 'users_active_30d',
+    'jobs_total', 'jobs_active', 'jobs_draft',
+    'events_total', 'events_upcoming',
+    'bulletins_total', 'bulletins_published',
+)
+
+TREND_INTERVALS = ('day', 'week', 'month')
+
+# 趨勢查詢的最大範圍（天）
+MAX_TREND_DAYS = 3 * 366
+
+
+def _as_date(value):
+    """func.date() 在 SQLite 回傳字串、在 PostgreSQL 回傳 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+# ========================================
+# 彙總工作
+# ========================================
+def snapshot_gauges(now):
+    """計算存量指標快照（每張表一個查詢）"""
+    thirty_days_ago = now - timedelta(days=30)
+
+    users = db.session.query(
+        func.count(),
+        func.count(case((User.status == 'active', 1))),
+        func.count(case((User.status == 'pending', 1))),
+        func.count(case((User.last_login_at >= thirty_days_ago, 1))),
+    ).select_from(User).one()
+    jobs = db.session.query(
+        func.count(),
+        func.count(case((Job.status == JobStatus.ACTIVE, 1))),
+        func.count(case((Job.status == JobStatus.DRAFT, 1))),
+    ).select_from(Job).one()
+    events = db.session.query(
+        func.count(),
+        func.count(case((Event.start_time > now, 1))),
+    ).select_from(Event).one()
+    bulletins = db.session.query(
+        func.count(),
+        func.count(case((Bulletin.status == ContentStatus.PUBLISHED, 1))),
+    ).select_from(Bulletin).one()
+
+    return dict(zip(GAUGE_METRICS, (*users, *jobs, *events, *bulletins)))
+
+
+def _first_day(today):
+    """尚未結算過任何日期時，從最早一筆資料的日期開始回補"""
+    earliest = [db.session.query(func.min(column)).scalar() for column, _ in FLOW_METRICS.values()]
+    earliest = [_as_date(value) for value in earliest if value is not None]
+    return min(earliest + [today])
+
+
+def rollup_daily_stats(now=None):
+    """
+    增量彙總每日統計（單一交易）
+
+    結算「最後一個已結算日期的隔天」到昨天的流量指標，並覆寫今天的流量與存量指標。
+
+    Returns:
+        dict: {'start': 彙總起始日期, 'days': 彙總天數, 'finalized': 本次結算天數}
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+
+    last_final = db.session.query(func.max(DailyStat.day)).filter(DailyStat.is_final.is_(True)).scalar()
+    start = min(last_final + timedelta(days=1), today) if last_final else _first_day(today)
+    start_at = datetime.combine(start, time.min)
+    days = [start + timedelta(days=offset) for offset in range((today - start).days + 1)]
+
+    values = {(day, metric): 0 for day in days for metric in FLOW_METRICS}
+    for metric, (column, count) in FLOW_METRICS.items():
+        day_expr = func.date(column)
+        grouped = db.session.query(day_expr, count).filter(column >= start_at).group_by(day_expr)
+        for day, value in grouped:
+            key = (_as_date(day), metric)
+            if key in values:
+                values[key] = value
+    for metric, value in snapshot_gauges(now).items():
+        values[(today, metric)] = value
+
+    rows = [
+        {'day': day, 'metric': metric, 'value': value, 'is_final': day < today, 'computed_at': now}
+        for (day, metric), value in values.items()
+    ]
+    try:
+        db.session.execute(delete(DailyStat).where(
+            DailyStat.day >= start, DailyStat.metric.in_(list(FLOW_METRICS))
+        ))
+        db.session.execute(delete(DailyStat).where(
+            DailyStat.day == today, DailyStat.metric.in_(GAUGE_METRICS)
+        ))
+        # 已過去日期的存量快照保留當日最後一次的數值，隨流量指標一併結算
+        db.session.execute(update(DailyStat).where(
+            DailyStat.day >= start, DailyStat.day < today
+        ).values(is_final=True))
+        db.session.execute(insert(DailyStat), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    finalized = len(days) - 1
+    if finalized:
+        logger.info(f"Daily stats finalized {finalized} day(s) from {start}")
+    return {'start': start.isoformat(), 'days': len(days), 'finalized': finalized}
+
+
+def refresh_daily_stats(max_age_seconds=None):
+    """
+    排程用：今天的彙總比 max_age_seconds 新時略過（多個 worker 各自排程時只有第一個會重算）
+    """
+    if max_age_seconds:
+        today = datetime.utcnow().date()
+        latest = db.session.query(func.max(DailyStat.computed_at)).filter(DailyStat.day == today).scalar()
+        if latest and latest > datetime.utcnow() - timedelta(seconds=max_age_seconds):
+            return {'skipped': True}
+    return rollup_daily_stats()
+
+
+# ========================================
+# 讀取
+# ========================================
+def _created_since(since):
+    """上次彙總之後各表新建立的筆數（單一查詢，每張表一個 created_at 索引範圍）"""
+    counts = [
+        select(func.count()).select_from(model).where(model.created_at >= since).scalar_subquery()
+        for model in (User, Job, Event, Bulletin)
+    ]
+    return db.session.execute(select(*counts)).one()
+
+
+def dashboard_statistics(now=None):
+    """
+    管理後台儀表板統計（回應格式與原本逐表計數相同）
+
+    Returns:
+        dict: {'users': {...}, 'jobs': {...}, 'events': {...}, 'bulletins': {...}, 'as_of': 彙總時間}
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    month_start = today.replace(day=1)
+    week_start = today - timedelta(days=today.weekday())
+
+    rows = DailyStat.query.filter(DailyStat.day >= min(month_start, week_start), DailyStat.day <= today).all()
+    if not any(row.day == today and row.metric in GAUGE_METRICS for row in rows):
+        # 今天尚未彙總（新部署或排程未啟動）時同步彙總一次，範圍只有未結算的日期；
+        # 彙總依來源資料表重算，需讀取主庫而非可能落後的副本
+        with use_primary():
+            rollup_daily_stats(now)
+            rows = DailyStat.query.filter(DailyStat.day >= min(month_start, week_start),
+                                          DailyStat.day <= today).all()
+
+    gauges = {row.metric: row.value for row in rows if row.day == today and row.metric in GAUGE_METRICS}
+    as_of = min(row.computed_at for row in rows if row.day == today)
+
+    def flow_since(metric, first_day):
+        return sum(row.value for row in rows if row.metric == metric and row.day >= first_day)
+
+    new_users, new_jobs, new_events, new_bulletins = _created_since(as_of)
+
+    return {
+        'users': {
+            'total': gauges['users_total'] + new_users,
+            'active': gauges['users_active'],
+            'pending': gauges['users_pending'],
+            'active_30d': gauges['users_active_30d'],
+            'new_this_month': flow_since('signups', month_start) + new_users,
+        },
+        'jobs': {
+            'total': gauges['jobs_total'] + new_jobs,
+            'active': gauges['jobs_active'],
+            'draft': gauges['jobs_draft'],
+            'new_this_month': flow_since('jobs_created', month_start) + new_jobs,
+        },
+        'events': {
+            'total': gauges['events_total'] + new_events,
+            'upcoming': gauges['events_upcoming'],
+            'new_this_month': flow_since('events_created', month_start) + new_events,
+        },
+        'bulletins': {
+            'total': gauges['bulletins_total'] + new_bulletins,
+            'published': gauges['bulletins_published'],
+            'new_this_month': flow_since('bulletins_created', month_start) + new_bulletins,
+            'new_this_week': flow_since('bulletins_created', week_start) + new_bulletins,
+        },
+        'as_of': as_of.isoformat(),
+    }
+
+
+def _bucket(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def metric_series(metrics, start, end, interval='day'):
+    """
+    指標時間序列
+
+    流量指標以區間加總、沒有資料的區間補 0；每日不重複人數（DAILY_DISTINCT_METRICS，如 active_users）
+    取區間內單日最大值，週 / 月區間即尖峰日的人數，而非區間內的不重複人數；
+    存量指標取區間內最後一天的快照，沒有快照時為 None。今天的數值為最近一次彙總的結果。
+
+    Returns:
+        dict: 指標 -> [{'date': 區間起始日期, 'value': 數值}, ...]
+    """
+    buckets = []
+    day = start
+    while day <= end:
+        bucket = _bucket(day, interval)
+        if not buckets or buckets[-1] != bucket:
+            buckets.append(bucket)
+        day += timedelta(days=1)
+
+    series = {metric: dict.fromkeys(buckets, 0 if metric in FLOW_METRICS else None) for metric in metrics}
+    rows = db.session.query(DailyStat.metric, DailyStat.day, DailyStat.value).filter(
+        DailyStat.metric.in_(metrics), DailyStat.day >= start, DailyStat.day <= end
+    ).order_by(DailyStat.day)
+    for metric, day, value in rows:
+        bucket = _bucket(day, interval)
+        if metric in DAILY_DISTINCT_METRICS:
+            series[metric][bucket] = max(series[metric][bucket], value)
+        elif metric in FLOW_METRICS:
+            series[metric][bucket] += value
+        else:
+            series[metric][bucket] = value
+
+    return {
+        metric: [{'date': bucket.isoformat(), 'value': value} for bucket, value in values.items()]
+        for metric, values in series.items()
+    }
@@ -0,0 +1,405 @@
+"""
+檔案上傳模組
+上傳內容邊讀邊寫入上傳目錄中的暫存檔，同時累計大小與計算 SHA-256，超過上限時立即中止；
+收齊後以 os.replace 原子地改名為最終檔名（暫存檔與最終檔案在同一目錄，不會看到寫到一半的檔案）
+
+- 單次上傳（multipart）：Content-Length 已超過上限時不讀取內容直接拒絕；
+  以 FormDataParser 的 stream_factory 讓檔案欄位直接寫入暫存檔，不經過 Werkzeug 的 SpooledTemporaryFile
+- 分段上傳（可續傳）：UploadSession 記錄檔案資訊，已接收的位元組存放在 .partial/<upload_id>.part，
+  用戶端以 Upload-Offset 標頭依序送出各段，斷線後查詢 offset 從中斷處繼續
+"""
+import fcntl
+import hashlib
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from werkzeug.formparser import FormDataParser
+from werkzeug.utils import secure_filename
+
+from src.models_v2 import db, FileUpload, UploadSession
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'pdf', 'doc', 'docx'}
+
+READ_SIZE = 64 * 1024
+# multipart 邊界與欄位標頭的額外位元組：Content-Length 超過上限加上此值時不讀取內容直接拒絕
+MULTIPART_OVERHEAD = 16 * 1024
+
+PARTIAL_DIR = '.partial'
+TEMP_PREFIX = '.upload-'
+# 單次上傳的暫存檔在請求結束時就會改名或刪除，超過此時間仍存在的是中斷留下的殘檔
+STALE_TEMP_SECONDS = 3600
+
+
+class UploadTooLarge(Exception):
+    """上傳內容超過大小上限"""
+
+    def __init__(self, limit):
+        super().__init__(f'Upload exceeds {limit} bytes')
+        self.limit = limit
+
+
+class OffsetMismatch(Exception):
+    """分段上傳的 Upload-Offset 與已接收的位元組數不符"""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected offset {offset}')
+        self.offset = offset
+
+
+class ChecksumMismatch(Exception):
+    """收齊的內容與用戶端提供的 SHA-256 不符"""
+
+
+class UploadBusy(Exception):
+    """同一個分段上傳正有另一個請求在寫入（例如逾時後重送）"""
+
+
+# ========================================
+# 共用
+# ========================================
+def upload_folder():
+    """上傳目錄（UPLOAD_FOLDER，預設為 static/uploads）"""
+    return current_app.config.get('UPLOAD_FOLDER') or os.path.join(current_app.static_folder, 'uploads')
+
+
+def file_extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+
+class HashingWriter:
+    """
+    寫入時同步累計大小與計算 SHA-256 的檔案包裝
+
+    超過 max_bytes 的那一段不會寫入，直接拋出 UploadTooLarge；其餘屬性（seek、close 等）轉給內部檔案
+    """
+
+    def __init__(self, file, max_bytes, hasher=None, size=0):
+        self.file = file
+        self.max_bytes = max_bytes
+        self.hasher = hasher or hashlib.sha256()
+        self.size = size
+
+    def write(self, data):
+        if self.size + len(data) > self.max_bytes:
+            raise UploadTooLarge(self.max_bytes)
+        self.hasher.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    @property
+    def sha256(self):
+        return self.hasher.hexdigest()
+
+
+def _commit_file(file, destination):
+    """寫入磁碟後原子地改名"""
+    file.flush()
+    os.fsync(file.fileno())
+    file.close()
+    os.replace(file.name, destination)
+
+
+def _record(user_id, filename, stored_name, size, file_type, related_type=None, related_id=None):
+    """建立 FileUpload 紀錄（不 commit）"""
+    file_upload = FileUpload(
+        user_id=user_id,
+        file_name=filename,
+        file_path=f'/static/uploads/{stored_name}',
+        file_type=file_type,
+        file_size=size,
+        related_type=related_type,
+        related_id=related_id
+    )
+    db.session.add(file_upload)
+    return file_upload
+
+
+def _stored_name(filename):
+    return f'{uuid.uuid4()}_{filename}'
+
+
+# ========================================
+# 單次上傳
+# ========================================
+def parse_multipart_upload(request, max_bytes):
+    """
+    串流解析 multipart 上傳，檔案欄位直接寫入上傳目錄中的暫存檔
+
+    Returns:
+        tuple: (form, files, writers)；files 中每個 FileStorage.stream 都是 HashingWriter，
+        未透過 save_upload 保存的暫存檔需以 discard_uploads(writers) 刪除
+
+    Raises:
+        UploadTooLarge: Content-Length 或實際讀到的檔案內容超過上限
+    """
+    if request.content_length is not None and request.content_length > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadTooLarge(max_bytes)
+
+    directory = upload_folder()
+    os.makedirs(directory, exist_ok=True)
+    writers = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        temp = tempfile.NamedTemporaryFile(dir=directory, prefix=TEMP_PREFIX, suffix='.part', delete=False)
+        writer = HashingWriter(temp, max_bytes)
+        writers.append(writer)
+        return writer
+
+    parser = FormDataParser(stream_factory=stream_factory,
+                            max_form_memory_size=request.max_form_memory_size,
+                            max_content_length=request.max_content_length,
+                            max_form_parts=request.max_form_parts)
+    try:
+        _, form, files = parser.parse(request.stream, request.mimetype, request.content_length,
+                                      request.mimetype_params)
+    except BaseException:
+        discard_uploads(writers)
+        raise
+    return form, files, writers
+
+
+def save_upload(user_id, storage, related_type=None, related_id=None):
+    """
+    將 parse_multipart_upload 寫好的暫存檔改名為最終檔名並建立 FileUpload（不 commit）
+
+    Returns:
+        tuple: (FileUpload, SHA-256 十六進位字串)
+    """
+    writer = storage.stream
+    filename = secure_filename(storage.filename)
+    stored_name = _stored_name(filename)
+    _commit_file(writer.file, os.path.join(upload_folder(), stored_name))
+    file_type = storage.content_type or f'application/{file_extension(filename)}'
+    return _record(user_id, filename, stored_name, writer.size, file_type, related_type, related_id), writer.sha256
+
+
+def discard_uploads(writers):
+    """刪除尚未改名的暫存檔"""
+    for writer in writers:
+        writer.file.close()
+        try:
+            os.unlink(writer.file.name)
+        except FileNotFoundError:
+            pass
+
+
+# ========================================
+# 分段上傳
+# ========================================
+# 各工作階段目前的 SHA-256 狀態 {upload_id: (offset, hasher)}；
+# 同一 worker 接續上傳時直接沿用，換 worker 或重啟後從磁碟上已接收的內容重算一次
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def partial_path(upload_id):
+    return os.path.join(upload_folder(), PARTIAL_DIR, f'{upload_id}.part')
+
+
+def partial_offset(session):
+    """已接收的位元組數"""
+    try:
+        return os.path.getsize(partial_path(session.upload_id))
+    except FileNotFoundError:
+        return 0
+
+
+def create_upload_session(user_id, filename, size, file_type=None, checksum=None,
+                          related_type=None, related_id=None):
+    """建立分段上傳工作階段與空的 .part 檔（commit）"""
+    session = UploadSession(
+        upload_id=secrets.token_urlsafe(24),
+        user_id=user_id,
+        file_name=secure_filename(filename),
+        file_type=file_type or f'application/{file_extension(filename)}',
+        total_size=size,
+        checksum=checksum.lower() if checksum else None,
+        related_type=related_type,
+        related_id=related_id,
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['UPLOAD_SESSION_TTL'])
+    )
+    os.makedirs(os.path.dirname(partial_path(session.upload_id)), exist_ok=True)
+    open(partial_path(session.upload_id), 'wb').close()
+    db.session.add(session)
+    db.session.commit()
+    return session
+
+
+def _resume_hasher(upload_id, path, offset):
+    with _hashers_lock:
+        cached = _hashers.pop(upload_id, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_SIZE), b''):
+            hasher.update(block)
+    return hasher
+
+
+def _remember_hasher(upload_id, writer):
+    with _hashers_lock:
+        _hashers[upload_id] = (writer.size, writer.hasher)
+
+
+def append_chunk(session, stream, offset, content_length=None):
+    """
+    把請求內容接在已接收的位元組之後，收齊時完成上傳
+
+    用戶端需依序送出各段；中途斷線時已寫入的部分保留，以回傳的 offset 繼續上傳。
+    以 .part 檔的 flock 讓同一個 upload_id 一次只有一個請求檢查 offset 與寫入（含完成），
+    不等待鎖（eventlet 下阻塞的 flock 會卡住整個 worker），搶不到時直接拋出 UploadBusy
+
+    Returns:
+        tuple: (新的 offset, 收齊時的 (FileUpload, SHA-256) 或 None)
+
+    Raises:
+        FileNotFoundError: 工作階段已完成或已取消
+        UploadBusy: 另一個請求正在寫入
+        OffsetMismatch: offset 與已接收的位元組數不符
+        UploadTooLarge: 內容超過工作階段宣告的檔案大小
+        ChecksumMismatch: 收齊的內容與宣告的 SHA-256 不符（見 complete_upload）
+    """
+    path = partial_path(session.upload_id)
+    # 不用 'ab'：檔案已被完成或取消刪除時不應重新建立
+    with open(path, 'r+b') as f:
+        _lock_partial(f)
+
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise OffsetMismatch(current)
+        if content_length is not None and current + content_length > session.total_size:
+            raise UploadTooLarge(session.total_size)
+
+        hasher = _resume_hasher(session.upload_id, path, current)
+        f.seek(current)
+        writer = HashingWriter(f, session.total_size, hasher, size=current)
+        try:
+            for block in iter(lambda: stream.read(READ_SIZE), b''):
+                writer.write(block)
+        except UploadTooLarge:
+            # 捨棄這一段，保留先前已接收的內容（雜湊狀態不再沿用，下次從磁碟重算）
+            f.truncate(current)
+            raise
+        except BaseException:
+            # 中途斷線：已寫入的部分保留，雜湊狀態與寫入的內容一致
+            f.flush()
+            _remember_hasher(session.upload_id, writer)
+            raise
+        f.flush()
+
+        if writer.size < session.total_size:
+            _remember_hasher(session.upload_id, writer)
+            session.expires_at = datetime.utcnow() + timedelta(seconds=current_app.config['UPLOAD_SESSION_TTL'])
+            db.session.commit()
+            return writer.size, None
+
+        # 仍持有鎖時完成，避免兩個請求都看到已收齊而重複建立檔案
+        return writer.size, (complete_upload(session, writer.sha256), writer.sha256)
+
+
+def _lock_partial(f):
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise UploadBusy() from None
+
+
+def complete_upload(session, sha256):
+    """
+    收齊後改名為最終檔名、建立 FileUpload 並刪除工作階段（commit；呼叫端需持有 .part 的鎖）
+
+    Raises:
+        ChecksumMismatch: 與建立工作階段時提供的 SHA-256 不符（工作階段與已接收內容一併刪除）
+    """
+    if session.checksum and session.checksum != sha256:
+        _discard_session(session)
+        raise ChecksumMismatch()
+
+    stored_name = _stored_name(session.file_name)
+    with open(partial_path(session.upload_id), 'rb+') as f:
+        _commit_file(f, os.path.join(upload_folder(), stored_name))
+    file_upload = _record(session.user_id, session.file_name, stored_name, session.total_size,
+                          session.file_type, session.related_type, session.related_id)
+    db.session.delete(session)
+    db.session.commit()
+    with _hashers_lock:
+        _hashers.pop(session.upload_id, None)
+    return file_upload
+
+
+def _discard_session(session):
+    with _hashers_lock:
+        _hashers.pop(session.upload_id, None)
+    try:
+        os.unlink(partial_path(session.upload_id))
+    except FileNotFoundError:
+        pass
+    db.session.delete(session)
+    db.session.commit()
+
+
+def abort_upload_session(session):
+    """
+    刪除工作階段與已接收的內容（commit）
+
+    Raises:
+        UploadBusy: 另一個請求正在寫入
+    """
+    try:
+        f = open(partial_path(session.upload_id), 'rb')
+    except FileNotFoundError:
+        _discard_session(session)
+        return
+    with f:
+        _lock_partial(f)
+        _discard_session(session)
+
+
+def purge_expired_uploads(now=None):
+    """
+    刪除過期的分段上傳工作階段與中斷留下的暫存檔（排程工作）
+
+    Returns:
+        int: 刪除的工作階段數
+    """
+    now = now or datetime.utcnow()
+    try:
+        expired = UploadSession.query.filter(UploadSession.expires_at <= now).all()
+        purged = 0
+        for session in expired:
+            try:
+                abort_upload_session(session)
+            except UploadBusy:
+                # 仍在寫入中，下次再清理
+                continue
+            purged += 1
+    except Exception:
+        db.session.rollback()
+        raise
+
+    directory = upload_folder()
+    if os.path.isdir(directory):
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        for entry in os.scandir(directory):
+            if entry.name.startswith(TEMP_PREFIX) and entry.stat().st_mtime < cutoff:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    if purged:
+        logger.info(f"Purged {purged} expired upload sessions")
+    return purged
@@ -9,6 +9,9 @@ import os
 # 添加專案根目錄到 Python 路徑
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# 測試時不啟動背景排程，排程工作由測試直接呼叫
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+
 
 def _activate_user(client, email):
     """輔助函式：將使用者狀態設為 active（因為註冊後預設是 pending）"""
@@ -20,34 +23,68 @@ def _activate_user(client, email):
             db.session.commit()
 
 
+@pytest.fixture(scope='session')
+def _flask_app(tmp_path_factory):
+    """
+    整個測試工作階段共用的應用程式（create_app 只執行一次）
+
+    使用暫存目錄中的 SQLite 檔案：背景執行緒、連線池監控與 WAL 都需要真正的檔案資料庫
+    """
+    from src.app import create_app
+    from src.config.database import sqlite_engine_options
+
+    database_path = tmp_path_factory.mktemp('database') / 'test.db'
+    upload_folder = tmp_path_factory.mktemp('uploads')
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': sqlite_engine_options(),
+        'DATABASE_REPLICA_URLS': [],
+        'UPLOAD_FOLDER': str(upload_folder),
+        'SECRET_KEY': 'test-secret-key',
+        'JWT_SECRET_KEY': 'test-jwt-secret-key',
+        'WTF_CSRF_ENABLED': False,  # 測試時停用 CSRF
+        'PRESERVE_CONTEXT_ON_EXCEPTION': False,
+    })
+
+
 @pytest.fixture(scope='function')
-def app():
+def app(_flask_app):
     """
     創建 Flask 應用程式實例
 
     使用 function scope 確保每個測試都有獨立的資料庫
     符合 pytest-flask 最佳實踐
     """
-    from src.main_v2 import app as flask_app
     from src.extensions import limiter
+    from src.utils.cache import response_cache
+    from src.utils.counting import count_cache
+    from src.utils.directory import clear_facet_cache
+    from src.utils.contact_graph import contact_graph
+    from src.utils.job_matching import clear_vocabulary_cache, match_refresh_queue
+    from src.utils.performance import metrics_pipeline, performance_monitor
+    from src.utils.sql_monitor import sql_monitor
+    from src.utils.pool_monitor import pool_monitor
 
     # 測試環境停用 rate limiter
     limiter.enabled = False
 
-    # 測試環境配置
-    flask_app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
-        'SECRET_KEY': 'test-secret-key',
-        'JWT_SECRET_KEY': 'test-jwt-secret-key',
-        'WTF_CSRF_ENABLED': False,  # 測試時停用 CSRF
-        'PRESERVE_CONTEXT_ON_EXCEPTION': False,
-    })
+    # 每個測試使用全新資料庫，清除前一個測試留下的各種行程內快取與待處理佇列
+    response_cache.clear()
+    count_cache.clear()
+    clear_facet_cache()
+    contact_graph.clear()
+    match_refresh_queue.clear()
+    clear_vocabulary_cache()
+    metrics_pipeline.clear()
+    performance_monitor.reset()
+    sql_monitor.reset()
+    pool_monitor.reset()
 
-    with flask_app.app_context():
+    with _flask_app.app_context():
         from src.models_v2 import db
         db.create_all()
-        yield flask_app
+        yield _flask_app
         db.session.remove()
         db.drop_all()
 
@@ -158,3 +195,120 @@ def second_user_token(client):
 
     data = response.get_json()
     return data.get('access_token')
+
+@pytest.fixture
+def query_budget(app):
+    """
+    SQL 查詢數上限檢查
+
+    用法：
+        with query_budget(5) as statements:
+            client.get('/api/v2/jobs')
+
+    區塊內執行的 SQL 超過上限時測試失敗，並列出所有語句方便找出 N+1。
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from src.models_v2 import db
+
+    @contextmanager
+    def budget(max_statements):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+        if len(statements) > max_statements:
+            listing = '\n\n'.join(statements)
+            pytest.fail(f"Executed {len(statements)} statements (budget {max_statements}):\n{listing}")
+
+    return budget
+
+
+# ========================================
+# 微基準測試
+# ========================================
+_benchmark_results = []
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    import time
+
+    class _FallbackBenchmark:
+        """
+        pytest-benchmark 未安裝時的替代 fixture
+
+        支援 benchmark(fn, ...) 與 benchmark.pedantic(...)，以 perf_counter 計時，
+        結果列在測試結束的摘要中；需要比較基準時請安裝 pytest-benchmark（--benchmark-save / --benchmark-compare）
+        """
+
+        def __init__(self, name):
+            self.name = name
+            self.timings = []
+
+        def __call__(self, fn, *args, **kwargs):
+            # 與 pytest-benchmark 預設相同：至少 5 輪，總計約 1 秒
+            started = time.perf_counter()
+            while True:
+                result = self._time(fn, args, kwargs)
+                if len(self.timings) >= 5 and time.perf_counter() - started >= 1.0:
+                    return result
+
+        def pedantic(self, target, args=(), kwargs=None, setup=None, rounds=1, warmup_rounds=0, iterations=1):
+            result = None
+            for round_number in range(warmup_rounds + rounds):
+                if setup is not None:
+                    args, kwargs = setup() or (args, kwargs)
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    result = target(*args, **(kwargs or {}))
+                if round_number >= warmup_rounds:
+                    self.timings.append((time.perf_counter() - started) / iterations)
+            return result
+
+        def _time(self, fn, args, kwargs):
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.timings.append(time.perf_counter() - started)
+            return result
+
+        @property
+        def stats(self):
+            timings = sorted(self.timings)
+            if not timings:
+                return {}
+            return {
+                'rounds': len(timings),
+                'min': timings[0],
+                'max': timings[-1],
+                'mean': sum(timings) / len(timings),
+                'median': timings[len(timings) // 2],
+            }
+
+    @pytest.fixture
+    def benchmark(request):
+        """pytest-benchmark 的 benchmark fixture 替代品"""
+        bench = _FallbackBenchmark(request.node.nodeid)
+        yield bench
+        if bench.timings:
+            _benchmark_results.append((bench.name, bench.stats))
+
+
+def pytest_terminal_summary(terminalreporter):
+    """列出替代 benchmark fixture 的計時結果（毫秒）"""
+    if not _benchmark_results:
+        return
+    terminalreporter.section('benchmark (fallback, ms)')
+    for name, stats in _benchmark_results:
+        terminalreporter.write_line(
+            f"{name}: mean {stats['mean'] * 1000:.2f}  median {stats['median'] * 1000:.2f}  "
+            f"min {stats['min'] * 1000:.2f}  max {stats['max'] * 1000:.2f}  rounds {stats['rounds']}"
+        )
@@ -0,0 +1,96 @@
+"""
+應用程式工廠測試
+create_app 會重新綁定 socketio、pool_monitor 等全域物件，另建應用程式的情境在子行程中執行
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_in_subprocess(code, tmp_path, **env_overrides):
+    env = dict(os.environ, SCHEDULER_ENABLED='false', DATABASE_URL=f"sqlite:///{tmp_path / 'factory.db'}")
+    env.update(env_overrides)
+    env.pop('FLASK_ENV', None)
+    env.pop('PRODUCTION', None)
+    completed = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class TestCreateApp:
+    """create_app 設定測試"""
+
+    def test_blueprint_manifest_and_lazy_setup(self, tmp_path):
+        """測試只註冊清單中的藍圖、不建立資料表、不載入 Alembic 與未使用的路由模組"""
+        result = _run_in_subprocess("""
+import json, sys
+from src.app import create_app
+from sqlalchemy import inspect
+app = create_app({'BLUEPRINTS': ['src.routes.auth_v2:auth_v2_bp'], 'AUTO_INIT_DATABASE': False})
+with app.app_context():
+    from src.models_v2 import db
+    tables = inspect(db.engine).get_table_names()
+print(json.dumps({
+    'blueprints': sorted(app.blueprints),
+    'tables': tables,
+    'migrate': 'migrate' in app.extensions,
+    'alembic': 'alembic' in sys.modules,
+    'jobs_routes': 'src.routes.jobs_v2' in sys.modules,
+}))
+""", tmp_path)
+
+        assert result['blueprints'] == ['auth_v2']
+        assert result['tables'] == []
+        assert result['migrate'] is False and result['alembic'] is False
+        assert result['jobs_routes'] is False
+
+    def test_dev_initializes_database(self, tmp_path):
+        """測試開發環境預設建立資料表並填入示範資料"""
+        result = _run_in_subprocess("""
+import json
+from src.app import create_app
+app = create_app()
+with app.app_context():
+    from src.models_v2 import User
+    print(json.dumps({'auto_init': app.config['AUTO_INIT_DATABASE'], 'users': User.query.count()}))
+""", tmp_path)
+
+        assert result == {'auto_init': True, 'users': 3}
+
+    def test_production_requires_secrets(self):
+        """測試生產環境未設定金鑰時拒絕啟動"""
+        from src.app import create_app
+
+        with pytest.raises(ValueError):
+            create_app({'PRODUCTION': True, 'SECRET_KEY': None, 'JWT_SECRET_KEY': None})
+
+    def test_testing_app_skips_init(self, app):
+        """測試 TESTING 設定下不自動初始化資料庫，且停用 rate limiter"""
+        from src.extensions import limiter
+
+        assert app.config['AUTO_INIT_DATABASE'] is False
+        assert limiter.enabled is False
+
+    def test_flask_cli_does_not_start_background_threads(self, tmp_path):
+        """測試 flask CLI 指令載入 main_v2 時不啟動排程與指標 flusher，直接載入（gunicorn）時才啟動"""
+        report_threads = (
+            "import atexit, json, threading\n"
+            "atexit.register(lambda: print(json.dumps(sorted(t.name for t in threading.enumerate()))))\n"
+        )
+
+        cli = _run_in_subprocess(report_threads + """
+import sys
+from flask.cli import main
+sys.argv = ['flask', '--app', 'src.main_v2', 'check-indexes']
+main()
+""", tmp_path, SCHEDULER_ENABLED='true')
+        served = _run_in_subprocess(report_threads + "import src.main_v2\n", tmp_path, SCHEDULER_ENABLED='true')
+
+        assert 'scheduler' not in cli and 'metrics-flusher' not in cli
+        assert 'scheduler' in served and 'metrics-flusher' in served
@@ -0,0 +1,248 @@
+"""
+熱點路徑微基準測試
+量測認證、序列化、搜尋、CSV 匯出入與建立通知的耗時，並以 query_budget 固定每條路徑的查詢數
+
+安裝 pytest-benchmark 時使用其 benchmark fixture，可保存並比較基準：
+    python -m pytest tests/test_benchmarks.py --benchmark-save=baseline
+    python -m pytest tests/test_benchmarks.py --benchmark-compare
+未安裝時由 conftest 的替代 fixture 計時，結果列在測試摘要中
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+ROWS = 1000
+EXPORT_ROWS = 10000
+IMPORT_ROWS = 5000
+AUTHORS = 20
+
+# 認證：使用者 + session 驗證
+AUTH_BUDGET = 2
+# 搜尋：認證 + COUNT + 資料列（發布者、profile、分類以 JOIN 一併載入）
+SEARCH_BUDGET = AUTH_BUDGET + 2
+
+
+def _measure(benchmark, query_budget, budget, fn, rounds=3):
+    """先在查詢數上限內執行一次（兼作暖身），再計時 rounds 輪"""
+    with query_budget(budget):
+        result = fn()
+    benchmark.pedantic(fn, rounds=rounds, iterations=1)
+    return result
+
+
+def _insert(model, rows):
+    from src.models_v2 import db
+
+    db.session.execute(model.__table__.insert(), rows)
+    db.session.commit()
+
+
+@pytest.fixture
+def authors(app):
+    """建立多位有 profile 的作者，回傳 id 列表"""
+    from src.models_v2 import User, UserProfile
+
+    _insert(User, [{'email': f'bench{i}@example.com', 'password_hash': 'x', 'role': 'user', 'status': 'active'}
+                   for i in range(AUTHORS)])
+    ids = [user.id for user in User.query.filter(User.email.like('bench%')).order_by(User.id)]
+    _insert(UserProfile, [{'user_id': user_id, 'full_name': f'校友{i}', 'display_name': f'校友{i}',
+                           'current_company': '台積電', 'current_position': '工程師'}
+                          for i, user_id in enumerate(ids)])
+    return ids
+
+
+def _seed_jobs(authors, count):
+    from src.models_v2 import Job, JobCategory
+
+    _insert(JobCategory, [{'name': f'基準職缺分類{i}'} for i in range(5)])
+    categories = [category.id for category in JobCategory.query.filter(JobCategory.name.like('基準%'))]
+    _insert(Job, [{'user_id': authors[i % len(authors)], 'category_id': categories[i % len(categories)],
+                   'title': f'後端工程師 {i}', 'company': '台積電', 'location': '新竹',
+                   'description': '負責後端服務開發與維運。' * 5} for i in range(count)])
+
+
+def _seed_events(authors, count):
+    from src.models_v2 import Event, EventCategory
+    from src.models_v2.events import EventStatus
+
+    _insert(EventCategory, [{'name': f'基準活動分類{i}'} for i in range(5)])
+    categories = [category.id for category in EventCategory.query.filter(EventCategory.name.like('基準%'))]
+    start = datetime.utcnow() + timedelta(days=7)
+    _insert(Event, [{'organizer_id': authors[i % len(authors)], 'category_id': categories[i % len(categories)],
+                     'title': f'系友聚會 {i}', 'description': '年度系友交流活動。' * 5, 'location': '台北',
+                     'start_time': start, 'end_time': start + timedelta(hours=2), 'max_participants': 50,
+                     'status': EventStatus.UPCOMING} for i in range(count)])
+
+
+def _seed_bulletins(authors, count):
+    from src.models_v2 import Bulletin, BulletinCategory
+    from src.models_v2.content import ContentStatus
+
+    _insert(BulletinCategory, [{'name': f'基準公告分類{i}'} for i in range(5)])
+    categories = [category.id for category in BulletinCategory.query.filter(BulletinCategory.name.like('基準%'))]
+    _insert(Bulletin, [{'author_id': authors[i % len(authors)], 'category_id': categories[i % len(categories)],
+                        'title': f'系友會公告 {i}', 'content': '台積電參訪活動報名開始。' * 5,
+                        'status': ContentStatus.PUBLISHED} for i in range(count)])
+
+
+def _seed_articles(authors, count):
+    from src.models_v2 import Article
+    from src.models_v2.content import ContentStatus
+
+    _insert(Article, [{'author_id': authors[i % len(authors)], 'title': f'系友專訪 {i}',
+                       'content': '在台積電工作的日子。' * 5, 'status': ContentStatus.PUBLISHED}
+                      for i in range(count)])
+
+
+def _seed_conversations(authors, count):
+    from src.models_v2 import Conversation, Message, User
+
+    # 每組 (user1, user2) 只能有一個對話，另外建立足夠的對象
+    _insert(User, [{'email': f'peer{i}@example.com', 'password_hash': 'x', 'role': 'user', 'status': 'active'}
+                   for i in range(count // len(authors) + 1)])
+    peers = [user.id for user in User.query.filter(User.email.like('peer%')).order_by(User.id)]
+    now = datetime.utcnow()
+    _insert(Conversation, [{'user1_id': authors[i % len(authors)], 'user2_id': peers[i // len(authors)],
+                            'last_message_at': now, 'last_message_preview': '嗨'} for i in range(count)])
+    ids = [conversation.id for conversation in Conversation.query.order_by(Conversation.id)]
+    _insert(Message, [{'conversation_id': conversation_id, 'sender_id': authors[i % len(authors)], 'content': '嗨'}
+                      for i, conversation_id in enumerate(ids)])
+
+
+class TestAuthBenchmark:
+    """認證裝飾器"""
+
+    def test_token_required(self, app, benchmark, query_budget, auth_token):
+        """測試 token_required 的解碼與查詢開銷"""
+        from src.routes.auth_v2 import token_required
+
+        view = token_required(lambda current_user: current_user.id)
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        def call():
+            with app.test_request_context(headers=headers):
+                return view()
+
+        user_id = _measure(benchmark, query_budget, AUTH_BUDGET, call, rounds=50)
+        assert isinstance(user_id, int)
+
+
+class TestSerializationBenchmark:
+    """to_dict 序列化"""
+
+    @pytest.mark.parametrize('model_name, seed, budget', [
+        ('Job', _seed_jobs, 1),
+        ('Event', _seed_events, 1),
+        # Conversation.to_dict 的 message_count 每筆各查一次；列表端點改用 conversation_serializer 整頁 GROUP BY
+        ('Conversation', _seed_conversations, 1 + ROWS),
+    ], ids=['job', 'event', 'conversation'])
+    def test_to_dict(self, app, authors, benchmark, query_budget, model_name, seed, budget):
+        """測試 1k 筆資料（含關聯 eager loading）的 to_dict"""
+        import src.models_v2 as models
+        from src.utils.serializers import conversation_serializer, event_serializer, job_serializer
+
+        seed(authors, ROWS)
+        model = getattr(models, model_name)
+        serializer = {'Job': job_serializer, 'Event': event_serializer,
+                      'Conversation': conversation_serializer}[model_name]
+
+        def serialize():
+            return [obj.to_dict() for obj in model.query.options(*serializer.loader_options()).all()]
+
+        rows = _measure(benchmark, query_budget, budget, serialize)
+        assert len(rows) == ROWS
+
+
+class TestSearchBenchmark:
+    """全文搜尋"""
+
+    @pytest.mark.parametrize('search_type, seed, keyword', [
+        ('jobs', _seed_jobs, '後端'),
+        ('events', _seed_events, '聚會'),
+        ('bulletins', _seed_bulletins, '台積電'),
+        ('articles', _seed_articles, '台積電'),
+        ('users', None, '台積電'),
+    ], ids=['jobs', 'events', 'bulletins', 'articles', 'users'])
+    def test_global_search(self, client, authors, auth_token, benchmark, query_budget, search_type, seed, keyword):
+        """測試各模組在 1k 筆資料中搜尋一頁結果的耗時與查詢數"""
+        if seed is not None:
+            seed(authors, ROWS)
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        def search():
+            return client.get(f'/api/v2/search?q={keyword}&type={search_type}&per_page=20', headers=headers)
+
+        response = _measure(benchmark, query_budget, SEARCH_BUDGET, search, rounds=10)
+        assert response.status_code == 200
+        assert len(response.get_json()['results']) == 20
+
+
+class TestCSVBenchmark:
+    """CSV 匯出與匯入"""
+
+    @pytest.mark.parametrize('name, seed, budget', [
+        ('users', None, 1),
+        ('jobs', _seed_jobs, 2),
+        ('events', _seed_events, 2),
+        ('bulletins', _seed_bulletins, 1),
+    ], ids=['users', 'jobs', 'events', 'bulletins'])
+    def test_export(self, app, authors, benchmark, query_budget, name, seed, budget):
+        """測試匯出 10k 筆資料，查詢數不隨筆數成長"""
+        from src.models_v2 import User
+        from src.routes import csv_import_export
+
+        if seed is None:
+            _insert(User, [{'email': f'export{i}@example.com', 'password_hash': 'x', 'role': 'user',
+                            'status': 'active'} for i in range(EXPORT_ROWS)])
+        else:
+            seed(authors, EXPORT_ROWS)
+        export = getattr(csv_import_export, f'export_{name}_csv')
+
+        content = _measure(benchmark, query_budget, budget, export, rounds=1)
+        lines = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        assert len(lines) - 1 >= EXPORT_ROWS
+
+    def test_import_users(self, client, admin_token, benchmark, query_budget):
+        """測試匯入 5k 筆系友（每批一次查詢既有帳號並整批寫入）"""
+        from src.models_v2 import DirectoryEntry, User
+        from src.routes.csv_import_export import IMPORT_BATCH_SIZE
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['電子郵件', '姓名', '顯示名稱', '畢業年份', '屆數', '目前公司', '職位', '個人網站', 'LinkedIn'])
+        for i in range(IMPORT_ROWS):
+            writer.writerow([f'import{i}@example.com', f'校友{i}', '', 2000 + i % 20, 89 + i % 20, '台積電', '工程師', '', ''])
+        content = output.getvalue().encode('utf-8-sig')
+        headers = {'Authorization': f'Bearer {admin_token}'}
+
+        def upload():
+            return client.post('/api/csv/import/users', headers=headers, content_type='multipart/form-data',
+                               data={'file': (io.BytesIO(content), 'users.csv')})
+
+        # 認證 + 每批：查既有帳號、寫入使用者、寫入 profile、重建通訊錄項目（SELECT + DELETE + INSERT）
+        batches = -(-IMPORT_ROWS // IMPORT_BATCH_SIZE)
+        with query_budget(AUTH_BUDGET + batches * 6):
+            response = benchmark.pedantic(upload, rounds=1, iterations=1)
+
+        assert response.status_code == 200
+        assert response.get_json()['imported'] == IMPORT_ROWS
+        assert User.query.filter(User.email.like('import%')).count() == IMPORT_ROWS
+        assert DirectoryEntry.query.filter(DirectoryEntry.email.like('import%')).count() == IMPORT_ROWS
+        assert not User.query.filter_by(email='import0@example.com').first().check_password('')
+
+
+class TestNotificationBenchmark:
+    """建立通知"""
+
+    def test_create_notification(self, app, authors, benchmark, query_budget):
+        """測試建立通知（寫入、未讀數、推播內容）"""
+        from src.models_v2 import NotificationType
+        from src.routes.notification_helper import create_notification
+
+        def create():
+            return create_notification(authors[0], NotificationType.SYSTEM_ANNOUNCEMENT, '系統通知', '基準測試')
+
+        notification = _measure(benchmark, query_budget, 3, create, rounds=20)
+        assert notification is not None
@@ -0,0 +1,118 @@
+"""
+條件式請求測試
+測試列表端點的 ETag 與 If-None-Match / 304 行為
+"""
+import pytest
+
+
+class TestConditionalRequests:
+    """ETag / 304 測試"""
+
+    def test_public_listing_returns_304_when_unchanged(self, client):
+        """測試公開列表（版本號 ETag）未變動時回傳 304"""
+        first = client.get('/api/v2/jobs')
+        etag = first.headers.get('ETag')
+
+        assert first.status_code == 200
+        assert etag
+
+        second = client.get('/api/v2/jobs', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_public_listing_etag_changes_after_write(self, client, auth_token):
+        """測試新增資料後 ETag 改變"""
+        etag = client.get('/api/v2/jobs').headers['ETag']
+
+        client.post(
+            '/api/v2/jobs',
+            json={
+                'title': '新職缺',
+                'company': '測試公司',
+                'description': '測試',
+                'job_type': 'full_time',
+                'category_name': '軟體工程'
+            },
+            headers={'Authorization': f'Bearer {auth_token}'}
+        )
+
+        response = client.get('/api/v2/jobs', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_notifications_returns_304_until_new_notification(self, client, auth_token_with_user_id):
+        """測試通知列表（資料列指紋 ETag）在新通知後失效"""
+        from src.models_v2 import NotificationType
+        from src.routes.notification_helper import create_notification
+
+        headers = {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+        first = client.get('/api/notifications', headers=headers)
+        etag = first.headers['ETag']
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+
+        unchanged = client.get('/api/notifications', headers={**headers, 'If-None-Match': etag})
+        assert unchanged.status_code == 304
+
+        create_notification(
+            user_id=auth_token_with_user_id['user_id'],
+            notification_type=NotificationType.SYSTEM_ANNOUNCEMENT,
+            title='系統公告',
+            message='測試'
+        )
+
+        changed = client.get('/api/notifications', headers={**headers, 'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert len(changed.get_json()['notifications']) == 1
+
+    def test_etag_depends_on_query_parameters(self, client, auth_token):
+        """測試不同分頁參數的 ETag 不同"""
+        headers = {'Authorization': f'Bearer {auth_token}'}
+        etag = client.get('/api/notifications?page=1', headers=headers).headers['ETag']
+
+        response = client.get('/api/notifications?page=2', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_conversations_support_conditional_get(self, client, auth_token):
+        """測試對話列表支援條件式請求"""
+        headers = {'Authorization': f'Bearer {auth_token}'}
+        etag = client.get('/api/v2/conversations', headers=headers).headers['ETag']
+
+        response = client.get('/api/v2/conversations', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_user_list_etag_follows_facets(self, client, auth_token):
+        """測試系友列表的篩選結果未變、但篩選範圍外的異動改變 facets 時不回 304"""
+        from src.models_v2 import db, User, UserProfile
+
+        headers = {'Authorization': f'Bearer {auth_token}'}
+        etag = client.get('/api/v2/users?graduation_year=2020', headers=headers).headers['ETag']
+
+        user = User(email='facet_only@example.com', password_hash='x', status='active')
+        user.profile = UserProfile(full_name='範圍外', graduation_year=2015)
+        db.session.add(user)
+        db.session.commit()
+
+        response = client.get('/api/v2/users?graduation_year=2020', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['users'] == []
+        assert 2015 in [facet['value'] for facet in response.get_json()['facets']['graduation_year']]
+
+    def test_conversations_etag_follows_participant_profile(self, client, auth_token_with_user_id):
+        """測試對話對象的個人檔案異動後，對話列表不回 304"""
+        from src.models_v2 import db, Conversation, User, UserProfile
+
+        headers = {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+        other = User(email='peer@example.com', password_hash='x', status='active')
+        other.profile = UserProfile(full_name='舊名字')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Conversation(user1_id=auth_token_with_user_id['user_id'], user2_id=other.id))
+        db.session.commit()
+        etag = client.get('/api/v2/conversations', headers=headers).headers['ETag']
+
+        other.profile.full_name = '新名字'
+        db.session.commit()
+
+        response = client.get('/api/v2/conversations', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert '新名字' in response.get_data(as_text=True)
@@ -0,0 +1,148 @@
+"""
+聯絡人關係圖快取測試
+測試聯絡狀態、聯絡人清單、共同聯絡人、二度人脈，以及接受 / 拒絕後的快取更新
+"""
+import pytest
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def graph(app, auth_token_with_user_id):
+    """
+    建立關係圖（me 為目前登入使用者）：
+    me - a, me - b（b 較晚建立聯絡），a - c, b - c, b - d, c - d，以及 e 對 me 的待處理申請
+    """
+    from src.models_v2 import db, User, UserProfile, ContactRequest
+
+    me = auth_token_with_user_id['user_id']
+    users = {}
+    for name in 'abcde':
+        user = User(email=f'graph_{name}@example.com', password_hash='x', status='active')
+        user.profile = UserProfile(full_name=f'系友{name.upper()}')
+        users[name] = user
+    db.session.add_all(users.values())
+    db.session.commit()
+    ids = {name: user.id for name, user in users.items()}
+    ids['me'] = me
+
+    now = datetime.utcnow()
+    edges = [('me', 'a', 3), ('b', 'me', 1), ('a', 'c', 5), ('b', 'c', 5), ('b', 'd', 5), ('c', 'd', 5)]
+    for requester, target, days_ago in edges:
+        db.session.add(ContactRequest(requester_id=ids[requester], target_id=ids[target], status='accepted',
+                                      responded_at=now - timedelta(days=days_ago)))
+    pending = ContactRequest(requester_id=ids['e'], target_id=me, status='pending')
+    db.session.add(pending)
+    db.session.commit()
+    ids['pending_request'] = pending.id
+
+    return ids, {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+
+
+class TestContactGraph:
+    """聯絡人關係圖測試"""
+
+    def test_contacts_ordered_and_hydrated(self, client, graph, query_budget):
+        """測試聯絡人清單依建立聯絡時間排序，個人檔案一次載入"""
+        ids, headers = graph
+        client.get('/api/v2/contacts', headers=headers)
+
+        with query_budget(4):
+            data = client.get('/api/v2/contacts?page=1', headers=headers).get_json()
+
+        assert [item['id'] for item in data['data']] == [ids['b'], ids['a']]
+        assert data['data'][0]['full_name'] == '系友B'
+        assert data['pagination']['total'] == 2
+
+    def test_status_served_from_graph(self, client, graph, query_budget):
+        """測試鄰接表載入後，無申請的狀態查詢不再查詢聯絡申請"""
+        ids, headers = graph
+        client.get(f"/api/v2/contacts/status/{ids['a']}", headers=headers)
+
+        with query_budget(10) as statements:
+            data = client.get(f"/api/v2/contacts/status/{ids['d']}", headers=headers).get_json()
+
+        assert data['status'] == 'none'
+        assert not any('contact_requests' in statement for statement in statements)
+
+    def test_accept_updates_cached_graph(self, client, graph):
+        """測試接受申請後快取中的狀態與聯絡人清單立即更新"""
+        ids, headers = graph
+        assert client.get(f"/api/v2/contacts/status/{ids['e']}",
+                          headers=headers).get_json()['status'] == 'pending_received'
+
+        client.post(f"/api/v2/contact-requests/{ids['pending_request']}/accept", headers=headers)
+
+        assert client.get(f"/api/v2/contacts/status/{ids['e']}",
+                          headers=headers).get_json()['status'] == 'accepted'
+        contacts = client.get('/api/v2/contacts', headers=headers).get_json()['data']
+        assert contacts[0]['id'] == ids['e']
+
+    def test_reject_updates_cached_graph(self, client, graph):
+        """測試拒絕申請後快取中的狀態更新"""
+        ids, headers = graph
+        client.get(f"/api/v2/contacts/status/{ids['e']}", headers=headers)
+
+        client.post(f"/api/v2/contact-requests/{ids['pending_request']}/reject", headers=headers)
+
+        assert client.get(f"/api/v2/contacts/status/{ids['e']}",
+                          headers=headers).get_json()['status'] == 'rejected'
+
+    def test_mutual_contacts(self, client, graph):
+        """測試共同聯絡人"""
+        ids, headers = graph
+        data = client.get(f"/api/v2/contacts/mutual/{ids['c']}", headers=headers).get_json()
+
+        assert sorted(item['id'] for item in data['data']) == sorted([ids['a'], ids['b']])
+        assert data['total'] == 2
+
+    def test_second_degree(self, client, graph):
+        """測試二度人脈依共同聯絡人數排序，排除自己、聯絡人與待處理申請對象"""
+        ids, headers = graph
+        data = client.get('/api/v2/contacts/second-degree', headers=headers).get_json()['data']
+
+        assert [(item['id'], item['mutual_count']) for item in data] == [(ids['c'], 2), (ids['d'], 1)]
+
+    def test_fanout_is_bounded(self, app, graph):
+        """測試只展開最近建立聯絡的前 max_fanout 位聯絡人"""
+        from src.utils.contact_graph import contact_graph
+
+        ids, _ = graph
+        ranked = contact_graph.second_degree(ids['me'], max_fanout=1)
+
+        # 只展開 b（最近建立聯絡），c 只算到一位共同聯絡人
+        assert dict(ranked) == {ids['c']: 1, ids['d']: 1}
+
+    def test_contacts_include_inactive_users(self, client, graph):
+        """測試聯絡人清單沿用原本的行為列出停用帳號，total 與資料筆數一致"""
+        from src.models_v2 import db, User
+
+        ids, headers = graph
+        db.session.get(User, ids['a']).status = 'inactive'
+        db.session.commit()
+
+        data = client.get('/api/v2/contacts?per_page=1&page=2', headers=headers).get_json()
+
+        assert [item['id'] for item in data['data']] == [ids['a']]
+        assert data['pagination']['total'] == 2
+
+    def test_other_worker_write_invalidates_graph(self, client, graph):
+        """測試其他 worker 接受申請（只遞增共用版本號）後，狀態、清單與 ETag 都不再是舊的"""
+        from sqlalchemy import text
+        from src.models_v2 import db
+        from src.utils.cache import response_cache
+
+        ids, headers = graph
+        client.get(f"/api/v2/contacts/status/{ids['e']}", headers=headers)
+        etag = client.get('/api/v2/contacts', headers=headers).headers['ETag']
+
+        # 模擬另一個 worker：直接寫入資料庫（不經過本行程的 session hook），再遞增共用版本號
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE contact_requests SET status = 'accepted', responded_at = :now "
+                                    "WHERE id = :id"), {'now': datetime.utcnow(), 'id': ids['pending_request']})
+        response_cache.bump('contact_requests')
+
+        assert client.get(f"/api/v2/contacts/status/{ids['e']}",
+                          headers=headers).get_json()['status'] == 'accepted'
+        response = client.get('/api/v2/contacts', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['data'][0]['id'] == ids['e']
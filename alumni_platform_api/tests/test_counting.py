@@ -0,0 +1,115 @@
+"""
+總筆數計算策略測試
+測試快取計數的重用與失效、最後一頁免 COUNT，以及 SQLite 統計估計
+"""
+import pytest
+
+
+def _count_statements(statements):
+    return [s for s in statements if s.startswith('SELECT count(*)')]
+
+
+@pytest.fixture
+def notification_headers(app, auth_token_with_user_id):
+    """為目前使用者建立 25 筆通知"""
+    from src.models_v2 import db, Notification, NotificationType
+
+    db.session.add_all([
+        Notification(user_id=auth_token_with_user_id['user_id'],
+                     notification_type=NotificationType.SYSTEM_ANNOUNCEMENT,
+                     title=f'通知{i}', message='測試')
+        for i in range(25)
+    ])
+    db.session.commit()
+    return {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+
+
+class TestCountStrategies:
+    """計數策略測試"""
+
+    def test_cached_count_is_reused(self, client, notification_headers, query_budget):
+        """測試相同篩選條件第二次不再執行 COUNT"""
+        first = client.get('/api/notifications?per_page=10', headers=notification_headers)
+
+        with query_budget(10) as statements:
+            second = client.get('/api/notifications?per_page=10&page=2', headers=notification_headers)
+
+        assert first.get_json()['total'] == second.get_json()['total'] == 25
+        assert second.get_json()['total_exact'] is True
+        assert _count_statements(statements) == []
+
+    def test_cached_count_invalidated_by_write(self, client, notification_headers, auth_token_with_user_id):
+        """測試新增通知後計數快取失效"""
+        from src.models_v2 import NotificationType
+        from src.routes.notification_helper import create_notification
+
+        client.get('/api/notifications?per_page=10', headers=notification_headers)
+        create_notification(
+            user_id=auth_token_with_user_id['user_id'],
+            notification_type=NotificationType.SYSTEM_ANNOUNCEMENT,
+            title='新通知',
+            message='測試'
+        )
+
+        data = client.get('/api/notifications?per_page=10', headers=notification_headers).get_json()
+        assert data['total'] == 26
+
+    def test_last_page_skips_count(self, client, notification_headers, query_budget):
+        """測試不足一頁時直接推得總數"""
+        with query_budget(10) as statements:
+            data = client.get('/api/notifications?per_page=10&page=3',
+                              headers=notification_headers).get_json()
+
+        assert data['total'] == 25
+        assert data['pages'] == 3
+        assert _count_statements(statements) == []
+
+    def test_exact_requested_by_client(self, client, notification_headers, query_budget):
+        """測試用戶端可在端點接受的方式中要求精確計數"""
+        client.get('/api/notifications?per_page=10', headers=notification_headers)
+
+        with query_budget(10) as statements:
+            client.get('/api/notifications?per_page=10&count=exact', headers=notification_headers)
+
+        assert len(_count_statements(statements)) == 1
+
+
+class TestCountEstimate:
+    """估計計數測試"""
+
+    def test_sqlite_estimate_from_stat_table(self, app, monkeypatch):
+        """測試 ANALYZE 後以 sqlite_stat1 估計未篩選資料表的筆數"""
+        from sqlalchemy import text
+        from src.models_v2 import db, User
+        from src.utils import counting
+
+        db.session.add_all([User(email=f'estimate{i}@example.com', password_hash='x') for i in range(30)])
+        db.session.commit()
+        db.session.execute(text('ANALYZE'))
+        total = User.query.count()
+
+        assert counting.estimate_count(User.query) == total
+        # 有篩選條件時 SQLite 無法估計
+        assert counting.estimate_count(User.query.filter_by(status='active')) is None
+
+        monkeypatch.setattr(counting, 'ESTIMATE_EXACT_THRESHOLD', 0)
+        assert counting.count_total(User.query, accept=(counting.ESTIMATED,)) == (total, False)
+
+        # 測試資料庫跨測試共用，清掉統計資料避免影響其他測試
+        db.session.execute(text('DELETE FROM sqlite_stat1'))
+        db.session.commit()
+
+    def test_estimate_falls_back_to_exact(self, app):
+        """測試無法估計時退回精確計數"""
+        from src.models_v2 import User
+        from src.utils.counting import ESTIMATED, count_total
+
+        assert count_total(User.query.filter_by(status='active'), accept=(ESTIMATED,)) == (
+            User.query.filter_by(status='active').count(), True
+        )
+
+    def test_users_directory_reports_exactness(self, client):
+        """測試系友列表回應標示總數是否精確"""
+        data = client.get('/api/v2/users').get_json()
+
+        assert data['total_exact'] is True
@@ -114,7 +114,82 @@ update_test@example.com,更新名稱,更新,2021,111,新公司,新職位,,'''
         result = response.get_json()
         # 應該是更新而非新增
         assert result.get('updated', 0) >= 1
-    
+
+    def test_import_users_batch_rows(self, client, admin_token):
+        """測試同一檔案中重複的電子郵件視為更新、格式錯誤的資料列不影響其他列"""
+        from src.models_v2 import User
+
+        csv_content = '''電子郵件,姓名,顯示名稱,畢業年份,屆數,目前公司,職位,個人網站,LinkedIn
+batch_dup@example.com,重複測試,,2020,110,舊公司,工程師,,
+batch_bad@example.com,格式錯誤,,abc,110,,,,
+batch_dup@example.com,,,0,0,新公司,,,'''
+
+        response = client.post(
+            '/api/csv/import/users',
+            headers={'Authorization': f'Bearer {admin_token}'},
+            data={'file': (io.BytesIO(csv_content.encode('utf-8-sig')), 'batch.csv')},
+            content_type='multipart/form-data'
+        )
+
+        result = response.get_json()
+        assert (result['imported'], result['updated']) == (1, 1)
+        assert result['errors'] == ['第 3 行: 資料處理失敗']
+        profile = User.query.filter_by(email='batch_dup@example.com').first().profile
+        assert (profile.full_name, profile.display_name) == ('重複測試', '重複測試')
+        assert (profile.graduation_year, profile.current_company) == (2020, '新公司')
+
+    def test_import_users_out_of_range_year(self, client, admin_token):
+        """測試超出整數範圍的畢業年份只影響該列"""
+        from src.models_v2 import User
+
+        csv_content = '''電子郵件,姓名,顯示名稱,畢業年份,屆數,目前公司,職位,個人網站,LinkedIn
+range_ok@example.com,範圍正常,,2020,110,,,,
+range_bad@example.com,範圍錯誤,,99999999999,110,,,,'''
+
+        response = client.post(
+            '/api/csv/import/users',
+            headers={'Authorization': f'Bearer {admin_token}'},
+            data={'file': (io.BytesIO(csv_content.encode('utf-8-sig')), 'range.csv')},
+            content_type='multipart/form-data'
+        )
+
+        result = response.get_json()
+        assert result['imported'] == 1
+        assert result['errors'] == ['第 3 行: 資料處理失敗']
+        assert User.query.filter_by(email='range_ok@example.com').first() is not None
+
+    def test_import_users_batch_failure_retried_per_row(self, client, admin_token, monkeypatch):
+        """測試整批寫入失敗時逐列重試，只有出錯的那一列記為錯誤，其他列（含更新）照常寫入"""
+        from src.models_v2 import User
+        from src.routes import csv_import_export
+
+        insert_users = csv_import_export._insert_users
+
+        def failing_insert(profiles):
+            if 'retry_bad@example.com' in profiles:
+                raise RuntimeError('simulated database error')
+            return insert_users(profiles)
+
+        monkeypatch.setattr(csv_import_export, '_insert_users', failing_insert)
+        csv_content = '''電子郵件,姓名,顯示名稱,畢業年份,屆數,目前公司,職位,個人網站,LinkedIn
+admin_test@example.com,管理員,,2015,105,,,,
+retry_ok@example.com,逐列成功,,2020,110,,,,
+retry_bad@example.com,逐列失敗,,2020,110,,,,'''
+
+        response = client.post(
+            '/api/csv/import/users',
+            headers={'Authorization': f'Bearer {admin_token}'},
+            data={'file': (io.BytesIO(csv_content.encode('utf-8-sig')), 'retry.csv')},
+            content_type='multipart/form-data'
+        )
+
+        result = response.get_json()
+        assert (result['imported'], result['updated']) == (1, 1)
+        assert result['errors'] == ['第 4 行: 資料處理失敗']
+        assert User.query.filter_by(email='retry_ok@example.com').first() is not None
+        assert User.query.filter_by(email='retry_bad@example.com').first() is None
+        assert User.query.filter_by(email='admin_test@example.com').first().profile.graduation_year == 2015
+
     def test_import_without_file(self, client, admin_token):
         """測試未提供檔案時匯入"""
         response = client.post(
@@ -0,0 +1,174 @@
+"""
+系友通訊錄讀取模型測試
+測試寫入同步、關鍵字搜尋、facet 統計與單表查詢
+"""
+import pytest
+
+
+@pytest.fixture
+def alumni(app):
+    """建立三位有個人檔案的 active 系友，回傳 id 列表"""
+    from src.models_v2 import db, User, UserProfile
+
+    rows = [
+        ('王小明', '台積電', '資深工程師', 2015),
+        ('李大華', '台積電', '產品經理', 2018),
+        ('陳美玲', 'Google', 'Software Engineer', 2018),
+    ]
+    users = []
+    for i, (name, company, position, year) in enumerate(rows):
+        user = User(email=f'directory{i}@example.com', password_hash='x', status='active')
+        user.profile = UserProfile(full_name=name, current_company=company,
+                                   current_position=position, graduation_year=year,
+                                   show_phone=(i == 0), phone=f'09000000{i}')
+        users.append(user)
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def _ids(response):
+    return [item['id'] for item in response.get_json()['users']]
+
+
+class TestDirectorySync:
+    """讀取模型同步測試"""
+
+    def test_entries_created_on_insert(self, app, alumni):
+        """測試新增使用者與個人檔案後立即有通訊錄項目"""
+        from src.models_v2 import db, DirectoryEntry
+
+        entry = db.session.get(DirectoryEntry, alumni[0])
+        assert entry.full_name == '王小明'
+        assert entry.has_profile is True
+        assert '台 積 電' in entry.search_text
+        assert entry.phone == '090000000'
+        # 未公開電話的不寫入讀取模型
+        assert db.session.get(DirectoryEntry, alumni[1]).phone is None
+
+    def test_profile_update_via_api(self, client, auth_token_with_user_id):
+        """測試透過 API 更新個人檔案後通訊錄同步"""
+        from src.models_v2 import db, DirectoryEntry
+
+        headers = {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+        client.put('/api/v2/auth/profile', json={'full_name': '林同步', 'current_company': 'Sync Corp'},
+                   headers=headers)
+
+        entry = db.session.get(DirectoryEntry, auth_token_with_user_id['user_id'])
+        assert entry.full_name == '林同步'
+        assert entry.current_company == 'Sync Corp'
+
+    def test_status_change_hides_entry(self, client, alumni):
+        """測試帳號停用後不再出現在通訊錄"""
+        from src.models_v2 import db, User
+
+        user = db.session.get(User, alumni[2])
+        user.status = 'suspended'
+        db.session.commit()
+
+        assert alumni[2] not in _ids(client.get('/api/v2/users?per_page=100'))
+
+    def test_rebuild(self, app, alumni):
+        """測試全量重建與現有使用者一致"""
+        from src.models_v2 import db, DirectoryEntry, User
+        from src.utils.directory import rebuild_directory
+
+        assert rebuild_directory() == User.query.count()
+        assert db.session.get(DirectoryEntry, alumni[1]).full_name == '李大華'
+
+
+class TestDirectoryQuery:
+    """通訊錄查詢測試"""
+
+    def test_multi_term_search(self, client, alumni):
+        """測試多個關鍵字可分別命中不同欄位"""
+        assert _ids(client.get('/api/v2/users?search=台積電 經理')) == [alumni[1]]
+        assert _ids(client.get('/api/v2/users?search=software')) == [alumni[2]]
+
+    def test_wildcards_are_literal(self, client, alumni):
+        """測試搜尋字串中的 % 不會被當成萬用字元"""
+        assert _ids(client.get('/api/v2/users?search=%25')) == []
+
+    def test_filters(self, client, alumni):
+        """測試畢業年份與公司篩選"""
+        ids = _ids(client.get('/api/v2/users?graduation_year=2018&company=台積電'))
+        assert ids == [alumni[1]]
+
+    def test_facets(self, client, alumni):
+        """測試回應包含 facet 統計，資料異動後重新計算"""
+        from src.models_v2 import db, UserProfile
+
+        facets = client.get('/api/v2/users').get_json()['facets']
+        assert {'value': 2018, 'count': 2} in facets['graduation_year']
+        assert {'value': '台積電', 'count': 2} in facets['company']
+
+        profile = UserProfile.query.filter_by(user_id=alumni[0]).first()
+        profile.current_company = 'Google'
+        db.session.commit()
+
+        facets = client.get('/api/v2/users').get_json()['facets']
+        assert {'value': 'Google', 'count': 2} in facets['company']
+
+    def test_response_shape(self, client, alumni):
+        """測試列表項目維持原本格式與聯絡方式隱私設定"""
+        users = {item['id']: item for item in client.get('/api/v2/users?per_page=100').get_json()['users']}
+
+        assert users[alumni[0]]['profile']['phone'] == '090000000'
+        assert 'phone' not in users[alumni[1]]['profile']
+        assert users[alumni[1]]['profile']['email'] == 'directory1@example.com'
+
+    def test_single_table_query(self, client, alumni, query_budget):
+        """測試列表不 JOIN 也不逐筆載入個人檔案"""
+        client.get('/api/v2/users?search=台積電')
+
+        with query_budget(3) as statements:
+            client.get('/api/v2/users?search=台積電&page=1')
+
+        assert not any('user_profiles_v2' in statement for statement in statements)
+
+
+class TestDirectorySearchIndex:
+    """全文索引測試"""
+
+    def test_substring_and_prefix_match(self, client, alumni):
+        """測試中文子字串（含兩個字）與英文詞首比對"""
+        assert _ids(client.get('/api/v2/users?search=小明')) == [alumni[0]]
+        assert sorted(_ids(client.get('/api/v2/users?search=積電'))) == sorted(alumni[:2])
+        assert _ids(client.get('/api/v2/users?search=SOFT eng')) == [alumni[2]]
+        assert _ids(client.get('/api/v2/users?search=台積電 google')) == []
+
+    def test_search_uses_fts_index(self, client, alumni, query_budget):
+        """測試關鍵字查詢走 FTS5 虛擬表，不再對 search_text 做 LIKE 全表掃描"""
+        with query_budget(5) as statements:
+            client.get('/api/v2/users?search=台積電 工程師')
+
+        # 總數與分頁兩個查詢走 FTS5，其餘為篩選面向統計
+        assert len([statement for statement in statements if 'MATCH' in statement]) == 2
+        assert not any('LIKE' in statement for statement in statements)
+
+    def test_index_follows_updates(self, client, alumni):
+        """測試個人檔案異動後全文索引同步（舊的詞不再命中）"""
+        from src.models_v2 import db, UserProfile
+
+        profile = UserProfile.query.filter_by(user_id=alumni[0]).first()
+        profile.current_company = '聯發科'
+        db.session.commit()
+
+        assert _ids(client.get('/api/v2/users?search=聯發')) == [alumni[0]]
+        assert _ids(client.get('/api/v2/users?search=台積電')) == [alumni[1]]
+
+    def test_ensure_creates_missing_index(self, client, alumni):
+        """測試既有資料庫缺少全文索引時建立並全量重建"""
+        from sqlalchemy import text
+        from src.models_v2 import db
+        from src.models_v2.directory import SEARCH_FTS_TABLE
+        from src.utils.directory import ensure_directory
+
+        for suffix in ('_ai', '_ad', '_au'):
+            db.session.execute(text(f'DROP TRIGGER {SEARCH_FTS_TABLE}{suffix}'))
+        db.session.execute(text(f'DROP TABLE {SEARCH_FTS_TABLE}'))
+        db.session.commit()
+
+        ensure_directory()
+
+        assert _ids(client.get('/api/v2/users?search=小明')) == [alumni[0]]
@@ -0,0 +1,134 @@
+"""
+活動提醒排程測試
+測試到期提醒的認領、批次派送與冪等性
+"""
+import json
+import pytest
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def reminder_setup(app):
+    """建立主辦者、三位報名者與兩場即將開始的活動"""
+    from src.models_v2 import db, User, UserProfile, Event, EventRegistration
+    from src.models_v2.events import EventStatus, RegistrationStatus
+
+    organizer = User(email='organizer@example.com', password_hash='x')
+    attendees = [User(email=f'attendee{i}@example.com', password_hash='x') for i in range(3)]
+    db.session.add_all([organizer, *attendees])
+    db.session.flush()
+
+    now = datetime.utcnow()
+    soon = Event(organizer_id=organizer.id, title='即將開始的講座', description='測試',
+                 start_time=now + timedelta(minutes=30), end_time=now + timedelta(hours=2),
+                 status=EventStatus.UPCOMING)
+    tomorrow = Event(organizer_id=organizer.id, title='明天的聚會', description='測試',
+                     start_time=now + timedelta(hours=10), end_time=now + timedelta(hours=12),
+                     status=EventStatus.UPCOMING)
+    far = Event(organizer_id=organizer.id, title='下個月的工作坊', description='測試',
+                start_time=now + timedelta(days=30), end_time=now + timedelta(days=30, hours=2),
+                status=EventStatus.UPCOMING)
+    db.session.add_all([soon, tomorrow, far])
+    db.session.flush()
+
+    registrations = [
+        EventRegistration(event_id=soon.id, user_id=attendees[0].id),
+        EventRegistration(event_id=soon.id, user_id=attendees[1].id),
+        EventRegistration(event_id=soon.id, user_id=attendees[2].id,
+                          status=RegistrationStatus.CANCELLED),
+        EventRegistration(event_id=tomorrow.id, user_id=attendees[0].id),
+        EventRegistration(event_id=far.id, user_id=attendees[1].id),
+    ]
+    db.session.add_all(registrations)
+    db.session.commit()
+
+    return {
+        'attendees': [user.id for user in attendees],
+        'soon_id': soon.id,
+        'tomorrow_id': tomorrow.id,
+    }
+
+
+class TestEventReminderDispatch:
+    """活動提醒派送測試"""
+
+    def test_dispatch_due_reminders(self, app, reminder_setup):
+        """測試只對時段內且有效報名的使用者發送提醒"""
+        from src.models_v2 import Notification, EventReminderDispatch
+        from src.utils.event_reminders import dispatch_event_reminders
+
+        result = dispatch_event_reminders()
+
+        assert result['claimed'] == 3
+        assert result['sent'] == 3
+
+        reminders = Notification.query.filter_by(related_type='event').all()
+        assert sorted((n.user_id, n.related_id) for n in reminders) == sorted([
+            (reminder_setup['attendees'][0], reminder_setup['soon_id']),
+            (reminder_setup['attendees'][1], reminder_setup['soon_id']),
+            (reminder_setup['attendees'][0], reminder_setup['tomorrow_id']),
+        ])
+
+        windows = {
+            (d.event_id, d.reminder_window) for d in EventReminderDispatch.query.all()
+        }
+        assert windows == {
+            (reminder_setup['soon_id'], '1h'),
+            (reminder_setup['tomorrow_id'], '24h'),
+        }
+
+    def test_dispatch_is_idempotent(self, app, reminder_setup):
+        """測試重複執行不會重複發送"""
+        from src.models_v2 import Notification
+        from src.utils.event_reminders import dispatch_event_reminders
+
+        dispatch_event_reminders()
+        second = dispatch_event_reminders()
+
+        assert second['claimed'] == 0
+        assert second['sent'] == 0
+        assert Notification.query.count() == 3
+
+    def test_dispatch_in_small_batches(self, app, reminder_setup):
+        """測試分批派送結果與單批相同"""
+        from src.models_v2 import Notification
+        from src.utils.event_reminders import dispatch_event_reminders
+
+        result = dispatch_event_reminders(batch_size=1)
+
+        assert result['sent'] == 3
+        assert Notification.query.count() == 3
+
+    def test_skip_users_with_reminders_disabled(self, app, reminder_setup):
+        """測試關閉活動提醒的使用者會被略過"""
+        from src.models_v2 import db, UserProfile, Notification
+        from src.utils.event_reminders import dispatch_event_reminders
+
+        user_id = reminder_setup['attendees'][1]
+        db.session.add(UserProfile(
+            user_id=user_id,
+            notification_preferences=json.dumps({'eventReminders': False})
+        ))
+        db.session.commit()
+
+        result = dispatch_event_reminders()
+
+        assert result['skipped'] == 1
+        assert Notification.query.filter_by(user_id=user_id).count() == 0
+
+    def test_reclaim_stale_claims(self, app, reminder_setup):
+        """測試中斷後過期的認領會被重新派送"""
+        from src.models_v2 import db, EventReminderDispatch, Notification
+        from src.utils.event_reminders import claim_due_reminders, dispatch_event_reminders
+
+        # 模擬前一次執行只完成認領就中斷
+        stale_time = datetime.utcnow() - timedelta(hours=1)
+        claim_due_reminders('crashed-worker', stale_time + timedelta(hours=1))
+        db.session.query(EventReminderDispatch).update({'claimed_at': stale_time})
+        db.session.commit()
+
+        result = dispatch_event_reminders()
+
+        assert result['reclaimed'] == 3
+        assert result['sent'] == 3
+        assert Notification.query.count() == 3
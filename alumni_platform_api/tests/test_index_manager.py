@@ -0,0 +1,132 @@
+"""
+索引管理測試
+測試模型宣告與實際 schema 的比對、同步、Alembic revision 產生與索引建議
+"""
+import shutil
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def drifted_schema(app):
+    """少一個宣告的索引、多一個手動建立的舊索引"""
+    from src.models_v2 import db
+
+    db.session.execute(text('DROP INDEX idx_job_created_at'))
+    db.session.execute(text('CREATE INDEX idx_jobs_legacy ON jobs_v2 (title)'))
+    db.session.commit()
+
+
+class TestIndexCheck:
+    """宣告與實際索引比對測試"""
+
+    def test_fresh_schema_matches(self, app):
+        """測試 create_all 建立的資料庫與宣告一致"""
+        from src.utils.index_manager import check_indexes
+
+        report = check_indexes()
+
+        assert report['dialect'] == 'sqlite'
+        for key in ('missing_tables', 'missing', 'mismatched', 'invalid', 'undeclared'):
+            assert report[key] == [], key
+
+    def test_detects_drift(self, drifted_schema):
+        """測試找出缺少與未宣告的索引"""
+        from src.utils.index_manager import check_indexes
+
+        report = check_indexes()
+
+        assert [item['name'] for item in report['missing']] == ['idx_job_created_at']
+        assert [item['name'] for item in report['undeclared']] == ['idx_jobs_legacy']
+
+    def test_sync_fixes_drift(self, drifted_schema):
+        """測試同步後建立缺少的索引並刪除未宣告的索引"""
+        from src.utils.index_manager import check_indexes, sync_indexes
+
+        result = sync_indexes(drop_undeclared=True)
+        report = check_indexes()
+
+        assert result['created'] == ['idx_job_created_at'] and result['dropped'] == ['idx_jobs_legacy']
+        assert report['missing'] == [] and report['undeclared'] == []
+
+    def test_invalid_declaration(self, app):
+        """測試宣告的欄位不存在於實際資料表時列為 invalid 而不建立"""
+        from sqlalchemy import Column, Index, Integer, MetaData, String, Table
+        from src.utils.index_manager import check_indexes, sync_indexes
+
+        metadata = MetaData()
+        Table('jobs_v2', metadata, Column('id', Integer, primary_key=True), Column('poster_id', String),
+              Index('idx_jobs_poster_id', 'poster_id'))
+
+        report = check_indexes(metadata=metadata)
+        assert report['invalid'][0]['absent_columns'] == ['poster_id']
+        assert sync_indexes(metadata=metadata)['skipped'] == ['idx_jobs_poster_id']
+
+    def test_unused_indexes_postgresql_only(self, app):
+        """測試非 PostgreSQL 不回報未使用索引"""
+        from src.utils.index_manager import unused_indexes
+
+        assert unused_indexes() is None
+
+
+class TestIndexMigration:
+    """Alembic revision 產生測試"""
+
+    def test_write_revision(self, drifted_schema, tmp_path):
+        """測試把差異寫成可執行的 Alembic revision"""
+        import os
+        from alembic.config import Config
+        from src.utils.index_manager import check_indexes, write_index_migration
+
+        migrations = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+        shutil.copy(os.path.join(migrations, 'script.py.mako'), tmp_path)
+        config = Config()
+        config.set_main_option('script_location', str(tmp_path))
+
+        path = write_index_migration(config, check_indexes(), drop_undeclared=True)
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+
+        compile(content, path, 'exec')
+        assert "op.create_index('idx_job_created_at', 'jobs_v2', ['created_at'], unique=False, if_not_exists=True)" \
+            in content
+        assert "op.drop_index('idx_jobs_legacy', table_name='jobs_v2', if_exists=True)" in content
+
+    def test_no_revision_without_drift(self, app, tmp_path):
+        """測試沒有差異時不產生 revision"""
+        from alembic.config import Config
+        from src.utils.index_manager import check_indexes, write_index_migration
+
+        config = Config()
+        config.set_main_option('script_location', str(tmp_path))
+        assert write_index_migration(config, check_indexes()) is None
+
+
+class TestIndexSuggestions:
+    """慢語句索引建議測試"""
+
+    def test_unindexed_predicates_suggested(self, app):
+        """測試沒有索引可用的 WHERE / ORDER BY 欄位列為建議，已有索引的欄位不列入"""
+        from src.utils.index_manager import suggest_indexes
+
+        statements = [
+            {'fingerprint': 'SELECT jobs_v2.id FROM jobs_v2 WHERE jobs_v2.location = ? AND jobs_v2.status = ? '
+                            'ORDER BY jobs_v2.title DESC LIMIT ?', 'total_ms': 80.0},
+            {'fingerprint': 'SELECT users_v2_1.id FROM users_v2 AS users_v2_1 WHERE users_v2_1.role = ?',
+             'total_ms': 20.0},
+        ]
+        suggestions = [(item['table'], item['column']) for item in suggest_indexes(statements)]
+
+        assert suggestions[:2] in ([('jobs_v2', 'location'), ('jobs_v2', 'title')],
+                                   [('jobs_v2', 'title'), ('jobs_v2', 'location')])
+        assert ('users_v2', 'role') in suggestions
+        assert ('jobs_v2', 'status') not in suggestions
+
+    def test_admin_index_report(self, client, admin_token):
+        """測試管理員取得索引檢查報告"""
+        response = client.get('/api/v2/admin/performance/indexes',
+                              headers={'Authorization': f'Bearer {admin_token}'})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['schema']['missing'] == [] and data['unused'] is None
@@ -0,0 +1,212 @@
+"""
+職缺媒合測試
+測試詞彙擷取、批次計算、兩個方向的推薦端點，以及異動後的增量重算
+"""
+import json
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def matching_data(app, auth_token_with_user_id, second_user_token):
+    """
+    me：Python（expert）、SQL、Docker（工作經歷）、碩士、約 6 年年資
+    junior：Python、1 年年資；designer：Photoshop
+    職缺由 second_user 發布：後端（Python/SQL/Docker，3 年、碩士）、設計、已關閉的 Python 職缺
+    """
+    from src.models_v2 import db, User, Skill, UserSkill, WorkExperience, Education, Job
+    from src.models_v2.jobs import JobStatus
+
+    me = auth_token_with_user_id['user_id']
+    poster = User.query.filter_by(email='second_user@example.com').first()
+    junior = User(email='match_junior@example.com', password_hash='x', status='active')
+    designer = User(email='match_designer@example.com', password_hash='x', status='active')
+    # 第一個測試可能看到種子資料中的同名技能
+    python, sql, photoshop = [Skill.query.filter_by(name=name).first() or Skill(name=name)
+                              for name in ('Python', 'SQL', 'Photoshop')]
+    db.session.add_all([junior, designer, python, sql, photoshop])
+    db.session.flush()
+
+    db.session.add_all([
+        UserSkill(user_id=me, skill_id=python.id, proficiency_level='expert'),
+        UserSkill(user_id=me, skill_id=sql.id),
+        UserSkill(user_id=junior.id, skill_id=python.id, proficiency_level='beginner'),
+        UserSkill(user_id=designer.id, skill_id=photoshop.id),
+        WorkExperience(user_id=me, company_name='A', position='工程師', start_date=date(2018, 1, 1),
+                       technologies=json.dumps(['Docker'])),
+        WorkExperience(user_id=junior.id, company_name='B', position='工程師',
+                       start_date=date(date.today().year - 1, 1, 1)),
+        Education(user_id=me, school_name='台科大', degree='master', major='色彩', start_year=2016),
+    ])
+
+    backend = Job(user_id=poster.id, title='Python 後端工程師', company='公司', description='測試',
+                  requirements='熟悉 Python、SQL 與 Docker', experience_years_min=3, education_level='碩士')
+    design = Job(user_id=poster.id, title='視覺設計師', company='公司', description='測試',
+                 requirements='Photoshop')
+    closed = Job(user_id=poster.id, title='Python 工程師', company='公司', description='測試',
+                 requirements='Python', status=JobStatus.CLOSED)
+    db.session.add_all([backend, design, closed])
+    db.session.commit()
+
+    return {
+        'me': me, 'junior': junior.id, 'designer': designer.id, 'poster': poster.id,
+        'photoshop': photoshop.id, 'backend': backend.id, 'design': design.id, 'closed': closed.id,
+        'headers': {'Authorization': f"Bearer {auth_token_with_user_id['token']}"},
+        'poster_headers': {'Authorization': f'Bearer {second_user_token}'},
+    }
+
+
+class TestFeatures:
+    """特徵擷取測試"""
+
+    def test_vocabulary_whole_words(self):
+        """測試英數詞整詞比對、中文詞子字串比對"""
+        from src.utils.job_matching import Vocabulary
+
+        vocabulary = Vocabulary(['c', 'c++', 'go', '機器學習'])
+
+        assert vocabulary.extract('熟悉 C++ 與 Docker') == {'c++'}
+        assert vocabulary.extract('Go / C 皆可，具機器學習經驗') == {'c', 'go', '機器學習'}
+
+    def test_degree_level(self):
+        """測試學歷字串轉等級"""
+        from src.utils.job_matching import degree_level
+
+        assert degree_level('碩士以上') == 2
+        assert degree_level('PhD') == 3
+        assert degree_level('不拘') is None
+
+
+class TestJobMatching:
+    """媒合計算與端點測試"""
+
+    def test_jobs_for_user(self, client, matching_data):
+        """測試系友取得最相符職缺，已關閉職缺不列入"""
+        from src.utils.job_matching import compute_job_matches
+
+        compute_job_matches()
+        data = client.get('/api/v2/recommendations/jobs', headers=matching_data['headers']).get_json()['data']
+
+        ours = {matching_data['backend'], matching_data['design'], matching_data['closed']}
+        matched = [item for item in data if item['job']['id'] in ours]
+        assert [item['job']['id'] for item in matched] == [matching_data['backend']]
+        assert matched[0]['matched_terms'] == ['docker', 'python', 'sql']
+
+    def test_candidates_for_job(self, client, matching_data):
+        """測試職缺發布者取得依分數排序的推薦系友"""
+        from src.utils.job_matching import compute_job_matches
+
+        compute_job_matches()
+        response = client.get(f"/api/v2/recommendations/jobs/{matching_data['backend']}/candidates",
+                              headers=matching_data['poster_headers'])
+
+        assert response.status_code == 200
+        ours = {matching_data['me'], matching_data['junior'], matching_data['designer']}
+        ids = [item['user']['id'] for item in response.get_json()['data'] if item['user']['id'] in ours]
+        assert ids == [matching_data['me'], matching_data['junior']]
+
+    def test_candidates_require_owner(self, client, matching_data):
+        """測試非發布者不能查看職缺推薦系友"""
+        response = client.get(f"/api/v2/recommendations/jobs/{matching_data['backend']}/candidates",
+                              headers=matching_data['headers'])
+        assert response.status_code == 403
+
+    def test_user_change_refreshed_incrementally(self, client, matching_data):
+        """測試新增技能後增量重算即出現新的相符職缺"""
+        from src.models_v2 import db, UserSkill
+        from src.utils.job_matching import compute_job_matches, match_refresh_queue, process_match_refresh_queue
+
+        compute_job_matches()
+        match_refresh_queue.clear()
+        db.session.add(UserSkill(user_id=matching_data['me'], skill_id=matching_data['photoshop']))
+        db.session.commit()
+
+        assert match_refresh_queue.user_ids == {matching_data['me']}
+        process_match_refresh_queue()
+
+        data = client.get('/api/v2/recommendations/jobs', headers=matching_data['headers']).get_json()['data']
+        assert matching_data['design'] in [item['job']['id'] for item in data]
+
+    def test_job_change_refreshed_incrementally(self, client, matching_data):
+        """測試修改職缺要求後增量重算該職缺，瀏覽數變動不排入重算"""
+        from src.models_v2 import db, Job
+        from src.utils.job_matching import compute_job_matches, match_refresh_queue, process_match_refresh_queue
+
+        compute_job_matches()
+        match_refresh_queue.clear()
+        job = db.session.get(Job, matching_data['design'])
+        job.views_count = (job.views_count or 0) + 1
+        db.session.commit()
+        assert match_refresh_queue.job_ids == set()
+
+        job.requirements = 'Photoshop 與 Python'
+        db.session.commit()
+        assert match_refresh_queue.job_ids == {matching_data['design']}
+        process_match_refresh_queue()
+
+        response = client.get(f"/api/v2/recommendations/jobs/{matching_data['design']}/candidates",
+                              headers=matching_data['poster_headers'])
+        ids = [item['user']['id'] for item in response.get_json()['data']]
+        assert matching_data['me'] in ids and matching_data['designer'] in ids
+
+    def test_jobs_for_user_query_budget(self, client, matching_data, query_budget):
+        """測試推薦職缺端點的查詢數為常數"""
+        from src.utils.job_matching import compute_job_matches
+
+        compute_job_matches()
+        with query_budget(5):
+            response = client.get('/api/v2/recommendations/jobs', headers=matching_data['headers'])
+        assert response.status_code == 200
+
+    def test_profile_change_queued_only_for_degree(self, app, matching_data):
+        """測試個人檔案只有學位異動才排入重算"""
+        from src.models_v2 import db, UserProfile
+        from src.utils.job_matching import match_refresh_queue
+
+        match_refresh_queue.clear()
+        profile = UserProfile.query.filter_by(user_id=matching_data['me']).first()
+        profile.bio = '新的自我介紹'
+        db.session.commit()
+        assert match_refresh_queue.user_ids == set()
+
+        profile.degree = 'phd'
+        db.session.commit()
+        assert match_refresh_queue.user_ids == {matching_data['me']}
+
+    def test_candidates_prefiltered_by_shared_terms(self, app, matching_data):
+        """測試增量重算只載入與異動對象共有詞的候選"""
+        from src.utils.job_matching import candidate_jobs, candidate_users
+
+        assert candidate_users({'photoshop'}) == {matching_data['designer']}
+        assert candidate_users({'docker', 'python'}) == {matching_data['me'], matching_data['junior']}
+        assert candidate_jobs({'docker'}) == {matching_data['backend']}
+        assert candidate_jobs({'photoshop'}) == {matching_data['design']}
+        assert candidate_users(set()) == set() and candidate_jobs(set()) == set()
+
+    def test_refresh_does_not_hold_write_lock(self, app, matching_data, monkeypatch):
+        """測試計分期間其他連線仍可寫入（先算完再以短交易替換結果）"""
+        from sqlalchemy import text
+        from src.models_v2 import db, JobMatch
+        from src.utils import job_matching
+
+        job_matching.compute_job_matches()
+        score_pairs = job_matching.score_pairs
+
+        def score_with_concurrent_write(*args, **kwargs):
+            with db.engine.connect() as conn:
+                conn.execute(text('UPDATE users_v2 SET login_count = login_count + 1 WHERE id = :id'),
+                             {'id': matching_data['designer']})
+                conn.commit()
+            yield from score_pairs(*args, **kwargs)
+
+        monkeypatch.setattr(job_matching, 'score_pairs', score_with_concurrent_write)
+        job_matching.refresh_job_matches(job_ids=[matching_data['backend']], user_ids=[matching_data['me']])
+
+        assert JobMatch.query.filter_by(job_id=matching_data['backend'], user_id=matching_data['me']).count() == 1
+
+    def test_full_rebuild_not_scheduled_in_web_worker_by_default(self, app):
+        """測試全量重算預設不註冊到 web worker 的排程器，增量重算仍在排程內"""
+        from src.utils.scheduler import scheduler
+
+        assert 'job_match_rebuild' not in scheduler.jobs
+        assert 'job_match_refresh' in scheduler.jobs
@@ -62,3 +62,54 @@ def test_get_job_by_id(client, auth_token):
     data = response.get_json()
     assert data['id'] == job_id
     assert data['title'] == '測試職缺'
+
+
+def _create_jobs_with_expiry(app):
+    """輔助函式：建立一筆已過期與一筆未過期的 ACTIVE 職缺"""
+    from datetime import datetime, timedelta
+    from src.models_v2 import db, User, Job
+    from src.models_v2.jobs import JobStatus
+
+    poster = User(email='poster@example.com', password_hash='x')
+    db.session.add(poster)
+    db.session.flush()
+
+    expired = Job(user_id=poster.id, title='過期職缺', company='測試公司', description='已過期',
+                  status=JobStatus.ACTIVE, expires_at=datetime.utcnow() - timedelta(days=1))
+    current = Job(user_id=poster.id, title='開放職缺', company='測試公司', description='仍開放',
+                  status=JobStatus.ACTIVE, expires_at=datetime.utcnow() + timedelta(days=7))
+    db.session.add_all([expired, current])
+    db.session.commit()
+    return expired.id, current.id
+
+
+def test_get_jobs_excludes_expired(client, app):
+    """測試開放中列表不包含已過期（尚未被排程處理）的職缺"""
+    expired_id, current_id = _create_jobs_with_expiry(app)
+
+    response = client.get('/api/v2/jobs')
+
+    assert response.status_code == 200
+    job_ids = [job['id'] for job in response.get_json()['jobs']]
+    assert current_id in job_ids
+    assert expired_id not in job_ids
+
+
+def test_sweep_expired_jobs(client, app):
+    """測試過期排程批次轉換狀態並更新列表快取版本"""
+    from src.models_v2 import db, Job
+    from src.models_v2.jobs import JobStatus
+    from src.utils.cache import get_version
+    from src.utils.job_expiry import sweep_expired_jobs
+
+    expired_id, current_id = _create_jobs_with_expiry(app)
+    version_before = get_version('jobs')
+
+    assert sweep_expired_jobs() == 1
+    assert get_version('jobs') == version_before + 1
+    assert db.session.get(Job, expired_id).status == JobStatus.EXPIRED
+    assert db.session.get(Job, current_id).status == JobStatus.ACTIVE
+
+    # 再次執行不應有任何變更
+    assert sweep_expired_jobs() == 0
+    assert get_version('jobs') == version_before + 1
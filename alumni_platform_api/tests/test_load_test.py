@@ -0,0 +1,73 @@
+"""
+HTTP 負載測試工具測試
+測試報告比較邏輯，並以小型資料集對本機伺服器執行一次短時間的負載測試
+"""
+import threading
+
+import pytest
+
+
+def _report(p95_ms, requests=100, errors=0):
+    return {'endpoints': {'GET /api/v2/jobs': {'requests': requests, 'errors': errors, 'p95_ms': p95_ms}}}
+
+
+@pytest.fixture
+def server_url(app):
+    """在背景執行緒以 werkzeug 伺服器提供測試應用程式"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join(timeout=10)
+
+
+class TestCompare:
+    """報告比較測試"""
+
+    def test_flags_p95_regression(self):
+        """測試 p95 退步超過門檻時列出端點，小幅波動不列出"""
+        from benchmarks.load_test import compare
+
+        assert compare(_report(20.0), _report(22.0)) == []
+        assert compare(_report(1.0), _report(4.0)) == []  # 低於 min_delta_ms
+        regressions = compare(_report(20.0), _report(40.0))
+        assert [r['endpoint'] for r in regressions] == ['GET /api/v2/jobs']
+        assert regressions[0]['change'] == 1.0
+
+    def test_flags_error_rate(self):
+        """測試錯誤率上升超過 1 個百分點時列出端點"""
+        from benchmarks.load_test import compare
+
+        assert compare(_report(20.0), _report(20.0, errors=5))
+        assert compare(_report(20.0, errors=5), _report(20.0, errors=5)) == []
+
+
+class TestLoadRun:
+    """實際執行測試"""
+
+    def test_journeys_against_local_server(self, app, server_url):
+        """測試虛擬使用者可登入、瀏覽並透過 Socket.IO 收到自己送出的訊息"""
+        from werkzeug.security import generate_password_hash
+        from benchmarks.dataset import DEFAULT_PASSWORD, DatasetGenerator, load_table
+        from benchmarks.load_test import run
+        from src.models_v2 import db
+
+        generator = DatasetGenerator(users=60, seed=3,
+                                     password_hash=generate_password_hash(DEFAULT_PASSWORD, method='pbkdf2:sha256'))
+        with db.engine.begin() as connection:
+            for name, rows in generator.tables():
+                load_table(connection, db.metadata.tables[name], rows, batch_size=100)
+
+        report = run(server_url, dataset_users=60, vusers=3, duration=4, spawn_rate=0, think_time=0.05, seed=1)
+
+        endpoints = report['endpoints']
+        assert report['meta']['vusers'] == 3
+        assert endpoints['POST /api/v2/auth/login']['statuses'].get('200') == 3
+        assert endpoints['GET /api/v2/jobs']['errors'] == 0
+        assert endpoints['GET /api/notifications/unread-count']['requests'] > 0
+        assert endpoints['SIO connected']['errors'] == 0
+        for entry in endpoints.values():
+            assert entry['p50_ms'] <= entry['p95_ms'] <= entry['max_ms']
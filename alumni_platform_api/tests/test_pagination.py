@@ -0,0 +1,103 @@
+"""
+Keyset 分頁測試
+測試游標分頁的完整性、與 OFFSET 模式排序一致，以及游標驗證
+"""
+import pytest
+from datetime import datetime, timedelta
+
+
+def _walk(client, url, key, headers=None):
+    """依 next_cursor 逐頁取完，回傳所有 id 與頁數"""
+    ids, pages = [], 0
+    response = client.get(f'{url}&pagination=cursor', headers=headers)
+    while True:
+        assert response.status_code == 200
+        data = response.get_json()
+        ids.extend(item['id'] for item in data[key])
+        pages += 1
+        if not data['has_more']:
+            return ids, pages
+        response = client.get(f"{url}&cursor={data['next_cursor']}", headers=headers)
+
+
+@pytest.fixture
+def notifications(app, auth_token_with_user_id):
+    """為目前使用者建立 25 筆通知（部分 created_at 相同，用來驗證 id 補位排序）"""
+    from src.models_v2 import db, Notification, NotificationType
+
+    user_id = auth_token_with_user_id['user_id']
+    base = datetime.utcnow()
+    db.session.add_all([
+        Notification(user_id=user_id, notification_type=NotificationType.SYSTEM_ANNOUNCEMENT,
+                     title=f'通知{i}', message='測試', created_at=base - timedelta(minutes=i // 3))
+        for i in range(25)
+    ])
+    db.session.commit()
+    return {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+
+
+class TestKeysetPagination:
+    """keyset 分頁測試"""
+
+    def test_walk_matches_offset_order(self, client, notifications):
+        """測試逐頁走完的順序與 OFFSET 模式一致且不重複"""
+        ids, pages = _walk(client, '/api/notifications?per_page=10', 'notifications', notifications)
+        offset = client.get('/api/notifications?per_page=100', headers=notifications).get_json()
+
+        assert pages == 3
+        assert len(ids) == len(set(ids)) == 25
+        assert ids == [item['id'] for item in offset['notifications']]
+
+    def test_keyset_response_shape(self, client, notifications):
+        """測試 keyset 模式預設不計算總數，可選擇加入"""
+        data = client.get('/api/notifications?pagination=cursor&per_page=5',
+                          headers=notifications).get_json()
+        assert data['has_more'] is True
+        assert 'total' not in data and 'page' not in data
+
+        data = client.get('/api/notifications?pagination=cursor&include_total=true',
+                          headers=notifications).get_json()
+        assert data['total'] == 25
+
+    def test_tampered_cursor_rejected(self, client, notifications):
+        """測試竄改過的游標回傳 400"""
+        data = client.get('/api/notifications?pagination=cursor&per_page=5',
+                          headers=notifications).get_json()
+
+        response = client.get(f"/api/notifications?cursor={data['next_cursor']}x",
+                              headers=notifications)
+        assert response.status_code == 400
+
+    def test_cursor_bound_to_sort_keys(self, client, notifications):
+        """測試游標不能拿到排序鍵不同的端點使用"""
+        data = client.get('/api/notifications?pagination=cursor&per_page=5',
+                          headers=notifications).get_json()
+
+        response = client.get(f"/api/v2/jobs?cursor={data['next_cursor']}")
+        assert response.status_code == 400
+
+    def test_nullable_sort_key(self, client, app):
+        """測試排序鍵含 NULL（從未登入的系友）時仍能完整走完"""
+        from src.models_v2 import db, User
+
+        now = datetime.utcnow()
+        db.session.add_all([
+            User(email=f'keyset{i}@example.com', password_hash='x', status='active',
+                 last_login_at=now - timedelta(days=i) if i % 2 else None)
+            for i in range(12)
+        ])
+        db.session.commit()
+        expected = [user.id for user in User.query.filter_by(status='active').all()]
+
+        ids, _ = _walk(client, '/api/v2/users?per_page=5', 'users')
+
+        assert sorted(ids) == sorted(expected)
+        assert len(ids) == len(set(ids))
+
+    def test_page_mode_unchanged(self, client, notifications):
+        """測試未帶游標時維持原本的 page / per_page 回應"""
+        data = client.get('/api/notifications?page=2&per_page=10', headers=notifications).get_json()
+
+        assert data['total'] == 25
+        assert data['page'] == 2
+        assert len(data['notifications']) == 10
@@ -0,0 +1,149 @@
+"""
+效能指標測試
+測試請求耗時入佇列、彙總批次寫入與佇列滿載時的丟棄計數
+"""
+
+
+class TestMetricsPipeline:
+    """非同步批次寫入測試"""
+
+    def test_requests_recorded_without_db_write(self, client):
+        """測試請求只放入佇列，尚未寫入資料庫"""
+        from src.models_v2 import PerformanceMetric
+        from src.utils.performance import metrics_pipeline
+
+        client.get('/api/v2/jobs')
+        client.get('/api/v2/jobs')
+
+        assert metrics_pipeline.stats()['queued'] == 2
+        assert PerformanceMetric.query.count() == 0
+
+    def test_flush_aggregates_by_route(self, client):
+        """測試 flush 依路由規則彙總後批次寫入"""
+        from src.models_v2 import PerformanceMetric
+        from src.utils.performance import metrics_pipeline
+
+        client.get('/api/v2/jobs/1')
+        client.get('/api/v2/jobs/2')
+        client.get('/api/v2/jobs')
+
+        # 請求剛好跨過時間窗邊界時會多一列
+        assert metrics_pipeline.flush() >= 2
+        assert metrics_pipeline.stats()['queued'] == 0
+
+        counts = {}
+        for row in PerformanceMetric.query.all():
+            assert row.max_ms * row.count >= row.total_ms
+            counts[(row.endpoint, row.status_code)] = counts.get((row.endpoint, row.status_code), 0) + row.count
+        assert counts[('/api/v2/jobs/<int:job_id>', 404)] == 2
+        assert counts[('/api/v2/jobs', 200)] == 1
+
+    def test_full_queue_drops(self, app):
+        """測試佇列滿載時丟棄新紀錄並計數"""
+        from src.utils.performance import MetricsPipeline
+
+        pipeline = MetricsPipeline(max_queue=2)
+        results = [pipeline.record('/x', 'GET', 200, 0.01) for _ in range(3)]
+
+        assert results == [True, True, False]
+        assert pipeline.stats()['dropped'] == 1
+
+    def test_aggregate_errors_and_windows(self):
+        """測試同一時間窗合併、跨時間窗分列並累計錯誤數"""
+        from src.utils.performance import MetricsPipeline
+
+        pipeline = MetricsPipeline(window_seconds=60)
+        rows = pipeline.aggregate([
+            (120.0, '/x', 'GET', 500, 0.2, True),
+            (150.0, '/x', 'GET', 500, 0.4, True),
+            (190.0, '/x', 'GET', 500, 0.1, True),
+        ])
+
+        assert [(row['count'], row['error_count']) for row in rows] == [(2, 2), (1, 1)]
+        assert round(rows[0]['max_ms']) == 400
+
+
+class TestPerformanceMonitor:
+    """延遲直方圖與 /metrics 測試"""
+
+    def test_histogram_percentiles(self):
+        """測試百分位數誤差在分桶精度內"""
+        from src.utils.performance import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for value in range(1, 10001):
+            histogram.record(value)
+
+        assert histogram.count == 10000 and histogram.max == 10000
+        for percent in (50, 95, 99):
+            expected = percent * 100
+            assert expected <= histogram.percentile(percent) <= expected * (1 + 1 / 16)
+        assert histogram.percentile(100) == 10000
+
+    def test_constant_memory(self):
+        """測試同一端點重複記錄不增加保存的資料量"""
+        from src.utils.performance import PerformanceMonitor
+
+        monitor = PerformanceMonitor(slow_threshold=0.5, recent_size=10)
+        for i in range(5000):
+            monitor.record_request('/x', 'GET', 0.6 if i % 2 else 0.01, 500 if i % 10 == 0 else 200)
+
+        stats = monitor.get_stats()
+        assert stats['total_requests'] == 5000
+        assert stats['error_rate'] == 0.1
+        assert len(monitor.recent_slow_requests) == 10
+        assert len(monitor.endpoint_stats()) == 1
+        assert stats['p50_ms'] < 11 and stats['p99_ms'] >= 600
+
+    def test_prometheus_endpoint(self, client):
+        """測試 /metrics 以路由規則為標籤輸出延遲直方圖與佇列計數"""
+        client.get('/api/v2/jobs/1')
+
+        response = client.get('/metrics')
+        body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        assert 'http_request_duration_seconds_count{method="GET",endpoint="/api/v2/jobs/<int:job_id>"} 1' in body
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",endpoint="/api/v2/jobs/<int:job_id>",le="+Inf"} 1' in body
+        assert 'quantile=' not in body
+        assert 'metrics_pipeline_dropped_total 0' in body
+
+    def test_prometheus_token(self, client, monkeypatch):
+        """測試設定 METRICS_TOKEN 時需帶正確 token"""
+        monkeypatch.setenv('METRICS_TOKEN', 'secret')
+
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+    def test_prometheus_requires_token_in_production(self, app, client, monkeypatch):
+        """測試生產環境未設定 METRICS_TOKEN 時拒絕提供指標"""
+        monkeypatch.delenv('METRICS_TOKEN', raising=False)
+        monkeypatch.setitem(app.config, 'PRODUCTION', True)
+
+        assert client.get('/metrics').status_code == 403
+
+    def test_histogram_cumulative_counts(self):
+        """測試 Prometheus le 桶的累計筆數"""
+        from src.utils.performance import LATENCY_BUCKETS, PerformanceMonitor
+
+        monitor = PerformanceMonitor()
+        for seconds in (0.003, 0.02, 0.02, 0.3, 20):
+            monitor.record_request('/x', 'GET', seconds, 200)
+
+        (_, _, cumulative, count, total), = monitor.endpoint_histograms(LATENCY_BUCKETS)
+        assert dict(zip(LATENCY_BUCKETS, cumulative)) == {
+            0.005: 1, 0.01: 1, 0.025: 3, 0.05: 3, 0.1: 3, 0.25: 3, 0.5: 4, 1: 4, 2.5: 4, 5: 4, 10: 4,
+        }
+        assert count == 5 and round(total, 3) == 20.343
+
+    def test_admin_performance(self, client, admin_token):
+        """測試管理員取得各端點延遲統計"""
+        client.get('/api/v2/jobs')
+        response = client.get('/api/v2/admin/performance', headers={'Authorization': f'Bearer {admin_token}'})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert any(item['endpoint'] == '/api/v2/jobs' for item in data['endpoints'])
+        assert 'p95_ms' in data['summary']
@@ -0,0 +1,107 @@
+"""
+連線池監控測試
+測試取得連線的等待 / 逾時統計、/metrics 輸出與連線上限自動調整
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+@pytest.fixture
+def small_pool(tmp_path):
+    """只有一條連線、逾時很短的連線池"""
+    from src.utils.pool_monitor import InstrumentedQueuePool, pool_monitor
+
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    pool_monitor.register('test', engine)
+    yield engine
+    pool_monitor.unregister('test')
+    engine.dispose()
+
+
+def _pool_stats(name):
+    from src.utils.pool_monitor import pool_monitor
+    return next(item for item in pool_monitor.stats()['pools'] if item['name'] == name)
+
+
+class TestPoolMonitor:
+    """取得連線統計測試"""
+
+    def test_checkout_and_gauges(self, small_pool):
+        """測試記錄取得次數，使用中 / 閒置連線數即時反映"""
+        with small_pool.connect():
+            stats = _pool_stats('test')
+            assert stats['checkouts'] == 1
+            assert (stats['checked_out'], stats['idle'], stats['capacity']) == (1, 0, 1)
+
+        assert _pool_stats('test')['idle'] == 1
+
+    def test_timeout_recorded_per_endpoint(self, small_pool):
+        """測試連線池耗盡時的逾時記入連線池與端點統計"""
+        from src.utils.pool_monitor import pool_monitor
+
+        with small_pool.connect():
+            with pytest.raises(PoolTimeoutError):
+                small_pool.connect()
+
+        assert _pool_stats('test')['timeouts'] == 1
+        endpoint = next(item for item in pool_monitor.stats()['endpoints'] if item['pool'] == 'test')
+        assert endpoint['endpoint'] == '<background>' and endpoint['timeouts'] == 1
+        assert endpoint['max_wait_ms'] >= 40
+
+    def test_metrics_endpoint(self, client):
+        """測試 /metrics 輸出主庫連線池的狀態與等待時間"""
+        client.get('/api/v2/job-categories')
+
+        body = client.get('/metrics').get_data(as_text=True)
+
+        assert 'db_pool_checked_out{pool="primary"}' in body
+        assert 'db_pool_capacity{pool="primary"}' in body
+        assert 'db_pool_checkout_wait_seconds_count{pool="primary",endpoint="GET /api/v2/job-categories"}' in body
+
+    def test_admin_performance_includes_pools(self, client, admin_token):
+        """測試管理後台效能 API 回傳連線池統計"""
+        response = client.get('/api/v2/admin/performance', headers={'Authorization': f'Bearer {admin_token}'})
+
+        assert response.status_code == 200
+        pools = response.get_json()['connection_pools']['pools']
+        assert [pool['name'] for pool in pools] == ['primary']
+
+
+class TestAdaptivePoolController:
+    """連線上限自動調整測試"""
+
+    def test_grows_after_timeouts_then_shrinks_when_idle(self, small_pool):
+        """測試逾時後提高上限讓等待的請求取得連線，持續閒置後降回下限"""
+        from src.utils.pool_monitor import AdaptivePoolController, pool_monitor
+
+        controller = AdaptivePoolController(pool_monitor, worker_concurrency=4, shrink_after=2)
+        first = small_pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            small_pool.connect()
+
+        changes = controller.adjust(names=['test'])
+        assert [(change['from'], change['to']) for change in changes] == [(1, 2)]
+        second = small_pool.connect()
+        second.close()
+        first.close()
+
+        # 取得第二條連線的時間窗不算閒置，之後連續 shrink_after 個閒置時間窗才降回
+        assert controller.adjust(names=['test']) == []
+        assert controller.adjust(names=['test']) == []
+        assert [(change['from'], change['to']) for change in controller.adjust(names=['test'])] == [(2, 1)]
+        assert small_pool.pool.capacity == 1
+
+    def test_capacity_bounded_by_concurrency(self, small_pool):
+        """測試上限不超過並行數加保留量"""
+        from src.utils.pool_monitor import AdaptivePoolController, pool_monitor
+
+        controller = AdaptivePoolController(pool_monitor, worker_concurrency=1, reserve=1, max_capacity=10)
+        small_pool.pool.resize(2)
+        with small_pool.connect(), small_pool.connect():
+            with pytest.raises(PoolTimeoutError):
+                small_pool.connect()
+
+        assert controller.adjust(names=['test']) == []
+        assert small_pool.pool.capacity == 2
@@ -0,0 +1,125 @@
+"""
+列表端點查詢數測試
+每頁資料的查詢數須為常數（不隨筆數成長），避免 N+1 lazy load
+"""
+import pytest
+from datetime import datetime, timedelta
+
+ROWS = 15
+
+# 公開列表：COUNT + 資料列（多對一關聯以 JOIN 一併載入）
+PUBLIC_BUDGET = 2
+# 需登入的列表：使用者 + session 驗證、ETag 指紋、COUNT、資料列
+AUTH_BUDGET = 5
+
+
+@pytest.fixture
+def listing_data(app, auth_token_with_user_id):
+    """為目前使用者與多位其他使用者建立各類列表資料，每位作者都有 profile 與分類"""
+    from src.models_v2 import (
+        db, User, UserProfile, Job, JobCategory, Event, EventCategory, EventRegistration,
+        Bulletin, BulletinCategory, Article, Conversation, Message, Skill, UserSkill
+    )
+    from src.models_v2.content import ArticleCategory, ContentStatus
+    from src.models_v2.events import EventStatus
+
+    me = auth_token_with_user_id['user_id']
+    others = [User(email=f'budget{i}@example.com', password_hash='x') for i in range(ROWS)]
+    db.session.add_all(others)
+    db.session.flush()
+    db.session.add_all([
+        UserProfile(user_id=user.id, full_name=f'校友{i}') for i, user in enumerate(others)
+    ])
+
+    job_categories = [JobCategory(name=f'查詢數職缺分類{i}') for i in range(ROWS)]
+    event_categories = [EventCategory(name=f'查詢數活動分類{i}') for i in range(ROWS)]
+    bulletin_categories = [BulletinCategory(name=f'查詢數公告分類{i}') for i in range(ROWS)]
+    article_categories = [ArticleCategory(name=f'查詢數文章分類{i}') for i in range(ROWS)]
+    skills = [Skill(name=f'查詢數技能{i}') for i in range(ROWS)]
+    db.session.add_all([*job_categories, *event_categories, *bulletin_categories,
+                        *article_categories, *skills])
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for i, user in enumerate(others):
+        for owner in (user.id, me):
+            db.session.add(Job(user_id=owner, category_id=job_categories[i].id,
+                               title=f'職缺{i}', company='公司', description='測試'))
+            db.session.add(Bulletin(author_id=owner, category_id=bulletin_categories[i].id,
+                                    title=f'公告{i}', content='內容'))
+            db.session.add(Article(author_id=owner, category_id=article_categories[i].id,
+                                   title=f'文章{i}', content='內容', status=ContentStatus.PUBLISHED))
+        event = Event(organizer_id=user.id, category_id=event_categories[i].id, title=f'活動{i}',
+                      description='測試', start_time=now + timedelta(days=i + 1),
+                      end_time=now + timedelta(days=i + 1, hours=2), status=EventStatus.UPCOMING)
+        my_event = Event(organizer_id=me, category_id=event_categories[i].id, title=f'我的活動{i}',
+                         description='測試', start_time=now + timedelta(days=i + 1),
+                         end_time=now + timedelta(days=i + 1, hours=2), status=EventStatus.UPCOMING)
+        conversation = Conversation(user1_id=me, user2_id=user.id, last_message_at=now)
+        db.session.add_all([event, my_event, conversation])
+        db.session.flush()
+        db.session.add(EventRegistration(event_id=event.id, user_id=me))
+        db.session.add(Message(conversation_id=conversation.id, sender_id=user.id, content='嗨'))
+        db.session.add(UserSkill(user_id=me, skill_id=skills[i].id))
+    db.session.commit()
+
+    return {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+
+
+class TestListQueryBudget:
+    """列表端點查詢數上限測試"""
+
+    @pytest.mark.parametrize('url, key', [
+        ('/api/v2/jobs?per_page=100', 'jobs'),
+        ('/api/v2/events?per_page=100', 'events'),
+        ('/api/v2/bulletins?per_page=100', 'bulletins'),
+    ])
+    def test_public_lists(self, client, listing_data, query_budget, url, key):
+        """測試公開列表的查詢數不隨筆數成長"""
+        with query_budget(PUBLIC_BUDGET):
+            response = client.get(url)
+
+        assert response.status_code == 200
+        assert len(response.get_json()[key]) >= ROWS
+
+    @pytest.mark.parametrize('url, key, budget', [
+        ('/api/v2/my-jobs?per_page=100', 'jobs', AUTH_BUDGET),
+        ('/api/v2/my-events?per_page=100', 'events', AUTH_BUDGET),
+        ('/api/v2/my-registrations?per_page=100', 'registrations', AUTH_BUDGET),
+        ('/api/v2/my-bulletins?per_page=100', 'bulletins', AUTH_BUDGET),
+        # 訊息數以一次 GROUP BY 取得；ETag 另含個人檔案表指紋
+        ('/api/v2/conversations?per_page=100', 'conversations', AUTH_BUDGET + 2),
+        ('/api/v2/cms/articles?per_page=100', 'articles', AUTH_BUDGET),
+    ])
+    def test_authenticated_lists(self, client, listing_data, query_budget, url, key, budget):
+        """測試需登入列表的查詢數不隨筆數成長"""
+        with query_budget(budget):
+            response = client.get(url, headers=listing_data)
+
+        assert response.status_code == 200
+        assert len(response.get_json()[key]) >= ROWS
+
+    def test_my_skills(self, client, listing_data, query_budget):
+        """測試技能列表（無分頁）的查詢數"""
+        with query_budget(AUTH_BUDGET):
+            response = client.get('/api/career/my-skills', headers=listing_data)
+
+        assert response.status_code == 200
+        assert len(response.get_json()['skills']) == ROWS
+
+
+class TestLoaderPlans:
+    """載入計畫登記表測試"""
+
+    def test_every_plan_builds(self, app):
+        """測試所有登記的計畫都能產生載入選項"""
+        from src.utils.loader_plans import LOADER_PLANS, loader_options
+
+        for endpoint in LOADER_PLANS:
+            assert loader_options(endpoint=endpoint)
+
+    def test_plans_reference_registered_endpoints(self, app):
+        """測試登記的端點名稱都存在"""
+        from src.utils.loader_plans import LOADER_PLANS
+
+        assert set(LOADER_PLANS) <= set(app.view_functions)
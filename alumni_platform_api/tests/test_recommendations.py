@@ -0,0 +1,141 @@
+"""
+「你可能認識的系友」推薦測試
+測試特徵計分、排除既有聯絡、批次寫入與推薦端點
+"""
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def alumni(app, auth_token_with_user_id):
+    """
+    me：第 101 屆、指導教授王教授、任職台積電
+    a：同指導教授 + 同屆；b：同公司；c：已是聯絡人（同指導教授）；d：毫無交集
+    """
+    from src.models_v2 import db, User, UserProfile, WorkExperience, ContactRequest
+
+    me = auth_token_with_user_id['user_id']
+    profile = UserProfile.query.filter_by(user_id=me).first()
+    profile.class_year, profile.advisor_1, profile.current_company = 101, '王教授', '台積電'
+
+    specs = {
+        'a': dict(class_year=101, advisor_1=' 王教授 '),
+        'b': dict(class_year=105),
+        'c': dict(advisor_1='王教授'),
+        'd': dict(class_year=110, advisor_1='李教授'),
+    }
+    users = {}
+    for name, fields in specs.items():
+        user = User(email=f'recommend_{name}@example.com', password_hash='x', status='active')
+        user.profile = UserProfile(**fields)
+        users[name] = user
+    db.session.add_all(users.values())
+    db.session.flush()
+
+    db.session.add(WorkExperience(user_id=users['b'].id, company_name='台積電', position='工程師',
+                                  start_date=date(2020, 1, 1)))
+    db.session.add(ContactRequest(requester_id=me, target_id=users['c'].id, status='accepted'))
+    db.session.commit()
+
+    ids = {name: user.id for name, user in users.items()}
+    ids['me'] = me
+    return ids, {'Authorization': f"Bearer {auth_token_with_user_id['token']}"}
+
+
+class TestRecommendationScoring:
+    """計分測試"""
+
+    def test_shared_features_ranked(self):
+        """測試共同特徵越多、群組越小分數越高"""
+        from src.utils.recommendations import score_candidates
+
+        features = {
+            1: {('advisor', 'x'), ('cohort', 'class:1')},
+            2: {('advisor', 'x'), ('cohort', 'class:1')},
+            3: {('cohort', 'class:1')},
+            4: {('skill', 9)},
+        }
+        results = dict(score_candidates(features))
+
+        assert [candidate for candidate, _, _ in results[1]] == [2, 3]
+        assert results[1][0][2] == ['same_cohort', 'shared_advisor']
+        assert 4 not in results
+
+    def test_oversized_groups_ignored(self):
+        """測試成員過多的特徵不參與計分"""
+        from src.utils.recommendations import score_candidates
+
+        features = {user_id: {('cohort', 'big')} for user_id in range(10)}
+        assert list(score_candidates(features, max_group_size=5)) == []
+
+    def test_excluded_pairs(self):
+        """測試已有聯絡申請的對象不推薦"""
+        from src.utils.recommendations import score_candidates
+
+        features = {1: {('company', 'x')}, 2: {('company', 'x')}, 3: {('company', 'x')}}
+        results = dict(score_candidates(features, excluded={1: {2}}))
+
+        assert [candidate for candidate, _, _ in results[1]] == [3]
+
+
+class TestPeopleRecommendations:
+    """批次計算與端點測試"""
+
+    def test_compute_and_serve(self, client, alumni):
+        """測試批次計算後端點依分數回傳，排除已是聯絡人者"""
+        from src.utils.recommendations import compute_people_recommendations
+
+        ids, headers = alumni
+        result = compute_people_recommendations()
+        assert result['recommendations'] > 0
+
+        data = client.get('/api/v2/recommendations/people', headers=headers).get_json()['data']
+        returned = [item['id'] for item in data]
+
+        assert returned[:2] == [ids['a'], ids['b']]
+        assert ids['c'] not in returned and ids['d'] not in returned
+        assert data[0]['reasons'] == ['same_cohort', 'shared_advisor']
+        assert data[1]['reasons'] == ['same_company']
+
+    def test_new_contact_filtered_at_read_time(self, client, alumni):
+        """測試批次計算後才發出申請的對象在回應時即被過濾"""
+        from src.utils.recommendations import compute_people_recommendations
+
+        ids, headers = alumni
+        compute_people_recommendations()
+        client.post('/api/v2/contact-requests', json={'target_id': ids['a']}, headers=headers)
+
+        data = client.get('/api/v2/recommendations/people', headers=headers).get_json()['data']
+        assert ids['a'] not in [item['id'] for item in data]
+
+    def test_refresh_skips_fresh_results(self, app, alumni):
+        """測試排程在結果未過期時略過重算"""
+        from src.utils.recommendations import compute_people_recommendations, refresh_people_recommendations
+
+        compute_people_recommendations()
+        assert refresh_people_recommendations(max_age_seconds=3600) == {'skipped': True}
+
+    def test_scoring_does_not_hold_write_lock(self, app, alumni, monkeypatch):
+        """測試計分期間其他連線仍可寫入（先算完再以短交易替換結果）"""
+        from sqlalchemy import text
+        from src.models_v2 import db
+        from src.utils import recommendations
+
+        ids, _ = alumni
+        score_candidates = recommendations.score_candidates
+
+        def score_with_concurrent_write(*args, **kwargs):
+            with db.engine.connect() as conn:
+                conn.execute(text('UPDATE users_v2 SET login_count = login_count + 1 WHERE id = :id'),
+                             {'id': ids['d']})
+                conn.commit()
+            yield from score_candidates(*args, **kwargs)
+
+        monkeypatch.setattr(recommendations, 'score_candidates', score_with_concurrent_write)
+        assert recommendations.compute_people_recommendations()['recommendations'] > 0
+
+    def test_not_scheduled_in_web_worker_by_default(self, app):
+        """測試全量計分預設不註冊到 web worker 的排程器（改以 CLI / cron 執行）"""
+        from src.utils.scheduler import scheduler
+
+        assert 'people_recommendations' not in scheduler.jobs
@@ -0,0 +1,183 @@
+"""
+讀取副本路由測試
+以另一個 SQLite 檔案模擬副本：GET 讀副本、寫入與讀自己的寫入走主庫、健康檢查與退回主庫
+"""
+import sqlite3
+import pytest
+from flask import g
+from sqlalchemy import select, update
+
+
+def _copy_primary(path):
+    """以 SQLite backup API 把主庫複製到副本檔案"""
+    from src.models_v2 import db
+
+    source = db.engine.raw_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.driver_connection.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+@pytest.fixture
+def replica_path(app, tmp_path):
+    return tmp_path / 'replica.db'
+
+
+@pytest.fixture
+def replica(replica_path):
+    """設定單一副本，內容為主庫目前的複本"""
+    from src.utils.db_routing import replica_router
+
+    _copy_primary(replica_path)
+    replica_router.configure([f'sqlite:///{replica_path}'])
+    yield replica_router.replicas[0]
+    replica_router.configure([])
+
+
+@pytest.fixture
+def replicate(replica, replica_path):
+    """模擬副本追上主庫"""
+    return lambda: _copy_primary(replica_path)
+
+
+def _category_names(response):
+    return [category['name'] for category in response.get_json()['categories']]
+
+
+class TestSessionRouting:
+    """Session 的 engine 選擇規則"""
+
+    def test_rules(self, app, replica):
+        """測試 GET 讀副本；寫入、交易內寫入後的讀取、use_primary 走主庫；交易結束後恢復"""
+        from src.models_v2 import db, JobCategory
+        from src.utils.db_routing import use_primary
+
+        g.pop('db_primary_until', None)
+        mapper, query = JobCategory.__mapper__, select(JobCategory)
+
+        assert db.session.get_bind(mapper, clause=query) is replica.engine
+        with use_primary():
+            assert db.session.get_bind(mapper, clause=query) is db.engine
+        assert db.session.get_bind(mapper, clause=query.with_for_update()) is db.engine
+        # 直接取用連線（DDL、inspection）一律走主庫
+        assert db.session.get_bind() is db.engine
+
+        db.session.execute(update(JobCategory).where(JobCategory.id == -1).values(name='不存在'))
+        assert db.session.get_bind(mapper, clause=query) is db.engine
+        db.session.rollback()
+        assert db.session.get_bind(mapper, clause=query) is replica.engine
+
+    def test_read_only_marks_post(self, app, replica):
+        """測試 POST 預設走主庫，以 read_only() 標記後讀副本"""
+        from src.models_v2 import db, JobCategory
+        from src.utils.db_routing import read_only
+
+        with app.test_request_context('/api/v2/search', method='POST'):
+            g.pop('db_primary_until', None)
+            assert db.session.get_bind(JobCategory.__mapper__, clause=select(JobCategory)) is db.engine
+            with read_only():
+                assert db.session.get_bind(JobCategory.__mapper__, clause=select(JobCategory)) is replica.engine
+
+
+class TestRequestRouting:
+    """HTTP 請求的讀寫分流"""
+
+    def test_get_reads_lagging_replica(self, app, replica):
+        """測試 GET 讀取副本：副本尚未同步的資料不會出現"""
+        from src.models_v2 import db, JobCategory
+
+        db.session.add(JobCategory(name='尚未同步的分類'))
+        db.session.commit()
+
+        response = app.test_client().get('/api/v2/job-categories')
+
+        assert response.status_code == 200
+        assert '尚未同步的分類' not in _category_names(response)
+        assert replica.transactions >= 1
+
+    def test_read_your_writes(self, app, admin_token, replica):
+        """測試寫入走主庫，同一用戶端之後的讀取也走主庫並收到 cookie"""
+        from src.models_v2 import JobCategory
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        response = client.post('/api/v2/job-categories', json={'name': '讀自己的寫入'}, headers=headers)
+
+        assert response.status_code == 201
+        assert 'db_primary_until=' in response.headers.get('Set-Cookie', '')
+        with replica.engine.connect() as connection:
+            assert connection.execute(
+                select(JobCategory.id).where(JobCategory.name == '讀自己的寫入')
+            ).first() is None
+
+        response = client.get('/api/v2/job-categories', headers=headers)
+        assert '讀自己的寫入' in _category_names(response)
+
+    def test_view_count_not_overwritten_by_replica(self, app, replica, replicate):
+        """測試瀏覽次數以主庫的值遞增，不以副本讀到的舊值寫回"""
+        from src.models_v2 import db, Job, User
+
+        poster = User(email='replica_poster@example.com', password_hash='x')
+        db.session.add(poster)
+        db.session.flush()
+        job = Job(user_id=poster.id, title='副本職缺', company='公司', description='測試')
+        db.session.add(job)
+        db.session.commit()
+        replicate()
+        job_id = job.id
+        db.session.execute(update(Job).where(Job.id == job_id).values(views_count=5))
+        db.session.commit()
+
+        response = app.test_client().get(f'/api/v2/jobs/{job_id}')
+
+        assert response.status_code == 200
+        assert replica.transactions >= 1
+        assert db.session.get(Job, job_id).views_count == 6
+
+
+class TestHealth:
+    """健康檢查與退回主庫"""
+
+    def test_unreachable_replica_falls_back(self, app, tmp_path):
+        """測試健康檢查失敗的副本不再分配，讀取退回主庫"""
+        from src.models_v2 import db, JobCategory
+        from src.utils.db_routing import replica_router
+
+        replica_router.configure([f'sqlite:///{tmp_path / "missing" / "replica.db"}'])
+        try:
+            assert replica_router.check_health() == {'healthy': 0, 'unhealthy': 1}
+            g.pop('db_primary_until', None)
+            assert db.session.get_bind(JobCategory.__mapper__, clause=select(JobCategory)) is db.engine
+            assert replica_router.stats()['fallbacks'] == 1
+        finally:
+            replica_router.configure([])
+
+    def test_connection_error_marks_unhealthy(self, app, tmp_path):
+        """測試執行中的連線錯誤立即停用副本，下一個交易改走主庫"""
+        from sqlalchemy.exc import OperationalError
+        from src.models_v2 import db, JobCategory
+        from src.utils.db_routing import replica_router
+
+        replica_router.configure([f'sqlite:///{tmp_path / "missing" / "replica.db"}'])
+        try:
+            g.pop('db_primary_until', None)
+            with pytest.raises(OperationalError):
+                JobCategory.query.all()
+            db.session.rollback()
+
+            assert replica_router.replicas[0].healthy is False
+            assert isinstance(JobCategory.query.all(), list)
+        finally:
+            replica_router.configure([])
+
+    def test_admin_replica_status(self, client, admin_token, replica):
+        """測試管理員取得副本狀態"""
+        response = client.get('/api/v2/admin/performance/replicas',
+                              headers={'Authorization': f'Bearer {admin_token}'})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['replicas']) == 1 and data['replicas'][0]['healthy'] is True
@@ -0,0 +1,127 @@
+"""
+回應快取測試
+測試公開列表端點的快取命中、版本失效與 LRU 淘汰
+"""
+import pytest
+
+
+def _create_job(client, token, title='快取測試職缺'):
+    return client.post(
+        '/api/v2/jobs',
+        json={
+            'title': title,
+            'company': '測試公司',
+            'location': '台北',
+            'description': '這是一個測試職缺',
+            'job_type': 'full_time',
+            'category_name': '軟體工程'
+        },
+        headers={'Authorization': f'Bearer {token}'}
+    )
+
+
+class TestResponseCache:
+    """公開列表回應快取測試"""
+
+    def test_second_request_is_served_from_cache(self, client):
+        """測試相同查詢第二次命中快取"""
+        first = client.get('/api/v2/jobs?page=1&per_page=5')
+        second = client.get('/api/v2/jobs?per_page=5&page=1')
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert first.get_json() == second.get_json()
+
+    def test_hit_and_miss_counts(self, client):
+        """測試多個執行緒同時讀取時命中與未命中次數不遺失"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.utils.cache import response_cache
+
+        client.get('/api/v2/jobs?page=1')
+
+        def fetch(_):
+            with client.application.test_client() as thread_client:
+                return thread_client.get('/api/v2/jobs?page=1').headers['X-Cache']
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(fetch, range(40)))
+
+        stats = response_cache.stats()
+        assert (stats['hits'], stats['misses']) == (results.count('HIT'), 1 + results.count('MISS'))
+
+    def test_different_query_uses_different_entry(self, client):
+        """測試不同查詢條件不共用快取"""
+        client.get('/api/v2/jobs?page=1')
+        response = client.get('/api/v2/jobs?page=2')
+
+        assert response.headers['X-Cache'] == 'MISS'
+
+    def test_create_invalidates_listing(self, client, auth_token):
+        """測試新增職缺後列表快取失效"""
+        client.get('/api/v2/jobs')
+
+        assert _create_job(client, auth_token).status_code == 201
+
+        response = client.get('/api/v2/jobs')
+        assert response.headers['X-Cache'] == 'MISS'
+        assert [job['title'] for job in response.get_json()['jobs']] == ['快取測試職缺']
+
+    def test_view_counter_does_not_invalidate(self, client, auth_token):
+        """測試瀏覽次數更新不會使列表快取失效"""
+        job_id = _create_job(client, auth_token).get_json()['job']['id']
+        client.get('/api/v2/jobs')
+
+        client.get(f'/api/v2/jobs/{job_id}')
+
+        assert client.get('/api/v2/jobs').headers['X-Cache'] == 'HIT'
+
+    def test_category_listing_depends_on_jobs(self, client, auth_token):
+        """測試分類列表（含職缺數量）會隨職缺異動失效"""
+        _create_job(client, auth_token)
+        first = client.get('/api/v2/job-categories')
+        assert first.get_json()['categories'][0]['job_count'] == 1
+
+        _create_job(client, auth_token, title='第二個職缺')
+
+        second = client.get('/api/v2/job-categories')
+        assert second.headers['X-Cache'] == 'MISS'
+        assert second.get_json()['categories'][0]['job_count'] == 2
+
+
+class TestLocalCacheBackend:
+    """行程內 LRU 後端測試"""
+
+    def test_evicts_least_recently_used(self):
+        """測試超過筆數上限時淘汰最久未使用的項目"""
+        from src.utils.cache import LocalCacheBackend
+
+        backend = LocalCacheBackend(max_entries=2)
+        backend.set('a', (200, 'application/json', b'1'), ttl=60)
+        backend.set('b', (200, 'application/json', b'2'), ttl=60)
+        backend.get('a')
+        backend.set('c', (200, 'application/json', b'3'), ttl=60)
+
+        assert backend.get('a') is not None
+        assert backend.get('b') is None
+        assert backend.get('c') is not None
+
+    def test_respects_byte_budget(self):
+        """測試超過總位元組上限時淘汰"""
+        from src.utils.cache import LocalCacheBackend
+
+        backend = LocalCacheBackend(max_entries=10, max_bytes=10)
+        backend.set('a', (200, 'application/json', b'x' * 6), ttl=60)
+        backend.set('b', (200, 'application/json', b'y' * 6), ttl=60)
+
+        assert backend.get('a') is None
+        assert backend.get('b') is not None
+        assert backend.stats()['bytes'] == 6
+
+    def test_expired_entry_is_dropped(self):
+        """測試過期項目不會被回傳"""
+        from src.utils.cache import LocalCacheBackend
+
+        backend = LocalCacheBackend()
+        backend.set('a', (200, 'application/json', b'1'), ttl=-1)
+
+        assert backend.get('a') is None
@@ -0,0 +1,164 @@
+"""
+宣告式序列化測試
+測試序列化輸出與 to_dict 一致、稀疏欄位與 eager loading（不觸發 lazy load）
+"""
+import pytest
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def serializer_setup(app):
+    """建立兩位使用者與各類列表資料"""
+    from src.models_v2 import (
+        db, User, UserProfile, Job, JobCategory, Event, EventCategory,
+        Bulletin, BulletinCategory, Conversation, Message
+    )
+    from src.models_v2.events import EventStatus
+
+    alice = User(email='alice@example.com', password_hash='x')
+    bob = User(email='bob@example.com', password_hash='x')
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    db.session.add(UserProfile(user_id=alice.id, full_name='陳愛麗', display_name='愛麗'))
+
+    job_category = JobCategory(name='序列化測試職缺分類')
+    event_category = EventCategory(name='序列化測試活動分類')
+    bulletin_category = BulletinCategory(name='序列化測試公告分類')
+    db.session.add_all([job_category, event_category, bulletin_category])
+    db.session.flush()
+
+    now = datetime.utcnow()
+    jobs = [
+        Job(user_id=alice.id, category_id=job_category.id, title='後端工程師', company='甲公司',
+            description='測試', expires_at=now + timedelta(days=30)),
+        Job(user_id=bob.id, title='資料工程師', company='乙公司', description='測試',
+            expires_at=now - timedelta(days=1)),
+    ]
+    event = Event(organizer_id=alice.id, category_id=event_category.id, title='校友講座',
+                  description='測試', start_time=now + timedelta(days=3),
+                  end_time=now + timedelta(days=3, hours=2), max_participants=10,
+                  current_participants=4, status=EventStatus.UPCOMING)
+    bulletin = Bulletin(author_id=alice.id, category_id=bulletin_category.id,
+                        title='系務公告', content='內容')
+    conversation = Conversation(user1_id=alice.id, user2_id=bob.id, unread_count_user2=2)
+    db.session.add_all([*jobs, event, bulletin, conversation])
+    db.session.flush()
+    db.session.add_all([
+        Message(conversation_id=conversation.id, sender_id=alice.id, content='嗨'),
+        Message(conversation_id=conversation.id, sender_id=alice.id, content='在嗎'),
+    ])
+    db.session.commit()
+
+    return {
+        'alice_id': alice.id,
+        'bob_id': bob.id,
+        'user_ids': [alice.id, bob.id],
+        'job_ids': [job.id for job in jobs],
+    }
+
+
+OWNER_COLUMNS = {
+    'Job': 'user_id',
+    'Event': 'organizer_id',
+    'Bulletin': 'author_id',
+    'Conversation': 'user1_id',
+}
+
+
+def _owned_query(serializer, setup):
+    """只查詢 fixture 建立的資料（第一個測試可能還看得到種子資料）"""
+    model = serializer.model
+    owner = getattr(model, OWNER_COLUMNS[model.__name__])
+    return model.query.filter(owner.in_(setup['user_ids'])).order_by(model.id)
+
+
+def _load_strict(serializer, setup, fields=None):
+    """以序列化器宣告的 eager loading 查詢，並禁止其他 lazy load"""
+    from sqlalchemy.orm import raiseload
+    from src.models_v2 import db
+
+    db.session.expunge_all()
+    return _owned_query(serializer, setup).options(
+        *serializer.loader_options(fields), raiseload('*')
+    ).all()
+
+
+class TestModelSerializers:
+    """序列化器輸出測試"""
+
+    @pytest.mark.parametrize('name', ['job', 'event', 'bulletin'])
+    def test_matches_to_dict(self, app, serializer_setup, name):
+        """測試輸出與 to_dict 相同"""
+        from src.utils import serializers
+
+        serializer = getattr(serializers, f'{name}_serializer')
+        objs = _owned_query(serializer, serializer_setup).all()
+
+        assert objs
+        assert serializer.dump_many(objs) == [obj.to_dict() for obj in objs]
+
+    def test_conversation_matches_to_dict(self, app, serializer_setup):
+        """測試對話輸出（含目前使用者欄位與訊息數）與 to_dict 相同"""
+        from src.models_v2 import Conversation
+        from src.utils.serializers import conversation_serializer
+
+        conversation = Conversation.query.one()
+        bob_id = serializer_setup['bob_id']
+
+        data = conversation_serializer.dump(conversation, current_user_id=bob_id)
+
+        assert data == conversation.to_dict(current_user_id=bob_id)
+        assert data['message_count'] == 2
+        assert data['unread_count'] == 2
+
+    def test_no_lazy_loads(self, app, serializer_setup):
+        """測試套用宣告的 eager loading 後序列化不會觸發 lazy load"""
+        from src.utils.serializers import (
+            job_serializer, event_serializer, bulletin_serializer, conversation_serializer
+        )
+
+        for serializer in (job_serializer, event_serializer, bulletin_serializer, conversation_serializer):
+            assert serializer.dump_many(_load_strict(serializer, serializer_setup))
+
+        jobs = job_serializer.dump_many(_load_strict(job_serializer, serializer_setup))
+        assert jobs[0]['poster_name'] == '愛麗'
+        assert jobs[0]['category_name'] == '序列化測試職缺分類'
+        assert 'category_name' not in jobs[1]
+
+    def test_sparse_fieldset(self, app, serializer_setup):
+        """測試只輸出指定欄位，且只載入所需關聯"""
+        from src.utils.serializers import job_serializer
+
+        fields = job_serializer.parse_fields('id,title,category_name')
+
+        assert job_serializer.load_paths(fields) == ('category',)
+        assert job_serializer.dump_many(_load_strict(job_serializer, serializer_setup, fields), fields)[0] == {
+            'id': serializer_setup['job_ids'][0], 'title': '後端工程師', 'category_name': '序列化測試職缺分類'
+        }
+
+    def test_unknown_field_rejected(self):
+        """測試未知欄位"""
+        from src.utils.serializers import job_serializer
+
+        with pytest.raises(ValueError):
+            job_serializer.parse_fields('id,password_hash')
+
+
+class TestSparseFieldsEndpoints:
+    """列表端點 ?fields= 測試"""
+
+    def test_jobs_fields_param(self, client, serializer_setup):
+        """測試職缺列表只回傳指定欄位"""
+        response = client.get('/api/v2/jobs?fields=id,title,is_expired&search=後端工程師')
+
+        assert response.status_code == 200
+        assert response.get_json()['jobs'] == [
+            {'id': serializer_setup['job_ids'][0], 'title': '後端工程師', 'is_expired': False}
+        ]
+
+    def test_unknown_field_returns_400(self, client):
+        """測試未知欄位回傳 400"""
+        response = client.get('/api/v2/events?fields=id,secret')
+
+        assert response.status_code == 400
+        assert 'secret' in response.get_json()['message']
@@ -0,0 +1,97 @@
+"""
+SQL 查詢監控測試
+測試語句指紋、每請求查詢數、Server-Timing 標頭與慢語句紀錄
+"""
+
+
+class TestFingerprint:
+    """語句指紋測試"""
+
+    def test_literals_and_in_lists_normalized(self):
+        """測試常數、參數與 IN 清單長度不同的語句歸為同一指紋"""
+        from src.utils.sql_monitor import fingerprint
+
+        first = fingerprint("SELECT * FROM users_v2 WHERE id IN (?, ?, ?) AND email = 'a@b.c' LIMIT 10")
+        second = fingerprint("SELECT *  FROM users_v2\n WHERE id IN (?) AND email = 'x''y' LIMIT 20")
+
+        assert first == second == 'SELECT * FROM users_v2 WHERE id IN (?) AND email = ? LIMIT ?'
+
+    def test_bulk_values_collapsed(self):
+        """測試多列 INSERT 收斂成同一指紋"""
+        from src.utils.sql_monitor import fingerprint
+
+        assert fingerprint('INSERT INTO t (a, b) VALUES (?, ?), (?, ?)') == \
+            fingerprint('INSERT INTO t (a, b) VALUES (?, ?)')
+
+
+class TestSQLMonitor:
+    """請求層級統計測試"""
+
+    def test_server_timing_header(self, client):
+        """測試回應帶有資料庫耗時與語句數"""
+        response = client.get('/api/v2/jobs')
+
+        timing = response.headers.getlist('Server-Timing')
+        assert any(value.startswith('db;dur=') and 'queries' in value for value in timing)
+        assert any(value.startswith('app;dur=') for value in timing)
+
+    def test_endpoint_statement_counts(self, client):
+        """測試依路由規則彙總每請求語句數"""
+        from src.utils.sql_monitor import sql_monitor
+
+        client.get('/api/v2/jobs/1')
+        client.get('/api/v2/jobs/2')
+
+        stats = {item['endpoint']: item for item in sql_monitor.endpoint_stats()}
+        detail = stats['GET /api/v2/jobs/<int:job_id>']
+        assert detail['requests'] == 2
+        assert detail['max_statements'] >= 1
+
+    def test_slow_statement_sample(self):
+        """測試超過門檻的語句保留參數樣本（預設只有型別）"""
+        from src.utils.sql_monitor import SQLMonitor
+
+        monitor = SQLMonitor(slow_threshold=0.05)
+        monitor.record_statement('SELECT ? FROM t', 0.01, ('fast',))
+        monitor.record_statement('SELECT ? FROM t', 0.2, ('slow',))
+        monitor.record_statement('SELECT ? FROM u', 0.01, ('other',))
+
+        slow = monitor.slow_statements()
+        assert [item['fingerprint'] for item in slow] == ['SELECT ? FROM t']
+        assert slow[0]['count'] == 2 and slow[0]['sample_parameters'] == ['<str>']
+        assert slow[0]['sample_endpoint'] == '<background>'
+
+    def test_raw_parameters_opt_in(self):
+        """測試參數預設只記錄型別，明確開啟才保留實際值"""
+        from src.utils.sql_monitor import SQLMonitor
+
+        statement = 'INSERT INTO users_v2 (email, password_hash) VALUES (?, ?)'
+        redacted = SQLMonitor()
+        redacted.record_statement(statement, 0.01, [('a@example.com', 'pbkdf2:sha256$secret'), ('b', 'c')])
+        raw = SQLMonitor(raw_parameters=True)
+        raw.record_statement(statement, 0.01, {'email': 'a@example.com', 'age': 3})
+
+        assert redacted.top_statements()[0]['sample_parameters'] == ['<str>', '<str>']
+        assert raw.top_statements()[0]['sample_parameters'] == {'email': "'a@example.com'", 'age': '3'}
+
+    def test_fingerprint_limit(self):
+        """測試指紋數量達上限時淘汰總耗時最少者"""
+        from src.utils.sql_monitor import SQLMonitor
+
+        monitor = SQLMonitor(max_fingerprints=2)
+        monitor.record_statement('A', 0.3)
+        monitor.record_statement('B', 0.1)
+        monitor.record_statement('C', 0.2)
+
+        assert [item['fingerprint'] for item in monitor.top_statements()] == ['A', 'C']
+
+    def test_admin_endpoint(self, client, admin_token):
+        """測試管理員取得 SQL 統計"""
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        client.get('/api/v2/jobs')
+
+        data = client.get('/api/v2/admin/performance/sql', headers=headers).get_json()
+        assert data['top_statements']
+        assert any(item['endpoint'] == 'GET /api/v2/jobs' for item in data['endpoints'])
+
+        assert client.delete('/api/v2/admin/performance/sql', headers=headers).status_code == 200
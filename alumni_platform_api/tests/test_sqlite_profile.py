@@ -0,0 +1,71 @@
+"""
+SQLite 連線設定測試
+測試 PRAGMA 套用、外鍵串聯刪除、PRAGMA optimize 與並行寫入
+"""
+import pytest
+from sqlalchemy import delete
+
+
+@pytest.fixture
+def sqlite_engine(app):
+    from src.models_v2 import db
+
+    if db.engine.dialect.name != 'sqlite':
+        pytest.skip('SQLite only')
+    return db.engine
+
+
+class TestSQLiteProfile:
+    """SQLite PRAGMA 測試"""
+
+    def test_pragmas_applied(self, sqlite_engine):
+        """測試每條連線都套用 busy_timeout、foreign_keys、synchronous"""
+        with sqlite_engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()  # noqa: E731
+            assert pragma('busy_timeout') == 5000
+            assert pragma('foreign_keys') == 1
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('journal_mode') in ('wal', 'memory')
+
+    def test_foreign_key_cascade(self, sqlite_engine, auth_token_with_user_id):
+        """測試外鍵開啟後刪除使用者會串聯刪除個人檔案"""
+        from src.models_v2 import db, User, UserProfile
+
+        user_id = auth_token_with_user_id['user_id']
+        assert UserProfile.query.filter_by(user_id=user_id).count() == 1
+
+        db.session.execute(delete(User).where(User.id == user_id))
+        db.session.commit()
+
+        assert UserProfile.query.filter_by(user_id=user_id).count() == 0
+
+    def test_optimize(self, sqlite_engine):
+        """測試 PRAGMA optimize 排程工作"""
+        from src.config.database import optimize_sqlite
+
+        assert 'wal_pages' in optimize_sqlite(sqlite_engine)
+
+    def test_engine_options(self, monkeypatch):
+        """測試檔案資料庫使用可跨執行緒的連線池，記憶體資料庫不帶連線池參數"""
+        from src.config.database import get_database_config
+
+        monkeypatch.setenv('DATABASE_URL', 'sqlite:////tmp/app.db')
+        options = get_database_config()['SQLALCHEMY_ENGINE_OPTIONS']
+        assert options['connect_args']['check_same_thread'] is False
+        assert options['pool_size'] >= 5
+
+        monkeypatch.setenv('DATABASE_URL', 'sqlite:///:memory:')
+        assert 'SQLALCHEMY_ENGINE_OPTIONS' not in get_database_config()
+
+
+class TestConcurrentWriters:
+    """並行寫入測試"""
+
+    def test_concurrent_writers_without_lock_errors(self, tmp_path):
+        """測試多個寫入與讀取執行緒同時存取時沒有 database is locked"""
+        from benchmarks.sqlite_concurrency import run
+
+        result = run('tuned', writers=6, readers=3, operations=30, directory=str(tmp_path))
+
+        assert result['errors'] == 0
+        assert result['writes'] == 180
@@ -0,0 +1,160 @@
+"""
+管理後台統計彙總測試
+測試歷史回補、增量結算、儀表板即時差額與趨勢端點
+"""
+import pytest
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def history(app):
+    """三天前註冊 2 人（其中 1 人當天登入兩次）、昨天註冊 1 人並發布 1 個職缺"""
+    from src.models_v2 import db, User, UserSession, Job
+
+    now = datetime.utcnow()
+    three_days_ago, yesterday = now - timedelta(days=3), now - timedelta(days=1)
+    users = [
+        User(email='stats_a@example.com', password_hash='x', created_at=three_days_ago),
+        User(email='stats_b@example.com', password_hash='x', created_at=three_days_ago),
+        User(email='stats_c@example.com', password_hash='x', created_at=yesterday),
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add_all([
+        UserSession(user_id=users[0].id, session_token=f'stats-{i}', expires_at=now,
+                    created_at=three_days_ago)
+        for i in range(2)
+    ])
+    db.session.add(Job(user_id=users[2].id, title='統計測試職缺', company='公司', description='測試',
+                       created_at=yesterday))
+    db.session.commit()
+    return {'three_days_ago': three_days_ago.date(), 'yesterday': yesterday.date(), 'today': now.date()}
+
+
+def _value(day, metric):
+    from src.models_v2 import db, DailyStat
+    row = db.session.get(DailyStat, (day, metric))
+    return row.value if row else None
+
+
+class TestRollup:
+    """彙總工作測試"""
+
+    def test_backfill_history(self, history):
+        """測試首次彙總回補歷史日期並結算"""
+        from src.models_v2 import db, DailyStat
+        from src.utils.statistics import rollup_daily_stats
+
+        rollup_daily_stats()
+
+        assert _value(history['three_days_ago'], 'signups') == 2
+        assert _value(history['three_days_ago'], 'active_users') == 1
+        assert _value(history['yesterday'], 'signups') == 1
+        assert _value(history['yesterday'], 'jobs_created') == 1
+        # 沒有資料的日期也有結算列
+        assert _value(history['yesterday'] - timedelta(days=1), 'signups') == 0
+
+        assert db.session.get(DailyStat, (history['yesterday'], 'signups')).is_final is True
+        assert db.session.get(DailyStat, (history['today'], 'signups')).is_final is False
+        assert _value(history['today'], 'users_total') is not None
+
+    def test_finalized_days_not_recomputed(self, history):
+        """測試已結算日期不再重算，之後的彙總只處理今天"""
+        from src.models_v2 import db, User
+        from src.utils.statistics import rollup_daily_stats
+
+        rollup_daily_stats()
+        db.session.add(User(email='stats_late@example.com', password_hash='x',
+                            created_at=datetime.combine(history['yesterday'], datetime.min.time())))
+        db.session.commit()
+
+        result = rollup_daily_stats()
+
+        assert result['start'] == history['today'].isoformat()
+        assert result['finalized'] == 0
+        assert _value(history['yesterday'], 'signups') == 1
+
+    def test_refresh_skips_fresh_rollup(self, history):
+        """測試排程在今天的彙總未過期時略過"""
+        from src.utils.statistics import rollup_daily_stats, refresh_daily_stats
+
+        rollup_daily_stats()
+        assert refresh_daily_stats(max_age_seconds=300) == {'skipped': True}
+
+
+class TestDashboard:
+    """儀表板與趨勢端點測試"""
+
+    def test_dashboard_includes_live_delta(self, client, admin_token, history):
+        """測試彙總之後新增的資料即時反映在總數與本月新增"""
+        from src.models_v2 import db, User, Job
+        from src.utils.statistics import rollup_daily_stats
+
+        rollup_daily_stats()
+        poster = User.query.filter_by(email='stats_a@example.com').first()
+        db.session.add(Job(user_id=poster.id, title='彙總後新增', company='公司', description='測試'))
+        db.session.commit()
+
+        response = client.get('/api/v2/admin/statistics', headers={'Authorization': f'Bearer {admin_token}'})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['statistics']['jobs']['total'] == Job.query.count()
+        assert data['statistics']['users']['total'] == User.query.count()
+        assert data['as_of']
+
+    def test_dashboard_query_budget(self, client, admin_token, history, query_budget):
+        """測試儀表板的查詢數為常數（不掃描來源資料表）"""
+        from src.utils.statistics import rollup_daily_stats
+
+        rollup_daily_stats()
+        with query_budget(4):
+            response = client.get('/api/v2/admin/statistics',
+                                  headers={'Authorization': f'Bearer {admin_token}'})
+        assert response.status_code == 200
+
+    def test_trends_zero_filled(self, client, admin_token, history):
+        """測試趨勢端點依區間加總並補 0"""
+        from src.utils.statistics import rollup_daily_stats
+
+        rollup_daily_stats()
+        start = history['three_days_ago'] - timedelta(days=1)
+        response = client.get(
+            f"/api/v2/admin/statistics/trends?metrics=signups,jobs_created"
+            f"&start={start.isoformat()}&end={history['yesterday'].isoformat()}",
+            headers={'Authorization': f'Bearer {admin_token}'}
+        )
+
+        assert response.status_code == 200
+        series = response.get_json()['series']
+        assert [point['value'] for point in series['signups']] == [0, 2, 0, 1]
+        assert [point['value'] for point in series['jobs_created']] == [0, 0, 0, 1]
+
+    def test_active_users_not_summed_across_days(self, app):
+        """測試週區間的 active_users 取單日最大值，其他流量指標照常加總"""
+        from datetime import date
+        from src.models_v2 import db, DailyStat
+        from src.utils.statistics import metric_series
+
+        monday = date(2025, 3, 3)
+        for offset, (active, signups) in enumerate([(5, 1), (7, 2), (5, 3)]):
+            day = monday + timedelta(days=offset)
+            db.session.add_all([DailyStat(day=day, metric='active_users', value=active, is_final=True),
+                                DailyStat(day=day, metric='signups', value=signups, is_final=True)])
+        db.session.commit()
+
+        series = metric_series(['active_users', 'signups'], monday, monday + timedelta(days=6), 'week')
+
+        assert series['active_users'] == [{'date': monday.isoformat(), 'value': 7}]
+        assert series['signups'] == [{'date': monday.isoformat(), 'value': 6}]
+
+    def test_trends_validation(self, client, admin_token):
+        """測試未知指標、錯誤區間與過長範圍回傳 400"""
+        headers = {'Authorization': f'Bearer {admin_token}'}
+
+        assert client.get('/api/v2/admin/statistics/trends?metrics=unknown',
+                          headers=headers).status_code == 400
+        assert client.get('/api/v2/admin/statistics/trends?interval=hour',
+                          headers=headers).status_code == 400
+        assert client.get('/api/v2/admin/statistics/trends?start=2020-01-01&end=2025-01-01',
+                          headers=headers).status_code == 400
@@ -0,0 +1,238 @@
+"""
+檔案上傳測試
+測試單次上傳的串流寫入與大小限制、分段上傳的續傳與校驗、過期工作階段清理
+"""
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _temp_files(app):
+    from src.utils.uploads import TEMP_PREFIX
+
+    folder = app.config['UPLOAD_FOLDER']
+    return [name for name in os.listdir(folder) if name.startswith(TEMP_PREFIX)]
+
+
+def _stored_path(app, file_path):
+    return os.path.join(app.config['UPLOAD_FOLDER'], os.path.basename(file_path))
+
+
+class TestSingleUpload:
+    """單次上傳"""
+
+    def test_upload_file(self, client, app, auth_token):
+        """測試上傳後檔案寫入上傳目錄，回應包含 SHA-256"""
+        content = b'%PDF-1.4 ' + os.urandom(200 * 1024)
+        response = client.post('/api/files/upload',
+                               headers={'Authorization': f'Bearer {auth_token}'},
+                               data={'file': (io.BytesIO(content), 'resume.pdf'), 'related_type': 'profile'},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['sha256'] == hashlib.sha256(content).hexdigest()
+        assert data['file']['file_size'] == len(content)
+        assert data['file']['related_type'] == 'profile'
+        with open(_stored_path(app, data['file']['file_path']), 'rb') as f:
+            assert f.read() == content
+        assert _temp_files(app) == []
+
+    def test_upload_too_large(self, client, app, auth_token):
+        """測試超過上限時回應 413，且不留下暫存檔"""
+        app.config['UPLOAD_MAX_BYTES'] = 64 * 1024
+        try:
+            response = client.post('/api/files/upload',
+                                   headers={'Authorization': f'Bearer {auth_token}'},
+                                   data={'file': (io.BytesIO(b'x' * (200 * 1024)), 'photo.png')},
+                                   content_type='multipart/form-data')
+        finally:
+            app.config['UPLOAD_MAX_BYTES'] = 5 * 1024 * 1024
+
+        assert response.status_code == 413
+        assert _temp_files(app) == []
+
+    def test_upload_too_large_without_content_length(self, app):
+        """測試 Content-Length 未超過上限時，讀取中途超過上限也會中止"""
+        from werkzeug.test import EnvironBuilder
+        from src.utils.uploads import UploadTooLarge, parse_multipart_upload
+
+        builder = EnvironBuilder(method='POST', data={'file': (io.BytesIO(b'x' * 4096), 'photo.png')})
+        with app.request_context(builder.get_environ()):
+            from flask import request
+            with pytest.raises(UploadTooLarge):
+                parse_multipart_upload(request, 1024)
+        assert _temp_files(app) == []
+
+    def test_upload_disallowed_extension(self, client, app, auth_token):
+        """測試不允許的副檔名"""
+        response = client.post('/api/files/upload',
+                               headers={'Authorization': f'Bearer {auth_token}'},
+                               data={'file': (io.BytesIO(b'echo hi'), 'run.sh')},
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 400
+        assert _temp_files(app) == []
+
+
+class TestChunkedUpload:
+    """分段上傳"""
+
+    def _create(self, client, token, content, **extra):
+        response = client.post('/api/files/uploads', headers={'Authorization': f'Bearer {token}'},
+                               json={'filename': 'slides.pdf', 'size': len(content), **extra})
+        assert response.status_code == 201
+        return response.get_json()['upload_id']
+
+    def _put(self, client, token, upload_id, offset, chunk):
+        return client.put(f'/api/files/uploads/{upload_id}', data=chunk,
+                          headers={'Authorization': f'Bearer {token}', 'Upload-Offset': str(offset),
+                                   'Content-Type': 'application/offset+octet-stream'})
+
+    def test_resumable_upload(self, client, app, auth_token):
+        """測試依序送出各段、查詢 offset 續傳與 offset 不符"""
+        content = os.urandom(300 * 1024)
+        upload_id = self._create(client, auth_token, content, sha256=hashlib.sha256(content).hexdigest())
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        response = self._put(client, auth_token, upload_id, 0, content[:100 * 1024])
+        assert response.status_code == 200
+        assert response.get_json()['offset'] == 100 * 1024
+
+        # 斷線後查詢 offset，重送舊的段落會被拒絕
+        assert client.get(f'/api/files/uploads/{upload_id}', headers=headers).get_json()['offset'] == 100 * 1024
+        response = self._put(client, auth_token, upload_id, 0, content[:100 * 1024])
+        assert response.status_code == 409
+        assert response.get_json()['offset'] == 100 * 1024
+
+        # 換 worker 時雜湊狀態從磁碟重算
+        from src.utils import uploads
+        uploads._hashers.clear()
+
+        self._put(client, auth_token, upload_id, 100 * 1024, content[100 * 1024:200 * 1024])
+        response = self._put(client, auth_token, upload_id, 200 * 1024, content[200 * 1024:])
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['sha256'] == hashlib.sha256(content).hexdigest()
+        assert data['file']['file_size'] == len(content)
+        with open(_stored_path(app, data['file']['file_path']), 'rb') as f:
+            assert f.read() == content
+
+        # 完成後工作階段即刪除
+        assert client.get(f'/api/files/uploads/{upload_id}', headers=headers).status_code == 404
+
+    def test_checksum_mismatch(self, client, app, auth_token):
+        """測試內容與宣告的 SHA-256 不符時回應 422 並捨棄"""
+        from src.utils.uploads import partial_path
+
+        content = b'a' * 1024
+        upload_id = self._create(client, auth_token, content, sha256=hashlib.sha256(b'other').hexdigest())
+
+        response = self._put(client, auth_token, upload_id, 0, content)
+
+        assert response.status_code == 422
+        assert not os.path.exists(partial_path(upload_id))
+
+    def test_chunk_exceeds_declared_size(self, client, auth_token):
+        """測試超過宣告大小的段落被拒絕，先前已接收的內容保留"""
+        upload_id = self._create(client, auth_token, b'a' * 1024)
+        self._put(client, auth_token, upload_id, 0, b'a' * 512)
+
+        response = self._put(client, auth_token, upload_id, 512, b'a' * 1024)
+
+        assert response.status_code == 413
+        assert response.get_json()['offset'] == 512
+
+    def test_chunk_exceeds_max_content_length(self, client, app, auth_token):
+        """測試單段超過 MAX_CONTENT_LENGTH 時回應 413 與目前的 offset"""
+        upload_id = self._create(client, auth_token, b'a' * (256 * 1024))
+        self._put(client, auth_token, upload_id, 0, b'a' * 1024)
+
+        app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
+        try:
+            response = self._put(client, auth_token, upload_id, 1024, b'a' * (128 * 1024))
+        finally:
+            app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
+
+        assert response.status_code == 413
+        assert response.get_json()['offset'] == 1024
+
+    def test_concurrent_write_rejected(self, client, auth_token):
+        """測試同一上傳正有請求在寫入時，重送的段落與取消都回應 409，不會重複寫入"""
+        import fcntl
+        from src.utils.uploads import partial_path
+
+        upload_id = self._create(client, auth_token, b'a' * 20)
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        with open(partial_path(upload_id), 'rb') as held:
+            fcntl.flock(held.fileno(), fcntl.LOCK_EX)
+            response = self._put(client, auth_token, upload_id, 0, b'a' * 10)
+            assert response.status_code == 409
+            assert response.get_json()['offset'] == 0
+            assert client.delete(f'/api/files/uploads/{upload_id}', headers=headers).status_code == 409
+
+        assert self._put(client, auth_token, upload_id, 0, b'a' * 10).get_json()['offset'] == 10
+        assert self._put(client, auth_token, upload_id, 10, b'a' * 10).status_code == 201
+
+    def test_create_validation(self, client, auth_token):
+        """測試建立時的副檔名與大小檢查"""
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        assert client.post('/api/files/uploads', headers=headers,
+                           json={'filename': 'run.sh', 'size': 10}).status_code == 400
+        assert client.post('/api/files/uploads', headers=headers,
+                           json={'filename': 'a.pdf', 'size': 0}).status_code == 400
+        assert client.post('/api/files/uploads', headers=headers,
+                           json={'filename': 'a.pdf', 'size': 10 ** 12}).status_code == 413
+
+    def test_other_user_cannot_access(self, client, auth_token, second_user_token):
+        """測試無法存取他人的上傳工作階段"""
+        upload_id = self._create(client, auth_token, b'a' * 10)
+
+        response = self._put(client, second_user_token, upload_id, 0, b'a' * 10)
+
+        assert response.status_code == 404
+
+    def test_cancel(self, client, auth_token):
+        """測試取消上傳"""
+        from src.utils.uploads import partial_path
+
+        upload_id = self._create(client, auth_token, b'a' * 10)
+        headers = {'Authorization': f'Bearer {auth_token}'}
+
+        assert client.delete(f'/api/files/uploads/{upload_id}', headers=headers).status_code == 200
+        assert not os.path.exists(partial_path(upload_id))
+        assert client.get(f'/api/files/uploads/{upload_id}', headers=headers).status_code == 404
+
+
+class TestPurgeExpiredUploads:
+    """過期清理排程"""
+
+    def test_purge_expired_uploads(self, app, auth_token_with_user_id):
+        """測試刪除過期的工作階段與殘留的暫存檔"""
+        from src.models_v2 import UploadSession
+        from src.utils.uploads import (STALE_TEMP_SECONDS, TEMP_PREFIX, create_upload_session,
+                                       partial_path, purge_expired_uploads)
+
+        user_id = auth_token_with_user_id['user_id']
+        active = create_upload_session(user_id, 'a.pdf', 10)
+        expired = create_upload_session(user_id, 'b.pdf', 10)
+        expired_id = expired.upload_id
+
+        stale = os.path.join(app.config['UPLOAD_FOLDER'], f'{TEMP_PREFIX}stale.part')
+        open(stale, 'wb').close()
+        old = datetime.now().timestamp() - STALE_TEMP_SECONDS - 60
+        os.utime(stale, (old, old))
+
+        now = expired.expires_at + timedelta(seconds=1)
+        active.expires_at = now + timedelta(hours=1)
+
+        assert purge_expired_uploads(now) == 1
+        assert [session.upload_id for session in UploadSession.query.all()] == [active.upload_id]
+        assert not os.path.exists(partial_path(expired_id))
+        assert os.path.exists(partial_path(active.upload_id))
+        assert not os.path.exists(stale)